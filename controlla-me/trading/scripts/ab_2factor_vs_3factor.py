@@ -20,10 +20,12 @@ Both use:
 Usage:
     cd trading
     python scripts/ab_2factor_vs_3factor.py
+    python scripts/ab_2factor_vs_3factor.py --no-cache   # re-run both variants (skip result cache)
 """
 
 from __future__ import annotations
 
+import argparse
 import sys
 from datetime import date
 from pathlib import Path
@@ -67,10 +69,11 @@ def run_variant(
     persistence_bars: int,
     min_acceleration_pct: float,
     acceleration_bars: int,
+    cache=None,
 ) -> dict:
-    """Run a single backtest variant and return metrics dict."""
-    from src.backtest.engine import BacktestConfig, BacktestEngine
-    from src.backtest.metrics import calculate_metrics
+    """Run a single backtest variant (memoized when a ResultCache is given) and return metrics dict."""
+    from src.backtest.engine import BacktestConfig
+    from src.backtest.result_cache import run_backtest
 
     logger.info(
         f"running_{label}",
@@ -107,9 +110,7 @@ def run_variant(
         slope_exit_threshold_pct=0.01,
     )
 
-    engine = BacktestEngine(config)
-    result = engine.run(data)
-    metrics = calculate_metrics(result)
+    result, metrics = run_backtest(config, data, cache=cache)
 
     # Count close reasons
     reason_counts = {}
@@ -246,8 +247,26 @@ def print_comparison(results: list[dict]) -> None:
     print()
 
 
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="ab_2factor_vs_3factor",
+        description="A/B backtest: 2-factor vs 3-factor slope+volume entries",
+    )
+    p.add_argument(
+        "--no-cache",
+        action="store_true",
+        dest="no_cache",
+        help="Always run the engine (skip the config + data result cache)",
+    )
+    return p.parse_args()
+
+
 def main() -> int:
     from src.backtest import DataLoader
+    from src.backtest.result_cache import ResultCache
+
+    args = parse_args()
+    cache = None if args.no_cache else ResultCache()
 
     # Load data once, reuse for both variants
     loader = DataLoader()
@@ -277,6 +296,7 @@ def main() -> int:
             persistence_bars=1,
             min_acceleration_pct=-999.0,
             acceleration_bars=5,
+            cache=cache,
         )
         results.append(r2)
     except Exception as e:
@@ -291,6 +311,7 @@ def main() -> int:
             persistence_bars=8,
             min_acceleration_pct=0.01,
             acceleration_bars=5,
+            cache=cache,
         )
         results.append(r3)
     except Exception as e:
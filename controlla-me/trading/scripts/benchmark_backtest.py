@@ -0,0 +1,177 @@
+"""
+benchmark_backtest.py — Backtest engine throughput (bars/sec) on 5-min SPY bars.
+
+Loads SPY 5-min data from trading/data/spy_5min_6m.csv (or generates a synthetic
+random-walk session series if the file is missing / --synthetic is given), then:
+
+  1. Price lookups: the per-bar access path used by the engine before the bar
+     store (``current_date in df.index`` + ``df.loc[current_date]``) vs
+     BarStore integer-index reads, over every bar of the dataset.
+  2. Full run: BacktestEngine.run() wall time and bars/sec for one strategy,
+     on the bar loop and/or the vectorized engine (BacktestConfig.engine).
+
+Usage (from trading/ directory):
+    python scripts/benchmark_backtest.py
+    python scripts/benchmark_backtest.py --synthetic --bars 20000
+    python scripts/benchmark_backtest.py --strategy noise_boundary --repeat 3
+    python scripts/benchmark_backtest.py --synthetic --bars 20000 --engine both
+
+Output: timing table printed to stdout.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+# ── Ensure trading/ is on sys.path ────────────────────────────────────────────
+_SCRIPT_DIR = Path(__file__).resolve().parent
+_TRADING_DIR = _SCRIPT_DIR.parent
+if str(_TRADING_DIR) not in sys.path:
+    sys.path.insert(0, str(_TRADING_DIR))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import structlog  # noqa: E402
+
+# Engine logs at info level per run — keep the benchmark output readable
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+DEFAULT_CSV = _TRADING_DIR / "data" / "spy_5min_6m.csv"
+DEFAULT_BARS = 10_000
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="benchmark_backtest",
+        description="Backtest engine bars/sec benchmark on 5-min SPY bars",
+    )
+    p.add_argument("--csv", type=Path, default=DEFAULT_CSV, help=f"5-min CSV (default: {DEFAULT_CSV})")
+    p.add_argument("--synthetic", action="store_true", help="Ignore --csv and generate bars")
+    p.add_argument("--bars", type=int, default=DEFAULT_BARS, help="Synthetic bar count / CSV tail length")
+    p.add_argument(
+        "--strategy",
+        default="slope_volume",
+        choices=["slope_volume", "noise_boundary", "trend_following"],
+        help="Strategy for the full-run benchmark (default: slope_volume)",
+    )
+    p.add_argument(
+        "--engine",
+        default="bar",
+        choices=["bar", "vectorized", "both"],
+        help="Engine for the full-run benchmark (default: bar)",
+    )
+    p.add_argument("--repeat", type=int, default=1, help="Full-run repetitions (best time is reported)")
+    return p.parse_args()
+
+
+# ── Data ──────────────────────────────────────────────────────────────────────
+
+
+def synthetic_5min(n_bars: int, seed: int = 7) -> pd.DataFrame:
+    """Random-walk SPY-like bars on the 14:30–20:55 UTC session grid."""
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range("2024-01-02", periods=n_bars // 78 + 2, tz="UTC")
+    idx = pd.DatetimeIndex(
+        [d + pd.Timedelta(hours=14, minutes=30) + pd.Timedelta(minutes=5 * k) for d in days for k in range(78)]
+    )[:n_bars]
+    close = 470.0 * np.exp(np.cumsum(rng.normal(0, 0.0008, n_bars)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.0006, n_bars)) * close
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.minimum(open_, close) - spread,
+            "close": close,
+            "volume": rng.integers(200_000, 2_000_000, n_bars).astype(float),
+        },
+        index=idx.rename("timestamp"),
+    )
+
+
+def load_bars(args: argparse.Namespace) -> tuple[pd.DataFrame, str]:
+    if not args.synthetic and args.csv.exists():
+        df = pd.read_csv(args.csv, index_col=0, parse_dates=True)
+        df.index = df.index.tz_localize("UTC") if df.index.tz is None else df.index.tz_convert("UTC")
+        return df.tail(args.bars), str(args.csv)
+    return synthetic_5min(args.bars), "synthetic"
+
+
+# ── Benchmarks ────────────────────────────────────────────────────────────────
+
+
+def bench_lookups(df: pd.DataFrame) -> tuple[float, float]:
+    """Seconds for one pass over every bar: df.loc path vs BarStore."""
+    from src.backtest.bar_store import BarStore
+
+    dates = list(df.index)
+
+    t0 = time.perf_counter()
+    for current_date in dates:
+        if current_date not in df.index:
+            continue
+        bar = df.loc[current_date]
+        _ = (float(bar["open"]), float(bar["high"]), float(bar["low"]), float(bar["close"]))
+    legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    store = BarStore({"SPY": df}, dates)
+    for bar_idx in range(len(dates)):
+        _ = store.bar("SPY", bar_idx)
+    array = time.perf_counter() - t0
+    return legacy, array
+
+
+def bench_run(df: pd.DataFrame, strategy: str, repeat: int, engine: str = "bar") -> tuple[float, int]:
+    """Best wall time of BacktestEngine.run() and the number of trades."""
+    from src.backtest.engine import BacktestConfig, BacktestEngine
+
+    config = BacktestConfig(
+        start=df.index[0].date(),
+        end=df.index[-1].date() if len(df) else date.today(),
+        timeframe="5Min",
+        strategy=strategy,
+        trend_filter=False,
+        engine=engine,
+    )
+    best, trades = float("inf"), 0
+    for _ in range(max(repeat, 1)):
+        t0 = time.perf_counter()
+        result = BacktestEngine(config).run({"SPY": df})
+        best = min(best, time.perf_counter() - t0)
+        trades = len(result.trades)
+    return best, trades
+
+
+def main() -> int:
+    args = parse_args()
+    df, source = load_bars(args)
+    n = len(df)
+    if n == 0:
+        print("No bars to benchmark")
+        return 1
+
+    legacy, array = bench_lookups(df)
+    engines = ["bar", "vectorized"] if args.engine == "both" else [args.engine]
+    runs = [(engine, *bench_run(df, args.strategy, args.repeat, engine)) for engine in engines]
+
+    print(f"\nSPY 5Min — {n:,} bars ({source})")
+    print(f"{'path':<34}{'seconds':>10}{'bars/sec':>14}")
+    print(f"{'lookup: df.loc[current_date]':<34}{legacy:>10.3f}{n / legacy:>14,.0f}")
+    print(f"{'lookup: BarStore[bar_idx]':<34}{array:>10.3f}{n / array:>14,.0f}")
+    for engine, run_s, trades in runs:
+        label = f"run: {args.strategy} [{engine}]"
+        print(f"{label:<34}{run_s:>10.3f}{n / run_s:>14,.0f}   ({trades} trades)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
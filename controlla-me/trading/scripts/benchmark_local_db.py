@@ -0,0 +1,219 @@
+"""
+benchmark_local_db.py — LocalDB pooled connections vs. connect-per-call.
+
+Compares the current LocalDB (per-thread long-lived connection, tuned
+pragmas, versioned schema, executemany bulk paths) against the previous
+access pattern, reproduced here as ``LegacyLocalDB``: a fresh sqlite3
+connection + WAL/foreign_keys pragmas for every call and the full schema
+script on every construction.
+
+Workloads (each on its own fresh database in a temp directory):
+  1. construct:      LocalDB() N times (e.g. one per _persist_to_sqlite)
+  2. signal inserts: N single-row insert_signal calls
+  3. order inserts:  N orders — legacy one call per order vs insert_orders_batch
+  4. trade inserts:  N trades in batches of 100 via insert_backtest_trades
+
+Usage (from trading/ directory):
+    python scripts/benchmark_local_db.py
+    python scripts/benchmark_local_db.py --rows 20000 --repeat 3
+
+Output: timing table printed to stdout.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Generator
+
+# ── Ensure trading/ is on sys.path ────────────────────────────────────────────
+_SCRIPT_DIR = Path(__file__).resolve().parent
+_TRADING_DIR = _SCRIPT_DIR.parent
+if str(_TRADING_DIR) not in sys.path:
+    sys.path.insert(0, str(_TRADING_DIR))
+
+import structlog  # noqa: E402
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+from src.utils.db_local import (  # noqa: E402
+    _INSERT_ORDER_SQL,
+    _INSERT_TRADE_SQL,
+    _SCHEMA_SQL,
+    LocalDB,
+    _order_row,
+    _trade_row,
+)
+
+TRADE_BATCH = 100
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="benchmark_local_db",
+        description="LocalDB pooled connections vs connect-per-call",
+    )
+    p.add_argument("--rows", type=int, default=5_000, help="Rows per insert workload (default: 5000)")
+    p.add_argument("--constructs", type=int, default=200, help="LocalDB() constructions (default: 200)")
+    p.add_argument("--repeat", type=int, default=3, help="Repetitions (best time is reported)")
+    return p.parse_args()
+
+
+# ── Previous implementation ───────────────────────────────────────────────────
+
+
+class LegacyLocalDB:
+    """The pre-pooling access pattern: new connection and pragmas per call."""
+
+    def __init__(self, db_path: Path) -> None:
+        self._db_path = db_path
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA_SQL)
+
+    @contextmanager
+    def _connect(self) -> Generator[sqlite3.Connection, None, None]:
+        conn = sqlite3.connect(str(self._db_path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def insert_signal(self, signal_type: str, data: dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO trading_signals (signal_type, data_json, created_at) VALUES (?, ?, ?)",
+                (signal_type, json.dumps(data), datetime.utcnow().isoformat()),
+            )
+
+    def insert_order(self, order: dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(_INSERT_ORDER_SQL, _order_row(order))
+
+    def insert_backtest_trades(self, run_id: int, trades: list[dict[str, Any]]) -> None:
+        with self._connect() as conn:
+            conn.executemany(_INSERT_TRADE_SQL, [_trade_row(run_id, t) for t in trades])
+
+
+# ── Workloads ─────────────────────────────────────────────────────────────────
+
+
+def _orders(n: int) -> list[dict[str, Any]]:
+    return [
+        {"id": f"o{i}", "alpaca_order_id": f"a{i}", "symbol": "SPY", "side": "buy", "qty": 10,
+         "status": "filled", "filled_avg_price": 470.0 + i * 0.01}
+        for i in range(n)
+    ]
+
+
+def _trades(n: int) -> list[dict[str, Any]]:
+    return [
+        {"symbol": "SPY", "action": "BUY", "entry_date": "2024-01-15", "entry_price": 470.0,
+         "exit_date": "2024-01-16", "exit_price": 471.0, "shares": 10, "pnl": 10.0}
+        for _ in range(n)
+    ]
+
+
+def _legacy_workloads(path: Path, args: argparse.Namespace) -> dict[str, Callable[[], None]]:
+    orders, trades = _orders(args.rows), _trades(args.rows)
+
+    def construct() -> None:
+        for _ in range(args.constructs):
+            LegacyLocalDB(path)
+
+    def signals() -> None:
+        db = LegacyLocalDB(path)
+        for i in range(args.rows):
+            db.insert_signal("trade", {"symbol": "SPY", "i": i})
+
+    def order_inserts() -> None:
+        db = LegacyLocalDB(path)
+        for o in orders:
+            db.insert_order(o)
+
+    def trade_inserts() -> None:
+        db = LegacyLocalDB(path)
+        for start in range(0, len(trades), TRADE_BATCH):
+            db.insert_backtest_trades(1, trades[start:start + TRADE_BATCH])
+
+    return {"construct": construct, "signal inserts": signals, "order inserts": order_inserts,
+            "trade inserts": trade_inserts}
+
+
+def _pooled_workloads(path: Path, args: argparse.Namespace) -> dict[str, Callable[[], None]]:
+    orders, trades = _orders(args.rows), _trades(args.rows)
+
+    def construct() -> None:
+        for _ in range(args.constructs):
+            LocalDB(path)
+
+    def signals() -> None:
+        db = LocalDB(path)
+        for i in range(args.rows):
+            db.insert_signal("trade", {"symbol": "SPY", "i": i})
+
+    def order_inserts() -> None:
+        LocalDB(path).insert_orders_batch(orders)
+
+    def trade_inserts() -> None:
+        db = LocalDB(path)
+        for start in range(0, len(trades), TRADE_BATCH):
+            db.insert_backtest_trades(1, trades[start:start + TRADE_BATCH])
+
+    return {"construct": construct, "signal inserts": signals, "order inserts": order_inserts,
+            "trade inserts": trade_inserts}
+
+
+def _best_ms(make: Callable[[Path], dict[str, Callable[[], None]]], name: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bench.db"
+            workloads = make(path)
+            if name == "trade inserts":
+                # backtest_trades references a run: create it outside the timing.
+                LocalDB(path).insert_backtest_run({"start": "", "end": ""}, {}, {})
+            start = time.perf_counter()
+            workloads[name]()
+            best = min(best, time.perf_counter() - start)
+            LocalDB(path).close()
+    return best * 1000
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+
+
+def main() -> int:
+    args = parse_args()
+    names = ["construct", "signal inserts", "order inserts", "trade inserts"]
+
+    print(f"\nLocalDB benchmark — rows={args.rows:,}  constructs={args.constructs}  repeat={args.repeat}\n")
+    print(f"{'workload':<16} {'legacy ms':>12} {'pooled ms':>12} {'speedup':>9}")
+    print("-" * 52)
+    for name in names:
+        legacy = _best_ms(lambda p: _legacy_workloads(p, args), name, args.repeat)
+        pooled = _best_ms(lambda p: _pooled_workloads(p, args), name, args.repeat)
+        print(f"{name:<16} {legacy:>12.1f} {pooled:>12.1f} {legacy / pooled:>8.1f}x")
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
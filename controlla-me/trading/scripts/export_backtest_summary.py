@@ -6,20 +6,37 @@ Genera:
   2. all_trades.csv         — tutti i trade da tutte le run, con run_id
   3. grid_summary.csv       — risultati grid search (se presenti)
 
+Le run standard e i loro trade vengono letti da LocalDB (data/backtest.db)
+con una sola query in streaming per file, senza rileggere i report.json di
+backtest-results/. Le grid search non sono salvate nel DB: grid_summary.csv
+viene ancora costruito dalle cartelle grid_*.
+
 Usage:
     cd trading
-    python scripts/export_backtest_summary.py
+    python scripts/export_backtest_summary.py               # da LocalDB
+    python scripts/export_backtest_summary.py --from-files  # vecchio crawl di backtest-results/
+    python scripts/export_backtest_summary.py --db path/to/backtest.db
 
 Output in: trading/exports/
 """
 
 from __future__ import annotations
 
+import argparse
 import csv
 import json
-import os
+import sys
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
+# ── Ensure trading/ is on sys.path ────────────────────────────────────────────
+_SCRIPT_DIR = Path(__file__).resolve().parent
+_TRADING_DIR = _SCRIPT_DIR.parent
+if str(_TRADING_DIR) not in sys.path:
+    sys.path.insert(0, str(_TRADING_DIR))
+
+from src.utils.db_local import DEFAULT_DB_PATH, LocalDB  # noqa: E402
+
 BACKTEST_DIR = Path(__file__).parent.parent / "backtest-results"
 EXPORT_DIR = Path(__file__).parent.parent / "exports"
 EXPORT_DIR.mkdir(exist_ok=True)
@@ -101,12 +118,58 @@ def flatten_run(run_id: str, report: dict) -> dict:
     }
 
 
-def main() -> None:
-    # ── 1. Separa run standard da grid search ──────────────────────────────
-    all_dirs = sorted(BACKTEST_DIR.iterdir())
-    standard_dirs = [d for d in all_dirs if d.is_dir() and not d.name.startswith("grid_")]
-    grid_dirs = [d for d in all_dirs if d.is_dir() and d.name.startswith("grid_")]
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="export_backtest_summary",
+        description="Export backtest runs/trades to CSV",
+    )
+    p.add_argument("--db", type=Path, default=DEFAULT_DB_PATH, help="LocalDB file (default: data/backtest.db)")
+    p.add_argument("--from-files", action="store_true", help="Crawl backtest-results/ instead of LocalDB")
+    return p.parse_args()
+
+
+def write_csv(path: Path, rows: Iterable[dict]) -> int:
+    """Write dict rows as they arrive (header from the first row). Returns the row count."""
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return 0
+    count = 1
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(first.keys()))
+        writer.writeheader()
+        writer.writerow(first)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def export_from_db(db: LocalDB) -> None:
+    # ── backtest_summary.csv / all_trades.csv: una query in streaming ciascuno ──
+    n_runs = write_csv(EXPORT_DIR / "backtest_summary.csv", db.iter_backtest_summary())
+    if n_runs:
+        print(f"✅ backtest_summary.csv — {n_runs} run (LocalDB)")
+    n_trades = write_csv(EXPORT_DIR / "all_trades.csv", db.iter_backtest_trades())
+    if n_trades:
+        print(f"✅ all_trades.csv     — {n_trades} trade totali da {n_runs} run (LocalDB)")
+
+
+def _grid_rows(grid_dirs: list[Path]) -> Iterator[dict]:
+    for grid_dir in grid_dirs:
+        # Grid dirs contengono sotto-run per ogni combinazione di parametri
+        for combo_dir in sorted(grid_dir.iterdir()):
+            if not combo_dir.is_dir():
+                continue
+            report = load_report(combo_dir)
+            if report is None:
+                continue
+            row = {"grid_name": grid_dir.name}
+            row.update(flatten_run(f"{grid_dir.name}/{combo_dir.name}", report))
+            yield row
+
 
+def export_from_files(standard_dirs: list[Path]) -> None:
     # ── 2. backtest_summary.csv ────────────────────────────────────────────
     summary_rows = []
     all_trades = []
@@ -138,29 +201,29 @@ def main() -> None:
             writer.writerows(all_trades)
         print(f"✅ all_trades.csv     — {len(all_trades)} trade totali da {len(standard_dirs)} run")
 
+
+def main() -> None:
+    args = parse_args()
+
+    # ── 1. Separa run standard da grid search ──────────────────────────────
+    all_dirs = sorted(BACKTEST_DIR.iterdir()) if BACKTEST_DIR.exists() else []
+    standard_dirs = [d for d in all_dirs if d.is_dir() and not d.name.startswith("grid_")]
+    grid_dirs = [d for d in all_dirs if d.is_dir() and d.name.startswith("grid_")]
+
+    if args.from_files:
+        export_from_files(standard_dirs)
+    else:
+        export_from_db(LocalDB(args.db))
+
     # ── 4. grid_summary.csv ────────────────────────────────────────────────
-    grid_rows = []
-    for grid_dir in grid_dirs:
-        # Grid dirs contengono sotto-run per ogni combinazione di parametri
-        for combo_dir in sorted(grid_dir.iterdir()):
-            if not combo_dir.is_dir():
-                continue
-            report = load_report(combo_dir)
-            if report is None:
-                continue
-            row = flatten_run(f"{grid_dir.name}/{combo_dir.name}", report)
-            row["grid_name"] = grid_dir.name
-            grid_rows.append(row)
-
-    if grid_rows:
-        grid_path = EXPORT_DIR / "grid_summary.csv"
-        fieldnames = ["grid_name"] + [k for k in grid_rows[0].keys() if k != "grid_name"]
-        with open(grid_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(grid_rows)
-        print(f"✅ grid_summary.csv   — {len(grid_rows)} combinazioni da {len(grid_dirs)} grid search")
+    n_grid = write_csv(EXPORT_DIR / "grid_summary.csv", _grid_rows(grid_dirs))
+    if n_grid:
+        print(f"✅ grid_summary.csv   — {n_grid} combinazioni da {len(grid_dirs)} grid search")
+
+    _print_prompt()
+
 
+def _print_prompt() -> None:
     print(f"\n📁 Export in: {EXPORT_DIR.resolve()}")
     print("\n💡 Prompt suggerito per ChatGPT / Claude:")
     print("""
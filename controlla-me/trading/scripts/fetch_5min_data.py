@@ -9,14 +9,19 @@ Usage:
     python scripts/fetch_5min_data.py
     python scripts/fetch_5min_data.py --symbols SPY QQQ --months 6
     python scripts/fetch_5min_data.py --symbols SPY --months 3 --cache-dir /tmp/data
+    python scripts/fetch_5min_data.py --universe --months 12 --workers 8
 
 Requirements:
     ALPACA_API_KEY and ALPACA_SECRET_KEY env vars (or .env file).
 
 Notes:
     - Alpaca free/paper tier: up to ~1 year of 1Min/5Min data available.
-    - Alpaca charges per-request in 30-day chunks to stay within API limits.
-    - Output: .backtest-cache/<SYMBOL>_5Min_<start>_<end>.parquet
+    - Requests go out in 10-symbol x 30-day chunks on --workers threads, capped
+      by --rate requests/minute (Alpaca Basic: 200/min). 429/5xx are retried
+      with jittered backoff; each finished chunk is saved immediately, so an
+      interrupted run picks up where it stopped.
+    - Output: .backtest-cache/store/5Min/<SYMBOL>/<YYYY-MM>.parquet; re-runs only
+      download the days not already in the store.
 """
 
 from __future__ import annotations
@@ -46,6 +51,8 @@ logger = structlog.get_logger()
 
 DEFAULT_SYMBOLS = ["SPY"]
 DEFAULT_MONTHS = 6
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 200
 DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".backtest-cache"
 
 # ─── CLI ──────────────────────────────────────────────────────────────────────
@@ -62,6 +69,11 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_SYMBOLS,
         help=f"Symbols to download (default: {DEFAULT_SYMBOLS})",
     )
+    parser.add_argument(
+        "--universe",
+        action="store_true",
+        help="Download the full default backtest universe instead of --symbols",
+    )
     parser.add_argument(
         "--months",
         type=int,
@@ -74,6 +86,18 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_CACHE_DIR,
         help=f"Cache directory (default: {DEFAULT_CACHE_DIR})",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent download threads (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_RATE,
+        help=f"Max Alpaca requests per minute across all threads (default: {DEFAULT_RATE})",
+    )
     parser.add_argument(
         "--force",
         action="store_true",
@@ -105,6 +129,17 @@ def main() -> int:
         )
         return 1
 
+    # Import DataLoader (inside trading package)
+    try:
+        # Add trading/src to path if running from trading/ dir
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+        from src.backtest.__main__ import DEFAULT_UNIVERSE
+        from src.backtest.data_loader import DataLoader
+        from src.backtest.market_cache import MarketDataCache
+    except ImportError as e:
+        logger.error("import_error", error=str(e), hint="Run from the trading/ directory")
+        return 1
+
     # Calculate date range
     end = date.today()
     # Go back N months
@@ -115,7 +150,7 @@ def main() -> int:
         year -= 1
     start = date(year, month, end.day if end.day <= 28 else 28)
 
-    symbols = [s.upper() for s in args.symbols]
+    symbols = list(DEFAULT_UNIVERSE) if args.universe else [s.upper() for s in args.symbols]
     cache_dir: Path = args.cache_dir
     cache_dir.mkdir(parents=True, exist_ok=True)
 
@@ -139,27 +174,20 @@ def main() -> int:
         print(f"{'='*60}\n")
         return 0
 
-    # Import DataLoader (inside trading package)
-    try:
-        # Add trading/src to path if running from trading/ dir
-        sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-        from src.backtest.data_loader import DataLoader
-    except ImportError as e:
-        logger.error("import_error", error=str(e), hint="Run from the trading/ directory")
-        return 1
-
     loader = DataLoader(
         api_key=api_key,
         secret_key=secret_key,
         cache_dir=cache_dir,
+        workers=args.workers,
+        rate_per_minute=args.rate,
     )
 
     # If force, clear existing 5Min cache for these symbols
     if args.force:
+        store = MarketDataCache(cache_dir)
         for symbol in symbols:
-            for f in cache_dir.glob(f"{symbol}_5Min_*.parquet"):
-                f.unlink()
-                logger.info("cache_cleared", symbol=symbol, file=f.name)
+            removed = store.clear(symbol, "5Min")
+            logger.info("cache_cleared", symbol=symbol, files=removed)
 
     # Download
     try:
@@ -185,9 +213,7 @@ def main() -> int:
         ts_from = df.index[0].strftime("%Y-%m-%d") if len(df) else "N/A"
         ts_to   = df.index[-1].strftime("%Y-%m-%d") if len(df) else "N/A"
 
-        # Find cache file
-        cache_files = list(cache_dir.glob(f"{symbol}_5Min_*.parquet"))
-        cache_file = cache_files[0].name if cache_files else "N/A"
+        cache_file = MarketDataCache(cache_dir).folder(symbol, "5Min").relative_to(cache_dir)
 
         print(f"  {symbol:<10} {bars:>8}  {ts_from:<12}  {ts_to:<12}  {cache_file}")
 
@@ -12,6 +12,7 @@ Usage (from trading/ directory):
     python scripts/grid_search_tpsl.py
     python scripts/grid_search_tpsl.py --symbol SPY --capital 100000
     python scripts/grid_search_tpsl.py --csv data/spy_5min_6m.csv --output data/grid_results.csv
+    python scripts/grid_search_tpsl.py --no-cache   # re-run every combo (skip result cache)
 
 Grid:
     tp_atr   : [2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0, 12.0]   (8 values)
@@ -120,6 +121,12 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Suppress per-combination progress output",
     )
+    p.add_argument(
+        "--no-cache",
+        action="store_true",
+        dest="no_cache",
+        help="Always run the engine (skip the config + data result cache)",
+    )
     return p.parse_args()
 
 
@@ -165,10 +172,12 @@ def run_single(
     tp_atr: float,
     slope_threshold: float,
     capital: float,
+    cache: Any = None,  # noqa: ANN401
+    fingerprint: str | None = None,
 ) -> dict[str, Any]:
-    """Run one backtest combination. Returns metrics dict."""
-    from src.backtest.engine import BacktestConfig, BacktestEngine
-    from src.backtest.metrics import calculate_metrics
+    """Run one backtest combination (memoized when a ResultCache is given). Returns metrics dict."""
+    from src.backtest.engine import BacktestConfig
+    from src.backtest.result_cache import run_backtest
 
     start_d = df_5min.index[0].date()
     end_d = df_5min.index[-1].date()
@@ -202,8 +211,7 @@ def run_single(
     _analysis_mod.analyze_slope_volume = _patched
 
     try:
-        engine = BacktestEngine(config)
-        result = engine.run({symbol: df_5min})
+        _, m = run_backtest(config, {symbol: df_5min}, cache=cache, fingerprint=fingerprint)
     except Exception as exc:
         _analysis_mod.analyze_slope_volume = _saved
         return {
@@ -226,8 +234,6 @@ def run_single(
     finally:
         _analysis_mod.analyze_slope_volume = _saved
 
-    m = calculate_metrics(result)
-
     return {
         "sl_atr": sl_atr,
         "tp_atr": tp_atr,
@@ -359,6 +365,12 @@ def main() -> int:
     print(f"  Capital: ${args.capital:,.0f}")
     print(f"{'='*70}\n")
 
+    # Identical (config, bars) combos from earlier runs come from the result cache
+    from src.backtest.result_cache import ResultCache, data_fingerprint
+
+    cache = None if args.no_cache else ResultCache()
+    fingerprint = data_fingerprint({symbol: df_5min}) if cache is not None else None
+
     all_results: list[dict[str, Any]] = []
     t_start = time.monotonic()
 
@@ -372,6 +384,8 @@ def main() -> int:
             tp_atr=tp,
             slope_threshold=thresh,
             capital=args.capital,
+            cache=cache,
+            fingerprint=fingerprint,
         )
         all_results.append(r)
 
@@ -3,25 +3,34 @@ Executor Agent
 
 Translates Risk Manager approvals into actual orders on Alpaca.
 Supports market and bracket orders (stop loss + take profit).
-Polls for fill status with timeout.
+Waits for fills on the Alpaca trade-update stream (FillTracker), falling back
+to single-order lookups, with timeout.
+
+Independent decisions run concurrently (up to risk.max_concurrent_orders at a
+time); decisions on the same symbol run one after another in their original
+order, so a SELL followed by a BUY of that symbol never overlap.
 """
 
 from __future__ import annotations
 
 import asyncio
+import time
 from typing import Any
 
 import pandas as pd
 
 from ..config import get_settings
 from ..connectors.alpaca_client import AlpacaClient
+from ..connectors.broker_state import BrokerState
+from ..connectors.trade_updates import TERMINAL_STATUSES, FillTracker
 from ..models.signals import RiskDecision, RiskDecisionStatus, SignalAction
 from ..models.orders import Order, OrderSide, OrderType, OrderStatus
 from ..utils.db import TradingDB
 from .base import BaseAgent
 
 MAX_RETRIES = 3
-FILL_POLL_INTERVAL_SEC = 2.0
+FILL_POLL_INTERVAL_SEC = 2.0       # single-order lookups when no trade stream
+FILL_STREAM_FALLBACK_SEC = 5.0     # lookup after this much stream silence
 FILL_TIMEOUT_SEC = 60.0
 
 
@@ -32,13 +41,20 @@ class Executor(BaseAgent):
         super().__init__("executor")
         self._alpaca = AlpacaClient(account_type=account_type)  # type: ignore[arg-type]
         self._db = TradingDB()
+        self._fills: FillTracker | None = None
 
-    async def run(self, decisions: list[dict] | None = None, **kwargs: Any) -> dict:
+    async def run(
+        self,
+        decisions: list[dict] | None = None,
+        broker: BrokerState | None = None,
+        **kwargs: Any,
+    ) -> dict:
         """
         Execute approved orders.
 
         Args:
             decisions: List of RiskDecision dicts. If None, reads latest from DB.
+            broker:    Cycle-scoped account/positions, invalidated on each fill.
         """
         if decisions is None:
             risk_checks = self._db.get_latest_signals("risk_check", limit=1)
@@ -51,22 +67,78 @@ class Executor(BaseAgent):
         approved = [d for d in decisions if d.get("status") == "APPROVED"]
         self.log_start(approved_orders=len(approved))
 
-        orders: list[dict] = []
-        for decision in approved:
-            order = await self._execute_order(decision)
-            if order:
-                orders.append(order)
-
+        max_concurrent = max(1, int(get_settings().risk.max_concurrent_orders))
+        start = time.perf_counter()
+        results: list[dict | None] = []
+        if approved:
+            # Listen for trade updates before the first order goes out.
+            self._fills = await self._start_fill_tracker()
+        try:
+            results = await self._execute_batch(approved, max_concurrent, broker)
+        finally:
+            if self._fills is not None:
+                await self._fills.stop()
+                self._fills = None
+        wall_time_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        orders = [order for order in results if order]
         result = {
             "date": pd.Timestamp.now().strftime("%Y-%m-%d"),
             "orders": orders,
             "total_approved": len(approved),
             "total_executed": len(orders),
+            "wall_time_ms": wall_time_ms,
         }
 
-        self.log_complete(executed=len(orders), failed=len(approved) - len(orders))
+        self.log_complete(
+            executed=len(orders),
+            failed=len(approved) - len(orders),
+            max_concurrent=max_concurrent,
+            wall_time_ms=wall_time_ms,
+        )
         return result
 
+    async def _execute_batch(
+        self,
+        decisions: list[dict],
+        max_concurrent: int,
+        broker: BrokerState | None = None,
+    ) -> list[dict | None]:
+        """
+        Execute decisions concurrently, one chain per symbol.
+
+        Decisions of the same symbol keep their order (a SELL then BUY of XLK
+        waits for the SELL's fill before the BUY is submitted); chains of
+        different symbols share ``max_concurrent`` slots. Results are returned
+        in the order of ``decisions``. Every (partial) fill invalidates
+        ``broker`` so later phases re-read account and positions.
+        """
+        chains: dict[str, list[int]] = {}
+        for i, decision in enumerate(decisions):
+            chains.setdefault(decision["symbol"], []).append(i)
+
+        results: list[dict | None] = [None] * len(decisions)
+        slots = asyncio.Semaphore(max_concurrent)
+
+        async def run_chain(indices: list[int]) -> None:
+            for i in indices:
+                async with slots:
+                    try:
+                        results[i] = await self._execute_order(decisions[i])
+                        if broker is not None and results[i] and results[i].get("status") in (
+                            "filled", "partially_filled",
+                        ):
+                            broker.invalidate()
+                    except Exception as e:
+                        self.logger.error(
+                            "order_execution_error",
+                            symbol=decisions[i].get("symbol"),
+                            error=str(e),
+                        )
+
+        await asyncio.gather(*(run_chain(indices) for indices in chains.values()))
+        return results
+
     async def _execute_order(self, decision: dict) -> dict | None:
         """Execute a single order on Alpaca with retries and fill polling."""
         symbol = decision["symbol"]
@@ -156,7 +228,7 @@ class Executor(BaseAgent):
             fresh_price = None
             try:
                 # 1. Try live quote first — bid/ask always reflects current market
-                quotes = self._alpaca.get_latest_quote([symbol])
+                quotes = await asyncio.to_thread(self._alpaca.get_latest_quote, [symbol])
                 if symbol in quotes:
                     fresh_price = quotes[symbol]["mid"]
                     self.logger.info(
@@ -173,7 +245,7 @@ class Executor(BaseAgent):
                         symbol=symbol,
                         note="No quote available — falling back to latest bar",
                     )
-                    snapshot = self._alpaca.get_latest_snapshot([symbol])
+                    snapshot = await asyncio.to_thread(self._alpaca.get_latest_snapshot, [symbol])
                     if symbol in snapshot:
                         fresh_price = snapshot[symbol]["close"]
                         self.logger.info(
@@ -251,13 +323,14 @@ class Executor(BaseAgent):
         # broker reserves the shares for the pending stop order.
         # We must cancel the stop order first so Alpaca releases the qty.
         if side == "sell":
-            self._cancel_trailing_stop_before_sell(symbol)
+            await asyncio.to_thread(self._cancel_trailing_stop_before_sell, symbol)
 
         for attempt in range(MAX_RETRIES):
             try:
                 # Use bracket order when we have both stop loss and take profit
                 if stop_loss and take_profit and side == "buy":
-                    result = self._alpaca.submit_market_order(
+                    result = await asyncio.to_thread(
+                        self._alpaca.submit_market_order,
                         symbol=symbol,
                         qty=qty,
                         side=side,
@@ -265,7 +338,8 @@ class Executor(BaseAgent):
                         take_profit=take_profit,
                     )
                 else:
-                    result = self._alpaca.submit_market_order(
+                    result = await asyncio.to_thread(
+                        self._alpaca.submit_market_order,
                         symbol=symbol,
                         qty=qty,
                         side=side,
@@ -273,8 +347,8 @@ class Executor(BaseAgent):
 
                 order_id = result.get("order_id")
 
-                # Poll for fill — partial fills are not terminal: keep polling
-                fill_info = await self._poll_for_fill(order_id, allow_partial=False)
+                # Wait for fill — partial fills are not terminal: keep waiting
+                fill_info = await self._wait_for_fill(order_id, allow_partial=False)
 
                 # Build order record
                 order_data = {
@@ -393,62 +467,48 @@ class Executor(BaseAgent):
 
         return None
 
-    async def _poll_for_fill(self, order_id: str | None, allow_partial: bool = False) -> dict:
-        """Poll Alpaca for order fill status with timeout.
+    async def _start_fill_tracker(self) -> FillTracker:
+        """FillTracker on the account's trade-update stream (lookup-only if it cannot start)."""
+        try:
+            tracker = FillTracker(
+                self._alpaca.get_order,
+                stream=self._alpaca.trade_update_stream(),
+                poll_interval=FILL_STREAM_FALLBACK_SEC,
+            )
+            await tracker.start()
+            return tracker
+        except Exception as e:
+            self.logger.warning("trade_stream_unavailable", error=str(e), fallback="order_lookup")
+            return FillTracker(self._alpaca.get_order, poll_interval=FILL_POLL_INTERVAL_SEC)
+
+    async def _wait_for_fill(self, order_id: str | None, allow_partial: bool = False) -> dict:
+        """Wait for the order's fill status with timeout.
+
+        Resolved by the trade-update stream; an order with no event for
+        poll_interval seconds is looked up by id (see FillTracker).
 
         Args:
             order_id: Alpaca order ID.
             allow_partial: If True, treat partially_filled as terminal (old behaviour).
-                           Default False — keeps polling until fully filled or cancelled.
+                           Default False — keeps waiting until fully filled or cancelled.
         """
         if not order_id:
             return {}
 
-        TERMINAL_STATUSES = {"filled", "cancelled", "expired", "rejected"}
-        if allow_partial:
-            TERMINAL_STATUSES.add("partially_filled")
-
-        elapsed = 0.0
-        last_partial: dict = {}
-
-        while elapsed < FILL_TIMEOUT_SEC:
-            try:
-                orders = self._alpaca.get_orders(status="all")
-                for order in orders:
-                    if order.get("order_id") == order_id:
-                        status = order.get("status", "")
-                        info = {
-                            "status": status,
-                            "filled_avg_price": order.get("filled_avg_price"),
-                            "filled_qty": order.get("filled_qty"),
-                            "filled_at": order.get("filled_at"),
-                        }
-                        if status in TERMINAL_STATUSES:
-                            return info
-                        if status == "partially_filled":
-                            # Save last partial fill info — return it if we timeout
-                            last_partial = info
-                            self.logger.debug(
-                                "poll_partial_fill",
-                                order_id=order_id,
-                                filled_qty=order.get("filled_qty"),
-                                elapsed=elapsed,
-                            )
-            except Exception as e:
-                self.logger.debug("poll_error", order_id=order_id, error=str(e))
-
-            await asyncio.sleep(FILL_POLL_INTERVAL_SEC)
-            elapsed += FILL_POLL_INTERVAL_SEC
-
-        # Timeout — return last partial fill info if available, else submitted
-        if last_partial:
-            self.logger.warning(
-                "fill_timeout_with_partial",
-                order_id=order_id,
-                timeout=FILL_TIMEOUT_SEC,
-                filled_qty=last_partial.get("filled_qty"),
-            )
-            return last_partial
+        tracker = self._fills or FillTracker(self._alpaca.get_order, poll_interval=FILL_POLL_INTERVAL_SEC)
+        info = await tracker.wait_for_fill(order_id, timeout=FILL_TIMEOUT_SEC, allow_partial=allow_partial)
+        status = info.get("status") if info else None
+        if status is not None and (status in TERMINAL_STATUSES or status == "partially_filled"):
+            info = {k: info.get(k) for k in ("status", "filled_avg_price", "filled_qty", "filled_at")}
+            if status == "partially_filled" and not allow_partial:
+                # Timeout — return last partial fill info
+                self.logger.warning(
+                    "fill_timeout_with_partial",
+                    order_id=order_id,
+                    timeout=FILL_TIMEOUT_SEC,
+                    filled_qty=info.get("filled_qty"),
+                )
+            return info
 
         self.logger.warning("fill_timeout", order_id=order_id, timeout=FILL_TIMEOUT_SEC)
         return {"status": "submitted"}
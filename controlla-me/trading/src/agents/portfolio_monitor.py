@@ -12,14 +12,19 @@ Generates risk events and alerts when thresholds are breached.
 
 from __future__ import annotations
 
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any, Literal
 
+import numpy as np
 import pandas as pd
 
 from ..analysis import calculate_atr
 from ..config import get_settings
 from ..connectors.alpaca_client import AlpacaClient
+from ..connectors.bar_cache import get_bar_cache
+from ..connectors.broker_state import BrokerState
 from ..models.portfolio import PortfolioSnapshot, Position, RiskEvent, RiskEventType
 from ..utils.db import TradingDB
 from .base import BaseAgent
@@ -27,6 +32,49 @@ from .base import BaseAgent
 
 MonitorMode = Literal["status", "daily_report", "check_stops", "trailing_stops"]
 
+# highest_close above this multiple of the live price is treated as bad data
+# (stale Alpaca values, split artifacts) and clamped to the price.
+_MAX_HC_RATIO = 1.5
+
+
+def trailing_stop_levels(
+    entry_price: np.ndarray,
+    atr: np.ndarray,
+    highest_close: np.ndarray,
+    current_price: np.ndarray,
+    tier: np.ndarray,
+    current_stop: np.ndarray,
+    risk: Any,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    4-tier trailing stop levels for many positions at once.
+
+    Vectorized form of the per-position tier ladder (breakeven → lock →
+    trail → tight): each tier whose ATR threshold the profit from entry
+    exceeds can only raise the stop. ``risk`` is RiskSettings.
+
+    Returns:
+        (highest_close, new_stop, tier) arrays — stops are not rounded.
+    """
+    highest = np.maximum(highest_close, current_price)
+    anomalous = (current_price > 0) & (highest > current_price * _MAX_HC_RATIO)
+    highest = np.where(anomalous, current_price, highest)
+
+    profit = highest - entry_price
+    new_stop = current_stop.astype(np.float64, copy=True)
+    tier = tier.astype(np.int64, copy=True)
+    ladder = (
+        (risk.trailing_breakeven_atr, entry_price, 1),
+        (risk.trailing_lock_atr, entry_price + atr * risk.trailing_lock_cushion_atr, 2),
+        (risk.trailing_trail_threshold_atr, highest - atr * risk.trailing_trail_distance_atr, 3),
+        (risk.trailing_tight_threshold_atr, highest - atr * risk.trailing_tight_distance_atr, 4),
+    )
+    for threshold_atr, level, level_tier in ladder:
+        hit = profit > threshold_atr * atr
+        new_stop = np.where(hit, np.maximum(new_stop, level), new_stop)
+        tier = np.where(hit, np.maximum(tier, level_tier), tier)
+    return highest, new_stop, tier
+
 
 class PortfolioMonitor(BaseAgent):
     """Monitors portfolio health and enforces risk limits."""
@@ -37,23 +85,31 @@ class PortfolioMonitor(BaseAgent):
         self._db = TradingDB()
         self._risk = get_settings().risk
 
-    async def run(self, mode: MonitorMode = "status", **kwargs: Any) -> dict:
+    async def run(
+        self,
+        mode: MonitorMode = "status",
+        broker: BrokerState | None = None,
+        **kwargs: Any,
+    ) -> dict:
         """
         Run portfolio monitoring in the specified mode.
 
         Args:
-            mode: One of "status", "daily_report", "check_stops".
+            mode:   One of "status", "daily_report", "check_stops", "trailing_stops".
+            broker: Cycle-scoped account/positions; None → fetched here.
         """
         self.log_start(mode=mode)
+        if broker is None:
+            broker = BrokerState(self._alpaca, self._db)
 
         if mode == "status":
-            result = await self._quick_status()
+            result = await self._quick_status(broker)
         elif mode == "daily_report":
-            result = await self._daily_report()
+            result = await self._daily_report(broker)
         elif mode == "check_stops":
-            result = await self._check_stops()
+            result = await self._check_stops(broker)
         elif mode == "trailing_stops":
-            result = await self._trailing_stops_mode()
+            result = await self._trailing_stops_mode(broker)
         else:
             self.log_error(f"Unknown mode: {mode}")
             return {"error": f"Unknown mode: {mode}"}
@@ -63,10 +119,10 @@ class PortfolioMonitor(BaseAgent):
 
     # ─── Mode: status ─────────────────────────────────────────
 
-    async def _quick_status(self) -> dict:
+    async def _quick_status(self, broker: BrokerState) -> dict:
         """Quick portfolio status -- positions, P&L, cash."""
-        account = self._alpaca.get_account()
-        raw_positions = self._alpaca.get_positions()
+        account = broker.account()
+        raw_positions = broker.positions()
         orders = self._alpaca.get_orders(status="open")
 
         positions = self._build_positions(raw_positions)
@@ -88,11 +144,11 @@ class PortfolioMonitor(BaseAgent):
 
     # ─── Mode: daily_report ───────────────────────────────────
 
-    async def _daily_report(self) -> dict:
+    async def _daily_report(self, broker: BrokerState) -> dict:
         """End-of-day report with P&L snapshot saved to DB."""
-        account = self._alpaca.get_account()
-        raw_positions = self._alpaca.get_positions()
-        snapshots = self._db.get_snapshots(days=30)
+        account = broker.account()
+        raw_positions = broker.positions()
+        snapshots = broker.snapshots(days=30)
 
         portfolio_value = float(account.get("portfolio_value") or 0)
         cash = float(account.get("cash") or 0)
@@ -138,10 +194,10 @@ class PortfolioMonitor(BaseAgent):
 
     # ─── Mode: check_stops ────────────────────────────────────
 
-    async def _check_stops(self) -> dict:
+    async def _check_stops(self, broker: BrokerState) -> dict:
         """Check and enforce stop-loss levels on open positions."""
-        raw_positions = self._alpaca.get_positions()
-        account = self._alpaca.get_account()
+        raw_positions = broker.positions()
+        account = broker.account()
         portfolio_value = float(account.get("portfolio_value") or 0)
         stop_events: list[dict] = []
 
@@ -162,6 +218,7 @@ class PortfolioMonitor(BaseAgent):
                 # Close the position
                 try:
                     self._alpaca.close_position(symbol)
+                    broker.invalidate()
                     action_taken = f"Position closed at {current_price}"
                 except Exception as e:
                     action_taken = f"Close failed: {e}"
@@ -207,19 +264,19 @@ class PortfolioMonitor(BaseAgent):
 
     # ─── Mode: trailing_stops ──────────────────────────────────
 
-    async def _trailing_stops_mode(self) -> dict:
+    async def _trailing_stops_mode(self, broker: BrokerState) -> dict:
         """Update 4-tier trailing stops for all positions."""
         # Sync positions from Alpaca to DB (keeps portfolio_positions fresh)
         try:
-            raw_positions = self._alpaca.get_positions()
+            raw_positions = broker.positions()
             built_positions = self._build_positions(raw_positions)
             self._db.upsert_positions([p.model_dump() for p in built_positions])
             self.logger.info("positions_synced", count=len(built_positions))
         except Exception as e:
             self.logger.warning("positions_sync_failed", error=str(e))
 
-        updates = self._update_trailing_stops()
-        cleanup = self._cleanup_trailing_stop_state()
+        updates = self._update_trailing_stops(broker)
+        cleanup = self._cleanup_trailing_stop_state(broker)
         return {
             "mode": "trailing_stops",
             "updates": updates,
@@ -227,7 +284,7 @@ class PortfolioMonitor(BaseAgent):
             "states_cleaned": cleanup,
         }
 
-    def _update_trailing_stops(self) -> list[dict]:
+    def _update_trailing_stops(self, broker: BrokerState | None = None) -> list[dict]:
         """
         4-tier trailing stop system (matches backtest engine _check_exits).
 
@@ -238,211 +295,247 @@ class PortfolioMonitor(BaseAgent):
 
         Uses max() to ensure stop only moves UP (monotonic).
         Auto-bootstraps state for pre-existing positions.
+
+        Runs as one batch per cycle: new stops for every position are computed
+        in a single vectorized pass (trailing_stop_levels), raised stop orders
+        are replaced concurrently (risk.trailing_replace_workers threads) and
+        all states are written back with one bulk upsert.
         """
         if not self._risk.trailing_enabled:
             return []
 
-        raw_positions = self._alpaca.get_positions()
+        if broker is None:
+            broker = BrokerState(self._alpaca, self._db)
+        raw_positions = broker.positions()
         if not raw_positions:
             return []
 
+        t0 = time.perf_counter()
         states = self._db.get_all_trailing_stop_states()
         state_map = {s["symbol"]: s for s in states}
-        updates: list[dict] = []
 
+        # 1. Per-position state (bootstrap + sanity checks may touch Alpaca/DB)
+        rows: list[tuple[dict, dict, float]] = []
         for pos in raw_positions:
-            symbol = pos["symbol"]
-            current_price = pos["current_price"]
-            state = state_map.get(symbol)
-
-            # Auto-bootstrap for positions without trailing stop state
-            if not state:
-                state = self._bootstrap_trailing_stop(pos)
-                if not state:
-                    continue
-
-            entry_price = float(state["entry_price"])
-            atr = float(state["atr_at_entry"])
-            highest_close = float(state["highest_close"])
-            current_stop = float(state["current_stop_price"])
-            stop_order_id = state.get("stop_order_id")
+            state = self._trailing_state_for(pos, state_map.get(pos["symbol"]))
+            if state is not None:
+                rows.append((pos, state, float(pos["current_price"] or 0.0)))
+        if not rows:
+            return []
 
-            if atr <= 0:
-                continue
+        # 2. One vectorized pass over all positions
+        highest, stops, tiers = trailing_stop_levels(
+            entry_price=np.array([float(s["entry_price"]) for _, s, _ in rows]),
+            atr=np.array([float(s["atr_at_entry"]) for _, s, _ in rows]),
+            highest_close=np.array([float(s["highest_close"]) for _, s, _ in rows]),
+            current_price=np.array([price for _, _, price in rows]),
+            tier=np.array([int(s.get("tier_reached", 0)) for _, s, _ in rows]),
+            current_stop=np.array([float(s["current_stop_price"]) for _, s, _ in rows]),
+            risk=self._risk,
+        )
+        t_compute = time.perf_counter()
 
-            # Sanity check: stop must be BELOW current price for a long position.
-            # If not (e.g. GLD anomaly: stop=458.11 vs price=~180, stale DB entry,
-            # bad data from Alpaca), force a full rebootstrap from market data.
-            # Using 99% threshold to tolerate negligible rounding diffs.
-            _current_price_f = float(current_price) if current_price else 0.0
-            if _current_price_f > 0 and current_stop >= _current_price_f * 0.99:
-                self.logger.critical(
-                    "trailing_stop_above_market_price",
-                    symbol=symbol,
-                    current_stop=round(current_stop, 2),
-                    current_price=round(_current_price_f, 2),
-                    action="forcing_rebootstrap",
-                    reason="stop_price >= 99% current_price — would trigger immediately",
-                )
-                state = self._bootstrap_trailing_stop(pos)
-                if not state:
-                    continue
-                # Re-read all values from the fresh state
-                entry_price = float(state["entry_price"])
-                atr = float(state["atr_at_entry"])
-                highest_close = float(state["highest_close"])
-                current_stop = float(state["current_stop_price"])
-                stop_order_id = state.get("stop_order_id")
-                if atr <= 0:
-                    continue
-
-            # Update highest close
-            if current_price > highest_close:
-                highest_close = current_price
-
-            # Sanity check: highest_close should not vastly exceed current_price.
-            # Prevents persisted anomalous values (e.g. stale Alpaca data, split
-            # artifacts) from corrupting stop calculations.
-            # 50% tolerance is generous enough for volatile names.
-            _MAX_HC_RATIO = 1.5
-            if highest_close > current_price * _MAX_HC_RATIO and current_price > 0:
+        updated_states: list[dict] = []
+        raises: list[tuple[dict, float]] = []
+        for i, (pos, state, price) in enumerate(rows):
+            symbol = pos["symbol"]
+            highest_close = float(highest[i])
+            if highest_close < float(state["highest_close"]) and price > 0:
                 self.logger.warning(
                     "trailing_stop_highest_close_anomaly",
                     symbol=symbol,
-                    highest_close=round(highest_close, 2),
-                    current_price=round(current_price, 2),
-                    ratio=round(highest_close / current_price, 2),
+                    highest_close=round(float(state["highest_close"]), 2),
+                    current_price=round(price, 2),
+                    ratio=round(float(state["highest_close"]) / price, 2),
                     reason="highest_close > 1.5x current_price — clamping to current_price",
                 )
-                highest_close = current_price
-
-            # Calculate profit from entry using highest_close
-            profit_from_entry = highest_close - entry_price
-            new_stop = current_stop
-            tier = int(state.get("tier_reached", 0))
-
-            # Tier 0: Breakeven — move SL to entry price
-            if profit_from_entry > self._risk.trailing_breakeven_atr * atr:
-                new_stop = max(new_stop, entry_price)
-                tier = max(tier, 1)
-
-            # Tier 1: Lock profit — move SL to entry + cushion
-            if profit_from_entry > self._risk.trailing_lock_atr * atr:
-                lock_stop = entry_price + (atr * self._risk.trailing_lock_cushion_atr)
-                new_stop = max(new_stop, lock_stop)
-                tier = max(tier, 2)
-
-            # Tier 2: Trail — follow highest_close at distance
-            if profit_from_entry > self._risk.trailing_trail_threshold_atr * atr:
-                trailing_stop = highest_close - (atr * self._risk.trailing_trail_distance_atr)
-                new_stop = max(new_stop, trailing_stop)
-                tier = max(tier, 3)
-
-            # Tier 3: Tight trail — close trailing near take profit
-            if profit_from_entry > self._risk.trailing_tight_threshold_atr * atr:
-                tight_stop = highest_close - (atr * self._risk.trailing_tight_distance_atr)
-                new_stop = max(new_stop, tight_stop)
-                tier = max(tier, 4)
-
-            new_stop = round(new_stop, 2)
-
-            # Update state in DB (always — to track highest_close)
+            current_stop = float(state["current_stop_price"])
+            new_stop = round(float(stops[i]), 2)
             updated_state = {
                 "symbol": symbol,
-                "entry_price": entry_price,
-                "atr_at_entry": atr,
+                "entry_price": float(state["entry_price"]),
+                "atr_at_entry": float(state["atr_at_entry"]),
                 "highest_close": round(highest_close, 4),
                 "current_stop_price": new_stop,
                 "original_stop_price": float(state["original_stop_price"]),
-                "stop_order_id": stop_order_id,
+                "stop_order_id": state.get("stop_order_id"),
                 "take_profit_price": state.get("take_profit_price"),
-                "tier_reached": tier,
+                "tier_reached": int(tiers[i]),
             }
+            updated_states.append(updated_state)
+            # If stop price moved up, the Alpaca stop order must be replaced
+            if new_stop > current_stop and updated_state["stop_order_id"]:
+                raises.append((updated_state, current_stop))
+
+        # 3. Replace raised stop orders concurrently
+        replaced = self._replace_stop_orders([s for s, _ in raises])
+        t_replace = time.perf_counter()
 
-            # If stop price moved up, replace the Alpaca stop order
-            if new_stop > current_stop and stop_order_id:
+        updates: list[dict] = []
+        open_orders: list[dict] | None = None
+        for (updated_state, old_stop), (ok, payload) in zip(raises, replaced):
+            symbol = updated_state["symbol"]
+            stop_order_id = updated_state["stop_order_id"]
+            if ok:
                 try:
-                    result = self._alpaca.replace_order_stop_price(
-                        stop_order_id, new_stop
-                    )
-                    # Alpaca creates a NEW order — update the ID
-                    new_order_id = result.get("order_id")
-                    if new_order_id and new_order_id != stop_order_id:
-                        updated_state["stop_order_id"] = new_order_id
-
-                    self.logger.info(
-                        "trailing_stop_raised",
-                        symbol=symbol,
-                        old_stop=current_stop,
-                        new_stop=new_stop,
-                        tier=tier,
-                        highest_close=round(highest_close, 2),
-                    )
+                    updates.append(self._record_stop_raise(updated_state, old_stop, payload))
+                except Exception as e:
+                    self.logger.warning("trailing_stop_event_failed", symbol=symbol, error=str(e))
+                continue
+            self.logger.error(
+                "trailing_stop_replace_failed",
+                symbol=symbol,
+                order_id=stop_order_id,
+                error=payload,
+            )
+            # Recovery: stop order may have changed after a partial fill.
+            # Search for a new valid stop order for this symbol and relink.
+            try:
+                if open_orders is None:
+                    open_orders = self._alpaca.get_orders(status="open")
+                for o in open_orders:
+                    if o.get("symbol") == symbol and o.get("type") == "stop":
+                        new_found_id = o.get("order_id")
+                        if new_found_id and new_found_id != stop_order_id:
+                            updated_state["stop_order_id"] = new_found_id
+                            self.logger.info(
+                                "trailing_stop_order_relinked",
+                                symbol=symbol,
+                                old_order_id=stop_order_id,
+                                new_order_id=new_found_id,
+                                reason="recovered_after_partial_fill",
+                            )
+                        break
+            except Exception:
+                pass
+
+        # 4. Save all states (even if an order replace failed — we still track highest_close)
+        self._db.upsert_trailing_stop_states(updated_states)
+        t_end = time.perf_counter()
 
-                    # Log risk event
-                    tier_names = {
-                        1: "breakeven",
-                        2: "lock_profit",
-                        3: "trailing",
-                        4: "tight_trail",
-                    }
-                    event = RiskEvent(
-                        event_type=RiskEventType.TRAILING_STOP,
-                        severity="INFO",
-                        symbol=symbol,
-                        message=(
-                            f"Trailing stop raised: {symbol} "
-                            f"${current_stop:.2f} → ${new_stop:.2f} "
-                            f"(tier {tier}: {tier_names.get(tier, 'unknown')})"
-                        ),
-                        portfolio_value=None,
-                        action_taken=(
-                            f"Stop order replaced: {stop_order_id} → "
-                            f"{updated_state['stop_order_id']}"
-                        ),
-                    )
-                    self._db.insert_risk_event(event.model_dump(mode="json"))
+        self.logger.info(
+            "trailing_stops_cycle",
+            positions=len(rows),
+            replaced=len(raises),
+            raised=len(updates),
+            compute_ms=round((t_compute - t0) * 1000, 1),
+            replace_ms=round((t_replace - t_compute) * 1000, 1),
+            persist_ms=round((t_end - t_replace) * 1000, 1),
+            total_ms=round((t_end - t0) * 1000, 1),
+        )
+        return updates
 
-                    updates.append({
-                        "symbol": symbol,
-                        "old_stop": current_stop,
-                        "new_stop": new_stop,
-                        "tier": tier,
-                        "tier_name": tier_names.get(tier, "unknown"),
-                        "highest_close": round(highest_close, 2),
-                    })
+    def _trailing_state_for(self, pos: dict, state: dict | None) -> dict | None:
+        """Stored state for ``pos``, bootstrapping missing or anomalous ones (None → skip)."""
+        symbol = pos["symbol"]
 
-                except Exception as e:
-                    self.logger.error(
-                        "trailing_stop_replace_failed",
-                        symbol=symbol,
-                        order_id=stop_order_id,
-                        error=str(e),
-                    )
-                    # Recovery: stop order may have changed after a partial fill.
-                    # Search for a new valid stop order for this symbol and relink.
-                    try:
-                        orders = self._alpaca.get_orders(status="open")
-                        for o in orders:
-                            if o.get("symbol") == symbol and o.get("type") == "stop":
-                                new_found_id = o.get("order_id")
-                                if new_found_id and new_found_id != stop_order_id:
-                                    updated_state["stop_order_id"] = new_found_id
-                                    self.logger.info(
-                                        "trailing_stop_order_relinked",
-                                        symbol=symbol,
-                                        old_order_id=stop_order_id,
-                                        new_order_id=new_found_id,
-                                        reason="recovered_after_partial_fill",
-                                    )
-                                break
-                    except Exception:
-                        pass
-
-            # Save state (even if order replace failed — we still track highest_close)
-            self._db.upsert_trailing_stop_state(updated_state)
+        # Auto-bootstrap for positions without trailing stop state
+        if not state:
+            state = self._bootstrap_trailing_stop(pos)
+            if not state:
+                return None
 
-        return updates
+        if float(state["atr_at_entry"]) <= 0:
+            return None
+
+        # Sanity check: stop must be BELOW current price for a long position.
+        # If not (e.g. GLD anomaly: stop=458.11 vs price=~180, stale DB entry,
+        # bad data from Alpaca), force a full rebootstrap from market data.
+        # Using 99% threshold to tolerate negligible rounding diffs.
+        current_price = float(pos["current_price"]) if pos["current_price"] else 0.0
+        current_stop = float(state["current_stop_price"])
+        if current_price > 0 and current_stop >= current_price * 0.99:
+            self.logger.critical(
+                "trailing_stop_above_market_price",
+                symbol=symbol,
+                current_stop=round(current_stop, 2),
+                current_price=round(current_price, 2),
+                action="forcing_rebootstrap",
+                reason="stop_price >= 99% current_price — would trigger immediately",
+            )
+            state = self._bootstrap_trailing_stop(pos)
+            if not state or float(state["atr_at_entry"]) <= 0:
+                return None
+        return state
+
+    def _replace_stop_orders(self, states: list[dict]) -> list[tuple[bool, Any]]:
+        """
+        Replace the stop order of every state concurrently.
+
+        Returns (True, replace result) or (False, error message) per state,
+        in input order.
+        """
+        if not states:
+            return []
+
+        def replace(state: dict) -> tuple[bool, Any]:
+            try:
+                return True, self._alpaca.replace_order_stop_price(
+                    state["stop_order_id"], state["current_stop_price"]
+                )
+            except Exception as e:
+                return False, str(e)
+
+        workers = max(1, min(int(self._risk.trailing_replace_workers), len(states)))
+        if workers == 1:
+            return [replace(s) for s in states]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(replace, states))
+
+    def _record_stop_raise(self, updated_state: dict, old_stop: float, result: dict) -> dict:
+        """Relink the replaced order id, log the raise and its risk event."""
+        symbol = updated_state["symbol"]
+        stop_order_id = updated_state["stop_order_id"]
+        new_stop = updated_state["current_stop_price"]
+        tier = updated_state["tier_reached"]
+        highest_close = updated_state["highest_close"]
+
+        # Alpaca creates a NEW order — update the ID
+        new_order_id = (result or {}).get("order_id")
+        if new_order_id and new_order_id != stop_order_id:
+            updated_state["stop_order_id"] = new_order_id
+
+        self.logger.info(
+            "trailing_stop_raised",
+            symbol=symbol,
+            old_stop=old_stop,
+            new_stop=new_stop,
+            tier=tier,
+            highest_close=round(highest_close, 2),
+        )
+
+        # Log risk event
+        tier_names = {
+            1: "breakeven",
+            2: "lock_profit",
+            3: "trailing",
+            4: "tight_trail",
+        }
+        event = RiskEvent(
+            event_type=RiskEventType.TRAILING_STOP,
+            severity="INFO",
+            symbol=symbol,
+            message=(
+                f"Trailing stop raised: {symbol} "
+                f"${old_stop:.2f} → ${new_stop:.2f} "
+                f"(tier {tier}: {tier_names.get(tier, 'unknown')})"
+            ),
+            portfolio_value=None,
+            action_taken=(
+                f"Stop order replaced: {stop_order_id} → "
+                f"{updated_state['stop_order_id']}"
+            ),
+        )
+        self._db.insert_risk_event(event.model_dump(mode="json"))
+
+        return {
+            "symbol": symbol,
+            "old_stop": old_stop,
+            "new_stop": new_stop,
+            "tier": tier,
+            "tier_name": tier_names.get(tier, "unknown"),
+            "highest_close": round(highest_close, 2),
+        }
 
     def _bootstrap_trailing_stop(self, pos: dict) -> dict | None:
         """Bootstrap trailing stop state for a pre-existing position.
@@ -455,7 +548,11 @@ class PortfolioMonitor(BaseAgent):
 
         # Compute ATR from current market data
         try:
-            bars = self._alpaca.get_bars([symbol], timeframe="1Day", days_back=30)
+            bar_cache = get_bar_cache()
+            if bar_cache is not None:
+                bars = bar_cache.get_latest_bars_multi(self._alpaca, [symbol], "1Day", n_bars=30)
+            else:
+                bars = self._alpaca.get_bars([symbol], timeframe="1Day", days_back=30)
             if symbol not in bars or len(bars[symbol]) < 14:
                 self.logger.warning(
                     "bootstrap_insufficient_data", symbol=symbol
@@ -529,7 +626,7 @@ class PortfolioMonitor(BaseAgent):
         )
         return state
 
-    def _cleanup_trailing_stop_state(self) -> int:
+    def _cleanup_trailing_stop_state(self, broker: BrokerState | None = None) -> int:
         """Remove trailing stop state for symbols no longer in portfolio.
 
         Guards against premature cleanup when a SELL is partially_filled:
@@ -537,7 +634,9 @@ class PortfolioMonitor(BaseAgent):
         fully settled yet, so we preserve the trailing stop state to keep
         the residual position protected.
         """
-        raw_positions = self._alpaca.get_positions()
+        if broker is None:
+            broker = BrokerState(self._alpaca, self._db)
+        raw_positions = broker.positions()
         current_symbols = {p["symbol"] for p in raw_positions}
 
         # Check for pending orders — a partially_filled SELL may temporarily
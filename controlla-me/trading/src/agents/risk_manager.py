@@ -14,6 +14,7 @@ import pandas as pd
 
 from ..config import get_settings, SECTOR_MAP
 from ..connectors.alpaca_client import AlpacaClient
+from ..connectors.broker_state import BrokerState
 from ..models.signals import RiskDecision, RiskDecisionStatus, SignalAction
 from ..models.portfolio import RiskEvent, RiskEventType
 from ..utils.db import TradingDB
@@ -29,12 +30,18 @@ class RiskManager(BaseAgent):
         self._db = TradingDB()
         self._risk = get_settings().risk
 
-    async def run(self, signals: list[dict] | None = None, **kwargs: Any) -> dict:
+    async def run(
+        self,
+        signals: list[dict] | None = None,
+        broker: BrokerState | None = None,
+        **kwargs: Any,
+    ) -> dict:
         """
         Validate signals against risk rules.
 
         Args:
             signals: List of Signal dicts. If None, reads latest from DB.
+            broker:  Cycle-scoped account/positions; None → fetched here.
         """
         if signals is None:
             trade_signals = self._db.get_latest_signals("trade", limit=1)
@@ -46,9 +53,11 @@ class RiskManager(BaseAgent):
         self.log_start(signals_count=len(signals))
 
         # Get current portfolio state
-        account = self._alpaca.get_account()
-        positions = self._alpaca.get_positions()
-        snapshots = self._db.get_snapshots(days=7)
+        if broker is None:
+            broker = BrokerState(self._alpaca, self._db)
+        account = broker.account()
+        positions = broker.positions()
+        snapshots = broker.snapshots(days=7)
 
         portfolio_value = account["portfolio_value"]
         cash = account["cash"]
@@ -56,6 +65,7 @@ class RiskManager(BaseAgent):
         # Check kill switch conditions first
         kill_switch = self._check_kill_switch(snapshots, portfolio_value)
         if kill_switch:
+            broker.invalidate()  # positions were closed
             return kill_switch
 
         # Validate each signal
@@ -7,6 +7,10 @@ Uses the shared composite-score analysis from src.analysis (single source of tru
 
 from __future__ import annotations
 
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import pandas as pd
@@ -14,6 +18,9 @@ import pandas as pd
 from ..analysis import analyze_composite, analyze_slope_volume, get_current_slope_direction, get_current_slope_info
 from ..config import get_settings
 from ..connectors import AlpacaClient
+from ..connectors.bar_aggregator import BarAggregator
+from ..connectors.bar_cache import get_bar_cache
+from ..connectors.broker_state import BrokerState
 from ..connectors.tiingo_client import TiingoClient
 from ..models.signals import Signal, SignalAction
 from ..utils.db import TradingDB
@@ -153,16 +160,24 @@ class SignalGenerator(BaseAgent):
             rationale=result["rationale"],
         )
 
-    def run_slope_volume(self) -> dict:
+    def run_slope_volume(self, broker: BrokerState | None = None, include_equities: bool = True) -> dict:
         """
         Run the slope+volume intraday strategy on all configured symbols.
 
-        Iterates over slope_volume.symbols (default: SPY, AAPL, NVDA, TSLA),
-        fetches 5-min bars from Alpaca and evaluates slope+volume entry signals.
+        Fetches the latest bars for slope_volume.symbols plus every open
+        position in one batched call (get_latest_bars_multi, through the
+        scheduler's BarCache when installed), then evaluates the symbols
+        concurrently (slope_volume.analysis_workers threads).
         If the strategy is disabled (TRADING_SLOPE_ENABLED=false), returns immediately.
 
         Configure symbols via env: TRADING_SLOPE_SYMBOLS='["SPY","AAPL","NVDA"]'
 
+        Open positions come from ``broker`` (the pipeline cycle's shared
+        BrokerState) when given, otherwise from Alpaca directly.
+
+        With ``include_equities=False`` only the crypto pairs are evaluated —
+        the equity watchlist is covered by stream_slope_volume.
+
         Returns:
             dict with keys:
                 strategy (str), symbols (list[str]), timeframe (str),
@@ -176,28 +191,22 @@ class SignalGenerator(BaseAgent):
         if not slope_cfg.enabled:
             return {"signals": [], "skipped": "slope_volume_disabled"}
 
-        symbols = slope_cfg.symbols
-        # Compute how many bars to fetch: need enough history for both the
-        # current and previous slope windows, the volume MA, and the ATR.
-        n_bars = max(
-            slope_cfg.lookback_bars * 2
-            + slope_cfg.volume_ma_period
-            + slope_cfg.atr_period
-            + 10,
-            60,
-        )
+        symbols = slope_cfg.symbols if include_equities else []
+        n_bars = self._slope_n_bars(slope_cfg)
 
         self.log_start(strategy="slope_volume", symbols=symbols, timeframe=slope_cfg.timeframe)
 
         # Fetch open positions once before the loop.
         # When slope reverses and a position is already open in the opposite direction,
         # we emit SELL (close long) or COVER (close short) — slope reversal IS the exit signal.
+        position_map: dict[str, dict] = {}
         try:
-            open_positions = self._alpaca.get_positions()
-            position_map: dict[str, dict] = {p["symbol"]: p for p in open_positions}
+            if include_equities:
+                if broker is None:
+                    broker = BrokerState(self._alpaca)
+                position_map = broker.position_map()
         except Exception as exc:
             self.log_error("positions_fetch_failed", error=str(exc))
-            position_map = {}
 
         # Expand scan to include ALL open positions — slope reversal is the exit signal
         # for every held position, not just the configured watchlist.
@@ -216,228 +225,54 @@ class SignalGenerator(BaseAgent):
         all_signals: list[dict] = []
         symbols_with_signals = 0
 
-        inverse_etf_set = set(getattr(slope_cfg, "inverse_etf_symbols", ["SH", "PSQ", "DOG", "SPXS", "SQQQ"]))
-        # Trend-following symbols: liquid instruments that trade on sustained slope
-        # direction (no reversal needed) but still require volume confirmation.
-        # Enables diversification beyond inverse ETFs — SPY/QQQ/NVDA etc. now generate signals.
-        trend_following_set = set(getattr(
-            slope_cfg, "trend_following_symbols",
-            ["SPY", "QQQ", "IWM", "NVDA", "GLD", "TLT", "XLK", "XLF", "XLE", "XLV"],
-        ))
-
-        for symbol in all_symbols:
-            df = self._market_data.get_latest_bars(
-                symbol,
-                timeframe=slope_cfg.timeframe,
-                n_bars=n_bars,
+        inverse_etf_set, trend_following_set = self._slope_modes(slope_cfg)
+
+        fetch_start = time.perf_counter()
+        # Under the scheduler the bars come from the process-wide ring buffer,
+        # which only fetches the bars closed since the previous cycle.
+        bar_cache = get_bar_cache()
+        if not all_symbols:
+            bars_by_symbol = {}
+        elif bar_cache is not None:
+            bars_by_symbol = bar_cache.get_latest_bars_multi(
+                self._market_data, all_symbols, slope_cfg.timeframe, n_bars
             )
-            if df.empty:
-                self.log_error("no_data", symbol=symbol)
-                continue  # skip this symbol, try next
-
-            # --- Entry mode per asset class ---
-            # Inverse ETFs (SH, PSQ, etc.): trend-continuation, volume bypassed.
-            #   A sustained positive slope = market falling → inverse ETF rising = BUY.
-            #   Volume bypassed: Tiingo IEX may not return volume for low-volume ETFs.
-            # Trend-following (SPY, QQQ, NVDA, GLD, ...): trend-continuation, volume required.
-            #   Sustained slope above threshold + volume confirmation → signal.
-            #   No reversal needed — these trend for hours/days, not just at reversal points.
-            # All others: reversal mode — slope must flip direction to signal entry.
-            is_inverse = symbol in inverse_etf_set
-            is_trend_following = (not is_inverse) and (symbol in trend_following_set)
-
-            result = analyze_slope_volume(
-                symbol,
-                df,
-                lookback_bars=slope_cfg.lookback_bars,
-                slope_threshold_pct=slope_cfg.slope_threshold_pct,
-                volume_multiplier=slope_cfg.volume_multiplier,
-                volume_ma_period=slope_cfg.volume_ma_period,
-                stop_loss_atr=slope_cfg.stop_loss_atr,
-                take_profit_atr=slope_cfg.take_profit_atr,
-                atr_period=slope_cfg.atr_period,
-                market_open_utc=slope_cfg.market_open_utc,
-                market_close_utc=slope_cfg.market_close_utc,
-                min_bars=slope_cfg.min_bars,
+        else:
+            bars_by_symbol = self._market_data.get_latest_bars_multi(
+                all_symbols,
                 timeframe=slope_cfg.timeframe,
-                require_reversal=(not is_inverse) and (not is_trend_following),
-                bypass_volume_check=is_inverse,  # only inverse ETFs bypass volume
-                # Wave detection: 3-factor entry
-                acceleration_bars=slope_cfg.acceleration_bars,
-                min_acceleration_pct=slope_cfg.min_acceleration_pct,
-                volume_trend_bars=slope_cfg.volume_trend_bars,
-                persistence_bars=slope_cfg.persistence_bars,
+                n_bars=n_bars,
             )
+        fetch_ms = round((time.perf_counter() - fetch_start) * 1000, 1)
 
-            # Inverse ETFs: never SHORT. SH/PSQ are already inverse instruments —
-            # shorting them = double-negative = going long on the market. Nonsensical.
-            # If slope is negative (ETF falling = market rising), just skip — no trade.
-            if is_inverse and result is not None and result.get("action") == "SHORT":
-                result = None
-
-            # Log slope diagnostics when no signal generated — helps tune thresholds.
-            # Logged for: inverse ETFs (always), trend-following symbols (sampling only).
-            log_diag = is_inverse or is_trend_following
-            if result is None and log_diag:
-                try:
-                    slope_info = get_current_slope_info(
-                        df,
-                        lookback_bars=slope_cfg.lookback_bars,
-                        slope_threshold_pct=slope_cfg.slope_threshold_pct,
-                    )
-                    reason = (
-                        "slope_negative_filtered"
-                        if slope_info["direction"] == "negative"
-                        else "below_threshold"
-                    )
-                    mode = "inverse" if is_inverse else "trend_following"
-                    self.logger.info(
-                        "slope_no_signal",
-                        symbol=symbol,
-                        mode=mode,
-                        slope_pct=round(slope_info["slope_pct"], 4),
-                        slope_dir=slope_info["direction"],
-                        angle_deg=round(slope_info["angle_deg"], 1),
-                        threshold_pct=slope_cfg.slope_threshold_pct,
-                        reason=reason,
-                    )
-                except Exception as _exc:
-                    pass  # Never block the pipeline for a diagnostic log
-
-            if result is not None:
-                raw_action = result["action"]  # "BUY" or "SHORT" from slope analysis
-                current_pos = position_map.get(symbol)
-                pos_qty = float(current_pos.get("qty", 0)) if current_pos else 0.0
-
-                # --- Exit logic: slope reversal closes the existing position first ---
-                # Slope turned bearish (SHORT signal) but we have an open long → SELL.
-                if raw_action == "SHORT" and pos_qty > 0:
-                    action = SignalAction.SELL
-                    # stop_loss/take_profit not used for exit orders; set to entry_price.
-                    stop_loss = result["entry_price"]
-                    take_profit = result["entry_price"]
-                    rationale = f"[SLOPE EXIT LONG] Slope reversed bearish — closing long. {result['rationale']}"
-                # Slope turned bullish (BUY signal) but we have an open short → COVER.
-                elif raw_action == "BUY" and pos_qty < 0:
-                    action = SignalAction.COVER
-                    stop_loss = result["entry_price"]
-                    take_profit = result["entry_price"]
-                    rationale = f"[SLOPE EXIT SHORT] Slope reversed bullish — covering short. {result['rationale']}"
-                # No conflicting position: open a new entry as usual.
-                else:
-                    action = SignalAction.BUY if raw_action == "BUY" else SignalAction.SHORT
-                    stop_loss = result["stop_loss"]
-                    take_profit = result["take_profit"]
-                    rationale = result["rationale"]
-
-                # ── News risk check (Tiingo Power plan) ──────────────────────────────
-                # Check for breaking news before emitting BUY/SHORT entry signals.
-                # Exit signals (SELL/COVER) are never blocked — exiting is always safe.
-                news_risk = False
-                news_headline = ""
-                is_entry = action in (SignalAction.BUY, SignalAction.SHORT)
-                if is_entry and self._news_client is not None:
-                    try:
-                        check_tickers = list({symbol, "SPY", "QQQ"})
-                        news_risk, news_headline = self._news_client.has_breaking_news(
-                            check_tickers,
-                            minutes_back=self._news_settings.minutes_back,
-                            high_impact_only=self._news_settings.high_impact_only,
-                        )
-                        if news_risk:
-                            self.logger.warning(
-                                "slope_signal_news_risk",
-                                symbol=symbol,
-                                action=action.value,
-                                headline=news_headline[:100] if news_headline else "",
-                                note="Signal flagged — Risk Manager will halve position size",
-                            )
-                    except Exception as exc:
-                        self.logger.debug("news_check_skipped", error=str(exc))
-
-                all_signals.append(
-                    Signal(
-                        symbol=result["symbol"],
-                        action=action,
-                        confidence=result["confidence"],
-                        score=result["score"],
-                        entry_price=result["entry_price"],
-                        stop_loss=stop_loss,
-                        take_profit=take_profit,
-                        rationale=rationale,
-                        news_risk=news_risk,
-                        news_headline=news_headline,
-                    ).model_dump(mode="json")
+        def evaluate(symbol: str) -> dict | None:
+            df = bars_by_symbol.get(symbol)
+            if df is None or df.empty:
+                self.log_error("no_data", symbol=symbol)
+                return None
+            try:
+                return self._slope_symbol_signal(
+                    symbol,
+                    df,
+                    slope_cfg,
+                    position_map.get(symbol),
+                    is_inverse=symbol in inverse_etf_set,
+                    is_trend_following=(symbol not in inverse_etf_set) and (symbol in trend_following_set),
                 )
-                symbols_with_signals += 1
-
-            else:
-                # No reversal signal — check if existing position has adverse slope.
-                # If we're holding a long with negative slope (or short with positive),
-                # exit immediately without waiting for a formal reversal.
-                adverse_pos = position_map.get(symbol)
-                if adverse_pos is not None:
-                    adverse_qty = float(adverse_pos.get("qty", 0))
-                    if adverse_qty != 0:
-                        slope_info = get_current_slope_info(
-                            df,
-                            lookback_bars=slope_cfg.lookback_bars,
-                            slope_threshold_pct=slope_cfg.slope_threshold_pct,
-                        )
-                        slope_dir = slope_info["direction"]
-                        slope_pct_val: float = slope_info["slope_pct"]
-                        angle_deg_val: float = slope_info["angle_deg"]
-                        exit_action: SignalAction | None = None
-                        if adverse_qty > 0 and slope_dir == "negative":
-                            exit_action = SignalAction.SELL
-                            exit_label = "ADVERSE EXIT LONG"
-                        elif adverse_qty < 0 and slope_dir == "positive":
-                            exit_action = SignalAction.COVER
-                            exit_label = "ADVERSE EXIT SHORT"
-                        elif adverse_qty < 0 and is_inverse:
-                            # Inverse ETF held SHORT: always wrong (double-negative = long market).
-                            # Force COVER immediately regardless of slope direction.
-                            exit_action = SignalAction.COVER
-                            exit_label = "INVERSE ETF SHORT CLEANUP"
-                        else:
-                            exit_label = ""
-
-                        if exit_action is not None:
-                            current_price = float(df["close"].iloc[-1])
-                            # Dynamic confidence: proportional to adverse slope magnitude.
-                            # Weak slope (~threshold) → 0.5, strong slope (3x+ threshold) → 0.9.
-                            # Prevents cutting winners on noise while exiting quickly on strong moves.
-                            _slope_magnitude = abs(slope_pct_val)
-                            _slope_ratio = min(_slope_magnitude / (slope_cfg.slope_threshold_pct * 3), 1.0)
-                            adverse_confidence = round(0.5 + 0.4 * _slope_ratio, 3)
-                            exit_rationale = (
-                                f"[SLOPE {exit_label}] slope={slope_pct_val:+.4f}%/bar "
-                                f"({angle_deg_val:+.1f}°) — "
-                                f"{'long' if adverse_qty > 0 else 'short'} qty={adverse_qty} "
-                                f"closing to prevent further loss."
-                            )
-                            all_signals.append(
-                                Signal(
-                                    symbol=symbol,
-                                    action=exit_action,
-                                    confidence=adverse_confidence,
-                                    score=slope_pct_val,  # actual slope_pct
-                                    entry_price=current_price,
-                                    stop_loss=current_price,
-                                    take_profit=current_price,
-                                    rationale=exit_rationale,
-                                ).model_dump(mode="json")
-                            )
-                            symbols_with_signals += 1
-                            self.logger.info(
-                                "slope_adverse_exit",
-                                symbol=symbol,
-                                action=exit_action.value,
-                                slope_dir=slope_dir,
-                                slope_pct=slope_pct_val,
-                                angle_deg=angle_deg_val,
-                                pos_qty=adverse_qty,
-                            )
+            except Exception as exc:
+                self.log_error("slope_analysis_failed", symbol=symbol, error=str(exc))
+                return None
+
+        # Symbols are independent: the analysis and the news lookups run on a
+        # thread pool, and map() keeps the signals in watchlist order.
+        analysis_start = time.perf_counter()
+        workers = max(1, min(slope_cfg.analysis_workers, len(all_symbols)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for signal in pool.map(evaluate, all_symbols):
+                if signal is not None:
+                    all_signals.append(signal)
+                    symbols_with_signals += 1
+        analysis_ms = round((time.perf_counter() - analysis_start) * 1000, 1)
 
         # ── Crypto symbols (24/7, bypass market hours) ──────────────────────────
         # BTC/ETH trade round the clock — run slope analysis even on weekends.
@@ -536,5 +371,302 @@ class SignalGenerator(BaseAgent):
             strategy="slope_volume",
             signals=len(all_signals),
             symbols_scanned=len(all_symbols),
+            fetch_ms=fetch_ms,
+            analysis_ms=analysis_ms,
         )
         return signal_data
+
+    async def stream_slope_volume(
+        self,
+        client: Any,
+        on_signal: Callable[[dict], None | Awaitable[None]],
+    ) -> None:
+        """
+        Live slope+volume signals from a TiingoWebSocketClient tick stream.
+
+        Ticks are aggregated into slope_volume.timeframe bars (BarAggregator)
+        seeded once with REST history, and each symbol is evaluated the moment
+        one of its bars closes — no REST bar polling in the loop. Open
+        positions are re-read once per bar period. Each signal dict (same
+        shape as run_slope_volume's) is passed to ``on_signal``.
+
+        Runs until the client's stream ends (client.stop()).
+        """
+        slope_cfg = get_settings().slope_volume
+        n_bars = self._slope_n_bars(slope_cfg)
+        inverse_etf_set, trend_following_set = self._slope_modes(slope_cfg)
+        positions: dict[str, Any] = {"period": None, "map": {}}
+
+        def refresh_positions() -> dict[str, dict]:
+            try:
+                return {p["symbol"]: p for p in self._alpaca.get_positions()}
+            except Exception as exc:
+                self.log_error("positions_fetch_failed", error=str(exc))
+                return positions["map"]
+
+        async def on_bar_close(symbol: str, bars: pd.DataFrame) -> None:
+            period = bars.index[-1]
+            if positions["period"] != period:
+                positions["period"] = period
+                positions["map"] = await asyncio.to_thread(refresh_positions)
+            signal = await asyncio.to_thread(
+                self._slope_symbol_signal,
+                symbol,
+                bars,
+                slope_cfg,
+                positions["map"].get(symbol),
+                is_inverse=symbol in inverse_etf_set,
+                is_trend_following=(symbol not in inverse_etf_set) and (symbol in trend_following_set),
+            )
+            if signal is not None:
+                result = on_signal(signal)
+                if asyncio.iscoroutine(result):
+                    await result
+
+        aggregator = BarAggregator(slope_cfg.timeframe, on_bar_close=on_bar_close, emit_bars=n_bars)
+        aggregator.seed(
+            await asyncio.to_thread(
+                self._market_data.get_latest_bars_multi,
+                [s.upper() for s in client.symbols],  # IEX ticks arrive upper-cased
+                timeframe=slope_cfg.timeframe,
+                n_bars=n_bars,
+            )
+        )
+        self.log_start(strategy="slope_volume_stream", symbols=client.symbols, timeframe=slope_cfg.timeframe)
+        await client.stream(callback=aggregator.on_tick)
+        self.log_complete(strategy="slope_volume_stream", late_ticks=aggregator.late_ticks)
+
+    @staticmethod
+    def _slope_n_bars(slope_cfg: Any) -> int:
+        """Bars one evaluation needs: current + previous slope windows, volume MA, ATR."""
+        return max(
+            slope_cfg.lookback_bars * 2
+            + slope_cfg.volume_ma_period
+            + slope_cfg.atr_period
+            + 10,
+            60,
+        )
+
+    @staticmethod
+    def _slope_modes(slope_cfg: Any) -> tuple[set[str], set[str]]:
+        """(inverse ETF symbols, trend-following symbols) of the slope watchlist."""
+        inverse_etf_set = set(getattr(slope_cfg, "inverse_etf_symbols", ["SH", "PSQ", "DOG", "SPXS", "SQQQ"]))
+        # Trend-following symbols: liquid instruments that trade on sustained slope
+        # direction (no reversal needed) but still require volume confirmation.
+        # Enables diversification beyond inverse ETFs — SPY/QQQ/NVDA etc. now generate signals.
+        trend_following_set = set(getattr(
+            slope_cfg, "trend_following_symbols",
+            ["SPY", "QQQ", "IWM", "NVDA", "GLD", "TLT", "XLK", "XLF", "XLE", "XLV"],
+        ))
+        return inverse_etf_set, trend_following_set
+
+    def _slope_symbol_signal(
+        self,
+        symbol: str,
+        df: pd.DataFrame,
+        slope_cfg: Any,
+        position: dict | None,
+        is_inverse: bool,
+        is_trend_following: bool,
+    ) -> dict | None:
+        """
+        Evaluate one symbol of the slope+volume watchlist.
+
+        Returns the serialized Signal (entry, slope-reversal exit or adverse
+        exit for an open position), or None when the symbol has no signal.
+        """
+        # --- Entry mode per asset class ---
+        # Inverse ETFs (SH, PSQ, etc.): trend-continuation, volume bypassed.
+        #   A sustained positive slope = market falling → inverse ETF rising = BUY.
+        #   Volume bypassed: Tiingo IEX may not return volume for low-volume ETFs.
+        # Trend-following (SPY, QQQ, NVDA, GLD, ...): trend-continuation, volume required.
+        #   Sustained slope above threshold + volume confirmation → signal.
+        #   No reversal needed — these trend for hours/days, not just at reversal points.
+        # All others: reversal mode — slope must flip direction to signal entry.
+
+        result = analyze_slope_volume(
+            symbol,
+            df,
+            lookback_bars=slope_cfg.lookback_bars,
+            slope_threshold_pct=slope_cfg.slope_threshold_pct,
+            volume_multiplier=slope_cfg.volume_multiplier,
+            volume_ma_period=slope_cfg.volume_ma_period,
+            stop_loss_atr=slope_cfg.stop_loss_atr,
+            take_profit_atr=slope_cfg.take_profit_atr,
+            atr_period=slope_cfg.atr_period,
+            market_open_utc=slope_cfg.market_open_utc,
+            market_close_utc=slope_cfg.market_close_utc,
+            min_bars=slope_cfg.min_bars,
+            timeframe=slope_cfg.timeframe,
+            require_reversal=(not is_inverse) and (not is_trend_following),
+            bypass_volume_check=is_inverse,  # only inverse ETFs bypass volume
+            # Wave detection: 3-factor entry
+            acceleration_bars=slope_cfg.acceleration_bars,
+            min_acceleration_pct=slope_cfg.min_acceleration_pct,
+            volume_trend_bars=slope_cfg.volume_trend_bars,
+            persistence_bars=slope_cfg.persistence_bars,
+        )
+
+        # Inverse ETFs: never SHORT. SH/PSQ are already inverse instruments —
+        # shorting them = double-negative = going long on the market. Nonsensical.
+        # If slope is negative (ETF falling = market rising), just skip — no trade.
+        if is_inverse and result is not None and result.get("action") == "SHORT":
+            result = None
+
+        # Log slope diagnostics when no signal generated — helps tune thresholds.
+        # Logged for: inverse ETFs (always), trend-following symbols (sampling only).
+        log_diag = is_inverse or is_trend_following
+        if result is None and log_diag:
+            try:
+                slope_info = get_current_slope_info(
+                    df,
+                    lookback_bars=slope_cfg.lookback_bars,
+                    slope_threshold_pct=slope_cfg.slope_threshold_pct,
+                )
+                reason = (
+                    "slope_negative_filtered"
+                    if slope_info["direction"] == "negative"
+                    else "below_threshold"
+                )
+                mode = "inverse" if is_inverse else "trend_following"
+                self.logger.info(
+                    "slope_no_signal",
+                    symbol=symbol,
+                    mode=mode,
+                    slope_pct=round(slope_info["slope_pct"], 4),
+                    slope_dir=slope_info["direction"],
+                    angle_deg=round(slope_info["angle_deg"], 1),
+                    threshold_pct=slope_cfg.slope_threshold_pct,
+                    reason=reason,
+                )
+            except Exception as _exc:
+                pass  # Never block the pipeline for a diagnostic log
+
+        if result is not None:
+            raw_action = result["action"]  # "BUY" or "SHORT" from slope analysis
+            pos_qty = float(position.get("qty", 0)) if position else 0.0
+
+            # --- Exit logic: slope reversal closes the existing position first ---
+            # Slope turned bearish (SHORT signal) but we have an open long → SELL.
+            if raw_action == "SHORT" and pos_qty > 0:
+                action = SignalAction.SELL
+                # stop_loss/take_profit not used for exit orders; set to entry_price.
+                stop_loss = result["entry_price"]
+                take_profit = result["entry_price"]
+                rationale = f"[SLOPE EXIT LONG] Slope reversed bearish — closing long. {result['rationale']}"
+            # Slope turned bullish (BUY signal) but we have an open short → COVER.
+            elif raw_action == "BUY" and pos_qty < 0:
+                action = SignalAction.COVER
+                stop_loss = result["entry_price"]
+                take_profit = result["entry_price"]
+                rationale = f"[SLOPE EXIT SHORT] Slope reversed bullish — covering short. {result['rationale']}"
+            # No conflicting position: open a new entry as usual.
+            else:
+                action = SignalAction.BUY if raw_action == "BUY" else SignalAction.SHORT
+                stop_loss = result["stop_loss"]
+                take_profit = result["take_profit"]
+                rationale = result["rationale"]
+
+            # ── News risk check (Tiingo Power plan) ──────────────────────────────
+            # Check for breaking news before emitting BUY/SHORT entry signals.
+            # Exit signals (SELL/COVER) are never blocked — exiting is always safe.
+            news_risk = False
+            news_headline = ""
+            is_entry = action in (SignalAction.BUY, SignalAction.SHORT)
+            if is_entry and self._news_client is not None:
+                try:
+                    check_tickers = list({symbol, "SPY", "QQQ"})
+                    news_risk, news_headline = self._news_client.has_breaking_news(
+                        check_tickers,
+                        minutes_back=self._news_settings.minutes_back,
+                        high_impact_only=self._news_settings.high_impact_only,
+                    )
+                    if news_risk:
+                        self.logger.warning(
+                            "slope_signal_news_risk",
+                            symbol=symbol,
+                            action=action.value,
+                            headline=news_headline[:100] if news_headline else "",
+                            note="Signal flagged — Risk Manager will halve position size",
+                        )
+                except Exception as exc:
+                    self.logger.debug("news_check_skipped", error=str(exc))
+
+            return Signal(
+                symbol=result["symbol"],
+                action=action,
+                confidence=result["confidence"],
+                score=result["score"],
+                entry_price=result["entry_price"],
+                stop_loss=stop_loss,
+                take_profit=take_profit,
+                rationale=rationale,
+                news_risk=news_risk,
+                news_headline=news_headline,
+            ).model_dump(mode="json")
+
+        # No reversal signal — check if existing position has adverse slope.
+        # If we're holding a long with negative slope (or short with positive),
+        # exit immediately without waiting for a formal reversal.
+        adverse_qty = float(position.get("qty", 0)) if position is not None else 0.0
+        if adverse_qty == 0:
+            return None
+
+        slope_info = get_current_slope_info(
+            df,
+            lookback_bars=slope_cfg.lookback_bars,
+            slope_threshold_pct=slope_cfg.slope_threshold_pct,
+        )
+        slope_dir = slope_info["direction"]
+        slope_pct_val: float = slope_info["slope_pct"]
+        angle_deg_val: float = slope_info["angle_deg"]
+        exit_action: SignalAction | None = None
+        if adverse_qty > 0 and slope_dir == "negative":
+            exit_action = SignalAction.SELL
+            exit_label = "ADVERSE EXIT LONG"
+        elif adverse_qty < 0 and slope_dir == "positive":
+            exit_action = SignalAction.COVER
+            exit_label = "ADVERSE EXIT SHORT"
+        elif adverse_qty < 0 and is_inverse:
+            # Inverse ETF held SHORT: always wrong (double-negative = long market).
+            # Force COVER immediately regardless of slope direction.
+            exit_action = SignalAction.COVER
+            exit_label = "INVERSE ETF SHORT CLEANUP"
+        else:
+            exit_label = ""
+
+        if exit_action is not None:
+            current_price = float(df["close"].iloc[-1])
+            # Dynamic confidence: proportional to adverse slope magnitude.
+            # Weak slope (~threshold) → 0.5, strong slope (3x+ threshold) → 0.9.
+            # Prevents cutting winners on noise while exiting quickly on strong moves.
+            _slope_magnitude = abs(slope_pct_val)
+            _slope_ratio = min(_slope_magnitude / (slope_cfg.slope_threshold_pct * 3), 1.0)
+            adverse_confidence = round(0.5 + 0.4 * _slope_ratio, 3)
+            exit_rationale = (
+                f"[SLOPE {exit_label}] slope={slope_pct_val:+.4f}%/bar "
+                f"({angle_deg_val:+.1f}°) — "
+                f"{'long' if adverse_qty > 0 else 'short'} qty={adverse_qty} "
+                f"closing to prevent further loss."
+            )
+            signal = Signal(
+                symbol=symbol,
+                action=exit_action,
+                confidence=adverse_confidence,
+                score=slope_pct_val,  # actual slope_pct
+                entry_price=current_price,
+                stop_loss=current_price,
+                take_profit=current_price,
+                rationale=exit_rationale,
+            ).model_dump(mode="json")
+            self.logger.info(
+                "slope_adverse_exit",
+                symbol=symbol,
+                action=exit_action.value,
+                slope_dir=slope_dir,
+                slope_pct=slope_pct_val,
+                angle_deg=angle_deg_val,
+                pos_qty=adverse_qty,
+            )
+            return signal
+        return None
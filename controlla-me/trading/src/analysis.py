@@ -21,87 +21,167 @@ from ta.trend import MACD
 from ta.volatility import BollingerBands
 
 
-def analyze_composite(
-    symbol: str,
+# ---------------------------------------------------------------------------
+# Series helpers
+# ---------------------------------------------------------------------------
+#
+# Every analyze_* function below is split into a precompute_* step (indicator
+# series over the whole frame) and an evaluate_* step (decision at bar i).
+# All indicators are causal — ta's RSI/MACD are adjust=False EWM recursions,
+# Bollinger is a pandas rolling window, ATR/SMA/volume averages are trailing
+# means — so the value at bar i of the full series is identical to the value
+# computed on df.iloc[:i + 1]. The live pipeline calls analyze_* on a fresh
+# frame (evaluate at the last bar); the backtest precomputes once per run and
+# evaluates every bar in O(1).
+
+
+def trailing_mean(values: np.ndarray | pd.Series, window: int) -> np.ndarray:
+    """``Series.tail(window).mean()`` evaluated at every bar.
+
+    Bars with fewer than ``window`` predecessors average the available prefix
+    (what ``tail()`` returns on a short frame). NaNs are skipped like pandas.
+    """
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    arr = np.asarray(values, dtype=float)
+    n = len(arr)
+    out = np.full(n, np.nan)
+    if n == 0 or window < 1:
+        return out
+
+    valid = ~np.isnan(arr)
+    filled = np.where(valid, arr, 0.0)
+
+    for i in range(min(window - 1, n)):
+        count = int(valid[: i + 1].sum())
+        if count:
+            out[i] = filled[: i + 1].sum() / count
+
+    if n >= window:
+        sums = sliding_window_view(filled, window).sum(axis=1)
+        counts = sliding_window_view(valid, window).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[window - 1:] = np.where(counts > 0, sums / counts, np.nan)
+    return out
+
+
+def true_range(
+    high: np.ndarray | pd.Series,
+    low: np.ndarray | pd.Series,
+    close: np.ndarray | pd.Series,
+) -> np.ndarray:
+    """True range per bar (first bar falls back to high - low)."""
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    prev_close = np.full(len(close), np.nan)
+    prev_close[1:] = close[:-1]
+    return np.fmax(
+        high - low,
+        np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Composite score (trend following)
+# ---------------------------------------------------------------------------
+
+
+def precompute_composite_indicators(
     df: pd.DataFrame,
     *,
-    # Signal settings
     rsi_period: int = 14,
-    rsi_oversold: float = 30.0,
-    rsi_overbought: float = 70.0,
     macd_fast: int = 12,
     macd_slow: int = 26,
     macd_signal: int = 9,
     bb_period: int = 20,
     bb_std: float = 2.0,
-    # Weights
+    atr_period: int = 14,
+) -> dict[str, Any]:
+    """Indicator series used by evaluate_composite_signal(), one value per bar."""
+    close = df["close"]
+    macd_ind = MACD(
+        close,
+        window_slow=macd_slow,
+        window_fast=macd_fast,
+        window_sign=macd_signal,
+    )
+    bb = BollingerBands(close, window=bb_period, window_dev=bb_std)
+    close_arr = close.to_numpy(dtype=float)
+    volume_arr = df["volume"].to_numpy(dtype=float)
+
+    return {
+        "close": close_arr,
+        "rsi": RSIIndicator(close, window=rsi_period).rsi().to_numpy(dtype=float),
+        "macd": macd_ind.macd().to_numpy(dtype=float),
+        "macd_signal": macd_ind.macd_signal().to_numpy(dtype=float),
+        "bb_upper": bb.bollinger_hband().to_numpy(dtype=float),
+        "bb_lower": bb.bollinger_lband().to_numpy(dtype=float),
+        "bb_mid": bb.bollinger_mavg().to_numpy(dtype=float),
+        "sma_20": trailing_mean(close_arr, 20),
+        "sma_50": trailing_mean(close_arr, 50),
+        "sma_200": trailing_mean(close_arr, 200),
+        "vol_avg_20": trailing_mean(volume_arr, 20),
+        "vol_avg_3": trailing_mean(volume_arr, 3),
+        "atr": trailing_mean(true_range(df["high"], df["low"], close_arr), atr_period),
+    }
+
+
+def evaluate_composite_signal(
+    symbol: str,
+    ind: dict[str, Any],
+    i: int,
+    *,
+    rsi_oversold: float = 30.0,
+    rsi_overbought: float = 70.0,
     weight_rsi: float = 0.15,
     weight_macd: float = 0.25,
     weight_bollinger: float = 0.15,
     weight_trend: float = 0.25,
     weight_volume: float = 0.20,
-    # Thresholds
     score_buy_threshold: float = 0.3,
     score_sell_threshold: float = -0.5,
-    # Stop loss / Take profit
     stop_loss_atr: float = 2.5,
     take_profit_atr: float = 6.0,
-    atr_period: int = 14,
-    # Filters
     trend_filter: bool = True,
     require_macd_crossover: bool = False,
     macd_crossover_lookback: int = 3,
     timeframe: str = "1Day",
     min_bars: int = 50,
 ) -> dict[str, Any] | None:
-    """
-    Composite-score signal analysis — shared between live and backtest.
+    """Composite-score decision at bar ``i`` of precomputed indicators.
 
-    Computes a weighted composite score from RSI, MACD, Bollinger Bands,
-    trend (SMA), and volume indicators. Generates BUY/SELL signals when
-    the score exceeds configurable thresholds.
-
-    Returns a plain dict with signal data, or None if no signal.
-    The caller is responsible for wrapping into their model type.
-
-    Returns dict keys:
-        symbol, action ("BUY"/"SELL"), score, confidence,
-        entry_price, stop_loss, take_profit, rationale,
-        indicators (dict with raw indicator values for debugging)
+    Same output as analyze_composite() on ``df.iloc[:i + 1]``.
     """
     try:
-        close = df["close"]
-        high = df["high"]
-        low = df["low"]
-        volume = df["volume"]
-        current_price = float(close.iloc[-1])
+        n = i + 1
+        close = ind["close"]
+        current_price = float(close[i])
 
-        if len(df) < min_bars:
+        if n < min_bars or i < 1:
             return None
 
         # --- Trend filter ---
         # Daily: SMA200 structural uptrend filter
         # Hourly: SMA50 short-term trend filter (200 hourly bars ≈ 30 days ≠ SMA200 daily)
         if trend_filter:
-            if timeframe == "1Day" and len(close) >= 200:
-                sma_trend = float(close.tail(200).mean())
+            if timeframe == "1Day" and n >= 200:
+                sma_trend = float(ind["sma_200"][i])
                 if current_price < sma_trend:
                     return None
-            elif timeframe == "1Hour" and len(close) >= 50:
-                sma_trend = float(close.tail(50).mean())
+            elif timeframe == "1Hour" and n >= 50:
+                sma_trend = float(ind["sma_50"][i])
                 if current_price < sma_trend:
                     return None
 
         # --- Volume (computed early for hard gate filters) ---
-        avg_vol_20 = float(volume.tail(20).mean())
-        recent_vol = float(volume.tail(3).mean())
+        avg_vol_20 = float(ind["vol_avg_20"][i])
+        recent_vol = float(ind["vol_avg_3"][i])
         vol_ratio = recent_vol / max(avg_vol_20, 1)
 
         # --- RSI ---
-        rsi = RSIIndicator(close, window=rsi_period)
-        rsi_series = rsi.rsi()
-        rsi_value = float(rsi_series.iloc[-1])
-        rsi_prev_value = float(rsi_series.iloc[-2])
+        rsi_value = float(ind["rsi"][i])
+        rsi_prev_value = float(ind["rsi"][i - 1])
 
         if np.isnan(rsi_value):
             return None
@@ -117,16 +197,10 @@ def analyze_composite(
             rsi_score = (50 - rsi_value) / 50 * 0.5  # Linear scale
 
         # --- MACD ---
-        macd_ind = MACD(
-            close,
-            window_slow=macd_slow,
-            window_fast=macd_fast,
-            window_sign=macd_signal,
-        )
-        macd_line = macd_ind.macd().iloc[-1]
-        signal_line = macd_ind.macd_signal().iloc[-1]
-        macd_prev = macd_ind.macd().iloc[-2]
-        signal_prev = macd_ind.macd_signal().iloc[-2]
+        macd_series = ind["macd"]
+        signal_series = ind["macd_signal"]
+        macd_line = macd_series[i]
+        signal_line = signal_series[i]
 
         if np.isnan(macd_line) or np.isnan(signal_line):
             return None
@@ -134,15 +208,13 @@ def analyze_composite(
         # Crossover detection — check last N bars for crossover
         bullish_crossover = False
         bearish_crossover = False
-        macd_series = macd_ind.macd()
-        signal_series = macd_ind.macd_signal()
 
         for lookback in range(1, macd_crossover_lookback + 1):
-            if len(macd_series) > lookback + 1:
-                prev_m = float(macd_series.iloc[-(lookback + 1)])
-                prev_s = float(signal_series.iloc[-(lookback + 1)])
-                curr_m = float(macd_series.iloc[-lookback])
-                curr_s = float(signal_series.iloc[-lookback])
+            if n > lookback + 1:
+                prev_m = float(macd_series[i - lookback])
+                prev_s = float(signal_series[i - lookback])
+                curr_m = float(macd_series[i - lookback + 1])
+                curr_s = float(signal_series[i - lookback + 1])
                 if not np.isnan(prev_m) and not np.isnan(curr_m):
                     if prev_m < prev_s and curr_m > curr_s:
                         bullish_crossover = True
@@ -158,7 +230,7 @@ def analyze_composite(
             if rsi_value > 65 or rsi_value < 25:
                 return None
             # Price must be above SMA50 (medium-term uptrend)
-            sma_50_filter = float(close.tail(50).mean()) if len(close) >= 50 else 0
+            sma_50_filter = float(ind["sma_50"][i]) if n >= 50 else 0
             if sma_50_filter > 0 and current_price < sma_50_filter:
                 return None
             # Volume must not be declining (>= 80% of 20-bar average)
@@ -173,10 +245,9 @@ def analyze_composite(
             macd_score = 0.3 if macd_line > signal_line else -0.3
 
         # --- Bollinger Bands ---
-        bb = BollingerBands(close, window=bb_period, window_dev=bb_std)
-        bb_upper = float(bb.bollinger_hband().iloc[-1])
-        bb_lower = float(bb.bollinger_lband().iloc[-1])
-        bb_mid = float(bb.bollinger_mavg().iloc[-1])
+        bb_upper = float(ind["bb_upper"][i])
+        bb_lower = float(ind["bb_lower"][i])
+        bb_mid = float(ind["bb_mid"][i])
 
         if current_price <= bb_lower:
             bb_score = 0.7
@@ -187,8 +258,8 @@ def analyze_composite(
             bb_score = (bb_mid - current_price) / bb_range if bb_range > 0 else 0.0
 
         # --- Trend (SMA) ---
-        sma_20 = float(close.tail(20).mean())
-        sma_50 = float(close.tail(50).mean()) if len(close) >= 50 else sma_20
+        sma_20 = float(ind["sma_20"][i])
+        sma_50 = float(ind["sma_50"][i]) if n >= 50 else sma_20
 
         if current_price > sma_20 > sma_50:
             trend_score = 0.8  # Strong uptrend
@@ -239,7 +310,7 @@ def analyze_composite(
             confidence = min(abs(score), 1.0)
 
         # ATR for stop loss / take profit
-        atr = calculate_atr(high, low, close, period=atr_period)
+        atr = float(ind["atr"][i])
 
         if action == "BUY":
             entry_price = current_price
@@ -278,6 +349,91 @@ def analyze_composite(
         return None
 
 
+def analyze_composite(
+    symbol: str,
+    df: pd.DataFrame,
+    *,
+    # Signal settings
+    rsi_period: int = 14,
+    rsi_oversold: float = 30.0,
+    rsi_overbought: float = 70.0,
+    macd_fast: int = 12,
+    macd_slow: int = 26,
+    macd_signal: int = 9,
+    bb_period: int = 20,
+    bb_std: float = 2.0,
+    # Weights
+    weight_rsi: float = 0.15,
+    weight_macd: float = 0.25,
+    weight_bollinger: float = 0.15,
+    weight_trend: float = 0.25,
+    weight_volume: float = 0.20,
+    # Thresholds
+    score_buy_threshold: float = 0.3,
+    score_sell_threshold: float = -0.5,
+    # Stop loss / Take profit
+    stop_loss_atr: float = 2.5,
+    take_profit_atr: float = 6.0,
+    atr_period: int = 14,
+    # Filters
+    trend_filter: bool = True,
+    require_macd_crossover: bool = False,
+    macd_crossover_lookback: int = 3,
+    timeframe: str = "1Day",
+    min_bars: int = 50,
+) -> dict[str, Any] | None:
+    """
+    Composite-score signal analysis — shared between live and backtest.
+
+    Computes a weighted composite score from RSI, MACD, Bollinger Bands,
+    trend (SMA), and volume indicators. Generates BUY/SELL signals when
+    the score exceeds configurable thresholds.
+
+    Returns a plain dict with signal data, or None if no signal.
+    The caller is responsible for wrapping into their model type.
+
+    Returns dict keys:
+        symbol, action ("BUY"/"SELL"), score, confidence,
+        entry_price, stop_loss, take_profit, rationale,
+        indicators (dict with raw indicator values for debugging)
+    """
+    try:
+        ind = precompute_composite_indicators(
+            df,
+            rsi_period=rsi_period,
+            macd_fast=macd_fast,
+            macd_slow=macd_slow,
+            macd_signal=macd_signal,
+            bb_period=bb_period,
+            bb_std=bb_std,
+            atr_period=atr_period,
+        )
+    except Exception:
+        return None
+
+    return evaluate_composite_signal(
+        symbol,
+        ind,
+        len(df) - 1,
+        rsi_oversold=rsi_oversold,
+        rsi_overbought=rsi_overbought,
+        weight_rsi=weight_rsi,
+        weight_macd=weight_macd,
+        weight_bollinger=weight_bollinger,
+        weight_trend=weight_trend,
+        weight_volume=weight_volume,
+        score_buy_threshold=score_buy_threshold,
+        score_sell_threshold=score_sell_threshold,
+        stop_loss_atr=stop_loss_atr,
+        take_profit_atr=take_profit_atr,
+        trend_filter=trend_filter,
+        require_macd_crossover=require_macd_crossover,
+        macd_crossover_lookback=macd_crossover_lookback,
+        timeframe=timeframe,
+        min_bars=min_bars,
+    )
+
+
 def calculate_atr(
     high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14
 ) -> float:
@@ -293,76 +449,88 @@ def calculate_atr(
     return float(tr.tail(period).mean())
 
 
-def analyze_mean_reversion_v3(
-    symbol: str,
-    df_intraday: pd.DataFrame,
-    df_daily: pd.DataFrame | None = None,
+# ---------------------------------------------------------------------------
+# Mean reversion (v2 intraday, v3 with daily filter)
+# ---------------------------------------------------------------------------
+
+
+def precompute_mean_reversion_indicators(
+    df: pd.DataFrame,
     *,
-    # RSI / BB / volume intraday params
     rsi_period: int = 14,
-    rsi_entry: float = 28.0,
     bb_period: int = 20,
     bb_std: float = 2.0,
     volume_avg: int = 20,
-    volume_mult: float = 1.5,
     atr_period: int = 14,
-    # Stop loss / take profit
+) -> dict[str, Any]:
+    """Indicator series used by evaluate_mean_reversion_signal(), one value per bar."""
+    close = df["close"]
+    bb = BollingerBands(close, window=bb_period, window_dev=bb_std)
+    close_arr = close.to_numpy(dtype=float)
+    volume_arr = df["volume"].to_numpy(dtype=float)
+
+    utc_hour = None
+    if isinstance(df.index, pd.DatetimeIndex):
+        idx = df.index.tz_convert("UTC") if df.index.tz is not None else df.index
+        utc_hour = np.asarray(idx.hour)
+
+    return {
+        "close": close_arr,
+        "volume": volume_arr,
+        "rsi": RSIIndicator(close, window=rsi_period).rsi().to_numpy(dtype=float),
+        "bb_lower": bb.bollinger_lband().to_numpy(dtype=float),
+        "bb_mid": bb.bollinger_mavg().to_numpy(dtype=float),
+        "vol_avg": trailing_mean(volume_arr, volume_avg),
+        "atr": trailing_mean(true_range(df["high"], df["low"], close_arr), atr_period),
+        "utc_hour": utc_hour,
+    }
+
+
+def daily_trend_reference(
+    df_daily: pd.DataFrame | None, sma_period: int = 20
+) -> tuple[float, float] | None:
+    """(last daily close, daily SMA) for the v3 trend filter, or None if unavailable."""
+    if df_daily is None or len(df_daily) < sma_period:
+        return None
+    daily_close = df_daily["close"]
+    return float(daily_close.iloc[-1]), float(daily_close.tail(sma_period).mean())
+
+
+def evaluate_mean_reversion_signal(
+    symbol: str,
+    ind: dict[str, Any],
+    i: int,
+    *,
+    daily_close: float | None = None,
+    daily_sma: float | None = None,
+    rsi_entry: float = 28.0,
+    volume_mult: float = 1.5,
     stop_loss_atr: float = 1.0,
     take_profit_atr: float = 1.5,
-    # Daily filter — the core v3 addition
     daily_filter_enabled: bool = True,
-    daily_sma_period: int = 20,
     daily_trend_strict: bool = True,
-    # Signal quality
     min_confidence: float = 0.4,
     min_rr: float = 1.0,
-    # Time filter (UTC hours)
     time_filter_start_utc: int = 14,
     time_filter_end_utc: int = 20,
     min_bars: int = 60,
 ) -> dict[str, Any] | None:
-    """
-    Mean Reversion v3 — dual-timeframe daily filter.
+    """Mean reversion decision at bar ``i`` of precomputed indicators.
 
-    The critical improvement over v2: before generating a 15-min mean reversion
-    signal, we check the DAILY timeframe to ensure the broader trend is bullish.
-    This eliminates "falling knife" trades during multi-day selloffs.
-
-    v2 problem: RSI(14) < 28 + BB lower band on 15-min → buy even during daily
-    downtrends → 39.6% win rate, Sharpe -69.
-
-    v3 fix: Add daily SMA(20) filter. Only enter mean reversion trades when the
-    daily close is ABOVE the daily SMA(20), confirming an uptrend context.
-
-    Args:
-        symbol: Ticker.
-        df_intraday: 15-min OHLCV bars (DatetimeIndex, tz-aware).
-        df_daily: Daily OHLCV bars (DatetimeIndex). If None, daily filter skipped.
-        daily_filter_enabled: If True and df_daily provided, reject signals
-            when daily close < daily SMA(daily_sma_period).
-        daily_sma_period: SMA period for daily trend detection.
-        daily_trend_strict: If True, require price > SMA. If False, allow
-            price within 0.5% below SMA (near-trend).
-
-    Returns:
-        dict with signal data or None.
+    ``daily_close`` / ``daily_sma`` come from daily_trend_reference(); when
+    either is None the daily filter is skipped (v2 behaviour). Same output as
+    analyze_mean_reversion_v3() on ``df.iloc[:i + 1]``.
     """
     try:
-        close = df_intraday["close"]
-        high = df_intraday["high"]
-        low = df_intraday["low"]
-        volume = df_intraday["volume"]
-        current_price = float(close.iloc[-1])
+        n = i + 1
+        current_price = float(ind["close"][i])
 
-        if len(df_intraday) < min_bars:
+        if n < min_bars:
             return None
 
         # ── DAILY TREND FILTER (v3 core) ──────────────────────────────
         daily_regime = "unknown"
-        if daily_filter_enabled and df_daily is not None and len(df_daily) >= daily_sma_period:
-            daily_close = float(df_daily["close"].iloc[-1])
-            daily_sma = float(df_daily["close"].tail(daily_sma_period).mean())
-
+        if daily_filter_enabled and daily_close is not None and daily_sma is not None:
             if daily_trend_strict:
                 if daily_close < daily_sma:
                     return None  # Daily downtrend → reject signal
@@ -375,49 +543,33 @@ def analyze_mean_reversion_v3(
                 daily_regime = "bullish" if daily_close >= daily_sma else "near_bullish"
 
         # ── TIME FILTER ───────────────────────────────────────────────
-        last_ts = df_intraday.index[-1]
-        if hasattr(last_ts, "hour"):
-            try:
-                ts_utc = (
-                    last_ts.tz_convert("UTC")
-                    if getattr(last_ts, "tzinfo", None) is not None
-                    else last_ts
-                )
-                utc_hour = ts_utc.hour
-                if utc_hour < time_filter_start_utc or utc_hour >= time_filter_end_utc:
-                    return None
-            except Exception:
-                pass
+        utc_hours = ind["utc_hour"]
+        if utc_hours is not None:
+            utc_hour = int(utc_hours[i])
+            if utc_hour < time_filter_start_utc or utc_hour >= time_filter_end_utc:
+                return None
 
         # ── RSI: must be oversold ─────────────────────────────────────
-        rsi_indicator = RSIIndicator(close, window=rsi_period)
-        rsi_series = rsi_indicator.rsi()
-        rsi_value = float(rsi_series.iloc[-1])
+        rsi_value = float(ind["rsi"][i])
         if np.isnan(rsi_value) or rsi_value >= rsi_entry:
             return None
 
         # ── Bollinger Bands: price must touch or breach lower band ────
-        bb = BollingerBands(close, window=bb_period, window_dev=bb_std)
-        bb_lower = float(bb.bollinger_lband().iloc[-1])
-        bb_mid = float(bb.bollinger_mavg().iloc[-1])
+        bb_lower = float(ind["bb_lower"][i])
+        bb_mid = float(ind["bb_mid"][i])
         if np.isnan(bb_lower) or np.isnan(bb_mid):
             return None
         if current_price > bb_lower * 1.002:
             return None
 
         # ── Volume spike confirmation ─────────────────────────────────
-        avg_vol = float(volume.tail(volume_avg).mean())
-        current_bar_vol = float(volume.iloc[-1])
+        avg_vol = float(ind["vol_avg"][i])
+        current_bar_vol = float(ind["volume"][i])
         if current_bar_vol < avg_vol * volume_mult:
             return None
 
         # ── ATR ───────────────────────────────────────────────────────
-        tr = pd.concat([
-            high - low,
-            (high - close.shift(1)).abs(),
-            (low - close.shift(1)).abs(),
-        ], axis=1).max(axis=1)
-        atr = float(tr.tail(atr_period).mean())
+        atr = float(ind["atr"][i])
         if atr <= 0 or np.isnan(atr):
             return None
 
@@ -480,89 +632,188 @@ def analyze_mean_reversion_v3(
         return None
 
 
-def analyze_slope_volume(
+def analyze_mean_reversion_v3(
     symbol: str,
+    df_intraday: pd.DataFrame,
+    df_daily: pd.DataFrame | None = None,
+    *,
+    # RSI / BB / volume intraday params
+    rsi_period: int = 14,
+    rsi_entry: float = 28.0,
+    bb_period: int = 20,
+    bb_std: float = 2.0,
+    volume_avg: int = 20,
+    volume_mult: float = 1.5,
+    atr_period: int = 14,
+    # Stop loss / take profit
+    stop_loss_atr: float = 1.0,
+    take_profit_atr: float = 1.5,
+    # Daily filter — the core v3 addition
+    daily_filter_enabled: bool = True,
+    daily_sma_period: int = 20,
+    daily_trend_strict: bool = True,
+    # Signal quality
+    min_confidence: float = 0.4,
+    min_rr: float = 1.0,
+    # Time filter (UTC hours)
+    time_filter_start_utc: int = 14,
+    time_filter_end_utc: int = 20,
+    min_bars: int = 60,
+) -> dict[str, Any] | None:
+    """
+    Mean Reversion v3 — dual-timeframe daily filter.
+
+    The critical improvement over v2: before generating a 15-min mean reversion
+    signal, we check the DAILY timeframe to ensure the broader trend is bullish.
+    This eliminates "falling knife" trades during multi-day selloffs.
+
+    v2 problem: RSI(14) < 28 + BB lower band on 15-min → buy even during daily
+    downtrends → 39.6% win rate, Sharpe -69.
+
+    v3 fix: Add daily SMA(20) filter. Only enter mean reversion trades when the
+    daily close is ABOVE the daily SMA(20), confirming an uptrend context.
+
+    Args:
+        symbol: Ticker.
+        df_intraday: 15-min OHLCV bars (DatetimeIndex, tz-aware).
+        df_daily: Daily OHLCV bars (DatetimeIndex). If None, daily filter skipped.
+        daily_filter_enabled: If True and df_daily provided, reject signals
+            when daily close < daily SMA(daily_sma_period).
+        daily_sma_period: SMA period for daily trend detection.
+        daily_trend_strict: If True, require price > SMA. If False, allow
+            price within 0.5% below SMA (near-trend).
+
+    Returns:
+        dict with signal data or None.
+    """
+    try:
+        if len(df_intraday) < min_bars:
+            return None
+        ind = precompute_mean_reversion_indicators(
+            df_intraday,
+            rsi_period=rsi_period,
+            bb_period=bb_period,
+            bb_std=bb_std,
+            volume_avg=volume_avg,
+            atr_period=atr_period,
+        )
+        daily_ref = daily_trend_reference(df_daily, daily_sma_period) if daily_filter_enabled else None
+    except Exception:
+        return None
+
+    daily_close, daily_sma = daily_ref if daily_ref is not None else (None, None)
+    return evaluate_mean_reversion_signal(
+        symbol,
+        ind,
+        len(df_intraday) - 1,
+        daily_close=daily_close,
+        daily_sma=daily_sma,
+        rsi_entry=rsi_entry,
+        volume_mult=volume_mult,
+        stop_loss_atr=stop_loss_atr,
+        take_profit_atr=take_profit_atr,
+        daily_filter_enabled=daily_filter_enabled,
+        daily_trend_strict=daily_trend_strict,
+        min_confidence=min_confidence,
+        min_rr=min_rr,
+        time_filter_start_utc=time_filter_start_utc,
+        time_filter_end_utc=time_filter_end_utc,
+        min_bars=min_bars,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Slope + volume wave detection
+# ---------------------------------------------------------------------------
+
+
+def precompute_slope_volume_indicators(
     df: pd.DataFrame,
     *,
     lookback_bars: int = 5,
+    volume_ma_period: int = 20,
+    atr_period: int = 14,
+) -> dict[str, Any]:
+    """Indicator series used by evaluate_slope_volume_signal(), one value per bar.
+
+    ``slope_pct`` holds the OLS slope (% of price per bar) of the window ending
+    at each bar; the first ``lookback_bars - 1`` entries are NaN.
+    """
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    close_arr = df["close"].values.astype(float)
+    vol_arr = df["volume"].values.astype(float)
+    n = len(close_arr)
+
+    # --- Vectorized rolling slopes ---
+    # Compute OLS slope for every overlapping window of `lookback_bars` in one pass.
+    slope_pcts = np.full(n, np.nan)
+    x_var = 0.0
+    if lookback_bars >= 1 and n >= lookback_bars:
+        windows = sliding_window_view(close_arr, lookback_bars)
+        # windows shape: (n - lookback_bars + 1, lookback_bars)
+
+        x = np.arange(lookback_bars, dtype=float)
+        x_mean = x.mean()
+        x_dev = x - x_mean
+        x_var = float(np.sum(x_dev ** 2))
+        if x_var > 0:
+            y_means = windows.mean(axis=1)
+            cov = np.sum((windows - y_means[:, np.newaxis]) * x_dev, axis=1)
+            slopes_raw = cov / x_var
+
+            # Normalize each slope as % of price at the end of that window
+            prices_at_end = close_arr[lookback_bars - 1:]
+            safe_prices = np.where(prices_at_end > 0, prices_at_end, 1.0)
+            slope_pcts[lookback_bars - 1:] = (slopes_raw / safe_prices) * 100
+
+    return {
+        "frame": df,
+        "close": close_arr,
+        "volume": vol_arr,
+        "slope_pct": slope_pcts,
+        "x_var": x_var,
+        "lookback_bars": lookback_bars,
+        "vol_avg": trailing_mean(vol_arr, volume_ma_period),
+        "atr": trailing_mean(true_range(df["high"], df["low"], close_arr), atr_period),
+    }
+
+
+def evaluate_slope_volume_signal(
+    symbol: str,
+    ind: dict[str, Any],
+    i: int,
+    *,
     slope_threshold_pct: float = 0.05,
     volume_multiplier: float = 1.5,
-    volume_ma_period: int = 20,
     stop_loss_atr: float = 1.5,
     take_profit_atr: float = 3.0,
-    atr_period: int = 14,
     market_open_utc: str = "14:30",
     market_close_utc: str = "20:00",
     min_bars: int = 30,
-    timeframe: str = "5Min",
     require_reversal: bool = True,
     bypass_volume_check: bool = False,
-    # --- Wave detection: 3-factor entry gate ---
     acceleration_bars: int = 5,
     min_acceleration_pct: float = 0.002,
     volume_trend_bars: int = 5,
     persistence_bars: int = 5,
-    # --- Contrarian mode: fade the wave ---
     contrarian: bool = False,
-    # --- Anticipatory mode: enter on deceleration (wave losing steam) ---
     anticipatory: bool = False,
 ) -> dict[str, Any] | None:
-    """
-    Wave-detection intraday signal analysis (3-factor entry).
-
-    Detects real market waves by requiring THREE simultaneous confirmations:
+    """Wave-detection decision at bar ``i`` of precomputed indicators.
 
-    1. ANGLE (slope + acceleration): the slope must be significant AND growing
-       in magnitude — the wave is accelerating, not decelerating.
-    2. VOLUME (growing volume): volume must be trending UP over the last N bars,
-       not just above average on a single bar. Real moves attract growing interest.
-    3. PERSISTENCE: the slope must have been in the same direction for M
-       consecutive bars. This filters out noise oscillations that flip every minute.
-
-    All 3 must be true simultaneously for entry. This eliminates the vast majority
-    of noise-driven signals that plagued the original single-threshold approach.
-
-    Args:
-        symbol: Ticker symbol (e.g. "SPY").
-        df: OHLCV DataFrame with DatetimeIndex (tz-aware preferred) or
-            a "timestamp" column. Must have columns: open, high, low, close, volume.
-        lookback_bars: Number of bars for OLS slope regression window.
-        slope_threshold_pct: Minimum absolute slope in % of price per bar to trigger.
-        volume_multiplier: Minimum volume ratio vs MA (existing baseline check).
-        volume_ma_period: Period for volume moving average.
-        stop_loss_atr: Stop loss distance in ATR units.
-        take_profit_atr: Take profit distance in ATR units.
-        atr_period: Period for ATR calculation.
-        market_open_utc: Only generate signals after this UTC time (HH:MM).
-        market_close_utc: Only generate signals before this UTC time (HH:MM).
-        min_bars: Minimum bars required in df before generating any signal.
-        timeframe: Bar timeframe string, informational (e.g. "1Min").
-        require_reversal: If True, require slope to have been in the opposite direction
-            before the persistence window (confirms a reversal preceded the wave).
-            If False, only the 3 factors are checked (trend-continuation mode).
-        bypass_volume_check: If True, skip volume gates entirely (for instruments
-            where the data provider doesn't return reliable volume).
-        acceleration_bars: How many bars back to measure slope change (acceleration).
-        min_acceleration_pct: Min slope increase (% per bar) over acceleration window.
-        volume_trend_bars: Bars for volume OLS trend regression (must be growing).
-        persistence_bars: Min consecutive bars with slope in the same direction.
-
-    Returns:
-        dict with signal data (symbol, action, score, confidence, entry_price,
-        stop_loss, take_profit, rationale, indicators) or None if no signal.
+    Same output as analyze_slope_volume() on ``df.iloc[:i + 1]``.
     """
     import datetime as dt
-    from numpy.lib.stride_tricks import sliding_window_view
 
     try:
-        if len(df) < min_bars:
+        n = i + 1
+        if n < min_bars:
             return None
 
-        close = df["close"]
-        high = df["high"]
-        low = df["low"]
-        volume = df["volume"]
-        current_price = float(close.iloc[-1])
+        lookback_bars = ind["lookback_bars"]
+        slope_pcts = ind["slope_pct"]
+        current_price = float(ind["close"][i])
 
         # --- Time filter (optional) ---
         open_h, open_m = map(int, market_open_utc.split(":"))
@@ -570,10 +821,11 @@ def analyze_slope_volume(
         _always_on = (open_h == 0 and open_m == 0 and close_h == 23 and close_m == 59)
 
         if not _always_on:
+            df = ind["frame"]
             if isinstance(df.index, pd.DatetimeIndex):
-                last_ts = df.index[-1]
+                last_ts = df.index[i]
             else:
-                last_ts = pd.Timestamp(df["timestamp"].iloc[-1])
+                last_ts = pd.Timestamp(df["timestamp"].iloc[i])
 
             if getattr(last_ts, "tzinfo", None) is not None:
                 last_ts_utc = last_ts.tz_convert("UTC")
@@ -588,44 +840,20 @@ def analyze_slope_volume(
                     return None
 
         # --- ATR ---
-        tr = pd.concat([
-            high - low,
-            (high - close.shift(1)).abs(),
-            (low - close.shift(1)).abs(),
-        ], axis=1).max(axis=1)
-        atr = float(tr.tail(atr_period).mean())
+        atr = float(ind["atr"][i])
         if atr <= 0 or np.isnan(atr):
             return None
 
-        # --- Vectorized rolling slopes ---
-        # Compute OLS slope for every overlapping window of `lookback_bars` in one pass.
-        # This gives us the slope at every bar position — needed for acceleration
-        # and persistence checks without repeated per-bar computation.
+        # --- Rolling slopes (precomputed) ---
         total_needed = lookback_bars + max(acceleration_bars, persistence_bars)
-        if len(close) < total_needed:
+        if n < total_needed:
             return None
-
-        close_arr = close.values.astype(float)
-        windows = sliding_window_view(close_arr, lookback_bars)
-        # windows shape: (n - lookback_bars + 1, lookback_bars)
-
-        x = np.arange(lookback_bars, dtype=float)
-        x_mean = x.mean()
-        x_dev = x - x_mean
-        x_var = float(np.sum(x_dev ** 2))
-        if x_var == 0:
+        if ind["x_var"] == 0:
             return None
 
-        y_means = windows.mean(axis=1)
-        cov = np.sum((windows - y_means[:, np.newaxis]) * x_dev, axis=1)
-        slopes_raw = cov / x_var
-
-        # Normalize each slope as % of price at the end of that window
-        prices_at_end = close_arr[lookback_bars - 1:]
-        safe_prices = np.where(prices_at_end > 0, prices_at_end, 1.0)
-        slope_pcts = (slopes_raw / safe_prices) * 100
-
-        current_slope = float(slope_pcts[-1])
+        # Slopes of the windows ending at bars lookback_bars-1 .. i
+        n_slopes = n - lookback_bars + 1
+        current_slope = float(slope_pcts[i])
 
         # ===================================================================
         # CRITERION 1: ANGLE — slope significant AND accelerating
@@ -634,8 +862,8 @@ def analyze_slope_volume(
 
         # Acceleration: how much the slope changed over the last `acceleration_bars`.
         # Positive acceleration = slope growing in the current direction.
-        if len(slope_pcts) > acceleration_bars:
-            prev_slope = float(slope_pcts[-(acceleration_bars + 1)])
+        if n_slopes > acceleration_bars:
+            prev_slope = float(slope_pcts[i - acceleration_bars])
             acceleration = current_slope - prev_slope
         else:
             acceleration = 0.0
@@ -664,21 +892,21 @@ def analyze_slope_volume(
         # ===================================================================
         # CRITERION 2: VOLUME — trending UP (not just a single bar spike)
         # ===================================================================
-        vol_arr = volume.values.astype(float)
-        avg_volume = float(volume.tail(volume_ma_period).mean())
-        last_volume = float(volume.iloc[-1])
+        vol_arr = ind["volume"]
+        avg_volume = float(ind["vol_avg"][i])
+        last_volume = float(vol_arr[i])
         vol_ratio = last_volume / max(avg_volume, 1)
         volume_above_avg = vol_ratio >= volume_multiplier
 
         # Volume trend: OLS regression on volume over last N bars
         volume_growing = True  # default if bypassed or insufficient data
-        if not bypass_volume_check and avg_volume > 0 and len(vol_arr) >= volume_trend_bars:
-            vol_recent = vol_arr[-volume_trend_bars:]
+        if not bypass_volume_check and avg_volume > 0 and n >= volume_trend_bars:
             vx = np.arange(volume_trend_bars, dtype=float)
             vx_mean = vx.mean()
             vx_dev = vx - vx_mean
             vx_var = float(np.sum(vx_dev ** 2))
             if vx_var > 0:
+                vol_recent = vol_arr[n - volume_trend_bars:n]
                 vy_mean = float(vol_recent.mean())
                 vol_cov = float(np.sum(vx_dev * (vol_recent - vy_mean)))
                 vol_slope = vol_cov / vx_var
@@ -693,9 +921,8 @@ def analyze_slope_volume(
         # CRITERION 3: PERSISTENCE — slope same direction for M consecutive bars
         # ===================================================================
         persistent_count = 0
-        n_slopes = len(slope_pcts)
-        for i in range(min(persistence_bars, n_slopes)):
-            s = float(slope_pcts[-(i + 1)])
+        for k in range(min(persistence_bars, n_slopes)):
+            s = float(slope_pcts[i - k])
             if current_slope > 0 and s > 0:
                 persistent_count += 1
             elif current_slope < 0 and s < 0:
@@ -716,7 +943,7 @@ def analyze_slope_volume(
             # reversal happened at the beginning of the persistent wave.
             reversal_idx = persistence_bars + 1  # how far back to check
             if n_slopes > reversal_idx:
-                prior_slope = float(slope_pcts[-(reversal_idx)])
+                prior_slope = float(slope_pcts[i - reversal_idx + 1])
                 if current_slope > 0:
                     reversal_ok = prior_slope <= 0
                 else:
@@ -800,7 +1027,7 @@ def analyze_slope_volume(
             "rationale": rationale,
             "indicators": {
                 "slope_pct": round(current_slope, 4),
-                "slope_prev_pct": round(prev_slope if len(slope_pcts) > acceleration_bars else 0.0, 4),
+                "slope_prev_pct": round(prev_slope if n_slopes > acceleration_bars else 0.0, 4),
                 "acceleration_pct": round(acceleration, 4),
                 "slope_angle": round(float(np.degrees(np.arctan(current_slope))), 1),
                 "vol_ratio": round(vol_ratio, 2),
@@ -817,6 +1044,179 @@ def analyze_slope_volume(
         return None
 
 
+def slope_volume_candidates(
+    ind: dict[str, Any],
+    *,
+    slope_threshold_pct: float = 0.05,
+    volume_multiplier: float = 1.5,
+    min_bars: int = 30,
+    bypass_volume_check: bool = False,
+    acceleration_bars: int = 5,
+    min_acceleration_pct: float = 0.002,
+    persistence_bars: int = 5,
+    anticipatory: bool = False,
+) -> np.ndarray:
+    """Bars where evaluate_slope_volume_signal() can return a signal.
+
+    Vectorized over the whole series: enough history, valid ATR, significant
+    and accelerating slope, volume above average and a same-sign slope streak
+    long enough for the persistence gate. Necessary, not sufficient — callers
+    still evaluate each candidate bar (volume trend, time filter, levels).
+    """
+    slope_pcts = ind["slope_pct"]
+    n = len(slope_pcts)
+    if n == 0 or ind["x_var"] == 0:
+        return np.zeros(n, dtype=bool)
+
+    bars = np.arange(1, n + 1)
+    total_needed = ind["lookback_bars"] + max(acceleration_bars, persistence_bars)
+    sign = np.sign(np.nan_to_num(slope_pcts, nan=0.0))
+
+    # Acceleration toward the slope direction (0 while the earlier slope is undefined)
+    prev = np.full(n, np.nan)
+    if 0 < acceleration_bars < n:
+        prev[acceleration_bars:] = slope_pcts[:-acceleration_bars]
+    elif acceleration_bars == 0:
+        prev = slope_pcts
+    toward = sign * np.where(np.isnan(prev), 0.0, slope_pcts - prev)
+    if anticipatory:
+        accel_ok = toward <= -min_acceleration_pct
+    else:
+        accel_ok = toward >= min_acceleration_pct
+
+    # Length of the same-sign slope streak ending at each bar (NaN / 0 break it)
+    idx = np.arange(n)
+    starts = np.r_[True, sign[1:] != sign[:-1]]
+    streak = idx - np.maximum.accumulate(np.where(starts, idx, 0)) + 1
+    streak[sign == 0] = 0
+    effective_persistence = max(3, persistence_bars // 2) if anticipatory else persistence_bars
+
+    avg_volume = ind["vol_avg"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        volume_ok = (
+            bypass_volume_check
+            | (avg_volume == 0)
+            | (ind["volume"] / np.maximum(avg_volume, 1) >= volume_multiplier)
+        )
+        return (
+            (bars >= min_bars)
+            & (bars >= total_needed)
+            & (ind["atr"] > 0)
+            & (np.abs(slope_pcts) >= slope_threshold_pct)
+            & (sign != 0)
+            & accel_ok
+            & volume_ok
+            & (streak >= effective_persistence)
+        )
+
+
+def analyze_slope_volume(
+    symbol: str,
+    df: pd.DataFrame,
+    *,
+    lookback_bars: int = 5,
+    slope_threshold_pct: float = 0.05,
+    volume_multiplier: float = 1.5,
+    volume_ma_period: int = 20,
+    stop_loss_atr: float = 1.5,
+    take_profit_atr: float = 3.0,
+    atr_period: int = 14,
+    market_open_utc: str = "14:30",
+    market_close_utc: str = "20:00",
+    min_bars: int = 30,
+    timeframe: str = "5Min",
+    require_reversal: bool = True,
+    bypass_volume_check: bool = False,
+    # --- Wave detection: 3-factor entry gate ---
+    acceleration_bars: int = 5,
+    min_acceleration_pct: float = 0.002,
+    volume_trend_bars: int = 5,
+    persistence_bars: int = 5,
+    # --- Contrarian mode: fade the wave ---
+    contrarian: bool = False,
+    # --- Anticipatory mode: enter on deceleration (wave losing steam) ---
+    anticipatory: bool = False,
+) -> dict[str, Any] | None:
+    """
+    Wave-detection intraday signal analysis (3-factor entry).
+
+    Detects real market waves by requiring THREE simultaneous confirmations:
+
+    1. ANGLE (slope + acceleration): the slope must be significant AND growing
+       in magnitude — the wave is accelerating, not decelerating.
+    2. VOLUME (growing volume): volume must be trending UP over the last N bars,
+       not just above average on a single bar. Real moves attract growing interest.
+    3. PERSISTENCE: the slope must have been in the same direction for M
+       consecutive bars. This filters out noise oscillations that flip every minute.
+
+    All 3 must be true simultaneously for entry. This eliminates the vast majority
+    of noise-driven signals that plagued the original single-threshold approach.
+
+    Args:
+        symbol: Ticker symbol (e.g. "SPY").
+        df: OHLCV DataFrame with DatetimeIndex (tz-aware preferred) or
+            a "timestamp" column. Must have columns: open, high, low, close, volume.
+        lookback_bars: Number of bars for OLS slope regression window.
+        slope_threshold_pct: Minimum absolute slope in % of price per bar to trigger.
+        volume_multiplier: Minimum volume ratio vs MA (existing baseline check).
+        volume_ma_period: Period for volume moving average.
+        stop_loss_atr: Stop loss distance in ATR units.
+        take_profit_atr: Take profit distance in ATR units.
+        atr_period: Period for ATR calculation.
+        market_open_utc: Only generate signals after this UTC time (HH:MM).
+        market_close_utc: Only generate signals before this UTC time (HH:MM).
+        min_bars: Minimum bars required in df before generating any signal.
+        timeframe: Bar timeframe string, informational (e.g. "1Min").
+        require_reversal: If True, require slope to have been in the opposite direction
+            before the persistence window (confirms a reversal preceded the wave).
+            If False, only the 3 factors are checked (trend-continuation mode).
+        bypass_volume_check: If True, skip volume gates entirely (for instruments
+            where the data provider doesn't return reliable volume).
+        acceleration_bars: How many bars back to measure slope change (acceleration).
+        min_acceleration_pct: Min slope increase (% per bar) over acceleration window.
+        volume_trend_bars: Bars for volume OLS trend regression (must be growing).
+        persistence_bars: Min consecutive bars with slope in the same direction.
+
+    Returns:
+        dict with signal data (symbol, action, score, confidence, entry_price,
+        stop_loss, take_profit, rationale, indicators) or None if no signal.
+    """
+    try:
+        if len(df) < min_bars:
+            return None
+        ind = precompute_slope_volume_indicators(
+            df,
+            lookback_bars=lookback_bars,
+            volume_ma_period=volume_ma_period,
+            atr_period=atr_period,
+        )
+    except Exception as exc:
+        import structlog as _sl
+        _sl.get_logger().warning("analyze_slope_volume_error", symbol=symbol, error=str(exc))
+        return None
+
+    return evaluate_slope_volume_signal(
+        symbol,
+        ind,
+        len(df) - 1,
+        slope_threshold_pct=slope_threshold_pct,
+        volume_multiplier=volume_multiplier,
+        stop_loss_atr=stop_loss_atr,
+        take_profit_atr=take_profit_atr,
+        market_open_utc=market_open_utc,
+        market_close_utc=market_close_utc,
+        min_bars=min_bars,
+        require_reversal=require_reversal,
+        bypass_volume_check=bypass_volume_check,
+        acceleration_bars=acceleration_bars,
+        min_acceleration_pct=min_acceleration_pct,
+        volume_trend_bars=volume_trend_bars,
+        persistence_bars=persistence_bars,
+        contrarian=contrarian,
+        anticipatory=anticipatory,
+    )
+
+
 def get_current_slope_direction(
     df: pd.DataFrame,
     *,
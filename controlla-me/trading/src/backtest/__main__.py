@@ -7,6 +7,7 @@ Usage:
     python -m src.backtest run --start 2023-03-01 --end 2026-02-28 --capital 50000
     python -m src.backtest run --start 2023-03-01 --end 2026-02-28 --mode train_test
     python -m src.backtest grid --start 2024-03-01 --end 2026-02-28
+    python -m src.backtest walkforward --start 2023-01-01 --end 2025-12-31 --train-months 12 --test-months 3
 
 No Supabase dependency — fully offline.
 """
@@ -50,7 +51,8 @@ MEAN_REVERSION_UNIVERSE = [
 ]
 
 
-def parse_args() -> argparse.Namespace:
+def build_parser() -> argparse.ArgumentParser:
+    """CLI parser — also used by the auto-optimizer to read experiment argv."""
     parser = argparse.ArgumentParser(
         prog="python -m src.backtest",
         description="Trading Backtest Framework — Phase 2",
@@ -92,8 +94,139 @@ def parse_args() -> argparse.Namespace:
         default="default",
         help="Grid preset: 'default' (original 64-combo), 'tpsl' (96-combo TP/SL + trailing), 'cycle4' (60-combo — BAD trailing params), or 'cycle4b' (12-combo — Cycle 3 trailing defaults, signal exit OFF)",
     )
+    grid_parser.add_argument(
+        "--engine", type=str, choices=["bar", "vectorized"], default="bar",
+        help="Simulation engine: bar or vectorized (5Min fast path, same results)",
+    )
+    grid_parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Worker processes for the grid (default: 1 = serial). Data is shared once, not pickled per run",
+    )
+    grid_parser.add_argument(
+        "--no-cache", action="store_true", default=False,
+        help="Always run the engine (skip the config + data result cache)",
+    )
+    grid_parser.add_argument(
+        "--prune", action="store_true", default=False,
+        help="Stop a combination early once its drawdown passes the go/no-go limit or it has not traded after 25%% of the period",
+    )
+    grid_parser.add_argument(
+        "--halving-rungs", type=int, default=1,
+        help="Successive halving rungs (default: 1 = off). 3 = all combos on the first 1/9 of the period, top third on 1/3, survivors on the full period",
+    )
+    grid_parser.add_argument(
+        "--halving-eta", type=float, default=3.0,
+        help="Successive halving factor: window growth and 1/eta survivors per rung (default: 3)",
+    )
+
+    # --- Walk-forward command ---
+    wf_parser = subparsers.add_parser(
+        "walkforward", help="Rolling train/test optimization with stitched out-of-sample results"
+    )
+    _add_common_args(wf_parser)
+    wf_parser.add_argument(
+        "--train-months", type=int, default=12,
+        help="Train span per window in months (default: 12)",
+    )
+    wf_parser.add_argument(
+        "--test-months", type=int, default=3,
+        help="Test span per window in months (default: 3)",
+    )
+    wf_parser.add_argument(
+        "--step-months", type=int, default=None,
+        help="Shift between windows in months, at least --test-months (default: --test-months)",
+    )
+    wf_parser.add_argument(
+        "--grid-preset", type=str, choices=["default", "tpsl", "cycle4", "cycle4b"],
+        default="default",
+        help="Parameter grid searched on each train span (same presets as grid)",
+    )
+    wf_parser.add_argument(
+        "--objective", type=str,
+        choices=["sharpe_ratio", "sortino_ratio", "total_return_pct", "cagr_pct", "profit_factor"],
+        default="sharpe_ratio",
+        help="Metric maximized on the train span (default: sharpe_ratio)",
+    )
+    wf_parser.add_argument(
+        "--min-trades", type=int, default=1,
+        help="Train runs with fewer trades never win a window (default: 1)",
+    )
+    wf_parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Worker processes for the train searches (default: 1 = serial)",
+    )
+
+    # --- Adaptive parameter search command ---
+    search_parser = subparsers.add_parser(
+        "search", help="Adaptive (TPE) parameter search, resumable from the local DB"
+    )
+    search_parser.add_argument("--start", type=str, required=True, help="Start date (YYYY-MM-DD)")
+    search_parser.add_argument("--end", type=str, required=True, help="End date (YYYY-MM-DD)")
+    search_parser.add_argument(
+        "--capital", type=float, default=100_000,
+        help="Initial capital (default: 100000)",
+    )
+    search_parser.add_argument(
+        "--universe", type=str, default=None,
+        help="Comma-separated symbols (default: S&P 500 subset + ETFs)",
+    )
+    search_parser.add_argument(
+        "--timeframe", type=str, choices=["1Day", "1Hour", "15Min", "5Min"], default="1Day",
+        help="Timeframe: 1Day, 1Hour, 15Min, or 5Min (default: 1Day)",
+    )
+    search_parser.add_argument(
+        "--space", type=str, choices=["full", "default", "tpsl", "cycle4", "cycle4b"], default="full",
+        help="Search space: 'full' (SL/TP/trailing/sigExit/trend/positions ranges) or the range spanned by a grid preset",
+    )
+    search_parser.add_argument(
+        "--trials", type=int, default=50,
+        help="Total trials in the study, including resumed ones (default: 50)",
+    )
+    search_parser.add_argument(
+        "--batch", type=int, default=4,
+        help="Proposals evaluated concurrently per round (default: 4)",
+    )
+    search_parser.add_argument(
+        "--startup", type=int, default=10,
+        help="Random trials before the TPE model is used (default: 10)",
+    )
+    search_parser.add_argument(
+        "--study", type=str, default=None,
+        help="Study name — rerun with the same name to resume (default: timestamped)",
+    )
+    search_parser.add_argument(
+        "--objective", type=str,
+        choices=["sharpe_ratio", "sortino_ratio", "total_return_pct", "cagr_pct", "profit_factor"],
+        default="sharpe_ratio",
+        help="Metric to maximize (default: sharpe_ratio)",
+    )
+    search_parser.add_argument("--seed", type=int, default=None, help="RNG seed for reproducible proposals")
+    search_parser.add_argument(
+        "--engine", type=str, choices=["bar", "vectorized"], default="bar",
+        help="Simulation engine: bar or vectorized (5Min fast path, same results)",
+    )
+    search_parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Worker processes (default: 1 = serial)",
+    )
+    search_parser.add_argument(
+        "--prune", action="store_true", default=False,
+        help="Stop hopeless trials early (drawdown past the go/no-go limit, no trades)",
+    )
+    search_parser.add_argument(
+        "--no-cache", action="store_true", default=False,
+        help="Always run the engine (skip the config + data result cache)",
+    )
+    search_parser.add_argument(
+        "--output", type=str, default=None,
+        help="Custom output directory for results",
+    )
 
-    return parser.parse_args()
+    return parser
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    return build_parser().parse_args(argv)
 
 
 def _add_common_args(parser: argparse.ArgumentParser) -> None:
@@ -293,52 +426,50 @@ def _add_common_args(parser: argparse.ArgumentParser) -> None:
         "--nb-min-hold-bars", type=int, default=0,
         help="Min bars to hold before any NB exit (0=disabled, 12=60min on 5Min). Prevents premature exits.",
     )
+    parser.add_argument(
+        "--engine", type=str, choices=["bar", "vectorized"], default="bar",
+        help="Simulation engine: bar (bar-by-bar loop) or vectorized (array fast path for 5Min slope_volume / noise_boundary, same results)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", default=False,
+        help="Always run the engine (skip the config + data result cache)",
+    )
+    parser.add_argument(
+        "--prune", action="store_true", default=False,
+        help="Stop early once drawdown passes the go/no-go limit or nothing traded after 25%% of the period",
+    )
 
 
-def cmd_run(args: argparse.Namespace) -> None:
-    """Execute a backtest run."""
-    from .data_loader import DataLoader
-    from .engine import BacktestConfig, BacktestEngine
-    from .metrics import calculate_metrics
-    from .report import generate_report
-
-    # Parse dates
-    try:
-        start = date.fromisoformat(args.start)
-        end = date.fromisoformat(args.end)
-    except ValueError as e:
-        print(f"Error: Invalid date format: {e}")
-        sys.exit(1)
-
-    if start >= end:
-        print("Error: Start date must be before end date")
-        sys.exit(1)
-
-    # Parse universe — auto-select based on timeframe
+def resolve_symbols(args: argparse.Namespace) -> list[str]:
+    """Universe for a run — auto-selected from the timeframe when not given."""
     if args.universe:
-        symbols = [s.strip().upper() for s in args.universe.split(",")]
-    elif args.timeframe in ("15Min", "5Min"):
+        return [s.strip().upper() for s in args.universe.split(",")]
+    if args.timeframe in ("15Min", "5Min"):
         # Slope+volume and mean reversion work best on liquid single names + ETFs
-        symbols = MEAN_REVERSION_UNIVERSE
-    else:
-        symbols = DEFAULT_UNIVERSE
+        return MEAN_REVERSION_UNIVERSE
+    return DEFAULT_UNIVERSE
+
 
-    # Derive strategy from timeframe if not explicitly set
+def resolve_strategy(args: argparse.Namespace) -> str:
+    """Strategy for a run — derived from the timeframe when not explicitly set."""
     if args.strategy:
-        strategy = args.strategy
-    elif args.timeframe == "5Min":
-        strategy = "slope_volume"
-    elif args.timeframe == "15Min":
-        strategy = "mean_reversion"
-    else:
-        strategy = "trend_following"
+        return args.strategy
+    if args.timeframe == "5Min":
+        return "slope_volume"
+    if args.timeframe == "15Min":
+        return "mean_reversion"
+    return "trend_following"
+
+
+def build_config(args: argparse.Namespace, start: date, end: date, strategy: str):
+    """BacktestConfig from parsed ``run`` arguments."""
+    from .engine import BacktestConfig
 
     # Daily filter settings (v3 only)
     daily_filter_enabled = not getattr(args, "no_daily_filter", False)
     daily_sma_period = getattr(args, "daily_sma_period", 20)
 
-    # Build config
-    config = BacktestConfig(
+    return BacktestConfig(
         start=start,
         end=end,
         initial_capital=args.capital,
@@ -387,7 +518,59 @@ def cmd_run(args: argparse.Namespace) -> None:
         nb_vwap_exit=args.nb_vwap_exit,
         nb_vwap_trailing=args.nb_vwap_trailing,
         nb_min_hold_bars=args.nb_min_hold_bars,
+        engine=args.engine,
+    )
+
+
+def load_data(loader, symbols: list[str], start: date, end: date, timeframe: str, strategy: str):
+    """Load primary bars (+ daily bars for mean_reversion_v3) → (data, daily_data)."""
+    if strategy == "mean_reversion_v3":
+        # Dual-timeframe: load both 15-min and daily bars
+        logger.info(
+            "loading_multi_timeframe",
+            symbols=len(symbols),
+            start=str(start),
+            end=str(end),
+        )
+        return loader.load_multi_timeframe(
+            symbols, start, end,
+            primary_timeframe=timeframe,
+            secondary_timeframe="1Day",
+        )
+    logger.info(
+        "loading_data",
+        symbols=len(symbols),
+        start=str(start),
+        end=str(end),
+        timeframe=timeframe,
     )
+    return loader.load(symbols, start, end, timeframe=timeframe), None
+
+
+def cmd_run(args: argparse.Namespace) -> None:
+    """Execute a backtest run."""
+    from .data_loader import DataLoader
+    from .report import generate_report
+    from .pruning import PruneRule
+    from .result_cache import ResultCache, run_backtest
+
+    # Parse dates
+    try:
+        start = date.fromisoformat(args.start)
+        end = date.fromisoformat(args.end)
+    except ValueError as e:
+        print(f"Error: Invalid date format: {e}")
+        sys.exit(1)
+
+    if start >= end:
+        print("Error: Start date must be before end date")
+        sys.exit(1)
+
+    symbols = resolve_symbols(args)
+    strategy = resolve_strategy(args)
+    config = build_config(args, start, end, strategy)
+    daily_filter_enabled = config.daily_filter_enabled
+    daily_sma_period = config.daily_sma_period
 
     if strategy == "noise_boundary":
         tf_label = f"NOISE BOUNDARY MOMENTUM ({args.timeframe})"
@@ -433,31 +616,7 @@ def cmd_run(args: argparse.Namespace) -> None:
     print(f"{'='*70}\n")
 
     # Step 1: Load data
-    loader = DataLoader()
-    daily_data = None
-
-    if strategy == "mean_reversion_v3":
-        # Dual-timeframe: load both 15-min and daily bars
-        logger.info(
-            "loading_multi_timeframe",
-            symbols=len(symbols),
-            start=str(start),
-            end=str(end),
-        )
-        data, daily_data = loader.load_multi_timeframe(
-            symbols, start, end,
-            primary_timeframe=args.timeframe,
-            secondary_timeframe="1Day",
-        )
-    else:
-        logger.info(
-            "loading_data",
-            symbols=len(symbols),
-            start=str(start),
-            end=str(end),
-            timeframe=args.timeframe,
-        )
-        data = loader.load(symbols, start, end, timeframe=args.timeframe)
+    data, daily_data = load_data(DataLoader(), symbols, start, end, args.timeframe, strategy)
 
     if not data:
         print("Error: No data loaded. Check API keys and date range.")
@@ -470,16 +629,13 @@ def cmd_run(args: argparse.Namespace) -> None:
         daily_symbols=len(daily_data) if daily_data else 0,
     )
 
-    # Step 2: Run backtest
+    # Step 2: Run backtest + calculate metrics (memoized unless --no-cache)
     logger.info("running_backtest", strategy=strategy)
-    engine = BacktestEngine(config)
-    result = engine.run(data, daily_data=daily_data)
-
-    # Step 3: Calculate metrics
-    logger.info("calculating_metrics")
-    metrics = calculate_metrics(result)
+    cache = None if args.no_cache else ResultCache()
+    prune = PruneRule() if args.prune else None
+    result, metrics = run_backtest(config, data, daily_data, cache=cache, prune=prune)
 
-    # Step 4: Generate report
+    # Step 3: Generate report
     output_dir = Path(args.output) if args.output else None
     report_dir = generate_report(result, metrics, output_dir)
 
@@ -492,7 +648,8 @@ def cmd_run(args: argparse.Namespace) -> None:
 
 def cmd_grid(args: argparse.Namespace) -> None:
     """Execute grid search over parameters."""
-    from .grid_search import run_grid_search
+    from .grid_search import GRID_PRESETS, run_grid_search
+    from .pruning import PruneRule
 
     # Parse dates
     try:
@@ -506,6 +663,10 @@ def cmd_grid(args: argparse.Namespace) -> None:
         print("Error: Start date must be before end date")
         sys.exit(1)
 
+    if args.halving_rungs < 1 or args.halving_eta <= 1:
+        print("Error: --halving-rungs must be >= 1 and --halving-eta > 1")
+        sys.exit(1)
+
     # Parse universe
     if args.universe:
         symbols = [s.strip().upper() for s in args.universe.split(",")]
@@ -515,16 +676,7 @@ def cmd_grid(args: argparse.Namespace) -> None:
     output_dir = Path(args.output) if args.output else None
 
     # Select grid preset
-    selected_grid = None
-    if args.grid_preset == "tpsl":
-        from .grid_search import TPSL_OPTIMIZATION_GRID
-        selected_grid = TPSL_OPTIMIZATION_GRID
-    elif args.grid_preset == "cycle4":
-        from .grid_search import CYCLE4_GRID
-        selected_grid = CYCLE4_GRID
-    elif args.grid_preset == "cycle4b":
-        from .grid_search import CYCLE4B_GRID
-        selected_grid = CYCLE4B_GRID
+    selected_grid = GRID_PRESETS[args.grid_preset]
 
     run_grid_search(
         symbols=symbols,
@@ -534,6 +686,133 @@ def cmd_grid(args: argparse.Namespace) -> None:
         timeframe=args.timeframe,
         output_dir=output_dir,
         param_grid=selected_grid,
+        engine=args.engine,
+        workers=args.workers,
+        use_cache=not args.no_cache,
+        prune=PruneRule() if args.prune else None,
+        halving_rungs=args.halving_rungs,
+        halving_eta=args.halving_eta,
+    )
+
+
+def cmd_walkforward(args: argparse.Namespace) -> None:
+    """Execute walk-forward optimization."""
+    from .data_loader import DataLoader
+    from .grid_search import GRID_PRESETS
+    from .report import generate_report
+    from .walkforward import build_windows, run_walkforward, write_windows_csv
+
+    try:
+        start = date.fromisoformat(args.start)
+        end = date.fromisoformat(args.end)
+    except ValueError as e:
+        print(f"Error: Invalid date format: {e}")
+        sys.exit(1)
+
+    if start >= end:
+        print("Error: Start date must be before end date")
+        sys.exit(1)
+
+    try:
+        windows = build_windows(start, end, args.train_months, args.test_months, args.step_months)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if not windows:
+        print(f"Error: {start} -> {end} is shorter than one train span ({args.train_months} months)")
+        sys.exit(1)
+
+    symbols = resolve_symbols(args)
+    strategy = resolve_strategy(args)
+    config = build_config(args, start, end, strategy)
+    grid = GRID_PRESETS[args.grid_preset]
+    n_combos = 1
+    for values in grid.values():
+        n_combos *= len(values)
+
+    print(f"\n{'='*70}")
+    print(f"  WALK-FORWARD [{args.timeframe}] -- {start} -> {end}")
+    print(f"  Strategy: {strategy} | Symbols: {len(symbols)} | Capital: ${config.initial_capital:,.0f}")
+    print(f"  Windows: {len(windows)} (train {args.train_months}m / test {args.test_months}m"
+          f" / step {args.step_months or args.test_months}m)")
+    print(f"  Grid: {args.grid_preset} ({n_combos} combos) | Objective: {args.objective}"
+          + (f" | Workers: {args.workers}" if args.workers > 1 else ""))
+    print(f"{'='*70}\n")
+
+    # Load once for the whole range — every window reuses the same frames
+    data, daily_data = load_data(DataLoader(), symbols, start, end, args.timeframe, strategy)
+    if not data:
+        print("Error: No data loaded. Check API keys and date range.")
+        sys.exit(1)
+
+    wf = run_walkforward(
+        config,
+        data,
+        windows,
+        grid,
+        daily_data=daily_data,
+        objective=args.objective,
+        min_trades=args.min_trades,
+        workers=args.workers,
+    )
+
+    print(f"\n  {'#':>2}  {'Test window':<23}  {'Train':>7}  {'Return%':>8}  {'Sharpe':>7}  {'Trades':>6}  Params")
+    print(f"  {'-'*90}")
+    for o in wf.windows:
+        params = " ".join(f"{k}={v}" for k, v in o.params.items())
+        print(
+            f"  {o.window.index:>2}  {str(o.window.test_start)}..{str(o.window.test_end)}  "
+            f"{o.train_score:>+7.2f}  {o.test_metrics.total_return_pct:>+8.2f}  "
+            f"{o.test_metrics.sharpe_ratio:>+7.2f}  {o.test_metrics.total_trades:>6}  {params}"
+        )
+
+    output_dir = Path(args.output) if args.output else None
+    report_dir = generate_report(wf.result, wf.metrics, output_dir)
+    write_windows_csv(wf.windows, report_dir / "walkforward_windows.csv")
+
+    print(f"\n  Out-of-sample report saved to: {report_dir}")
+    print("     - report.json / trades.csv (stitched test windows)")
+    print("     - walkforward_windows.csv")
+    print()
+
+
+def cmd_search(args: argparse.Namespace) -> None:
+    """Execute adaptive parameter search."""
+    from .grid_search import GRID_PRESETS
+    from .param_search import DEFAULT_SPACE, run_param_search, space_from_grid
+    from .pruning import PruneRule
+
+    try:
+        start = date.fromisoformat(args.start)
+        end = date.fromisoformat(args.end)
+    except ValueError as e:
+        print(f"Error: Invalid date format: {e}")
+        sys.exit(1)
+
+    if start >= end:
+        print("Error: Start date must be before end date")
+        sys.exit(1)
+
+    space = DEFAULT_SPACE if args.space == "full" else space_from_grid(GRID_PRESETS[args.space])
+
+    run_param_search(
+        symbols=resolve_symbols(args),
+        start=start,
+        end=end,
+        initial_capital=args.capital,
+        timeframe=args.timeframe,
+        space=space,
+        n_trials=args.trials,
+        batch_size=args.batch,
+        workers=args.workers,
+        study_name=args.study,
+        objective=args.objective,
+        n_startup=args.startup,
+        seed=args.seed,
+        engine=args.engine,
+        use_cache=not args.no_cache,
+        prune=PruneRule() if args.prune else None,
+        output_dir=Path(args.output) if args.output else None,
     )
 
 
@@ -543,6 +822,8 @@ def main() -> None:
     if args.command is None:
         print("Usage: python -m src.backtest run --start YYYY-MM-DD --end YYYY-MM-DD")
         print("       python -m src.backtest grid --start YYYY-MM-DD --end YYYY-MM-DD")
+        print("       python -m src.backtest walkforward --start YYYY-MM-DD --end YYYY-MM-DD")
+        print("       python -m src.backtest search --start YYYY-MM-DD --end YYYY-MM-DD --trials 50")
         print("       python -m src.backtest run --help")
         sys.exit(0)
 
@@ -550,6 +831,10 @@ def main() -> None:
         cmd_run(args)
     elif args.command == "grid":
         cmd_grid(args)
+    elif args.command == "walkforward":
+        cmd_walkforward(args)
+    elif args.command == "search":
+        cmd_search(args)
 
 
 if __name__ == "__main__":
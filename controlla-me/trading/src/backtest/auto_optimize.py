@@ -15,6 +15,7 @@ Usage (from terminal, NOT inside Claude Code):
     python -m src.backtest.auto_optimize --start 2023-01-01 --end 2024-12-31 --max-iter 15
     python -m src.backtest.auto_optimize --resume backtest-results/optimize_20260305_123456
     python -m src.backtest.auto_optimize --start 2023-01-01 --end 2024-12-31 --rules-only
+    python -m src.backtest.auto_optimize --start 2023-01-01 --end 2024-12-31 --rules-only --workers 4
 
 Flow:
     1. Run backtest with current params
@@ -28,18 +29,27 @@ Flow:
 from __future__ import annotations
 
 import argparse
+import io
 import json
 import os
 import re
 import subprocess
 import sys
 import time
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import date, datetime
 from pathlib import Path
 from typing import Any
 
 import structlog
 
+from .__main__ import build_config, build_parser, load_data, resolve_strategy, resolve_symbols
+from .data_loader import DataLoader
+from .report import generate_report
+from .pruning import PruneRule
+from .result_cache import ResultCache, data_fingerprint, run_backtest
+
 # Telegram integration (silently skips if not configured)
 try:
     from src.utils.telegram import send as telegram_send
@@ -220,6 +230,191 @@ BOOL_PARAMS = {
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent  # trading/src/backtest/ → controlla-me/
 
 
+# ---------------------------------------------------------------------------
+# In-process experiment runner
+# ---------------------------------------------------------------------------
+
+def experiment_argv(
+    experiment: dict, start: str, end: str, capital: float, output_dir: Path
+) -> list[str]:
+    """`python -m src.backtest` argv for an experiment (PARAM_TO_CLI semantics)."""
+    argv = [
+        "run",
+        "--start", start,
+        "--end", end,
+        "--capital", str(capital),
+        "--strategy", experiment["strategy"],
+        "--timeframe", experiment["timeframe"],
+        "--output", str(output_dir),
+    ]
+
+    # Universe
+    universe = experiment.get("universe")
+    if universe:
+        argv.extend(["--universe", universe])
+
+    # Params
+    params = experiment.get("params", {})
+    for key, value in params.items():
+        cli_flag = PARAM_TO_CLI.get(key)
+        if cli_flag is None:
+            logger.warning("unknown_param", key=key)
+            continue
+
+        if key in BOOL_PARAMS:
+            if value:
+                argv.append(cli_flag)
+        else:
+            argv.extend([cli_flag, str(value)])
+
+    return argv
+
+
+# Per-process warm data: (symbols, start, end, timeframe, needs_daily) → (data, daily_data, fingerprint).
+# Pool workers keep their own copy across tasks; a forked pool inherits the parent's.
+_data_cache: dict[tuple, tuple] = {}
+_loader: DataLoader | None = None
+_result_cache: ResultCache | None = None
+
+
+def _cached_data(symbols: list[str], start: date, end: date, timeframe: str, strategy: str) -> tuple:
+    global _loader
+    key = (tuple(symbols), start, end, timeframe, strategy == "mean_reversion_v3")
+    if key not in _data_cache:
+        if _loader is None:
+            _loader = DataLoader()
+        data, daily_data = load_data(_loader, symbols, start, end, timeframe, strategy)
+        _data_cache[key] = (data, daily_data, data_fingerprint(data, daily_data) if data else None)
+    return _data_cache[key]
+
+
+def _get_result_cache(no_cache: bool) -> ResultCache | None:
+    global _result_cache
+    if no_cache:
+        return None
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
+
+
+def run_experiment(argv: list[str]) -> tuple:
+    """Run one `run` argv in this process → (result, metrics, error)."""
+    out = io.StringIO()
+    try:
+        with redirect_stdout(out):
+            args = build_parser().parse_args(argv)
+            start = date.fromisoformat(args.start)
+            end = date.fromisoformat(args.end)
+            strategy = resolve_strategy(args)
+            config = build_config(args, start, end, strategy)
+            data, daily_data, fingerprint = _cached_data(
+                resolve_symbols(args), start, end, args.timeframe, strategy
+            )
+            if not data:
+                raise RuntimeError("no data loaded")
+            result, metrics = run_backtest(
+                config,
+                data,
+                daily_data,
+                cache=_get_result_cache(args.no_cache),
+                fingerprint=fingerprint,
+                prune=PruneRule() if args.prune else None,
+            )
+            return result, metrics, None
+    except (Exception, SystemExit) as e:
+        return None, None, f"{e!r} {out.getvalue()[-500:]}".strip()
+
+
+def _read_report(output_dir: Path) -> dict | None:
+    """Load report.json written for an experiment."""
+    report_path = output_dir / "report.json"
+    if not report_path.exists():
+        logger.error("report_not_found", path=str(report_path))
+        return None
+
+    try:
+        with open(report_path) as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error("report_parse_error", error=str(e))
+        return None
+
+
+class ExperimentRunner:
+    """Runs experiments without a subprocess per backtest.
+
+    Market data stays loaded between experiments (per process), configs are
+    built by the same parser the CLI uses, and batches can be spread over a
+    process pool that is kept alive across batches. Reports are written by
+    the parent exactly as `python -m src.backtest run` would.
+    """
+
+    def __init__(
+        self,
+        start: str,
+        end: str,
+        capital: float,
+        workers: int = 1,
+        use_cache: bool = True,
+        prune: bool = False,
+    ) -> None:
+        self.start = start
+        self.end = end
+        self.capital = capital
+        self.workers = max(1, workers)
+        self.use_cache = use_cache
+        self.prune = prune
+        self._pool: ProcessPoolExecutor | None = None
+
+    def argv(self, experiment: dict, output_dir: Path) -> list[str]:
+        """`run` argv for an experiment under this runner's settings."""
+        argv = experiment_argv(experiment, self.start, self.end, self.capital, output_dir)
+        if not self.use_cache:
+            argv.append("--no-cache")
+        if self.prune:
+            argv.append("--prune")
+        return argv
+
+    def run(self, experiment: dict, output_dir: Path) -> dict | None:
+        """Run a single experiment and return its report dict."""
+        return self.run_batch([(experiment, output_dir)])[0]
+
+    def run_batch(self, jobs: list[tuple[dict, Path]]) -> list[dict | None]:
+        """Run (experiment, output_dir) jobs, concurrently when workers > 1."""
+        argvs = [self.argv(exp, out) for exp, out in jobs]
+        for argv in argvs:
+            logger.info("running_backtest", cmd=" ".join(argv[-10:]))  # Log last 10 args
+
+        if self.workers == 1 or len(argvs) == 1:
+            outcomes = [run_experiment(argv) for argv in argvs]
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            futures = [self._pool.submit(run_experiment, argv) for argv in argvs]
+            outcomes = []
+            for future in futures:
+                try:
+                    outcomes.append(future.result())
+                except Exception as e:  # worker died (BrokenProcessPool)
+                    outcomes.append((None, None, repr(e)))
+
+        reports: list[dict | None] = []
+        for (result, metrics, error), (_, output_dir) in zip(outcomes, jobs):
+            if error is not None:
+                logger.error("backtest_failed", error=error)
+                reports.append(None)
+                continue
+            with redirect_stdout(io.StringIO()):
+                generate_report(result, metrics, output_dir)
+            reports.append(_read_report(output_dir))
+        return reports
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
 # ---------------------------------------------------------------------------
 # Task Board integration (via company-tasks.ts CLI)
 # ---------------------------------------------------------------------------
@@ -511,12 +706,21 @@ class AutoOptimizer:
         output_dir: Path | None = None,
         rules_only: bool = False,
         resume_dir: Path | None = None,
+        workers: int = 1,
+        use_subprocess: bool = False,
+        use_cache: bool = True,
+        prune: bool = False,
     ) -> None:
         self.start = start
         self.end = end
         self.capital = capital
         self.max_iterations = max_iterations
         self.rules_only = rules_only
+        self.workers = max(1, workers)
+        self.use_subprocess = use_subprocess
+        self.runner = ExperimentRunner(
+            start, end, capital, workers=self.workers, use_cache=use_cache, prune=prune
+        )
 
         # Session directory
         if resume_dir and resume_dir.exists():
@@ -559,35 +763,56 @@ class AutoOptimizer:
             f"📂 {self.session_dir.name}"
         )
 
-        for i in range(len(self.history), self.max_iterations):
-            iteration = i + 1
+        try:
+            while len(self.history) < self.max_iterations:
+                outcome = self._run_next_batch()
+                if outcome == "GO":
+                    return
+                if outcome == "EXHAUSTED":
+                    break
+        finally:
+            self.runner.close()
+
+        # Max iterations reached
+        self._save_final_report("MAX_ITERATIONS", self.max_iterations)
+        print(f"\n⚠️  Max iterations ({self.max_iterations}) reached without GO.")
+        print(f"    Best Sharpe: {self.best_sharpe:.3f} at iteration {self.best_iteration}")
+
+    def _run_next_batch(self) -> str | None:
+        """Pick the next experiment(s), run them and record one iteration each.
+
+        Returns "GO" or "EXHAUSTED" when the optimization should stop.
+        """
+        first = len(self.history) + 1
+        batch = self._next_batch(first)
+
+        if not batch:
+            print("\n⛔ Strategist exhausted all options. Stopping.")
+            _send_telegram(
+                f"⛔ <b>Auto-Optimizer — EXHAUSTED</b>\n\n"
+                f"Lo strategist ha esaurito tutte le opzioni dopo {first - 1} iterazioni.\n"
+                f"🏆 Best Sharpe: {self.best_sharpe:.3f} (iter #{self.best_iteration})"
+            )
+            return "EXHAUSTED"
+
+        iter_dirs = [self.session_dir / f"iteration_{first + k:02d}" for k in range(len(batch))]
+        reports: list[dict | None] | None = None
+        if len(batch) > 1:
+            print(f"\n  Running {len(batch)} experiments in parallel (iterations {first}-{first + len(batch) - 1})")
+            reports = self.runner.run_batch(list(zip(batch, iter_dirs)))
+
+        for k, experiment in enumerate(batch):
+            iteration = first + k
             print(f"\n{'─'*60}")
             print(f"  ITERATION {iteration}/{self.max_iterations}")
             print(f"{'─'*60}")
 
-            # Get experiment config
-            if iteration == 1 and not self.history:
-                # First iteration: use first preset
-                experiment = self._get_next_preset()
-            else:
-                experiment = self._get_next_experiment(iteration)
-
-            if experiment is None:
-                print("\n⛔ Strategist exhausted all options. Stopping.")
-                _send_telegram(
-                    f"⛔ <b>Auto-Optimizer — EXHAUSTED</b>\n\n"
-                    f"Lo strategist ha esaurito tutte le opzioni dopo {iteration - 1} iterazioni.\n"
-                    f"🏆 Best Sharpe: {self.best_sharpe:.3f} (iter #{self.best_iteration})"
-                )
-                break
-
             print(f"  Experiment: {experiment.get('name', '?')}")
             print(f"  Strategy: {experiment['strategy']} | TF: {experiment['timeframe']}")
             print(f"  Params: {experiment.get('params', {})}")
 
             # Run backtest
-            iter_dir = self.session_dir / f"iteration_{iteration:02d}"
-            report = self._run_backtest(experiment, iter_dir)
+            report = reports[k] if reports is not None else self._run_backtest(experiment, iter_dirs[k])
 
             if report is None:
                 print("  ❌ Backtest failed — skipping iteration")
@@ -644,12 +869,9 @@ class AutoOptimizer:
             if g.get("pass", False):
                 print(f"\n🎉 GO! Strategy passes all criteria at iteration {iteration}!")
                 self._save_final_report("GO", iteration)
-                return
+                return "GO"
 
-        # Max iterations reached
-        self._save_final_report("MAX_ITERATIONS", self.max_iterations)
-        print(f"\n⚠️  Max iterations ({self.max_iterations}) reached without GO.")
-        print(f"    Best Sharpe: {self.best_sharpe:.3f} at iteration {self.best_iteration}")
+        return None
 
     # ------------------------------------------------------------------
     # Company integration: Task Board + Telegram
@@ -734,35 +956,17 @@ class AutoOptimizer:
 
     def _run_backtest(self, experiment: dict, output_dir: Path) -> dict | None:
         """Run a single backtest and return the report dict."""
+        if not self.use_subprocess:
+            return self.runner.run(experiment, output_dir)
+        return self._run_backtest_subprocess(experiment, output_dir)
+
+    def _run_backtest_subprocess(self, experiment: dict, output_dir: Path) -> dict | None:
+        """Run a backtest in a fresh `python -m src.backtest` process (isolated, slower)."""
         cmd = [
-            sys.executable, "-m", "src.backtest", "run",
-            "--start", self.start,
-            "--end", self.end,
-            "--capital", str(self.capital),
-            "--strategy", experiment["strategy"],
-            "--timeframe", experiment["timeframe"],
-            "--output", str(output_dir),
+            sys.executable, "-m", "src.backtest",
+            *self.runner.argv(experiment, output_dir),
         ]
 
-        # Universe
-        universe = experiment.get("universe")
-        if universe:
-            cmd.extend(["--universe", universe])
-
-        # Params
-        params = experiment.get("params", {})
-        for key, value in params.items():
-            cli_flag = PARAM_TO_CLI.get(key)
-            if cli_flag is None:
-                logger.warning("unknown_param", key=key)
-                continue
-
-            if key in BOOL_PARAMS:
-                if value:
-                    cmd.append(cli_flag)
-            else:
-                cmd.extend([cli_flag, str(value)])
-
         logger.info("running_backtest", cmd=" ".join(cmd[-10:]))  # Log last 10 args
 
         try:
@@ -780,18 +984,7 @@ class AutoOptimizer:
             logger.error("backtest_error", error=str(e))
             return None
 
-        # Read report
-        report_path = output_dir / "report.json"
-        if not report_path.exists():
-            logger.error("report_not_found", path=str(report_path))
-            return None
-
-        try:
-            with open(report_path) as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error("report_parse_error", error=str(e))
-            return None
+        return _read_report(output_dir)
 
     # ------------------------------------------------------------------
     # Next experiment selection
@@ -824,10 +1017,39 @@ class AutoOptimizer:
         # All presets exhausted — generate adaptive variants from best result
         return self._generate_adaptive_variant()
 
+    def _next_batch(self, iteration: int) -> list[dict]:
+        """Experiments for the next step — several at once in rules-only mode with workers > 1.
+
+        Presets and adaptive variants are never mixed in one batch, since the
+        variants are derived from results the presets have not produced yet.
+        """
+        if self.workers == 1 or not self.rules_only or self.use_subprocess:
+            if iteration == 1 and not self.history:
+                # First iteration: use first preset
+                experiment = self._get_next_preset()
+            else:
+                experiment = self._get_next_experiment(iteration)
+            return [experiment] if experiment is not None else []
+
+        size = min(self.workers, self.max_iterations - len(self.history))
+        tried_names = {h.get("config_used", {}).get("name") for h in self.history}
+        presets: list[dict] = []
+        while self.preset_index < len(STRATEGY_PRESETS) and len(presets) < size:
+            preset = STRATEGY_PRESETS[self.preset_index]
+            self.preset_index += 1
+            if preset["name"] not in tried_names:
+                presets.append(preset)
+        return presets or self._adaptive_variants(size)
+
     def _generate_adaptive_variant(self) -> dict | None:
         """Generate a new variant based on the best-performing iteration so far."""
+        variants = self._adaptive_variants(1)
+        return variants[0] if variants else None
+
+    def _adaptive_variants(self, limit: int) -> list[dict]:
+        """Up to `limit` variants of the best iteration, most pressing tweak first."""
         if not self.history:
-            return None
+            return []
 
         # Find best iteration by Sharpe
         best = max(
@@ -836,37 +1058,40 @@ class AutoOptimizer:
             default=None,
         )
         if best is None:
-            return None
+            return []
 
         best_config = best.get("config_used", {})
-        best_perf = best.get("performance", {})
         best_trades = best.get("trades", {})
         best_params = dict(best_config.get("params", {}))
 
         # Determine what to tweak based on failure analysis
-        sharpe = best_perf.get("sharpe_ratio", -999)
         wr = best_trades.get("win_rate_pct", 0)
         pf = best_trades.get("profit_factor", 0)
         cr = best.get("close_reasons", {})
 
         tried_names = {h.get("config_used", {}).get("name") for h in self.history}
-        variant_num = len(self.history) + 1
+        variants: list[dict] = []
+
+        def _propose(prefix: str, params: dict) -> bool:
+            """Queue a variant (numbered by the iteration it will run as); True when full."""
+            name = f"{prefix}_{len(self.history) + 1 + len(variants)}"
+            if name not in tried_names:
+                variants.append({
+                    "name": name,
+                    "strategy": best_config.get("strategy", "trend_following"),
+                    "timeframe": best_config.get("timeframe", "1Day"),
+                    "universe": best_config.get("universe"),
+                    "params": params,
+                })
+            return len(variants) >= limit
 
         # Strategy: improve the weakest metric
         if wr < 40:
             # Low win rate → raise threshold (pickier entries)
             new_threshold = best_params.get("threshold", 0.3) + 0.05
             if new_threshold <= 0.6:
-                name = f"adaptive_higher_threshold_{variant_num}"
-                if name not in tried_names:
-                    params = {**best_params, "threshold": round(new_threshold, 2)}
-                    return {
-                        "name": name,
-                        "strategy": best_config.get("strategy", "trend_following"),
-                        "timeframe": best_config.get("timeframe", "1Day"),
-                        "universe": best_config.get("universe"),
-                        "params": params,
-                    }
+                if _propose("adaptive_higher_threshold", {**best_params, "threshold": round(new_threshold, 2)}):
+                    return variants
 
         if pf < 1.5:
             # Low profit factor → widen TP or tighten SL
@@ -875,63 +1100,28 @@ class AutoOptimizer:
 
             # Try tighter SL first
             if current_sl > 1.0:
-                new_sl = round(current_sl - 0.5, 1)
-                name = f"adaptive_tighter_sl_{variant_num}"
-                if name not in tried_names:
-                    params = {**best_params, "sl_atr": new_sl}
-                    return {
-                        "name": name,
-                        "strategy": best_config.get("strategy", "trend_following"),
-                        "timeframe": best_config.get("timeframe", "1Day"),
-                        "universe": best_config.get("universe"),
-                        "params": params,
-                    }
+                if _propose("adaptive_tighter_sl", {**best_params, "sl_atr": round(current_sl - 0.5, 1)}):
+                    return variants
 
             # Try wider TP
             if current_tp < 15.0:
-                new_tp = round(current_tp + 2.0, 1)
-                name = f"adaptive_wider_tp_{variant_num}"
-                if name not in tried_names:
-                    params = {**best_params, "tp_atr": new_tp}
-                    return {
-                        "name": name,
-                        "strategy": best_config.get("strategy", "trend_following"),
-                        "timeframe": best_config.get("timeframe", "1Day"),
-                        "universe": best_config.get("universe"),
-                        "params": params,
-                    }
+                if _propose("adaptive_wider_tp", {**best_params, "tp_atr": round(current_tp + 2.0, 1)}):
+                    return variants
 
         # Too many stop losses → widen SL
         sl_count = cr.get("stop_loss", 0)
         total = best_trades.get("total", 1)
         if total > 0 and (sl_count / total) > 0.5:
             new_sl = best_params.get("sl_atr", 2.0) + 0.5
-            name = f"adaptive_wider_sl_{variant_num}"
-            if name not in tried_names:
-                params = {**best_params, "sl_atr": round(new_sl, 1)}
-                return {
-                    "name": name,
-                    "strategy": best_config.get("strategy", "trend_following"),
-                    "timeframe": best_config.get("timeframe", "1Day"),
-                    "universe": best_config.get("universe"),
-                    "params": params,
-                }
+            if _propose("adaptive_wider_sl", {**best_params, "sl_atr": round(new_sl, 1)}):
+                return variants
 
         # Try fewer positions for concentration
         current_max = best_params.get("max_positions", 10)
         if current_max > 3:
-            name = f"adaptive_fewer_positions_{variant_num}"
-            if name not in tried_names:
-                params = {**best_params, "max_positions": max(3, current_max - 2)}
-                return {
-                    "name": name,
-                    "strategy": best_config.get("strategy", "trend_following"),
-                    "timeframe": best_config.get("timeframe", "1Day"),
-                    "universe": best_config.get("universe"),
-                    "params": params,
-                }
+            _propose("adaptive_fewer_positions", {**best_params, "max_positions": max(3, current_max - 2)})
 
-        return None  # Exhausted
+        return variants  # Empty → exhausted
 
     # ------------------------------------------------------------------
     # LLM strategist (claude -p)
@@ -1134,6 +1324,22 @@ def main() -> None:
     parser.add_argument("--output", type=str, default=None, help="Base output directory")
     parser.add_argument("--rules-only", action="store_true", help="Skip LLM strategist, use rule-based only")
     parser.add_argument("--resume", type=str, default=None, help="Resume from existing session directory")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Run rules-only batches (presets / adaptive variants) on N worker processes (default: 1)",
+    )
+    parser.add_argument(
+        "--subprocess", action="store_true",
+        help="Run each backtest in a separate `python -m src.backtest` process (old behaviour)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Always run the engine (skip the config + data result cache)",
+    )
+    parser.add_argument(
+        "--prune", action="store_true",
+        help="Stop hopeless experiments early (drawdown past the go/no-go limit, no trades)",
+    )
     args = parser.parse_args()
 
     output_dir = Path(args.output) if args.output else None
@@ -1147,6 +1353,10 @@ def main() -> None:
         output_dir=output_dir,
         rules_only=args.rules_only,
         resume_dir=resume_dir,
+        workers=args.workers,
+        use_subprocess=args.subprocess,
+        use_cache=not args.no_cache,
+        prune=args.prune,
     )
     optimizer.run()
 
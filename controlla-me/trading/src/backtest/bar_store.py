@@ -0,0 +1,111 @@
+"""
+Bar store — contiguous OHLCV arrays aligned to the backtest timeline.
+
+BacktestEngine iterates a union timeline of every symbol's timestamps. Looking
+a bar up with ``current_date in df.index`` + ``df.loc[current_date]`` costs a
+hash probe and a Series allocation per position per bar; BarStore resolves the
+alignment once per run and serves prices by integer bar index.
+
+Layout: one float64 array of shape (n_symbols, n_bars) per field, plus a
+boolean presence mask (symbol has a bar at that timestamp). Absent cells hold
+NaN and must not be read — use ``has_bar`` / the None returned by ``bar``.
+
+Usage:
+    store = BarStore(data, dates)
+    if store.has_bar("SPY", bar_idx):
+        o, h, l, c = store.bar("SPY", bar_idx)
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def align_rows(index: pd.Index, stamps: pd.Index) -> tuple[np.ndarray, np.ndarray]:
+    """Map timeline ``stamps`` onto rows of a sorted ``index``.
+
+    Returns (hit, src): ``hit[b]`` is True when stamps[b] is in ``index`` and
+    ``src`` holds the matching row positions for the hits, in timeline order.
+    Duplicate timestamps resolve to the first row, like ``df.loc[ts].iloc[0]``.
+    """
+    pos = index.searchsorted(stamps, side="left")
+    in_range = pos < len(index)
+    hit = np.zeros(len(stamps), dtype=bool)
+    hit[in_range] = index[pos[in_range]] == stamps[in_range]
+    return hit, pos[hit]
+
+
+def daily_rows_through(daily_index: pd.DatetimeIndex, stamps: pd.Index) -> np.ndarray:
+    """Per timeline bar, how many rows of a sorted daily index are dated on or
+    before the bar's calendar day (in the bar's own timezone).
+
+    Same rows as ``daily_index.normalize() <= pd.Timestamp(ts.date())`` (localized
+    to the daily timezone) evaluated bar by bar — the as-of join used to read
+    daily series (trend filters, VIX) from intraday bars.
+    """
+    days = pd.DatetimeIndex(stamps).normalize()
+    if days.tz is not None:
+        days = days.tz_localize(None)
+    if daily_index.tz is not None:
+        days = days.tz_localize(daily_index.tz)
+    return np.asarray(daily_index.normalize().searchsorted(days, side="right"))
+
+
+class BarStore:
+    """Symbol × bar OHLCV arrays with a presence mask."""
+
+    def __init__(self, data: dict[str, pd.DataFrame], dates: list) -> None:
+        self.symbols: list[str] = list(data)
+        self._row: dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+        n_symbols, n_bars = len(self.symbols), len(dates)
+
+        self.present = np.zeros((n_symbols, n_bars), dtype=bool)
+        self.open = np.full((n_symbols, n_bars), np.nan)
+        self.high = np.full((n_symbols, n_bars), np.nan)
+        self.low = np.full((n_symbols, n_bars), np.nan)
+        self.close = np.full((n_symbols, n_bars), np.nan)
+        self.volume = np.full((n_symbols, n_bars), np.nan)
+
+        if n_bars == 0:
+            return
+
+        stamps = pd.Index(dates)
+        for row, symbol in enumerate(self.symbols):
+            df = data[symbol]
+            if len(df) == 0:
+                continue
+            if not df.index.is_monotonic_increasing:
+                df = df.sort_index(kind="stable")
+
+            hit, src = align_rows(df.index, stamps)
+            self.present[row] = hit
+            for field in FIELDS:
+                if field in df.columns:
+                    getattr(self, field)[row, hit] = df[field].to_numpy(dtype=float)[src]
+
+    def has_bar(self, symbol: str, bar_idx: int) -> bool:
+        """True if ``symbol`` traded at timeline bar ``bar_idx``."""
+        row = self._row.get(symbol)
+        return row is not None and bool(self.present[row, bar_idx])
+
+    def price(self, symbol: str, bar_idx: int, field: str = "close") -> float | None:
+        """Single field at ``bar_idx``, or None when the symbol has no bar there."""
+        row = self._row.get(symbol)
+        if row is None or not self.present[row, bar_idx]:
+            return None
+        return float(getattr(self, field)[row, bar_idx])
+
+    def bar(self, symbol: str, bar_idx: int) -> tuple[float, float, float, float] | None:
+        """(open, high, low, close) at ``bar_idx``, or None when absent."""
+        row = self._row.get(symbol)
+        if row is None or not self.present[row, bar_idx]:
+            return None
+        return (
+            float(self.open[row, bar_idx]),
+            float(self.high[row, bar_idx]),
+            float(self.low[row, bar_idx]),
+            float(self.close[row, bar_idx]),
+        )
@@ -2,27 +2,46 @@
 Data Loader — Download and cache historical OHLCV data.
 
 Sources:
-- Daily bars:  Alpaca StockHistoricalDataClient (full history)
+- Daily bars:  Alpaca historical bars API (full history)
 - Hourly bars: yfinance (up to 730 days free)
-- 5Min bars:   Alpaca StockHistoricalDataClient (free tier: up to ~1 year)
-- 15Min bars:  Alpaca StockHistoricalDataClient (free tier: up to ~1 year)
-
-Caches to Parquet files in .backtest-cache/ for offline backtesting.
+- 5Min bars:   Alpaca historical bars API (free tier: up to ~1 year)
+- 15Min bars:  Alpaca historical bars API (free tier: up to ~1 year)
+- Regime series (^VIX and other indices): yfinance daily bars
+
+Caches to a month-partitioned Parquet store in .backtest-cache/store/ for
+offline backtesting; only date spans not yet fetched are downloaded
+(see market_cache.py). Alpaca chunks are fetched concurrently under a shared
+rate limit and checkpointed into the store as they finish (see downloader.py),
+so an interrupted download resumes where it stopped.
 """
 
 from __future__ import annotations
 
 import os
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 from pathlib import Path
 
 import pandas as pd
 import structlog
 
+from .downloader import (
+    ALPACA_DATA_URL,
+    DEFAULT_RATE_PER_MINUTE,
+    DEFAULT_WORKERS,
+    AlpacaBarDownloader,
+    Chunk,
+    plan_chunks,
+)
+from .market_cache import MarketDataCache
+
 logger = structlog.get_logger()
 
 DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / ".backtest-cache"
 
+# Alpaca request shape: symbols per request, days per request
+_ALPACA_DAILY_CHUNK = (20, 365)
+_ALPACA_INTRADAY_CHUNK = (10, 30)
+
 
 class DataLoader:
     """Downloads and caches historical OHLCV data."""
@@ -32,11 +51,18 @@ class DataLoader:
         api_key: str | None = None,
         secret_key: str | None = None,
         cache_dir: Path = DEFAULT_CACHE_DIR,
+        workers: int = DEFAULT_WORKERS,
+        rate_per_minute: float = DEFAULT_RATE_PER_MINUTE,
+        alpaca_data_url: str = ALPACA_DATA_URL,
     ) -> None:
         self._api_key = api_key or os.environ.get("ALPACA_API_KEY", "")
         self._secret_key = secret_key or os.environ.get("ALPACA_SECRET_KEY", "")
         self._cache_dir = cache_dir
         self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._store = MarketDataCache(cache_dir)
+        self._workers = workers
+        self._rate_per_minute = rate_per_minute
+        self._alpaca_data_url = alpaca_data_url
 
     def load(
         self,
@@ -58,58 +84,50 @@ class DataLoader:
             dict[symbol, DataFrame] with columns: open, high, low, close, volume.
             Index is DatetimeIndex named 'timestamp'.
         """
-        result: dict[str, pd.DataFrame] = {}
-        to_download: list[str] = []
-
-        # Check cache first
+        # Which date spans each symbol is missing from the store
+        gaps: dict[tuple[date, date], list[str]] = {}
         for symbol in symbols:
-            cached = self._load_from_cache(symbol, start, end, timeframe)
-            if cached is not None:
-                result[symbol] = cached
-                logger.debug("cache_hit", symbol=symbol, rows=len(cached), tf=timeframe)
-            else:
-                to_download.append(symbol)
-
-        if to_download:
+            for span in self._store.missing_spans(symbol, timeframe, start, end):
+                gaps.setdefault(span, []).append(symbol)
+
+        if gaps:
             logger.info(
                 "downloading_data",
-                symbols=len(to_download),
-                cached=len(result),
+                symbols=len({s for syms in gaps.values() for s in syms}),
+                spans=len(gaps),
                 start=str(start),
                 end=str(end),
                 timeframe=timeframe,
             )
-            has_alpaca = bool(self._api_key and self._secret_key)
+            self._download(gaps, timeframe)
 
-            if timeframe == "1Hour":
-                downloaded = self._download_batch_yfinance(to_download, start, end, timeframe)
-            elif timeframe == "15Min":
-                if has_alpaca:
-                    downloaded = self._download_batch_alpaca_intraday(to_download, start, end, minutes=15)
-                else:
-                    logger.warning("alpaca_keys_missing", fallback="yfinance", timeframe=timeframe)
-                    downloaded = self._download_batch_yfinance(to_download, start, end, timeframe)
-            elif timeframe == "5Min":
-                if has_alpaca:
-                    downloaded = self._download_batch_alpaca_intraday(to_download, start, end, minutes=5)
-                else:
-                    logger.warning("alpaca_keys_missing", fallback="yfinance", timeframe=timeframe)
-                    downloaded = self._download_batch_yfinance(to_download, start, end, timeframe)
-            else:
-                # Daily bars: try Alpaca first, fall back to yfinance if no keys
-                if has_alpaca:
-                    downloaded = self._download_batch_alpaca(to_download, start, end)
-                else:
-                    logger.warning("alpaca_keys_missing", fallback="yfinance", timeframe=timeframe)
-                    downloaded = self._download_batch_yfinance(to_download, start, end, timeframe)
-
-            for symbol, df in downloaded.items():
-                self._save_to_cache(symbol, start, end, timeframe, df)
+        result: dict[str, pd.DataFrame] = {}
+        for symbol in symbols:
+            df = self._store.read(symbol, timeframe, start, end)
+            if df is not None:
                 result[symbol] = df
+                logger.debug("cache_hit", symbol=symbol, rows=len(df), tf=timeframe)
 
         logger.info("data_loaded", total_symbols=len(result), timeframe=timeframe)
         return result
 
+    def load_regime(self, symbol: str, start: date, end: date) -> pd.DataFrame | None:
+        """
+        Daily bars of a regime series (market index such as "^VIX") from start to end.
+
+        Indices are not served by Alpaca, so uncovered spans come from yfinance;
+        the bars land in the same Parquet store as any symbol, so repeat runs
+        read them from disk without touching the network.
+
+        Returns:
+            DataFrame (open, high, low, close[, volume]) or None when unavailable.
+        """
+        for gap_start, gap_end in self._store.missing_spans(symbol, "1Day", start, end):
+            logger.info("downloading_regime_series", symbol=symbol, start=str(gap_start), end=str(gap_end))
+            downloaded = self._download_batch_yfinance([symbol], gap_start, gap_end, timeframe="1Day")
+            self._store.merge(symbol, "1Day", downloaded.get(symbol), gap_start, gap_end)
+        return self._store.read(symbol, "1Day", start, end)
+
     def load_multi_timeframe(
         self,
         symbols: list[str],
@@ -158,186 +176,51 @@ class DataLoader:
         return primary_data, secondary_data
 
     # ------------------------------------------------------------------
-    # Cache
-    # ------------------------------------------------------------------
-
-    def _cache_path(self, symbol: str, start: date, end: date, timeframe: str = "1Day") -> Path:
-        """Return path to Parquet cache file (includes timeframe in name)."""
-        return self._cache_dir / f"{symbol}_{timeframe}_{start.isoformat()}_{end.isoformat()}.parquet"
-
-    def _load_from_cache(
-        self, symbol: str, start: date, end: date, timeframe: str = "1Day"
-    ) -> pd.DataFrame | None:
-        """Try to load from cache. Returns None if not found or incomplete."""
-        # Check for exact match first
-        exact = self._cache_path(symbol, start, end, timeframe)
-        if exact.exists():
-            try:
-                df = pd.read_parquet(exact)
-                if len(df) > 0:
-                    return df
-            except Exception:
-                pass
-
-        # Check for any cached file that covers our range (same timeframe)
-        for f in self._cache_dir.glob(f"{symbol}_{timeframe}_*.parquet"):
-            parts = f.stem.split("_")
-            # Format: SYMBOL_TIMEFRAME_START_END
-            if len(parts) >= 4:
-                try:
-                    cached_start = date.fromisoformat(parts[2])
-                    cached_end = date.fromisoformat(parts[3])
-                    if cached_start <= start and cached_end >= end:
-                        df = pd.read_parquet(f)
-                        # Slice to requested range (tz-aware safe)
-                        ts_start = pd.Timestamp(start)
-                        ts_end = pd.Timestamp(end) + pd.Timedelta(days=1)
-                        if df.index.tz is not None:
-                            ts_start = ts_start.tz_localize(df.index.tz)
-                            ts_end = ts_end.tz_localize(df.index.tz)
-                        mask = (df.index >= ts_start) & (df.index <= ts_end)
-                        sliced = df[mask]
-                        if len(sliced) > 0:
-                            return sliced
-                except (ValueError, IndexError):
-                    continue
-        return None
-
-    def _save_to_cache(
-        self, symbol: str, start: date, end: date, timeframe: str, df: pd.DataFrame
-    ) -> None:
-        """Save DataFrame to Parquet cache."""
-        path = self._cache_path(symbol, start, end, timeframe)
-        df.to_parquet(path)
-        logger.debug("cache_saved", symbol=symbol, path=str(path), tf=timeframe)
-
-    # ------------------------------------------------------------------
-    # Alpaca download (daily bars — full history)
+    # Download dispatch (source depends on timeframe + available keys)
     # ------------------------------------------------------------------
 
-    def _download_batch_alpaca(
-        self, symbols: list[str], start: date, end: date
-    ) -> dict[str, pd.DataFrame]:
-        """Download daily bars from Alpaca for multiple symbols."""
-        from alpaca.data.historical import StockHistoricalDataClient
-        from alpaca.data.requests import StockBarsRequest
-        from alpaca.data.timeframe import TimeFrame
+    def _download(self, gaps: dict[tuple[date, date], list[str]], timeframe: str) -> None:
+        """Fetch every (span -> symbols) gap and merge the bars into the store."""
+        has_alpaca = bool(self._api_key and self._secret_key)
 
-        client = StockHistoricalDataClient(self._api_key, self._secret_key)
-        result: dict[str, pd.DataFrame] = {}
+        if timeframe in ("15Min", "5Min", "1Day") and has_alpaca:
+            self._download_alpaca(gaps, timeframe)
+            return
 
-        # Batch in groups of 20 to avoid API limits
-        batch_size = 20
-        for i in range(0, len(symbols), batch_size):
-            batch = symbols[i : i + batch_size]
-            logger.info(
-                "downloading_batch_alpaca",
-                batch=f"{i // batch_size + 1}/{(len(symbols) - 1) // batch_size + 1}",
-                symbols=len(batch),
-            )
-
-            try:
-                request = StockBarsRequest(
-                    symbol_or_symbols=batch,
-                    timeframe=TimeFrame.Day,
-                    start=datetime.combine(start, datetime.min.time()),
-                    end=datetime.combine(end, datetime.min.time()),
-                )
-                bars = client.get_stock_bars(request)
-
-                for symbol in batch:
-                    if symbol in bars.data and bars.data[symbol]:
-                        data = []
-                        for bar in bars.data[symbol]:
-                            data.append(
-                                {
-                                    "timestamp": bar.timestamp,
-                                    "open": float(bar.open),
-                                    "high": float(bar.high),
-                                    "low": float(bar.low),
-                                    "close": float(bar.close),
-                                    "volume": int(bar.volume),
-                                }
-                            )
-                        if data:
-                            df = pd.DataFrame(data).set_index("timestamp")
-                            result[symbol] = df
-                            logger.debug(
-                                "symbol_downloaded", symbol=symbol, bars=len(df), source="alpaca"
-                            )
-                    else:
-                        logger.warning("no_data", symbol=symbol, source="alpaca")
-
-            except Exception as e:
-                logger.error("download_error", batch=batch, error=str(e), source="alpaca")
-
-        return result
+        if timeframe != "1Hour":
+            logger.warning("alpaca_keys_missing", fallback="yfinance", timeframe=timeframe)
+        for (gap_start, gap_end), gap_symbols in sorted(gaps.items()):
+            downloaded = self._download_batch_yfinance(gap_symbols, gap_start, gap_end, timeframe)
+            for symbol in gap_symbols:
+                self._store.merge(symbol, timeframe, downloaded.get(symbol), gap_start, gap_end)
 
     # ------------------------------------------------------------------
-    # Alpaca intraday download (15Min bars via Alpaca API)
+    # Alpaca download (daily + intraday, concurrent and checkpointed)
     # ------------------------------------------------------------------
 
-    def _download_batch_alpaca_intraday(
-        self, symbols: list[str], start: date, end: date, minutes: int = 15
-    ) -> dict[str, pd.DataFrame]:
-        """Download sub-hourly bars from Alpaca (15Min supported by paper account)."""
-        from alpaca.data.historical import StockHistoricalDataClient
-        from alpaca.data.requests import StockBarsRequest
-        from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
-
-        client = StockHistoricalDataClient(self._api_key, self._secret_key)
-        tf = TimeFrame(minutes, TimeFrameUnit.Minute)
-        result: dict[str, pd.DataFrame] = {}
-
-        # Alpaca limits: request in 30-day chunks to stay within API bounds
-        max_chunk_days = 30
-        batch_size = 10
-
-        for i in range(0, len(symbols), batch_size):
-            batch = symbols[i : i + batch_size]
-            all_chunks: list[pd.DataFrame] = []
-            chunk_start = start
-
-            while chunk_start < end:
-                chunk_end = min(chunk_start + timedelta(days=max_chunk_days), end)
-                try:
-                    request = StockBarsRequest(
-                        symbol_or_symbols=batch,
-                        timeframe=tf,
-                        start=datetime.combine(chunk_start, datetime.min.time()),
-                        end=datetime.combine(chunk_end, datetime.min.time()),
-                    )
-                    bars = client.get_stock_bars(request)
-
-                    for symbol in batch:
-                        if symbol in bars.data and bars.data[symbol]:
-                            data = [
-                                {
-                                    "timestamp": bar.timestamp,
-                                    "open": float(bar.open),
-                                    "high": float(bar.high),
-                                    "low": float(bar.low),
-                                    "close": float(bar.close),
-                                    "volume": int(bar.volume),
-                                }
-                                for bar in bars.data[symbol]
-                            ]
-                            if data:
-                                df = pd.DataFrame(data).set_index("timestamp")
-                                if symbol not in result:
-                                    result[symbol] = df
-                                else:
-                                    result[symbol] = pd.concat([result[symbol], df])
-                except Exception as e:
-                    logger.error("download_error_intraday", batch=batch, error=str(e))
-                chunk_start = chunk_end + timedelta(days=1)
-
-        for symbol in result:
-            result[symbol] = result[symbol][~result[symbol].index.duplicated(keep="first")]
-            result[symbol].sort_index(inplace=True)
-            logger.debug("symbol_downloaded", symbol=symbol, bars=len(result[symbol]), source="alpaca_15min")
-
-        return result
+    def _download_alpaca(self, gaps: dict[tuple[date, date], list[str]], timeframe: str) -> None:
+        """Download all gaps from Alpaca; each finished chunk is merged into the store."""
+        batch_size, chunk_days = _ALPACA_DAILY_CHUNK if timeframe == "1Day" else _ALPACA_INTRADAY_CHUNK
+        chunks = [
+            chunk
+            for (gap_start, gap_end), gap_symbols in sorted(gaps.items())
+            for chunk in plan_chunks(gap_symbols, gap_start, gap_end, batch_size, chunk_days)
+        ]
+
+        def checkpoint(chunk: Chunk, frames: dict[str, pd.DataFrame]) -> None:
+            for symbol in chunk.symbols:
+                if symbol not in frames:
+                    logger.warning("no_data", symbol=symbol, start=str(chunk.start), source="alpaca")
+                self._store.merge(symbol, timeframe, frames.get(symbol), chunk.start, chunk.end)
+
+        downloader = AlpacaBarDownloader(
+            self._api_key,
+            self._secret_key,
+            base_url=self._alpaca_data_url,
+            workers=self._workers,
+            rate_per_minute=self._rate_per_minute,
+        )
+        downloader.download(chunks, timeframe, on_chunk=checkpoint)
 
     # ------------------------------------------------------------------
     # yfinance download (all timeframes — fallback when Alpaca keys missing)
@@ -386,7 +269,7 @@ class DataLoader:
                 all_chunks: list[pd.DataFrame] = []
                 chunk_start = start
 
-                while chunk_start < end:
+                while chunk_start <= end:
                     chunk_end = min(chunk_start + timedelta(days=max_chunk_days), end)
 
                     ticker = yf.Ticker(symbol)
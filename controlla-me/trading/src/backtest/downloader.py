@@ -0,0 +1,310 @@
+"""
+Bar Downloader — concurrent, rate-limited Alpaca historical bars.
+
+A download is split into chunks (a batch of symbols x a date span). Chunks run
+on a bounded thread pool; every HTTP request (including pagination) first
+takes a token from a shared TokenBucket, so throughput is capped by the
+provider quota rather than by serial round-trips. Failed requests (429, 5xx,
+connection errors) are retried with exponentially growing, fully jittered
+waits, honouring Retry-After when the server sends one.
+
+Each finished chunk is handed to ``on_chunk`` on the calling thread. DataLoader
+uses it to merge the bars into the MarketDataCache and record the span as
+fetched, so an interrupted download resumes from the last completed chunk.
+
+Usage:
+    downloader = AlpacaBarDownloader(api_key, secret_key, workers=4)
+    chunks = plan_chunks(symbols, start, end, batch_size=10, chunk_days=30)
+    failed = downloader.download(chunks, "5Min", on_chunk=store_chunk)
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+import pandas as pd
+import requests
+import structlog
+
+logger = structlog.get_logger()
+
+ALPACA_DATA_URL = "https://data.alpaca.markets"
+
+# Alpaca Basic plan: 200 historical data requests per minute
+DEFAULT_RATE_PER_MINUTE = 200
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_RETRIES = 5
+
+# Max bars per page accepted by /v2/stocks/bars
+_PAGE_LIMIT = 10_000
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------------------
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, bursts up to ``capacity``.
+
+    ``acquire()`` reserves a token under the lock and sleeps outside it, so
+    waiting threads queue up in order instead of spinning.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, **kwargs: Any) -> TokenBucket:
+        """Bucket allowing ``requests_per_minute`` with a burst of one second's worth."""
+        rate = requests_per_minute / 60.0
+        return cls(rate, capacity=kwargs.pop("capacity", max(1.0, rate)), **kwargs)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens``, blocking until they are available. Returns seconds waited."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+# ---------------------------------------------------------------------------
+# Chunk planning
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Chunk:
+    """One unit of work: a batch of symbols over an inclusive date span."""
+
+    symbols: tuple[str, ...]
+    start: date
+    end: date
+
+
+def plan_chunks(
+    symbols: list[str],
+    start: date,
+    end: date,
+    batch_size: int,
+    chunk_days: int,
+) -> list[Chunk]:
+    """Split symbols x [start, end] into batches of symbols and spans of chunk_days."""
+    chunks: list[Chunk] = []
+    for i in range(0, len(symbols), batch_size):
+        batch = tuple(symbols[i : i + batch_size])
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+            chunks.append(Chunk(batch, chunk_start, chunk_end))
+            chunk_start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+# ---------------------------------------------------------------------------
+# Downloader
+# ---------------------------------------------------------------------------
+
+class DownloadError(RuntimeError):
+    """A request failed permanently (non-retryable status or retries exhausted)."""
+
+
+class AlpacaBarDownloader:
+    """Fetch /v2/stocks/bars for many chunks concurrently under a shared rate limit."""
+
+    def __init__(
+        self,
+        api_key: str,
+        secret_key: str,
+        base_url: str = ALPACA_DATA_URL,
+        workers: int = DEFAULT_WORKERS,
+        rate_per_minute: float = DEFAULT_RATE_PER_MINUTE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 60.0,
+        timeout: float = 30.0,
+        bucket: TokenBucket | None = None,
+    ) -> None:
+        self._headers = {"APCA-API-KEY-ID": api_key, "APCA-API-SECRET-KEY": secret_key}
+        self._url = base_url.rstrip("/") + "/v2/stocks/bars"
+        self.workers = max(1, workers)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.bucket = bucket or TokenBucket.per_minute(rate_per_minute)
+        self._local = threading.local()
+
+    def download(
+        self,
+        chunks: list[Chunk],
+        timeframe: str,
+        on_chunk: Callable[[Chunk, dict[str, pd.DataFrame]], None],
+    ) -> list[Chunk]:
+        """
+        Fetch every chunk; call ``on_chunk(chunk, frames)`` as each one completes.
+
+        ``on_chunk`` runs on the calling thread, in completion order. Chunks
+        that still fail after retries are logged and returned.
+        """
+        failed: list[Chunk] = []
+        if not chunks:
+            return failed
+
+        logger.info(
+            "alpaca_download_start",
+            chunks=len(chunks),
+            workers=self.workers,
+            timeframe=timeframe,
+        )
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(chunks))) as pool:
+            futures = {pool.submit(self.fetch_chunk, chunk, timeframe): chunk for chunk in chunks}
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    chunk = futures[future]
+                    try:
+                        frames = future.result()
+                    except Exception as e:
+                        failed.append(chunk)
+                        logger.error(
+                            "download_error_alpaca",
+                            symbols=list(chunk.symbols),
+                            start=str(chunk.start),
+                            end=str(chunk.end),
+                            error=str(e),
+                        )
+                        continue
+                    on_chunk(chunk, frames)
+                    logger.debug(
+                        "chunk_downloaded",
+                        progress=f"{done}/{len(chunks)}",
+                        symbols=len(frames),
+                        start=str(chunk.start),
+                        end=str(chunk.end),
+                    )
+            except BaseException:
+                # Ctrl-C / checkpoint failure: don't start queued chunks
+                for future in futures:
+                    future.cancel()
+                raise
+
+        if failed:
+            logger.warning("alpaca_download_incomplete", failed_chunks=len(failed), total=len(chunks))
+        return failed
+
+    def fetch_chunk(self, chunk: Chunk, timeframe: str) -> dict[str, pd.DataFrame]:
+        """All pages of one chunk as dict[symbol, DataFrame] (UTC 'timestamp' index)."""
+        params: dict[str, Any] = {
+            "symbols": ",".join(chunk.symbols),
+            "timeframe": timeframe,
+            "start": f"{chunk.start.isoformat()}T00:00:00Z",
+            "end": f"{(chunk.end + timedelta(days=1)).isoformat()}T00:00:00Z",
+            "limit": _PAGE_LIMIT,
+            "adjustment": "raw",
+        }
+        rows: dict[str, list[dict]] = {}
+        while True:
+            payload = self._get(params)
+            for symbol, bars in (payload.get("bars") or {}).items():
+                rows.setdefault(symbol, []).extend(bars or [])
+            token = payload.get("next_page_token")
+            if not token:
+                break
+            params["page_token"] = token
+
+        return {symbol: _to_frame(bars) for symbol, bars in rows.items() if bars}
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self._headers)
+            self._local.session = session
+        return session
+
+    def _get(self, params: dict[str, Any]) -> dict:
+        """Rate-limited GET with jittered exponential backoff on transient errors."""
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            retry_after: float | None = None
+            try:
+                resp = self._session().get(self._url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if resp.status_code == 200:
+                    return resp.json()
+                if resp.status_code not in _RETRY_STATUS:
+                    raise DownloadError(f"HTTP {resp.status_code}: {resp.text[:200]}")
+                error = f"HTTP {resp.status_code}"
+                retry_after = _retry_after(resp)
+
+            if attempt >= self.max_retries:
+                raise DownloadError(f"{error} after {self.max_retries} retries")
+            wait = self._backoff(attempt, retry_after)
+            logger.warning(
+                "alpaca_request_retry",
+                attempt=attempt + 1,
+                max_retries=self.max_retries,
+                wait_s=round(wait, 2),
+                error=error,
+            )
+            time.sleep(wait)
+        raise DownloadError("unexpected exit from retry loop")
+
+    def _backoff(self, attempt: int, retry_after: float | None) -> float:
+        """Full jitter: uniform(0, min(cap, base * 2**attempt)), at least Retry-After."""
+        wait = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2**attempt))
+        if retry_after is not None:
+            wait = max(wait, min(retry_after, self.backoff_cap))
+        return wait
+
+
+def _retry_after(resp: requests.Response) -> float | None:
+    try:
+        return float(resp.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _to_frame(bars: list[dict]) -> pd.DataFrame:
+    df = pd.DataFrame(
+        {
+            "open": [float(b["o"]) for b in bars],
+            "high": [float(b["h"]) for b in bars],
+            "low": [float(b["l"]) for b in bars],
+            "close": [float(b["c"]) for b in bars],
+            "volume": [int(b["v"]) for b in bars],
+        },
+        index=pd.DatetimeIndex(pd.to_datetime([b["t"] for b in bars], utc=True), name="timestamp"),
+    )
+    return df[~df.index.duplicated(keep="last")].sort_index()
@@ -8,7 +8,7 @@ Supports both daily and hourly timeframes with calibrated indicator periods.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from datetime import date
+from datetime import date, timedelta
 from enum import StrEnum
 
 import numpy as np
@@ -16,7 +16,6 @@ import pandas as pd
 import structlog
 from pydantic import BaseModel, Field
 from ta.momentum import RSIIndicator
-from ta.trend import MACD
 from ta.volatility import BollingerBands
 
 from ..analysis import (
@@ -26,12 +25,20 @@ from ..analysis import (
     precompute_noise_boundaries,
 )
 from ..config.settings import RiskSettings, SignalSettings
+from .bar_store import BarStore, daily_rows_through
+from .data_loader import DataLoader
+from .indicators import IndicatorEngine, PrecomputeCache
+from .metrics import MetricsAccumulator, PerformanceMetrics
+from .pruning import PruneCheck
 
 logger = structlog.get_logger()
 
 # Hours per trading day (US markets: 9:30-16:00 = 6.5h)
 HOURS_PER_DAY = 6.5
 
+# Regime series for the noise_boundary VIX filter (DataLoader.load_regime)
+VIX_SYMBOL = "^VIX"
+
 
 # ---------------------------------------------------------------------------
 # Timeframe-aware indicator settings
@@ -169,6 +176,7 @@ class BacktestConfig(BaseModel):
     trend_filter: bool = True  # require price > SMA long for BUY signals
     timeframe: str = "1Day"  # "1Day", "1Hour", or "15Min"
     strategy: str = "trend_following"  # "trend_following", "mean_reversion", "mean_reversion_v3", "slope_volume", or "noise_boundary"
+    engine: str = "bar"  # "bar" (bar-by-bar loop) or "vectorized" (array fast path, 5Min slope_volume / noise_boundary)
 
     # Daily filter for mean reversion v3 (dual-timeframe)
     daily_filter_enabled: bool = True  # Require daily uptrend for MR v3 entries
@@ -252,6 +260,31 @@ class BacktestConfig(BaseModel):
         return periods["warmup_bars"]
 
 
+# Config fields that only change how open positions are closed: variants that
+# differ in nothing else see the same entry signals (see run_exit_variants).
+# SL/TP multipliers set the levels of each signal but, except for the mean
+# reversion R:R gate, not whether it fires.
+EXIT_PARAMS = frozenset({
+    "stop_loss_atr",
+    "take_profit_atr",
+    "trailing_breakeven_atr",
+    "trailing_lock_atr",
+    "trailing_lock_cushion_atr",
+    "trailing_trail_threshold_atr",
+    "trailing_trail_distance_atr",
+    "trailing_tight_threshold_atr",
+    "trailing_tight_distance_atr",
+    "signal_exit_enabled",
+    "slope_exit_enabled",
+    "slope_exit_lookback_bars",
+    "slope_exit_threshold_pct",
+    "nb_safety_sl_atr",
+    "nb_vwap_exit",
+    "nb_vwap_trailing",
+    "nb_min_hold_bars",
+})
+
+
 class TradeRecord(BaseModel):
     """Record of a completed trade."""
 
@@ -325,6 +358,9 @@ class BacktestResult(BaseModel):
     orders_filled: int
     kill_switch_triggered: bool = False
     kill_switch_date: str | None = None
+    # Set when a prune predicate stopped the run early (see pruning.py)
+    pruned: bool = False
+    pruned_reason: str | None = None
 
     model_config = {"arbitrary_types_allowed": True}
 
@@ -346,6 +382,21 @@ class SignalResult:
     take_profit: float
 
 
+def _signal_from_dict(result: dict | None) -> SignalResult | None:
+    """Wrap a src.analysis signal dict into a SignalResult."""
+    if result is None:
+        return None
+    return SignalResult(
+        symbol=result["symbol"],
+        action=result["action"],
+        score=result["score"],
+        confidence=result["confidence"],
+        entry_price=result["entry_price"],
+        stop_loss=result["stop_loss"],
+        take_profit=result["take_profit"],
+    )
+
+
 def analyze_stock(
     symbol: str,
     df: pd.DataFrame,
@@ -401,18 +452,7 @@ def analyze_stock(
         timeframe=timeframe,
     )
 
-    if result is None:
-        return None
-
-    return SignalResult(
-        symbol=result["symbol"],
-        action=result["action"],
-        score=result["score"],
-        confidence=result["confidence"],
-        entry_price=result["entry_price"],
-        stop_loss=result["stop_loss"],
-        take_profit=result["take_profit"],
-    )
+    return _signal_from_dict(result)
 
 
 def analyze_stock_slope_volume(
@@ -466,17 +506,7 @@ def analyze_stock_slope_volume(
         contrarian=contrarian,
         anticipatory=anticipatory,
     )
-    if result is None:
-        return None
-    return SignalResult(
-        symbol=result["symbol"],
-        action=result["action"],
-        score=result["score"],
-        confidence=result["confidence"],
-        entry_price=result["entry_price"],
-        stop_loss=result["stop_loss"],
-        take_profit=result["take_profit"],
-    )
+    return _signal_from_dict(result)
 
 
 def analyze_stock_mean_reversion(
@@ -670,36 +700,47 @@ def analyze_stock_mean_reversion_v3(
         min_bars=periods["min_bars"],
     )
 
-    if result is None:
-        return None
-
-    return SignalResult(
-        symbol=result["symbol"],
-        action=result["action"],
-        score=result["score"],
-        confidence=result["confidence"],
-        entry_price=result["entry_price"],
-        stop_loss=result["stop_loss"],
-        take_profit=result["take_profit"],
-    )
+    return _signal_from_dict(result)
 
 
 # ---------------------------------------------------------------------------
 # Engine
 # ---------------------------------------------------------------------------
 
+def _window_bounds(dates: list, window: tuple[date, date]) -> tuple[int, int]:
+    """[lo, hi) positions of the bars of ``dates`` whose day falls inside ``window``."""
+    stamps = pd.DatetimeIndex(dates)
+    first = pd.Timestamp(window[0])
+    after_last = pd.Timestamp(window[1] + timedelta(days=1))
+    if stamps.tz is not None:
+        first, after_last = first.tz_localize(stamps.tz), after_last.tz_localize(stamps.tz)
+    return int(stamps.searchsorted(first)), int(stamps.searchsorted(after_last))
+
+
+@dataclass
+class _SharedArrays:
+    """Indicator and price arrays prepared by the first of a batch of exit variants."""
+
+    indicators: IndicatorEngine | None = None
+    bars: BarStore | None = None
+
+
 class BacktestEngine:
     """Bar-by-bar backtesting engine with realistic simulation."""
 
-    def __init__(self, config: BacktestConfig) -> None:
+    def __init__(self, config: BacktestConfig, precomputed: PrecomputeCache | None = None) -> None:
         self.config = config
         self._periods = get_indicator_periods(config.timeframe)
+        # Indicator series shared with other runs over the same data (walk-forward)
+        self._precomputed = precomputed
         self._positions: dict[str, OpenPosition] = {}
         self._pending_orders: list[PendingOrder] = []
         self._cash: float = config.initial_capital
         self._trades: list[TradeRecord] = []
         self._equity_curve: list[dict] = []
         self._daily_returns: list[float] = []
+        # Running statistics over trades/equity/returns (see live_metrics())
+        self._metrics = MetricsAccumulator(config.initial_capital, config.timeframe)
         self._signals_generated: int = 0
         self._orders_filled: int = 0
         self._kill_switch: bool = False
@@ -711,12 +752,24 @@ class BacktestEngine:
         self._prev_equity: float = config.initial_capital
         self._week_start_equity: float = config.initial_capital
         self._bar_count: int = 0
+        self._pruned_reason: str | None = None
 
         # Precomputed noise boundary data (populated in run() for noise_boundary strategy)
         self._nb_data: dict[str, pd.DataFrame] = {}
 
         # VIX daily data for regime filtering (populated in run() if nb_vix_filter=True)
         self._vix_data: pd.DataFrame | None = None
+        # Latest VIX close as of each timeline bar's day (NaN before the first)
+        self._vix_by_bar: np.ndarray | None = None
+
+        # Indicator series precomputed once per symbol (populated in run())
+        self._indicators: IndicatorEngine | None = None
+
+        # OHLCV arrays aligned to the run timeline (populated in run())
+        self._bars: BarStore | None = None
+
+        # Set by run_exit_variants: arrays shared with the other variants of a batch
+        self._shared: _SharedArrays | None = None
 
         # Current bar index (used for min hold time tracking)
         self._current_bar_idx: int = 0
@@ -745,6 +798,9 @@ class BacktestEngine:
         self,
         data: dict[str, pd.DataFrame],
         daily_data: dict[str, pd.DataFrame] | None = None,
+        window: tuple[date, date] | None = None,
+        prune: PruneCheck | None = None,
+        prune_every: int | None = None,
     ) -> BacktestResult:
         """
         Run backtest on historical data.
@@ -752,22 +808,34 @@ class BacktestEngine:
         Args:
             data: dict[symbol, DataFrame] with OHLCV columns, DatetimeIndex.
             daily_data: Optional daily bars for dual-timeframe strategies (v3).
+            window: Optional (first_day, last_day) to simulate. Bars before the
+                window still feed the indicators and count toward warmup, so a
+                window starts trading immediately when enough history precedes it.
+            prune: Optional predicate called with (live metrics, fraction of bars
+                done) at every checkpoint; a truthy return stops the run there
+                and marks the result pruned. Bar loop only — the vectorized
+                path always runs to the end.
+            prune_every: Bars between prune checkpoints (default: one week of bars).
 
         Returns:
             BacktestResult with trades, equity curve, and metrics inputs.
         """
-        self._daily_data = daily_data  # Store for use in _generate_signals
-
         # Precompute noise boundaries if using noise_boundary strategy
         if self.config.strategy == "noise_boundary":
             logger.info("precomputing_noise_boundaries", symbols=len(data))
+            nb_params = {
+                "lookback_days": self.config.nb_lookback_days,
+                "band_mult": self.config.nb_band_mult,
+                "trade_freq_bars": self.config.nb_trade_freq_bars,
+            }
             for symbol, df in data.items():
-                self._nb_data[symbol] = precompute_noise_boundaries(
-                    df,
-                    lookback_days=self.config.nb_lookback_days,
-                    band_mult=self.config.nb_band_mult,
-                    trade_freq_bars=self.config.nb_trade_freq_bars,
-                )
+                if self._precomputed is None:
+                    self._nb_data[symbol] = precompute_noise_boundaries(df, **nb_params)
+                else:
+                    self._nb_data[symbol] = self._precomputed.get(
+                        df, ("noise_boundary", tuple(nb_params.items())),
+                        lambda df=df: precompute_noise_boundaries(df, **nb_params),
+                    )
             logger.info("noise_boundaries_ready", symbols=len(self._nb_data))
 
         # Load VIX data for regime filtering (noise_boundary + nb_vix_filter)
@@ -798,9 +866,37 @@ class BacktestEngine:
             # Run on test set only (train is warmup + parameter fitting)
             dates = test_dates
 
-        total_bars = len(dates)
         warmup = self.config.effective_warmup_bars()
 
+        if window is not None:
+            lo, hi = _window_bounds(dates, window)
+            if lo >= hi:
+                logger.error("no_data_in_window", start=str(window[0]), end=str(window[1]))
+                return self._build_result(0)
+            # Bars before the window are history, not simulation
+            warmup = max(0, warmup - lo)
+            dates = dates[lo:hi]
+
+        total_bars = len(dates)
+
+        if self._shared is not None and self._shared.indicators is not None:
+            # Exit variant of an earlier run: same timeline, same entry signals
+            self._indicators = self._shared.indicators.shared_view(self.config)
+            self._bars = self._shared.bars
+        else:
+            # Precompute indicator series once — per-bar reads are O(1) instead of
+            # re-slicing and recomputing the whole history every bar
+            self._indicators = IndicatorEngine(self.config, self._periods, cache=self._precomputed)
+            self._indicators.prepare(data, dates, daily_data)
+            # Same for prices: integer-indexed arrays instead of df.loc per position per bar
+            self._bars = BarStore(data, dates)
+            if self._shared is not None:
+                self._shared.indicators, self._shared.bars = self._indicators, self._bars
+                self._indicators = self._indicators.shared_view(self.config)
+
+        if self._vix_data is not None:
+            self._join_vix(dates)
+
         logger.info(
             "backtest_start",
             start=str(dates[0]),
@@ -812,8 +908,27 @@ class BacktestEngine:
             warmup_bars=warmup,
         )
 
+        # Array fast path: same result as the loop below for the configs it supports
+        if self.config.engine == "vectorized":
+            from .vectorized import run_vectorized, unsupported_reason
+
+            reason = unsupported_reason(self.config)
+            if reason is None:
+                run_vectorized(self, data, dates, warmup)
+                logger.info(
+                    "backtest_complete",
+                    trades=len(self._trades),
+                    final_equity=round(self._cash, 2),
+                    kill_switches=self._kill_switch_count,
+                    timeframe=self.config.timeframe,
+                    engine="vectorized",
+                )
+                return self._build_result(total_bars)
+            logger.warning("vectorized_engine_fallback", reason=reason)
+
         # Track previous day for daily return calculation in hourly mode
         prev_day: str | None = None
+        checkpoint = max(1, prune_every or self._week_bars)
 
         for bar_idx, current_date in enumerate(dates):
             self._current_bar_idx = bar_idx
@@ -880,6 +995,7 @@ class BacktestEngine:
             if self._prev_equity > 0:
                 bar_ret = (equity - self._prev_equity) / self._prev_equity
                 self._daily_returns.append(bar_ret)
+                self._metrics.add_return(bar_ret)
             self._prev_equity = equity
 
             # Weekly reset
@@ -887,6 +1003,21 @@ class BacktestEngine:
             if self._bar_count % self._week_bars == 0:
                 self._week_start_equity = equity
 
+            # Pruning checkpoint — stop runs that can no longer be worth finishing
+            if prune is not None and (bar_idx + 1) % checkpoint == 0 and bar_idx + 1 < total_bars:
+                verdict = prune(self.live_metrics(), (bar_idx + 1) / total_bars)
+                if verdict:
+                    self._pruned_reason = verdict if isinstance(verdict, str) else "prune_predicate"
+                    logger.info(
+                        "backtest_pruned",
+                        date=date_str,
+                        bars_done=bar_idx + 1,
+                        total_bars=total_bars,
+                        reason=self._pruned_reason,
+                    )
+                    dates = dates[: bar_idx + 1]
+                    break
+
         # Close remaining positions at end
         if self._positions:
             last_date = dates[-1]
@@ -935,13 +1066,10 @@ class BacktestEngine:
             if order.symbol not in data:
                 continue
 
-            df = data[order.symbol]
-            if current_date not in df.index:
+            open_price = self._bars.price(order.symbol, self._current_bar_idx, "open")
+            if open_price is None:
                 continue
 
-            bar = df.loc[current_date]
-            open_price = float(bar["open"])
-
             # Apply slippage
             slippage = open_price * (self.config.slippage_bps / 10_000)
             if order.action == TradeAction.BUY:
@@ -1075,14 +1203,10 @@ class BacktestEngine:
         for symbol, pos in self._positions.items():
             if symbol not in data:
                 continue
-            df = data[symbol]
-            if current_date not in df.index:
+            bar = self._bars.bar(symbol, self._current_bar_idx)
+            if bar is None:
                 continue
-
-            bar = df.loc[current_date]
-            low = float(bar["low"])
-            high = float(bar["high"])
-            close_price = float(bar["close"])
+            _, high, low, close_price = bar
 
             atr = pos.atr_at_entry
 
@@ -1194,20 +1318,18 @@ class BacktestEngine:
         for symbol, pos in self._positions.items():
             if symbol not in data:
                 continue
-            df = data[symbol]
-            mask = df.index <= current_date
-            df_slice = df[mask]
+            n = self._indicators.bars_available(symbol, self._current_bar_idx)
 
-            if len(df_slice) < lookback * 2:
+            if n < lookback * 2:
                 continue
 
-            close = df_slice["close"]
-            current_price = float(close.iloc[-1])
+            close = self._indicators.close(symbol)
+            current_price = float(close[n - 1])
             if current_price <= 0:
                 continue
 
             # Current slope (OLS linear regression — same math as analyze_slope_volume)
-            y_curr = close.tail(lookback).values
+            y_curr = close[n - lookback:n]
             x_curr = np.arange(len(y_curr), dtype=float)
             x_mean_c, y_mean_c = x_curr.mean(), y_curr.mean()
             denom_c = float(np.sum((x_curr - x_mean_c) ** 2))
@@ -1219,7 +1341,7 @@ class BacktestEngine:
             slope_pct = (slope_raw / current_price) * 100
 
             # Previous slope (for reversal detection)
-            y_prev = close.iloc[-(lookback * 2):-lookback].values
+            y_prev = close[n - lookback * 2:n - lookback]
             x_prev = np.arange(len(y_prev), dtype=float)
             x_mean_p, y_mean_p = x_prev.mean(), y_prev.mean()
             denom_p = float(np.sum((x_prev - x_mean_p) ** 2))
@@ -1287,37 +1409,29 @@ class BacktestEngine:
         for symbol, pos in self._positions.items():
             if symbol not in data:
                 continue
-            df = data[symbol]
-            mask = df.index <= current_date
-            df_slice = df[mask]
+            n = self._indicators.bars_available(symbol, self._current_bar_idx)
 
             min_bars = self._periods["min_bars"]
-            if len(df_slice) < min_bars:
+            if n < min_bars:
                 continue
 
             try:
-                close = df_slice["close"]
-
-                # MACD bearish crossover detection
-                macd_ind = MACD(
-                    close,
-                    window_slow=self._periods["macd_slow"],
-                    window_fast=self._periods["macd_fast"],
-                    window_sign=self._periods["macd_signal"],
-                )
-                macd_series = macd_ind.macd()
-                signal_series = macd_ind.macd_signal()
+                # MACD bearish crossover detection (series precomputed per run)
+                macd = self._indicators.exit_macd(symbol)
+                if macd is None:
+                    continue
+                macd_series, signal_series = macd
 
-                if len(macd_series) < 3:
+                if n < 3:
                     continue
 
                 # Check bearish crossover in last 2 bars
                 lookback = self._periods.get("crossover_lookback", 3)
-                for lb in range(1, min(lookback + 1, len(macd_series))):
-                    prev_macd = float(macd_series.iloc[-(lb + 1)])
-                    prev_signal = float(signal_series.iloc[-(lb + 1)])
-                    curr_macd = float(macd_series.iloc[-lb])
-                    curr_signal = float(signal_series.iloc[-lb])
+                for lb in range(1, min(lookback + 1, n)):
+                    prev_macd = float(macd_series[n - 1 - lb])
+                    prev_signal = float(signal_series[n - 1 - lb])
+                    curr_macd = float(macd_series[n - lb])
+                    curr_signal = float(signal_series[n - lb])
 
                     if np.isnan(prev_macd) or np.isnan(curr_macd):
                         continue
@@ -1358,20 +1472,13 @@ class BacktestEngine:
 
         # Macro filter: skip if SPY is below its SMA medium
         # (disabled for noise_boundary — NB can go short in downtrends)
-        sma_medium_period = self._periods["sma_medium"]
         if self.config.trend_filter and self.config.strategy != "noise_boundary" and "SPY" in data:
-            spy_df = data["SPY"]
-            spy_mask = spy_df.index <= current_date
-            spy_slice = spy_df[spy_mask]
-            if len(spy_slice) >= sma_medium_period:
-                spy_price = float(spy_slice["close"].iloc[-1])
-                spy_sma = float(spy_slice["close"].tail(sma_medium_period).mean())
-                if spy_price < spy_sma:
-                    return  # Market in downtrend — sit out
+            if self._indicators.spy_below_sma(bar_idx):
+                return  # Market in downtrend — sit out
 
         min_bars = self._periods["min_bars"]
 
-        for symbol, full_df in data.items():
+        for symbol in data:
             if symbol in self._positions:
                 continue  # Already have a position
             # 15-min: respect per-symbol stop-loss cooldown (avoid falling knives)
@@ -1380,18 +1487,15 @@ class BacktestEngine:
             if len(self._positions) + len(self._pending_orders) >= self.config.max_positions:
                 break
 
-            # Slice data up to and including current bar (NO look-ahead)
-            mask = full_df.index <= current_date
-            df_slice = full_df[mask]
-
-            if len(df_slice) < min_bars:
+            # Bars up to and including current bar (NO look-ahead)
+            if self._indicators.bars_available(symbol, bar_idx) < min_bars:
                 continue  # Not enough history for indicators
 
             # Analyze stock — route to appropriate strategy
             if self.config.strategy == "noise_boundary":
                 # NB VIX regime filter: skip entries when VIX < threshold (low vol = no momentum edge)
                 if self.config.nb_vix_filter:
-                    vix_val = self._get_vix_for_date(current_date)
+                    vix_val = self._vix_at(bar_idx)
                     if vix_val is not None and vix_val < self.config.nb_vix_threshold:
                         continue  # Low vol regime — skip momentum entries
 
@@ -1451,72 +1555,10 @@ class BacktestEngine:
                     take_profit=round(tp, 4),
                 )
 
-            elif self.config.strategy == "mean_reversion_v3":
-                # v3: dual-timeframe — slice daily data up to current date
-                daily_slice = None
-                if self._daily_data and symbol in self._daily_data:
-                    daily_df = self._daily_data[symbol]
-                    # For 15-min bars, get the corresponding daily date
-                    current_day = current_date.date() if hasattr(current_date, "date") else current_date
-                    # Slice daily data up to the current trading day (no look-ahead)
-                    # Handle tz-aware vs tz-naive comparison safely
-                    try:
-                        ts_day = pd.Timestamp(current_day)
-                        if daily_df.index.tz is not None:
-                            ts_day = ts_day.tz_localize(daily_df.index.tz)
-                        daily_mask = daily_df.index.normalize() <= ts_day
-                        daily_slice = daily_df[daily_mask]
-                        if len(daily_slice) == 0:
-                            daily_slice = None
-                    except Exception:
-                        daily_slice = None
-
-                signal = analyze_stock_mean_reversion_v3(
-                    symbol,
-                    df_slice,
-                    daily_slice,
-                    self.config.signal,
-                    self.config,
-                )
-            elif self._is_five_min or self.config.strategy == "slope_volume":
-                signal = analyze_stock_slope_volume(
-                    symbol,
-                    df_slice,
-                    lookback_bars=self.config.slope_lookback_bars,
-                    slope_threshold_pct=self.config.slope_threshold_pct,
-                    volume_multiplier=self.config.slope_volume_multiplier,
-                    volume_ma_period=self.config.slope_volume_ma_period,
-                    stop_loss_atr=self.config.stop_loss_atr,
-                    take_profit_atr=self.config.take_profit_atr,
-                    acceleration_bars=self.config.slope_acceleration_bars,
-                    min_acceleration_pct=self.config.slope_min_acceleration_pct,
-                    volume_trend_bars=self.config.slope_volume_trend_bars,
-                    persistence_bars=self.config.slope_persistence_bars,
-                    contrarian=self.config.slope_contrarian,
-                    anticipatory=self.config.slope_anticipatory,
-                )
-            elif self._is_fifteen_min or self.config.strategy == "mean_reversion":
-                signal = analyze_stock_mean_reversion(
-                    symbol,
-                    df_slice,
-                    self.config.signal,
-                    threshold=self.config.signal_threshold,
-                    stop_loss_atr=self.config.stop_loss_atr,
-                    take_profit_atr=self.config.take_profit_atr,
-                    trend_filter=self.config.trend_filter,
-                    timeframe=self.config.timeframe,
-                )
             else:
-                signal = analyze_stock(
-                    symbol,
-                    df_slice,
-                    self.config.signal,
-                    threshold=self.config.signal_threshold,
-                    stop_loss_atr=self.config.stop_loss_atr,
-                    take_profit_atr=self.config.take_profit_atr,
-                    trend_filter=self.config.trend_filter,
-                    timeframe=self.config.timeframe,
-                )
+                # slope_volume / mean_reversion(_v3) / trend_following — routed by IndicatorEngine
+                # (v3 reads its daily trend filter from the daily bars mapped in prepare())
+                signal = _signal_from_dict(self._indicators.entry_signal(symbol, bar_idx))
 
             if signal is None:
                 continue
@@ -1732,47 +1774,40 @@ class BacktestEngine:
     # ------------------------------------------------------------------
 
     def _load_vix_data(self) -> None:
-        """Load daily VIX data via yfinance for regime filtering."""
+        """Load daily VIX bars (DataLoader Parquet cache, downloaded once) for regime filtering."""
         try:
-            import yfinance as yf
-        except ImportError:
-            logger.warning("yfinance_not_installed", msg="VIX filter disabled — pip install yfinance")
+            df = DataLoader().load_regime(VIX_SYMBOL, self.config.start, self.config.end)
+        except Exception as e:
+            logger.error("vix_load_error", error=str(e), msg="VIX filter disabled")
             self.config.nb_vix_filter = False
             return
 
+        if df is None or df.empty:
+            logger.warning("vix_data_empty", msg="VIX filter disabled")
+            self.config.nb_vix_filter = False
+            return
+        self._vix_data = df
+        logger.info("vix_data_loaded", bars=len(df), start=str(self.config.start), end=str(self.config.end))
+
+    def _join_vix(self, dates: list) -> None:
+        """As-of join: the most recent VIX close on or before each bar's day (no look-ahead)."""
+        vix = self._vix_data
+        if not vix.index.is_monotonic_increasing:
+            vix = vix.sort_index(kind="stable")
         try:
-            start_str = str(self.config.start)
-            end_str = str(self.config.end)
-            ticker = yf.Ticker("^VIX")
-            df = ticker.history(start=start_str, end=end_str, interval="1d", auto_adjust=True)
-            if df is not None and len(df) > 0:
-                df.columns = [c.lower() for c in df.columns]
-                df.index.name = "timestamp"
-                self._vix_data = df
-                logger.info("vix_data_loaded", bars=len(df), start=start_str, end=end_str)
-            else:
-                logger.warning("vix_data_empty", msg="VIX filter disabled")
-                self.config.nb_vix_filter = False
+            rows = daily_rows_through(vix.index, pd.Index(dates))
         except Exception as e:
-            logger.error("vix_download_error", error=str(e), msg="VIX filter disabled")
-            self.config.nb_vix_filter = False
+            logger.warning("vix_join_failed", error=str(e))
+            return
+        close = vix["close"].to_numpy(dtype=float)
+        self._vix_by_bar = np.where(rows > 0, close[np.maximum(rows - 1, 0)], np.nan)
 
-    def _get_vix_for_date(self, current_date) -> float | None:
-        """Get the VIX close value for a given date (maps intraday bars to daily VIX)."""
-        if self._vix_data is None or self._vix_data.empty:
+    def _vix_at(self, bar_idx: int) -> float | None:
+        """VIX close for the day of timeline bar ``bar_idx``, or None if unknown."""
+        if self._vix_by_bar is None:
             return None
-        try:
-            day = current_date.date() if hasattr(current_date, "date") else current_date
-            ts_day = pd.Timestamp(day)
-            if self._vix_data.index.tz is not None:
-                ts_day = ts_day.tz_localize(self._vix_data.index.tz)
-            # Find the most recent VIX value on or before this date (no look-ahead)
-            mask = self._vix_data.index.normalize() <= ts_day
-            if mask.any():
-                return float(self._vix_data.loc[mask, "close"].iloc[-1])
-        except Exception:
-            pass
-        return None
+        value = self._vix_by_bar[bar_idx]
+        return None if np.isnan(value) else float(value)
 
     # ------------------------------------------------------------------
     # VWAP-based exit (Maroy 2025 improvement)
@@ -1884,8 +1919,8 @@ class BacktestEngine:
         """Calculate total portfolio value (cash + long positions - short liabilities)."""
         positions_value = 0.0
         for symbol, pos in self._positions.items():
-            if symbol in data and current_date in data[symbol].index:
-                price = float(data[symbol].loc[current_date, "close"])
+            price = self._bars.price(symbol, self._current_bar_idx)
+            if price is not None:
                 # Long: +shares × price. Short: -shares × price (liability).
                 positions_value += pos.direction * pos.shares * price
             else:
@@ -1899,24 +1934,25 @@ class BacktestEngine:
         """Record end-of-day equity snapshot."""
         positions_value = 0.0
         for symbol, pos in self._positions.items():
-            if symbol in data and current_date in data[symbol].index:
-                price = float(data[symbol].loc[current_date, "close"])
+            price = self._bars.price(symbol, self._current_bar_idx)
+            if price is not None:
                 positions_value += pos.direction * pos.shares * price
             else:
                 positions_value += pos.direction * pos.cost_basis
 
-        peak = max(e["equity"] for e in self._equity_curve) if self._equity_curve else equity
-        peak = max(peak, equity)
+        peak = max(self._metrics.peak, equity) if self._metrics.points else equity
         drawdown_pct = ((equity - peak) / peak) * 100 if peak > 0 else 0.0
 
-        self._equity_curve.append({
+        point = {
             "date": date_str,
             "equity": round(equity, 2),
             "cash": round(self._cash, 2),
             "positions_value": round(positions_value, 2),
             "drawdown_pct": round(drawdown_pct, 2),
             "positions_count": len(self._positions),
-        })
+        }
+        self._equity_curve.append(point)
+        self._metrics.add_equity(point)
 
     def _record_trade(
         self, pos: OpenPosition, exit_price: float, exit_date: str, reason: CloseReason
@@ -1936,25 +1972,25 @@ class BacktestEngine:
         except (ValueError, TypeError):
             hold_days = 0
 
-        self._trades.append(
-            TradeRecord(
-                symbol=pos.symbol,
-                action=TradeAction.BUY if pos.direction == 1 else TradeAction.SHORT,
-                entry_date=pos.entry_date,
-                entry_price=round(pos.entry_price, 2),
-                exit_date=exit_date,
-                exit_price=round(exit_price, 2),
-                shares=pos.shares,
-                pnl=round(pnl, 2),
-                pnl_pct=round(pnl_pct, 2),
-                hold_days=hold_days,
-                close_reason=reason,
-                stop_loss=pos.stop_loss,
-                take_profit=pos.take_profit,
-                signal_score=pos.signal_score,
-                signal_confidence=pos.signal_confidence,
-            )
+        trade = TradeRecord(
+            symbol=pos.symbol,
+            action=TradeAction.BUY if pos.direction == 1 else TradeAction.SHORT,
+            entry_date=pos.entry_date,
+            entry_price=round(pos.entry_price, 2),
+            exit_date=exit_date,
+            exit_price=round(exit_price, 2),
+            shares=pos.shares,
+            pnl=round(pnl, 2),
+            pnl_pct=round(pnl_pct, 2),
+            hold_days=hold_days,
+            close_reason=reason,
+            stop_loss=pos.stop_loss,
+            take_profit=pos.take_profit,
+            signal_score=pos.signal_score,
+            signal_confidence=pos.signal_confidence,
         )
+        self._trades.append(trade)
+        self._metrics.add_trade(trade)
 
     def _close_all_positions(
         self, data: dict[str, pd.DataFrame], current_date, date_str: str, reason: CloseReason
@@ -1962,9 +1998,8 @@ class BacktestEngine:
         """Close all open positions (both long and short)."""
         for symbol in list(self._positions.keys()):
             pos = self._positions[symbol]
-            if symbol in data and current_date in data[symbol].index:
-                exit_price = float(data[symbol].loc[current_date, "close"])
-            else:
+            exit_price = self._bars.price(symbol, self._current_bar_idx)
+            if exit_price is None:
                 exit_price = pos.entry_price
 
             if pos.direction == 1:
@@ -1976,6 +2011,10 @@ class BacktestEngine:
             self._record_trade(pos, exit_price, date_str, reason)
             del self._positions[symbol]
 
+    def live_metrics(self) -> PerformanceMetrics:
+        """Metrics of the run so far, O(1) — usable mid-run (early stopping, progress)."""
+        return self._metrics.snapshot()
+
     def _build_result(self, total_bars: int) -> BacktestResult:
         """Build final result object."""
         return BacktestResult(
@@ -1988,4 +2027,56 @@ class BacktestEngine:
             orders_filled=self._orders_filled,
             kill_switch_triggered=self._kill_switch_count > 0,
             kill_switch_date=self._kill_switch_date,
+            pruned=self._pruned_reason is not None,
+            pruned_reason=self._pruned_reason,
         )
+
+
+# ---------------------------------------------------------------------------
+# Exit-parameter batches
+# ---------------------------------------------------------------------------
+
+def run_exit_variants(
+    config: BacktestConfig,
+    variants: list[dict],
+    data: dict[str, pd.DataFrame],
+    daily_data: dict[str, pd.DataFrame] | None = None,
+    window: tuple[date, date] | None = None,
+    prune: PruneCheck | None = None,
+    precomputed: PrecomputeCache | None = None,
+) -> list[BacktestResult]:
+    """
+    Backtest ``config`` once per exit-parameter set, computing entry signals once.
+
+    Each variant is ``config.model_copy(update=params)`` and may only set
+    EXIT_PARAMS. The timeline, indicator series, price arrays and the entry
+    evaluations that found no signal are computed by the first variant and
+    reused by the rest. Fills, positions and cash are path-dependent — a
+    different exit frees capital on a different bar — so every variant still
+    simulates its own portfolio; its result is identical to a standalone
+    ``BacktestEngine(variant).run(...)``.
+
+    Args:
+        config: Base configuration (entry, sizing and risk parameters).
+        variants: Exit-parameter overrides, one dict per variant.
+        data, daily_data, window, prune: As for BacktestEngine.run.
+        precomputed: Optional cache shared with runs outside this batch.
+
+    Returns:
+        One BacktestResult per variant, in the order of ``variants``.
+    """
+    for params in variants:
+        extra = set(params) - EXIT_PARAMS
+        if extra:
+            raise ValueError(f"run_exit_variants: not exit parameters: {sorted(extra)}")
+
+    # Also shares the noise-boundary frames, which live outside IndicatorEngine
+    if precomputed is None:
+        precomputed = PrecomputeCache()
+    shared = _SharedArrays()
+    results = []
+    for params in variants:
+        engine = BacktestEngine(config.model_copy(update=params), precomputed=precomputed)
+        engine._shared = shared
+        results.append(engine.run(data, daily_data=daily_data, window=window, prune=prune))
+    return results
@@ -7,21 +7,29 @@ Results saved to CSV sorted by Sharpe ratio.
 Usage:
     python -m src.backtest grid --start 2024-03-01 --end 2026-02-28
     python -m src.backtest grid --start 2024-03-01 --end 2026-02-28 --timeframe 1Hour
+    python -m src.backtest grid --start 2024-03-01 --end 2026-02-28 --workers 8
+    python -m src.backtest grid --start 2024-03-01 --end 2026-02-28 --prune --halving-rungs 3
 """
 
 from __future__ import annotations
 
 import csv
 import itertools
+import math
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
 from datetime import date, datetime
 from pathlib import Path
 
 import structlog
 
 from .data_loader import DataLoader
-from .engine import BacktestConfig, BacktestEngine
-from .metrics import calculate_metrics
+from .engine import EXIT_PARAMS, BacktestConfig, BacktestResult
+from .metrics import PerformanceMetrics
+from .pruning import PruneRule, halving_windows, promote
+from .result_cache import ResultCache, data_fingerprint, run_backtests
+from .shared_data import SharedFrames, SharedFramesHandle, attach
 
 logger = structlog.get_logger()
 
@@ -140,6 +148,251 @@ CYCLE4B_GRID = {
     "max_positions": [10],                              # fixed
 }
 
+# --grid-preset name -> grid (grid and walkforward commands)
+GRID_PRESETS = {
+    "default": PARAM_GRID,
+    "tpsl": TPSL_OPTIMIZATION_GRID,
+    "cycle4": CYCLE4_GRID,
+    "cycle4b": CYCLE4B_GRID,
+}
+
+
+# Metric columns appended after the grid params + timeframe in every CSV row
+RESULT_COLUMNS = [
+    "total_return_pct",
+    "cagr_pct",
+    "sharpe_ratio",
+    "sortino_ratio",
+    "max_drawdown_pct",
+    "win_rate_pct",
+    "profit_factor",
+    "total_trades",
+    "avg_win_pct",
+    "avg_loss_pct",
+    "avg_hold_days",
+    "exposure_pct",
+    "final_equity",
+    "stop_loss_count",
+    "take_profit_count",
+    "signal_exit_count",
+    "go_nogo",
+    "kill_switches",
+    "pruned",
+]
+
+
+# ---------------------------------------------------------------------------
+# Single combination
+# ---------------------------------------------------------------------------
+
+_result_cache: ResultCache | None = None  # opened lazily, once per process
+
+def _build_config(params: dict, settings: dict) -> BacktestConfig:
+    """BacktestConfig for one combination (grid params over run-level settings)."""
+    return BacktestConfig(
+        start=settings["start"],
+        end=settings["end"],
+        initial_capital=settings["initial_capital"],
+        timeframe=settings["timeframe"],
+        stop_loss_atr=params.get("stop_loss_atr", 2.0),
+        take_profit_atr=params.get("take_profit_atr", 4.0),
+        trend_filter=params.get("trend_filter", True),
+        max_positions=params.get("max_positions", 10),
+        signal_threshold=params.get("signal_threshold", 0.3),
+        slippage_bps=params.get("slippage_bps", 4.0),
+        # 4-tier trailing stop params
+        trailing_breakeven_atr=params.get("trailing_breakeven_atr", 1.0),
+        trailing_lock_atr=params.get("trailing_lock_atr", 1.5),
+        trailing_lock_cushion_atr=params.get("trailing_lock_cushion_atr", 0.5),
+        trailing_trail_threshold_atr=params.get("trailing_trail_threshold_atr", 2.5),
+        trailing_trail_distance_atr=params.get("trailing_trail_distance_atr", 1.5),
+        trailing_tight_threshold_atr=params.get("trailing_tight_threshold_atr", 4.0),
+        trailing_tight_distance_atr=params.get("trailing_tight_distance_atr", 1.0),
+        # Signal exit
+        signal_exit_enabled=params.get("signal_exit_enabled", False),
+        engine=settings["engine"],
+    )
+
+
+def _evaluate_batch(batch: list[dict], settings: dict, data: dict) -> list[dict]:
+    """
+    Run (or reuse cached results of) combinations that differ only in exit
+    parameters, computing their entry signals once; one CSV row per combination.
+    """
+    global _result_cache
+    cache = None
+    if settings["fingerprint"] is not None:
+        if _result_cache is None:
+            _result_cache = ResultCache()
+        cache = _result_cache
+    outcomes = run_backtests(
+        [_build_config(params, settings) for params in batch],
+        data,
+        cache=cache,
+        fingerprint=settings["fingerprint"],
+        window=settings.get("window"),
+        prune=settings.get("prune"),
+    )
+    return [_row(params, settings, result, metrics) for params, (result, metrics) in zip(batch, outcomes)]
+
+
+def _row(params: dict, settings: dict, result: BacktestResult, metrics: PerformanceMetrics) -> dict:
+    """CSV row of one combination."""
+    return {
+        **params,
+        "timeframe": settings["timeframe"],
+        "total_return_pct": metrics.total_return_pct,
+        "cagr_pct": metrics.cagr_pct,
+        "sharpe_ratio": metrics.sharpe_ratio,
+        "sortino_ratio": metrics.sortino_ratio,
+        "max_drawdown_pct": metrics.max_drawdown_pct,
+        "win_rate_pct": metrics.win_rate_pct,
+        "profit_factor": metrics.profit_factor,
+        "total_trades": metrics.total_trades,
+        "avg_win_pct": metrics.avg_win_pct,
+        "avg_loss_pct": metrics.avg_loss_pct,
+        "avg_hold_days": metrics.avg_hold_days,
+        "exposure_pct": metrics.exposure_pct,
+        "final_equity": metrics.final_equity,
+        "stop_loss_count": metrics.stop_loss_count,
+        "take_profit_count": metrics.take_profit_count,
+        "signal_exit_count": metrics.signal_exit_count,
+        "go_nogo": metrics.go_nogo["pass"],
+        "kill_switches": 1 if result.kill_switch_triggered else 0,
+        "pruned": result.pruned_reason or "",
+    }
+
+
+def _exit_batches(combos: list[tuple[int, dict]], parts: int) -> list[list[tuple[int, dict]]]:
+    """
+    Group combinations sharing every non-exit parameter (same entry signals),
+    split each group into up to ``parts`` batches so a pool stays busy.
+    """
+    groups: dict[tuple, list[tuple[int, dict]]] = {}
+    for idx, params in combos:
+        entry_key = tuple(sorted((k, v) for k, v in params.items() if k not in EXIT_PARAMS))
+        groups.setdefault(entry_key, []).append((idx, params))
+    batches = []
+    for group in groups.values():
+        size = math.ceil(len(group) / max(1, parts))
+        batches.extend(group[i:i + size] for i in range(0, len(group), size))
+    return batches
+
+
+def _param_summary(params: dict) -> str:
+    """Compact one-line description of a combination."""
+    param_parts = [
+        f"SL={params.get('stop_loss_atr', '-')}x",
+        f"TP={params.get('take_profit_atr', '-')}x",
+    ]
+    if "trailing_breakeven_atr" in params:
+        param_parts.append(f"tBE={params['trailing_breakeven_atr']}x")
+    if "trailing_trail_threshold_atr" in params:
+        param_parts.append(f"tTH={params['trailing_trail_threshold_atr']}x")
+    if "trailing_trail_distance_atr" in params:
+        param_parts.append(f"tTR={params['trailing_trail_distance_atr']}x")
+    if "signal_exit_enabled" in params:
+        param_parts.append(f"sigExit={'ON' if params['signal_exit_enabled'] else 'OFF'}")
+    param_parts.append(f"trend={'ON' if params.get('trend_filter', True) else 'OFF'}")
+    param_parts.append(f"pos={params.get('max_positions', 10)}")
+    return " ".join(param_parts)
+
+
+def _result_summary(row: dict) -> str:
+    """Quick metrics summary printed after each combination."""
+    go_str = "GO" if row["go_nogo"] else "NO-GO"
+    if row.get("pruned"):
+        go_str = f"PRUNED: {row['pruned']}"
+    return (
+        f"Sharpe={row['sharpe_ratio']:+.2f} "
+        f"DD={row['max_drawdown_pct']:.1f}% "
+        f"WR={row['win_rate_pct']:.0f}% "
+        f"PF={row['profit_factor']:.2f} "
+        f"T={row['total_trades']} "
+        f"SL={row['stop_loss_count']} TP={row['take_profit_count']} SE={row['signal_exit_count']} "
+        f"[{go_str}]"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Worker process state (ProcessPoolExecutor initializer)
+# ---------------------------------------------------------------------------
+
+_worker_shm = None
+_worker_data: dict = {}
+
+
+def _init_worker(handle: SharedFramesHandle) -> None:
+    """Attach once per worker to the frames published by the parent."""
+    global _worker_shm, _worker_data
+    _worker_shm, _worker_data = attach(handle)
+
+
+def _batch_outcomes(
+    batch: list[tuple[int, dict]], settings: dict, data: dict
+) -> list[tuple[int, dict | None, str | None]]:
+    """(combination index, row or None, error or None) per combination of a batch."""
+    try:
+        rows = _evaluate_batch([params for _, params in batch], settings, data)
+        return [(idx, row, None) for (idx, _), row in zip(batch, rows)]
+    except Exception as e:
+        return [(idx, None, str(e)) for idx, _ in batch]
+
+
+def _run_batch(batch: list[tuple[int, dict]], settings: dict) -> list[tuple[int, dict | None, str | None]]:
+    """Pool task: _batch_outcomes on the worker's attached frames."""
+    return _batch_outcomes(batch, settings, _worker_data)
+
+
+def _evaluate_all(
+    combos: list[tuple[int, dict]],
+    settings: dict,
+    data: dict,
+    pool: ProcessPoolExecutor | None,
+    on_row,
+    workers: int = 1,
+) -> None:
+    """
+    Evaluate (index, params) combinations serially or on the pool; on_row per outcome.
+
+    Combinations that differ only in exit parameters run as one batch sharing
+    their entry signals (engine.run_exit_variants); with a pool each such group
+    is split into up to ``workers`` batches.
+    """
+    total = len(combos)
+    params_of = dict(combos)
+    n_done = 0
+
+    def _report(outcomes: list[tuple[int, dict | None, str | None]]) -> None:
+        nonlocal n_done
+        for idx, row, error in outcomes:
+            n_done += 1
+            print(f"  [{n_done}/{total}] {_param_summary(params_of[idx])} ... ", end="")
+            on_row(idx, row, error, params_of[idx])
+
+    if pool is None:
+        for batch in _exit_batches(combos, 1):
+            _report(_batch_outcomes(batch, settings, data))
+        return
+
+    pending = [pool.submit(_run_batch, batch, settings) for batch in _exit_batches(combos, workers)]
+    for future in as_completed(pending):
+        _report(future.result())
+
+
+def _ranked(completed: list[tuple[int, dict]]) -> list[dict]:
+    """Rows by Sharpe (pruned last), combination index breaking ties."""
+    rows = [row for _, row in sorted(completed, key=lambda item: item[0])]
+    rows.sort(key=lambda r: (not r.get("pruned"), r.get("sharpe_ratio", -999)), reverse=True)
+    return rows
+
+
+def _write_csv(path: Path, fieldnames: list[str], rows: list[dict]) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
 
 def run_grid_search(
     symbols: list[str],
@@ -149,6 +402,12 @@ def run_grid_search(
     timeframe: str = "1Day",
     output_dir: Path | None = None,
     param_grid: dict | None = None,
+    engine: str = "bar",
+    workers: int = 1,
+    use_cache: bool = True,
+    prune: PruneRule | None = None,
+    halving_rungs: int = 1,
+    halving_eta: float = 3.0,
 ) -> Path:
     """
     Run grid search over parameter combinations.
@@ -161,6 +420,17 @@ def run_grid_search(
         timeframe: "1Day" or "1Hour".
         output_dir: Custom output directory.
         param_grid: Custom parameter grid (default: PARAM_GRID).
+        engine: BacktestConfig.engine — "vectorized" for the 5Min array fast path.
+        workers: Worker processes. >1 publishes the data once in shared memory
+            and evaluates combinations in a process pool.
+        use_cache: Reuse results of combinations already run on identical data.
+        prune: Stop a combination's backtest early when this rule fires
+            (e.g. drawdown past the go/no-go limit). Pruned rows rank last.
+        halving_rungs: Successive halving. With N > 1 every combination runs
+            on the first 1/eta^(N-1) of the period, the best 1/eta of them
+            move on to a window eta times longer, and so on; only the last
+            rung covers [start, end].
+        halving_eta: Window growth / survivor reduction factor per rung.
 
     Returns:
         Path to output directory with results.
@@ -172,13 +442,19 @@ def run_grid_search(
     values = list(grid.values())
     combinations = list(itertools.product(*values))
     total = len(combinations)
+    workers = max(1, min(workers, total))
+    rung_ends = halving_windows(start, end, halving_rungs, halving_eta)
 
     tf_label = "HOURLY" if timeframe == "1Hour" else "DAILY"
     print(f"\n{'='*70}")
     print(f"  GRID SEARCH [{tf_label}] -- {start} -> {end}")
     print(f"  Capital: ${initial_capital:,.0f} | Symbols: {len(symbols)}")
     print(f"  Parameters: {', '.join(keys)}")
-    print(f"  Combinations: {total}")
+    print(f"  Combinations: {total}" + (f" | Workers: {workers}" if workers > 1 else ""))
+    if len(rung_ends) > 1:
+        print(f"  Successive halving: {len(rung_ends)} rungs (eta={halving_eta}) ending {', '.join(map(str, rung_ends))}")
+    if prune is not None:
+        print(f"  Pruning: max DD {prune.max_drawdown_pct}% | min {prune.min_trades} trades by {prune.idle_fraction:.0%}")
     print(f"{'='*70}\n")
 
     # Step 1: Load data once (shared across all runs)
@@ -193,136 +469,100 @@ def run_grid_search(
     total_bars = sum(len(df) for df in data.values())
     logger.info("data_loaded", symbols=len(data), total_bars=total_bars)
 
-    # Step 2: Run all combinations
-    results: list[dict] = []
-    start_time = time.time()
-
-    for idx, combo in enumerate(combinations, 1):
-        params = dict(zip(keys, combo))
-        elapsed = time.time() - start_time
-        eta = (elapsed / idx * (total - idx)) if idx > 1 else 0
-
-        # Build compact param summary
-        param_parts = [
-            f"SL={params.get('stop_loss_atr', '-')}x",
-            f"TP={params.get('take_profit_atr', '-')}x",
-        ]
-        if "trailing_breakeven_atr" in params:
-            param_parts.append(f"tBE={params['trailing_breakeven_atr']}x")
-        if "trailing_trail_threshold_atr" in params:
-            param_parts.append(f"tTH={params['trailing_trail_threshold_atr']}x")
-        if "trailing_trail_distance_atr" in params:
-            param_parts.append(f"tTR={params['trailing_trail_distance_atr']}x")
-        if "signal_exit_enabled" in params:
-            param_parts.append(f"sigExit={'ON' if params['signal_exit_enabled'] else 'OFF'}")
-        param_parts.append(f"trend={'ON' if params.get('trend_filter', True) else 'OFF'}")
-        param_parts.append(f"pos={params.get('max_positions', 10)}")
-
-        print(
-            f"  [{idx}/{total}] {' '.join(param_parts)} ... ",
-            end="",
-            flush=True,
-        )
-
-        try:
-            config = BacktestConfig(
-                start=start,
-                end=end,
-                initial_capital=initial_capital,
-                timeframe=timeframe,
-                stop_loss_atr=params.get("stop_loss_atr", 2.0),
-                take_profit_atr=params.get("take_profit_atr", 4.0),
-                trend_filter=params.get("trend_filter", True),
-                max_positions=params.get("max_positions", 10),
-                signal_threshold=params.get("signal_threshold", 0.3),
-                slippage_bps=params.get("slippage_bps", 4.0),
-                # 4-tier trailing stop params
-                trailing_breakeven_atr=params.get("trailing_breakeven_atr", 1.0),
-                trailing_lock_atr=params.get("trailing_lock_atr", 1.5),
-                trailing_lock_cushion_atr=params.get("trailing_lock_cushion_atr", 0.5),
-                trailing_trail_threshold_atr=params.get("trailing_trail_threshold_atr", 2.5),
-                trailing_trail_distance_atr=params.get("trailing_trail_distance_atr", 1.5),
-                trailing_tight_threshold_atr=params.get("trailing_tight_threshold_atr", 4.0),
-                trailing_tight_distance_atr=params.get("trailing_tight_distance_atr", 1.0),
-                # Signal exit
-                signal_exit_enabled=params.get("signal_exit_enabled", False),
-            )
-
-            engine = BacktestEngine(config)
-            result = engine.run(data)
-            metrics = calculate_metrics(result)
-
-            row = {
-                **params,
-                "timeframe": timeframe,
-                "total_return_pct": metrics.total_return_pct,
-                "cagr_pct": metrics.cagr_pct,
-                "sharpe_ratio": metrics.sharpe_ratio,
-                "sortino_ratio": metrics.sortino_ratio,
-                "max_drawdown_pct": metrics.max_drawdown_pct,
-                "win_rate_pct": metrics.win_rate_pct,
-                "profit_factor": metrics.profit_factor,
-                "total_trades": metrics.total_trades,
-                "avg_win_pct": metrics.avg_win_pct,
-                "avg_loss_pct": metrics.avg_loss_pct,
-                "avg_hold_days": metrics.avg_hold_days,
-                "exposure_pct": metrics.exposure_pct,
-                "final_equity": metrics.final_equity,
-                "stop_loss_count": metrics.stop_loss_count,
-                "take_profit_count": metrics.take_profit_count,
-                "signal_exit_count": metrics.signal_exit_count,
-                "go_nogo": metrics.go_nogo["pass"],
-                "kill_switches": 1 if result.kill_switch_triggered else 0,
-            }
-            results.append(row)
-
-            # Quick summary
-            go_str = "GO" if row["go_nogo"] else "NO-GO"
-            sl_pct = (metrics.stop_loss_count / metrics.total_trades * 100) if metrics.total_trades > 0 else 0
-            print(
-                f"Sharpe={metrics.sharpe_ratio:+.2f} "
-                f"DD={metrics.max_drawdown_pct:.1f}% "
-                f"WR={metrics.win_rate_pct:.0f}% "
-                f"PF={metrics.profit_factor:.2f} "
-                f"T={metrics.total_trades} "
-                f"SL={metrics.stop_loss_count} TP={metrics.take_profit_count} SE={metrics.signal_exit_count} "
-                f"[{go_str}]"
-                f"  (ETA: {eta:.0f}s)"
-            )
-
-        except Exception as e:
-            print(f"ERROR: {e}")
-            logger.error("grid_run_error", params=params, error=str(e))
-
-    # Step 3: Sort by Sharpe ratio and save
-    results.sort(key=lambda r: r.get("sharpe_ratio", -999), reverse=True)
-
-    # Create output directory
+    # Create output directory — rows are streamed to the CSV as they complete
     if output_dir is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_dir = DEFAULT_OUTPUT_DIR / f"grid_{timestamp}"
     output_dir.mkdir(parents=True, exist_ok=True)
-
-    # Save CSV
     csv_path = output_dir / "grid_results.csv"
-    if results:
-        with open(csv_path, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=results[0].keys())
-            writer.writeheader()
-            writer.writerows(results)
+    fieldnames = [*keys, "timeframe", *RESULT_COLUMNS]
+
+    settings = {
+        "start": start,
+        "end": end,
+        "initial_capital": initial_capital,
+        "timeframe": timeframe,
+        "engine": engine,
+        # Hashed once here so workers do not re-hash the data per combination
+        "fingerprint": data_fingerprint(data) if use_cache else None,
+        "window": None,
+        "prune": prune,
+    }
+
+    # Step 2: Run all combinations (per rung when halving)
+    survivors = [(idx, dict(zip(keys, combo))) for idx, combo in enumerate(combinations, 1)]
+    completed: list[tuple[int, dict]] = []
+    start_time = time.time()
+    runs = 0
+
+    with ExitStack() as stack:
+        pool = None
+        if workers > 1:
+            shared = stack.enter_context(SharedFrames.publish(data))
+            pool = stack.enter_context(ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(shared.handle,),
+            ))
+
+        for rung, rung_end in enumerate(rung_ends):
+            final = rung == len(rung_ends) - 1
+            rung_settings = {
+                **settings,
+                "end": rung_end,
+                # Earlier rungs simulate a leading slice of the loaded data
+                "window": None if final else (start, rung_end),
+            }
+            if len(rung_ends) > 1:
+                print(f"\n  --- Rung {rung + 1}/{len(rung_ends)}: {start} -> {rung_end} | {len(survivors)} combinations ---")
+
+            completed = []
+            rung_total = len(survivors)
+            rung_start = time.time()
+            rung_path = csv_path if final else output_dir / f"halving_rung{rung + 1}.csv"
+            with open(rung_path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+
+                def _collect(idx: int, row: dict | None, error: str | None, params: dict) -> None:
+                    if row is None:
+                        print(f"ERROR: {error}")
+                        logger.error("grid_run_error", params=params, error=error)
+                        return
+                    completed.append((idx, row))
+                    writer.writerow(row)
+                    f.flush()
+                    done = len(completed)
+                    eta = (time.time() - rung_start) / done * (rung_total - done)
+                    print(f"{_result_summary(row)}  (ETA: {eta:.0f}s)")
+
+                _evaluate_all(survivors, rung_settings, data, pool, _collect, workers)
+            runs += rung_total
+
+            if not final:
+                keep = math.ceil(len(survivors) / halving_eta)
+                promoted = set(promote(completed, keep))
+                survivors = [(idx, params) for idx, params in survivors if idx in promoted]
+                _write_csv(rung_path, fieldnames, _ranked(completed))
+                logger.info("halving_rung_done", rung=rung + 1, evaluated=rung_total, promoted=len(survivors))
+
+    # Step 3: Sort by Sharpe ratio and save — combination order breaks ties,
+    # so the final CSV is identical whatever order the workers finished in
+    results = _ranked(completed)
+    _write_csv(csv_path, fieldnames, results)
 
     total_time = time.time() - start_time
 
     # Print summary
     print(f"\n{'='*70}")
     print(f"  GRID SEARCH COMPLETE")
-    print(f"  Combinations: {total} | Time: {total_time:.0f}s")
+    print(f"  Combinations: {total} | Backtests: {runs} | Time: {total_time:.0f}s")
     print(f"  Results saved: {csv_path}")
     print(f"{'='*70}")
 
     # Top 5 by Sharpe
     go_results = [r for r in results if r.get("go_nogo")]
-    print(f"\n  GO results: {len(go_results)}/{total}")
+    print(f"\n  GO results: {len(go_results)}/{len(results)}")
 
     if go_results:
         print(f"\n  TOP GO COMBINATIONS:")
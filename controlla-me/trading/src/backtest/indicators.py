@@ -0,0 +1,464 @@
+"""
+Indicator engine — indicator series computed once per symbol per backtest run.
+
+The bar loop used to slice every symbol's history up to the current bar
+(``df[df.index <= current_date]``) and rebuild RSI / MACD / Bollinger / ATR /
+slopes on the whole prefix, which is quadratic in bar count. All indicators
+used for entries and exits are causal, so IndicatorEngine computes each
+series once over the full frame and the evaluate_* functions in src.analysis
+read bar ``i`` in O(1). The result is identical to the slicing path — see the
+parity tests in tests/unit/test_slope_and_trailing.py.
+
+Runs over the same frames (walk-forward windows, parameter sweeps) can share
+a PrecomputeCache so series whose parameters did not change are computed once.
+Exit-parameter variants of one run (engine.run_exit_variants) go further and
+share the prepared engine itself through ``shared_view``: the arrays, plus a
+memo of the bars where no entry fires, are reused by every variant.
+
+Usage (inside BacktestEngine.run):
+    indicators = IndicatorEngine(config, periods, cache=precomputed)
+    indicators.prepare(data, dates, daily_data)      # daily_data: mean_reversion_v3 only
+    n = indicators.bars_available("SPY", bar_idx)   # == len(df[df.index <= date])
+    signal = indicators.entry_signal("SPY", bar_idx)
+"""
+
+from __future__ import annotations
+
+import copy
+from collections.abc import Callable, Hashable
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+import structlog
+from ta.trend import MACD
+
+from ..analysis import (
+    daily_trend_reference,
+    evaluate_composite_signal,
+    evaluate_mean_reversion_signal,
+    evaluate_slope_volume_signal,
+    precompute_composite_indicators,
+    precompute_mean_reversion_indicators,
+    precompute_slope_volume_indicators,
+    slope_volume_candidates,
+    trailing_mean,
+)
+from .bar_store import daily_rows_through
+
+if TYPE_CHECKING:
+    from .engine import BacktestConfig
+
+logger = structlog.get_logger()
+
+# Signal families whose entry gate reads the SL/TP multipliers (minimum R:R);
+# the others only use them for the returned price levels
+LEVEL_GATED_MODES = frozenset({"mean_reversion", "mean_reversion_v3"})
+
+
+def signal_mode(config: BacktestConfig) -> str:
+    """Entry-signal family for a config (same routing as BacktestEngine)."""
+    if config.strategy == "noise_boundary":
+        return "noise_boundary"
+    if config.strategy == "mean_reversion_v3":
+        return "mean_reversion_v3"
+    if config.timeframe == "5Min" or config.strategy == "slope_volume":
+        return "slope_volume"
+    if config.timeframe == "15Min" or config.strategy == "mean_reversion":
+        return "mean_reversion"
+    return "trend_following"
+
+
+class PrecomputeCache:
+    """Indicator series shared across backtest runs over the same data frames.
+
+    Entries are keyed by the frame's identity plus the parameters the series
+    depends on, so the cache must not outlive the frames it was filled from.
+    """
+
+    def __init__(self) -> None:
+        self._store: dict[Hashable, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, df: pd.DataFrame, key: Hashable, compute: Callable[[], Any]) -> Any:
+        full_key = (id(df), len(df), key)
+        if full_key in self._store:
+            self.hits += 1
+            return self._store[full_key]
+        self.misses += 1
+        value = compute()
+        self._store[full_key] = value
+        return value
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class IndicatorEngine:
+    """Precomputed per-symbol indicator arrays for one backtest run."""
+
+    def __init__(self, config: BacktestConfig, periods: dict, cache: PrecomputeCache | None = None) -> None:
+        self.config = config
+        self.mode = signal_mode(config)
+        self._periods = periods
+        self._cache = cache
+        self._frames: dict[str, tuple[pd.DataFrame, pd.DataFrame]] = {}
+        self._bars: dict[str, np.ndarray] = {}
+        self._close: dict[str, np.ndarray] = {}
+        self._entry: dict[str, dict[str, Any] | None] = {}
+        self._exit_macd: dict[str, tuple[np.ndarray, np.ndarray] | None] = {}
+        self._spy_sma: np.ndarray | None = None
+        # mean_reversion_v3 daily trend filter: daily rows up to each timeline
+        # bar's day, and (close, SMA(daily_sma_period)) per daily row
+        self._daily_rows: dict[str, np.ndarray] = {}
+        self._daily_trend: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        # (symbol, row, daily reference, levels) known to produce no entry — only
+        # kept once shared_view() is used; a lone run gains nothing from it
+        self._no_entry: set[tuple] | None = None
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    def prepare(
+        self,
+        data: dict[str, pd.DataFrame],
+        dates: list,
+        daily_data: dict[str, pd.DataFrame] | None = None,
+    ) -> None:
+        """Compute every series once and map each bar of ``dates`` to a prefix length.
+
+        ``daily_data`` feeds the mean_reversion_v3 daily trend filter: each bar
+        is also mapped to the daily rows dated up to its own day.
+        """
+        stamps = pd.Index(dates)
+
+        for symbol, source in data.items():
+            df = source
+            if not df.index.is_monotonic_increasing:
+                df = df.sort_index(kind="stable")
+            self._frames[symbol] = (source, df)
+            self._bars[symbol] = np.asarray(df.index.searchsorted(stamps, side="right"))
+            self._close[symbol] = df["close"].to_numpy(dtype=float)
+
+            spec = self._entry_spec()
+            if spec is None:
+                self._entry[symbol] = None
+            else:
+                fn, kwargs = spec
+                try:
+                    self._entry[symbol] = self._cached(
+                        source, ("entry", fn.__name__, tuple(sorted(kwargs.items()))),
+                        lambda: fn(df, **kwargs),
+                    )
+                except Exception as exc:
+                    logger.warning("indicator_precompute_failed", symbol=symbol, error=str(exc))
+                    self._entry[symbol] = None
+
+            if self.config.signal_exit_enabled:
+                self._load_exit_macd(symbol)
+
+        if self.config.trend_filter and self.mode != "noise_boundary" and "SPY" in self._close:
+            self._spy_sma = trailing_mean(self._close["SPY"], self._periods["sma_medium"])
+
+        if self.mode == "mean_reversion_v3" and self.config.daily_filter_enabled and daily_data:
+            for symbol, daily in daily_data.items():
+                if symbol in self._bars:
+                    self._prepare_daily(symbol, daily, stamps)
+
+        logger.info("indicators_ready", symbols=len(self._bars), mode=self.mode)
+
+    def _prepare_daily(self, symbol: str, source: pd.DataFrame, stamps: pd.Index) -> None:
+        df = source
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index(kind="stable")
+        try:
+            self._daily_rows[symbol] = daily_rows_through(df.index, stamps)
+        except Exception as exc:
+            logger.warning("daily_index_failed", symbol=symbol, error=str(exc))
+            return
+        period = self.config.daily_sma_period
+        close = df["close"].to_numpy(dtype=float)
+        self._daily_trend[symbol] = (
+            close,
+            self._cached(source, ("daily_sma", period), lambda: trailing_mean(close, period)),
+        )
+
+    def shared_view(self, config: BacktestConfig) -> IndicatorEngine:
+        """
+        This prepared engine seen through ``config``, for an exit-parameter variant.
+
+        ``config`` must only differ from the prepared one in exit parameters
+        (engine.EXIT_PARAMS). The arrays and the no-entry memo are shared, so
+        every view skips the entry evaluations another view already found empty.
+        """
+        if signal_mode(config) != self.mode:
+            raise ValueError(f"shared_view: signal mode {signal_mode(config)} != {self.mode}")
+        if self._no_entry is None:
+            self._no_entry = set()
+        view = copy.copy(self)
+        view.config = config
+        return view
+
+    def _load_exit_macd(self, symbol: str) -> None:
+        source, df = self._frames[symbol]
+        windows = (self._periods["macd_fast"], self._periods["macd_slow"], self._periods["macd_signal"])
+        try:
+            self._exit_macd[symbol] = self._cached(
+                source, ("exit_macd", windows), lambda: self._macd(df, *windows)
+            )
+        except Exception:
+            self._exit_macd[symbol] = None
+
+    def _cached(self, df: pd.DataFrame, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if self._cache is None:
+            return compute()
+        return self._cache.get(df, key, compute)
+
+    @staticmethod
+    def _macd(df: pd.DataFrame, fast: int, slow: int, sign: int) -> tuple[np.ndarray, np.ndarray]:
+        macd_ind = MACD(df["close"], window_slow=slow, window_fast=fast, window_sign=sign)
+        return (
+            macd_ind.macd().to_numpy(dtype=float),
+            macd_ind.macd_signal().to_numpy(dtype=float),
+        )
+
+    def _entry_spec(self) -> tuple[Callable[..., dict[str, Any]], dict[str, Any]] | None:
+        """(precompute function, kwargs) for the entry indicators of this mode."""
+        cfg = self.config
+        if self.mode == "slope_volume":
+            return precompute_slope_volume_indicators, {
+                "lookback_bars": cfg.slope_lookback_bars,
+                "volume_ma_period": cfg.slope_volume_ma_period,
+            }
+        if self.mode == "mean_reversion_v3":
+            from .engine import get_indicator_periods
+
+            p = get_indicator_periods("15Min")
+        elif self.mode == "mean_reversion":
+            p = self._periods
+            if "rsi_entry" not in p or "bb_period" not in p:
+                return None  # Mean reversion thresholds only exist for 15Min
+        elif self.mode == "trend_following":
+            s = cfg.signal
+            return precompute_composite_indicators, {
+                "rsi_period": s.rsi_period,
+                "macd_fast": s.macd_fast,
+                "macd_slow": s.macd_slow,
+                "macd_signal": s.macd_signal,
+                "bb_period": s.bb_period,
+                "bb_std": s.bb_std,
+            }
+        else:
+            return None  # noise_boundary has its own precompute
+
+        return precompute_mean_reversion_indicators, {
+            "rsi_period": p["rsi_period"],
+            "bb_period": p["bb_period"],
+            "bb_std": p["bb_std"],
+            "volume_avg": p["volume_avg"],
+            "atr_period": p["atr_period"],
+        }
+
+    # ------------------------------------------------------------------
+    # Per-bar reads
+    # ------------------------------------------------------------------
+
+    def bars_available(self, symbol: str, bar_idx: int) -> int:
+        """Number of ``symbol`` bars with timestamp <= dates[bar_idx]."""
+        bars = self._bars.get(symbol)
+        return int(bars[bar_idx]) if bars is not None else 0
+
+    def prefix_lengths(self, symbol: str) -> np.ndarray:
+        """``bars_available`` for every bar of the timeline at once."""
+        return self._bars[symbol]
+
+    def close(self, symbol: str) -> np.ndarray:
+        """Full close array for ``symbol`` (read the first ``bars_available`` entries)."""
+        return self._close[symbol]
+
+    def exit_macd(self, symbol: str) -> tuple[np.ndarray, np.ndarray] | None:
+        """(macd, signal) arrays for MACD signal exits, or None if unavailable."""
+        if symbol not in self._exit_macd and symbol in self._frames:
+            self._load_exit_macd(symbol)  # a shared view enabled signal exits
+        return self._exit_macd.get(symbol)
+
+    def spy_below_sma(self, bar_idx: int) -> bool:
+        """Macro filter: SPY close below its sma_medium at this bar."""
+        if self._spy_sma is None:
+            return False
+        n = self.bars_available("SPY", bar_idx)
+        if n < self._periods["sma_medium"]:
+            return False
+        return bool(self._close["SPY"][n - 1] < self._spy_sma[n - 1])
+
+    def spy_below_sma_mask(self) -> np.ndarray | None:
+        """``spy_below_sma`` for every bar of the timeline, or None when the filter is off."""
+        if self._spy_sma is None:
+            return None
+        n = self._bars["SPY"]
+        mask = np.zeros(len(n), dtype=bool)
+        ready = n >= self._periods["sma_medium"]
+        last = n[ready] - 1
+        mask[ready] = self._close["SPY"][last] < self._spy_sma[last]
+        return mask
+
+    def entry_candidates(self, symbol: str) -> np.ndarray | None:
+        """Symbol bars where a slope_volume entry is possible (see slope_volume_candidates)."""
+        ind = self._entry.get(symbol)
+        if self.mode != "slope_volume" or ind is None:
+            return None
+        cfg = self.config
+        return slope_volume_candidates(
+            ind,
+            slope_threshold_pct=cfg.slope_threshold_pct,
+            volume_multiplier=cfg.slope_volume_multiplier,
+            acceleration_bars=cfg.slope_acceleration_bars,
+            min_acceleration_pct=cfg.slope_min_acceleration_pct,
+            persistence_bars=cfg.slope_persistence_bars,
+            anticipatory=cfg.slope_anticipatory,
+        )
+
+    def entry_signal(
+        self,
+        symbol: str,
+        bar_idx: int,
+        df_daily: pd.DataFrame | None = None,
+    ) -> dict[str, Any] | None:
+        """Entry signal dict at ``bar_idx`` — same parameters as the engine's analyze_stock_* wrappers.
+
+        ``df_daily`` is the daily slice up to the current day (mean_reversion_v3
+        only); without it the daily bars given to prepare() are used.
+        """
+        i = self.bars_available(symbol, bar_idx) - 1
+        if df_daily is None and symbol in self._daily_rows:
+            return self._signal(symbol, i, self.daily_reference(symbol, bar_idx))
+        return self.signal_at(symbol, i, df_daily)
+
+    def daily_reference(self, symbol: str, bar_idx: int) -> tuple[float, float] | None:
+        """daily_trend_reference() of the daily slice up to the day of ``bar_idx``, O(1)."""
+        rows = self._daily_rows.get(symbol)
+        if rows is None:
+            return None
+        n = int(rows[bar_idx])
+        if n < self.config.daily_sma_period:
+            return None
+        close, sma = self._daily_trend[symbol]
+        return float(close[n - 1]), float(sma[n - 1])
+
+    def signal_at(
+        self,
+        symbol: str,
+        i: int,
+        df_daily: pd.DataFrame | None = None,
+    ) -> dict[str, Any] | None:
+        """Entry signal dict at row ``i`` of the symbol's own frame."""
+        daily_ref = None
+        if self.mode == "mean_reversion_v3" and self.config.daily_filter_enabled:
+            daily_ref = daily_trend_reference(df_daily, self.config.daily_sma_period)
+        return self._signal(symbol, i, daily_ref)
+
+    def _signal(self, symbol: str, i: int, daily_ref: tuple[float, float] | None) -> dict[str, Any] | None:
+        ind = self._entry.get(symbol)
+        if ind is None or i < 0:
+            return None
+        if self._no_entry is None:
+            return self._evaluate(symbol, ind, i, daily_ref)
+
+        cfg = self.config
+        levels = (cfg.stop_loss_atr, cfg.take_profit_atr) if self.mode in LEVEL_GATED_MODES else ()
+        key = (symbol, i, daily_ref, levels)
+        if key in self._no_entry:
+            return None
+        signal = self._evaluate(symbol, ind, i, daily_ref)
+        if signal is None:
+            self._no_entry.add(key)
+        return signal
+
+    def _evaluate(
+        self,
+        symbol: str,
+        ind: dict[str, Any],
+        i: int,
+        daily_ref: tuple[float, float] | None,
+    ) -> dict[str, Any] | None:
+        cfg = self.config
+        if self.mode == "slope_volume":
+            return evaluate_slope_volume_signal(
+                symbol,
+                ind,
+                i,
+                slope_threshold_pct=cfg.slope_threshold_pct,
+                volume_multiplier=cfg.slope_volume_multiplier,
+                stop_loss_atr=cfg.stop_loss_atr,
+                take_profit_atr=cfg.take_profit_atr,
+                # Backtest data is already market-hours only
+                market_open_utc="00:00",
+                market_close_utc="23:59",
+                require_reversal=False,
+                acceleration_bars=cfg.slope_acceleration_bars,
+                min_acceleration_pct=cfg.slope_min_acceleration_pct,
+                volume_trend_bars=cfg.slope_volume_trend_bars,
+                persistence_bars=cfg.slope_persistence_bars,
+                contrarian=cfg.slope_contrarian,
+                anticipatory=cfg.slope_anticipatory,
+            )
+
+        if self.mode == "mean_reversion_v3":
+            from .engine import get_indicator_periods
+
+            p = get_indicator_periods("15Min")
+            daily_close, daily_sma = daily_ref if daily_ref is not None else (None, None)
+            return evaluate_mean_reversion_signal(
+                symbol,
+                ind,
+                i,
+                daily_close=daily_close,
+                daily_sma=daily_sma,
+                rsi_entry=p["rsi_entry"],
+                volume_mult=p["volume_mult"],
+                stop_loss_atr=cfg.stop_loss_atr,
+                take_profit_atr=cfg.take_profit_atr,
+                daily_filter_enabled=cfg.daily_filter_enabled,
+                daily_trend_strict=cfg.daily_trend_strict,
+                min_confidence=cfg.signal_threshold,
+                min_bars=p["min_bars"],
+            )
+
+        if self.mode == "mean_reversion":
+            p = self._periods
+            return evaluate_mean_reversion_signal(
+                symbol,
+                ind,
+                i,
+                rsi_entry=p["rsi_entry"],
+                volume_mult=p["volume_mult"],
+                stop_loss_atr=cfg.stop_loss_atr,
+                take_profit_atr=cfg.take_profit_atr,
+                daily_filter_enabled=False,
+                min_confidence=cfg.signal_threshold,
+                min_bars=p["min_bars"],
+            )
+
+        s = cfg.signal
+        return evaluate_composite_signal(
+            symbol,
+            ind,
+            i,
+            rsi_oversold=s.rsi_oversold,
+            rsi_overbought=s.rsi_overbought,
+            weight_rsi=s.weight_rsi,
+            weight_macd=s.weight_macd,
+            weight_bollinger=s.weight_bollinger,
+            weight_trend=s.weight_trend,
+            weight_volume=s.weight_volume,
+            score_buy_threshold=cfg.signal_threshold,
+            score_sell_threshold=-0.5,
+            stop_loss_atr=cfg.stop_loss_atr,
+            take_profit_atr=cfg.take_profit_atr,
+            trend_filter=cfg.trend_filter,
+            require_macd_crossover=True,  # Hard gate: only enter on MACD crossover
+            macd_crossover_lookback=3,
+            timeframe=cfg.timeframe,
+        )
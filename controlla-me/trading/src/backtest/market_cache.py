@@ -0,0 +1,243 @@
+"""
+Market Data Cache — one month-partitioned Parquet dataset per symbol/timeframe.
+
+Layout (under the DataLoader cache dir):
+    store/<timeframe>/<SYMBOL>/2024-03.parquet     bars for that calendar month
+    store/<timeframe>/<SYMBOL>/_manifest.json      {"coverage": [[start, end], ...],
+                                                    "imported": [legacy file names]}
+
+``coverage`` lists the (inclusive) date spans already fetched from a provider,
+so weekends/holidays inside a span are not re-requested and only the gaps of a
+new request are downloaded. Reads touch only the month files overlapping the
+request and push the timestamp range down to Parquet. Downloads are merged into
+the affected month files instead of writing another overlapping file.
+
+Legacy ``<SYMBOL>_<timeframe>_<start>_<end>.parquet`` files (older DataLoader,
+scripts/fetch_5min_data.py) are imported into the store the first time their
+symbol/timeframe is read.
+
+Usage:
+    cache = MarketDataCache(Path(".backtest-cache"))
+    for gap_start, gap_end in cache.missing_spans("SPY", "5Min", start, end):
+        cache.merge("SPY", "5Min", download(...), gap_start, gap_end)
+    df = cache.read("SPY", "5Min", start, end)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import structlog
+
+logger = structlog.get_logger()
+
+_MANIFEST = "_manifest.json"
+
+
+def _merge_spans(spans: list[tuple[date, date]]) -> list[tuple[date, date]]:
+    """Union of inclusive date spans (adjacent spans are joined)."""
+    merged: list[tuple[date, date]] = []
+    for lo, hi in sorted(spans):
+        if merged and lo <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def _subtract_spans(start: date, end: date, covered: list[tuple[date, date]]) -> list[tuple[date, date]]:
+    """Parts of [start, end] not inside any covered span."""
+    gaps: list[tuple[date, date]] = []
+    cursor = start
+    for lo, hi in covered:
+        if hi < cursor:
+            continue
+        if lo > end:
+            break
+        if lo > cursor:
+            gaps.append((cursor, lo - timedelta(days=1)))
+        cursor = max(cursor, hi + timedelta(days=1))
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def _month_keys(start: date, end: date) -> list[str]:
+    keys = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        keys.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return keys
+
+
+def _bound(day: date, tz) -> pd.Timestamp:
+    ts = pd.Timestamp(day)
+    return ts.tz_localize(tz) if tz is not None else ts
+
+
+class MarketDataCache:
+    """Partitioned Parquet store of OHLCV bars with fetched-range bookkeeping."""
+
+    def __init__(self, cache_dir: Path) -> None:
+        self._cache_dir = cache_dir
+        self._root = cache_dir / "store"
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def missing_spans(self, symbol: str, timeframe: str, start: date, end: date) -> list[tuple[date, date]]:
+        """Date spans of [start, end] that have never been fetched."""
+        manifest = self._manifest(symbol, timeframe)
+        covered = [(date.fromisoformat(a), date.fromisoformat(b)) for a, b in manifest["coverage"]]
+        return _subtract_spans(start, end, covered)
+
+    def read(self, symbol: str, timeframe: str, start: date, end: date) -> pd.DataFrame | None:
+        """Bars with start <= timestamp < end + 1 day, or None when nothing is stored."""
+        self._manifest(symbol, timeframe)  # imports legacy files on first touch
+        folder = self._folder(symbol, timeframe)
+        files = [folder / f"{key}.parquet" for key in _month_keys(start, end + timedelta(days=1))]
+        files = [str(f) for f in files if f.exists()]
+        if not files:
+            return None
+
+        dataset = ds.dataset(files, format="parquet")
+        tz = getattr(dataset.schema.field("timestamp").type, "tz", None)
+        field = ds.field("timestamp")
+        table = dataset.to_table(
+            filter=(field >= _bound(start, tz)) & (field < _bound(end + timedelta(days=1), tz))
+        )
+        if table.num_rows == 0:
+            return None
+        return table.to_pandas().sort_index()
+
+    def merge(
+        self,
+        symbol: str,
+        timeframe: str,
+        df: pd.DataFrame | None,
+        span_start: date,
+        span_end: date,
+    ) -> None:
+        """
+        Merge downloaded bars for [span_start, span_end] into the store.
+
+        The span is recorded as fetched when bars came back (or it holds no
+        business days). Today is never marked fetched — its bars are incomplete.
+        """
+        if df is not None and len(df) > 0:
+            self._write(symbol, timeframe, df)
+        elif len(pd.bdate_range(span_start, span_end)) > 0:
+            return
+
+        covered_end = min(span_end, date.today() - timedelta(days=1))
+        if covered_end >= span_start:
+            manifest = self._manifest(symbol, timeframe)
+            self._add_coverage(manifest, [(span_start, covered_end)])
+            self._save_manifest(symbol, timeframe, manifest)
+
+    def clear(self, symbol: str, timeframe: str) -> int:
+        """Drop the stored bars and coverage (and legacy files). Returns files removed."""
+        removed = 0
+        folder = self._folder(symbol, timeframe)
+        if folder.exists():
+            removed += sum(1 for _ in folder.glob("*.parquet"))
+            shutil.rmtree(folder)
+        for f in self._cache_dir.glob(f"{symbol}_{timeframe}_*.parquet"):
+            f.unlink()
+            removed += 1
+        return removed
+
+    def folder(self, symbol: str, timeframe: str) -> Path:
+        """Directory holding the month partitions of symbol/timeframe."""
+        return self._folder(symbol, timeframe)
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _folder(self, symbol: str, timeframe: str) -> Path:
+        return self._root / timeframe / symbol
+
+    def _write(self, symbol: str, timeframe: str, df: pd.DataFrame) -> None:
+        """Upsert bars into their month partitions (new rows win on duplicates)."""
+        folder = self._folder(symbol, timeframe)
+        folder.mkdir(parents=True, exist_ok=True)
+        df = df.copy()
+        df.index.name = "timestamp"
+        # Every partition keeps the timezone the store was created with
+        stored = next(iter(sorted(folder.glob("*.parquet"))), None)
+        if stored is not None and df.index.tz is not None:
+            tz = getattr(pq.read_schema(stored).field("timestamp").type, "tz", None)
+            if tz is not None:
+                df = df.tz_convert(tz)
+
+        for key, part in df.groupby(df.index.strftime("%Y-%m")):
+            path = folder / f"{key}.parquet"
+            if path.exists():
+                part = pd.concat([pd.read_parquet(path), part])
+            part = part[~part.index.duplicated(keep="last")].sort_index()
+            tmp = path.with_suffix(".parquet.tmp")
+            part.to_parquet(tmp)
+            os.replace(tmp, path)
+        logger.debug("cache_saved", symbol=symbol, rows=len(df), tf=timeframe)
+
+    def _manifest(self, symbol: str, timeframe: str) -> dict:
+        path = self._folder(symbol, timeframe) / _MANIFEST
+        manifest = {"coverage": [], "imported": []}
+        if path.exists():
+            try:
+                with open(path) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                logger.warning("cache_manifest_unreadable", symbol=symbol, tf=timeframe)
+        if self._import_legacy(symbol, timeframe, manifest):
+            self._save_manifest(symbol, timeframe, manifest)
+        return manifest
+
+    def _save_manifest(self, symbol: str, timeframe: str, manifest: dict) -> None:
+        folder = self._folder(symbol, timeframe)
+        folder.mkdir(parents=True, exist_ok=True)
+        tmp = folder / f"{_MANIFEST}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, folder / _MANIFEST)
+
+    @staticmethod
+    def _add_coverage(manifest: dict, spans: list[tuple[date, date]]) -> None:
+        covered = [(date.fromisoformat(a), date.fromisoformat(b)) for a, b in manifest["coverage"]]
+        manifest["coverage"] = [[a.isoformat(), b.isoformat()] for a, b in _merge_spans(covered + spans)]
+
+    def _import_legacy(self, symbol: str, timeframe: str, manifest: dict) -> bool:
+        """Fold ``<SYMBOL>_<tf>_<start>_<end>.parquet`` files into the store. True if any."""
+        imported = set(manifest["imported"])
+        changed = False
+        for f in sorted(self._cache_dir.glob(f"{symbol}_{timeframe}_*.parquet")):
+            if f.name in imported:
+                continue
+            parts = f.stem.rsplit("_", 3)
+            if len(parts) != 4 or parts[0] != symbol or parts[1] != timeframe:
+                continue
+            try:
+                span = (date.fromisoformat(parts[2]), date.fromisoformat(parts[3]))
+                df = pd.read_parquet(f)
+            except (ValueError, OSError) as e:
+                logger.warning("legacy_cache_skipped", file=f.name, error=str(e))
+                continue
+            if len(df) > 0:
+                self._write(symbol, timeframe, df)
+                self._add_coverage(manifest, [span])
+            manifest["imported"].append(f.name)
+            changed = True
+            logger.info("legacy_cache_imported", file=f.name, rows=len(df))
+        return changed
@@ -5,14 +5,19 @@ Sharpe, Sortino, CAGR, max drawdown, win rate, profit factor, etc.
 Includes go/no-go check against runbook criteria.
 
 Supports both daily and hourly timeframes with correct annualization.
+
+MetricsAccumulator keeps the same statistics as running sums (peak, drawdown,
+Welford variance, streaks, close-reason counts); the engine updates it per
+trade/equity point/bar return, so metrics are available mid-run.
 """
 
 from __future__ import annotations
 
+import math
+from collections import Counter
 from dataclasses import dataclass
 from datetime import date
 
-import numpy as np
 import structlog
 
 logger = structlog.get_logger()
@@ -86,11 +91,273 @@ def _bars_per_year(timeframe: str) -> float:
     return TRADING_DAYS_PER_YEAR
 
 
+# ---------------------------------------------------------------------------
+# Streaming accumulator
+# ---------------------------------------------------------------------------
+
+class _Welford:
+    """Running mean / sample variance (Welford's algorithm)."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1); NaN below two observations."""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else float("nan")
+
+
+def _day(label: str) -> date:
+    return date.fromisoformat(label[:10])
+
+
+class MetricsAccumulator:
+    """
+    Performance statistics updated one event at a time.
+
+    BacktestEngine feeds it every closed trade, recorded equity point and
+    per-bar return as they happen, so ``snapshot()`` is O(1) at any point of
+    a run (early stopping, progress logs) and ``peak`` replaces rescanning the
+    equity curve on every bar. calculate_metrics() replays a finished
+    BacktestResult through the same class.
+    """
+
+    def __init__(self, initial_capital: float, timeframe: str = "1Day") -> None:
+        self.initial_capital = initial_capital
+        self.timeframe = timeframe
+
+        # Equity curve
+        self.points = 0
+        self.peak: float | None = None  # highest recorded equity so far
+        self.final_equity = initial_capital
+        self.max_drawdown_pct = 0.0
+        self.max_drawdown_duration_days = 0
+        self._dd_start: str | None = None
+        self._first_date: str | None = None
+        self._last_date: str | None = None
+        self._dd_sum = 0.0  # recorded drawdown_pct values below zero
+        self._dd_count = 0
+        self._invested_points = 0
+        self._positions_sum = 0
+
+        # Returns
+        self._returns = _Welford()
+        self._downside = _Welford()
+
+        # Trades
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self._win_pct_sum = 0.0
+        self._loss_pct_sum = 0.0
+        self._hold_sum = 0
+        self.best_trade_pct: float | None = None
+        self.worst_trade_pct: float | None = None
+        self.max_win_streak = 0
+        self.max_loss_streak = 0
+        self._win_streak = 0
+        self._loss_streak = 0
+        self.close_reasons: Counter[str] = Counter()
+
+    # ------------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------------
+
+    def add_trade(self, trade) -> None:
+        self.total_trades += 1
+        if trade.pnl > 0:
+            self.winning_trades += 1
+            self.gross_profit += trade.pnl
+            self._win_pct_sum += trade.pnl_pct
+            self._win_streak += 1
+            self._loss_streak = 0
+            self.max_win_streak = max(self.max_win_streak, self._win_streak)
+        else:
+            self.gross_loss += trade.pnl
+            self._loss_pct_sum += trade.pnl_pct
+            self._loss_streak += 1
+            self._win_streak = 0
+            self.max_loss_streak = max(self.max_loss_streak, self._loss_streak)
+        self._hold_sum += trade.hold_days
+        if self.best_trade_pct is None or trade.pnl_pct > self.best_trade_pct:
+            self.best_trade_pct = trade.pnl_pct
+        if self.worst_trade_pct is None or trade.pnl_pct < self.worst_trade_pct:
+            self.worst_trade_pct = trade.pnl_pct
+        self.close_reasons[str(trade.close_reason)] += 1
+
+    def add_equity(self, point: dict) -> None:
+        """One equity_curve entry ({date, equity, drawdown_pct, positions_count, ...})."""
+        eq = point["equity"]
+        label = point["date"]
+        self.points += 1
+        if self._first_date is None:
+            self._first_date = label
+        self._last_date = label
+        self.final_equity = eq
+
+        if self.peak is None:
+            self.peak = eq
+        elif eq > self.peak:
+            self.peak = eq
+            if self._dd_start is not None:
+                try:
+                    duration = (_day(label) - _day(self._dd_start)).days
+                    self.max_drawdown_duration_days = max(self.max_drawdown_duration_days, duration)
+                except (ValueError, TypeError):
+                    pass
+                self._dd_start = None
+        dd_pct = ((eq - self.peak) / self.peak) * 100 if self.peak > 0 else 0.0
+        if dd_pct < self.max_drawdown_pct:
+            self.max_drawdown_pct = dd_pct
+        if dd_pct < 0 and self._dd_start is None:
+            self._dd_start = label
+
+        if point["drawdown_pct"] < 0:
+            self._dd_sum += point["drawdown_pct"]
+            self._dd_count += 1
+        if point["positions_count"] > 0:
+            self._invested_points += 1
+        self._positions_sum += point["positions_count"]
+
+    def add_return(self, ret: float) -> None:
+        """One per-bar portfolio return."""
+        self._returns.add(ret)
+        if ret < 0:
+            self._downside.add(ret)
+
+    # ------------------------------------------------------------------
+    # Readout
+    # ------------------------------------------------------------------
+
+    def _years(self) -> float:
+        if self.points > 1:
+            try:
+                return max((_day(self._last_date) - _day(self._first_date)).days / 365.25, 0.01)
+            except (ValueError, TypeError):
+                return self.points / TRADING_DAYS_PER_YEAR
+        return 1.0
+
+    def snapshot(self) -> PerformanceMetrics:
+        """PerformanceMetrics for everything accumulated so far."""
+        ann_factor = _bars_per_year(self.timeframe)
+        initial_capital = self.initial_capital
+        final_equity = self.final_equity
+        total_pnl = final_equity - initial_capital
+        total_return_pct = ((final_equity / initial_capital) - 1) * 100
+
+        years = self._years()
+        if final_equity > 0 and initial_capital > 0:
+            cagr_pct = ((final_equity / initial_capital) ** (1 / years) - 1) * 100
+        else:
+            cagr_pct = 0.0
+
+        # --- Volatility & risk-adjusted metrics ---
+        annualized_vol = (
+            self._returns.std() * math.sqrt(ann_factor) * 100 if self._returns.n > 1 else 0.0
+        )
+        if annualized_vol > 0:
+            sharpe_ratio = (cagr_pct - (RISK_FREE_RATE * 100)) / annualized_vol
+        else:
+            sharpe_ratio = 0.0
+
+        if self._downside.n > 0:
+            downside_dev = self._downside.std() * math.sqrt(ann_factor) * 100
+            if downside_dev > 0:  # NaN (single losing bar) fails this too
+                sortino_ratio = (cagr_pct - (RISK_FREE_RATE * 100)) / downside_dev
+            else:
+                sortino_ratio = 0.0
+        else:
+            sortino_ratio = sharpe_ratio  # No losing periods
+
+        avg_dd_pct = self._dd_sum / self._dd_count if self._dd_count else 0.0
+
+        # --- Trade statistics ---
+        total_trades = self.total_trades
+        winning_trades = self.winning_trades
+        losing_trades = total_trades - winning_trades
+        win_rate_pct = (winning_trades / total_trades * 100) if total_trades > 0 else 0.0
+
+        gross_loss = abs(self.gross_loss)
+        profit_factor = (
+            (self.gross_profit / gross_loss)
+            if gross_loss > 0
+            else (float("inf") if self.gross_profit > 0 else 0.0)
+        )
+        avg_win_pct = self._win_pct_sum / winning_trades if winning_trades else 0.0
+        avg_loss_pct = self._loss_pct_sum / losing_trades if losing_trades else 0.0
+        avg_hold = self._hold_sum / total_trades if total_trades else 0.0
+
+        if self.points:
+            exposure_pct = (self._invested_points / self.points) * 100
+            avg_positions = self._positions_sum / self.points
+        else:
+            exposure_pct = 0.0
+            avg_positions = 0.0
+
+        reasons = self.close_reasons
+        go_nogo = _check_go_nogo(
+            sharpe=sharpe_ratio,
+            max_dd=abs(self.max_drawdown_pct),
+            win_rate=win_rate_pct,
+            profit_factor=profit_factor,
+            total_trades=total_trades,
+        )
+
+        return PerformanceMetrics(
+            total_return_pct=round(total_return_pct, 2),
+            cagr_pct=round(cagr_pct, 2),
+            annualized_volatility_pct=round(annualized_vol, 2),
+            sharpe_ratio=round(sharpe_ratio, 3),
+            sortino_ratio=round(sortino_ratio, 3),
+            max_drawdown_pct=round(self.max_drawdown_pct, 2),
+            max_drawdown_duration_days=self.max_drawdown_duration_days,
+            avg_drawdown_pct=round(avg_dd_pct, 2),
+            total_trades=total_trades,
+            winning_trades=winning_trades,
+            losing_trades=losing_trades,
+            win_rate_pct=round(win_rate_pct, 1),
+            profit_factor=round(profit_factor, 2) if profit_factor != float("inf") else 999.99,
+            avg_win_pct=round(avg_win_pct, 2),
+            avg_loss_pct=round(avg_loss_pct, 2),
+            avg_hold_days=round(avg_hold, 1),
+            best_trade_pct=round(self.best_trade_pct or 0.0, 2),
+            worst_trade_pct=round(self.worst_trade_pct or 0.0, 2),
+            max_win_streak=self.max_win_streak,
+            max_loss_streak=self.max_loss_streak,
+            exposure_pct=round(exposure_pct, 1),
+            avg_positions=round(avg_positions, 1),
+            final_equity=round(final_equity, 2),
+            total_pnl=round(total_pnl, 2),
+            stop_loss_count=reasons["stop_loss"],
+            take_profit_count=reasons["take_profit"],
+            signal_exit_count=reasons["signal_exit"],
+            slope_exit_count=reasons["slope_exit"],
+            adverse_slope_exit_count=reasons["adverse_slope_exit"],
+            nb_exit_count=reasons["nb_exit"],
+            vwap_exit_count=reasons["vwap_exit"],
+            eod_close_count=reasons["eod_close"],
+            end_of_backtest_count=reasons["end_of_backtest"],
+            kill_switch_exit_count=reasons["kill_switch"],
+            go_nogo=go_nogo,
+        )
+
+
 def calculate_metrics(result) -> PerformanceMetrics:
     """
     Calculate comprehensive performance metrics from a BacktestResult.
 
     Handles both daily and hourly timeframes with correct annualization.
+    One pass over trades, equity curve and returns (see MetricsAccumulator).
 
     Args:
         result: BacktestResult from engine.
@@ -98,193 +365,15 @@ def calculate_metrics(result) -> PerformanceMetrics:
     Returns:
         PerformanceMetrics with all statistics.
     """
-    trades = result.trades
-    equity_curve = result.equity_curve
-    daily_returns = result.daily_returns
-    initial_capital = result.config.initial_capital
     timeframe = getattr(result.config, "timeframe", "1Day")
-
-    # Annualization factor
-    ann_factor = _bars_per_year(timeframe)
-
-    # --- Basic returns ---
-    final_equity = equity_curve[-1]["equity"] if equity_curve else initial_capital
-    total_pnl = final_equity - initial_capital
-    total_return_pct = ((final_equity / initial_capital) - 1) * 100
-
-    # Trading period in years
-    if equity_curve and len(equity_curve) > 1:
-        try:
-            start_d = date.fromisoformat(equity_curve[0]["date"][:10])
-            end_d = date.fromisoformat(equity_curve[-1]["date"][:10])
-            years = max((end_d - start_d).days / 365.25, 0.01)
-        except (ValueError, TypeError):
-            years = len(equity_curve) / TRADING_DAYS_PER_YEAR
-    else:
-        years = 1.0
-
-    # CAGR
-    if final_equity > 0 and initial_capital > 0:
-        cagr_pct = ((final_equity / initial_capital) ** (1 / years) - 1) * 100
-    else:
-        cagr_pct = 0.0
-
-    # --- Volatility & risk-adjusted metrics ---
-    returns_arr = np.array(daily_returns) if daily_returns else np.array([0.0])
-
-    # Annualized volatility — uses ann_factor for correct scaling
-    annualized_vol = (
-        float(np.std(returns_arr, ddof=1) * np.sqrt(ann_factor) * 100)
-        if len(returns_arr) > 1
-        else 0.0
-    )
-
-    # Sharpe ratio (annualized)
-    if annualized_vol > 0:
-        excess_return = cagr_pct - (RISK_FREE_RATE * 100)
-        sharpe_ratio = excess_return / annualized_vol
-    else:
-        sharpe_ratio = 0.0
-
-    # Sortino ratio (uses downside deviation only)
-    negative_returns = returns_arr[returns_arr < 0]
-    if len(negative_returns) > 0:
-        downside_dev = float(np.std(negative_returns, ddof=1) * np.sqrt(ann_factor) * 100)
-        if downside_dev > 0:
-            sortino_ratio = (cagr_pct - (RISK_FREE_RATE * 100)) / downside_dev
-        else:
-            sortino_ratio = 0.0
-    else:
-        sortino_ratio = sharpe_ratio  # No losing periods
-
-    # --- Drawdown ---
-    max_dd_pct = 0.0
-    max_dd_duration = 0
-    dd_durations: list[int] = []
-    current_dd_start: str | None = None
-
-    if equity_curve:
-        peak = equity_curve[0]["equity"]
-        for point in equity_curve:
-            eq = point["equity"]
-            if eq > peak:
-                peak = eq
-                if current_dd_start is not None:
-                    try:
-                        dd_start = date.fromisoformat(current_dd_start[:10])
-                        dd_end = date.fromisoformat(point["date"][:10])
-                        dd_durations.append((dd_end - dd_start).days)
-                    except (ValueError, TypeError):
-                        pass
-                    current_dd_start = None
-            dd_pct = ((eq - peak) / peak) * 100 if peak > 0 else 0.0
-            if dd_pct < max_dd_pct:
-                max_dd_pct = dd_pct
-            if dd_pct < 0 and current_dd_start is None:
-                current_dd_start = point["date"]
-
-        max_dd_duration = max(dd_durations) if dd_durations else 0
-
-    avg_dd_pct = (
-        float(np.mean([e["drawdown_pct"] for e in equity_curve if e["drawdown_pct"] < 0]))
-        if any(e["drawdown_pct"] < 0 for e in equity_curve)
-        else 0.0
-    )
-
-    # --- Trade statistics ---
-    total_trades = len(trades)
-    winning = [t for t in trades if t.pnl > 0]
-    losing = [t for t in trades if t.pnl <= 0]
-    winning_trades = len(winning)
-    losing_trades = len(losing)
-
-    win_rate_pct = (winning_trades / total_trades * 100) if total_trades > 0 else 0.0
-
-    # Profit factor
-    gross_profit = sum(t.pnl for t in winning) if winning else 0.0
-    gross_loss = abs(sum(t.pnl for t in losing)) if losing else 0.0
-    profit_factor = (
-        (gross_profit / gross_loss)
-        if gross_loss > 0
-        else (float("inf") if gross_profit > 0 else 0.0)
-    )
-
-    avg_win_pct = float(np.mean([t.pnl_pct for t in winning])) if winning else 0.0
-    avg_loss_pct = float(np.mean([t.pnl_pct for t in losing])) if losing else 0.0
-    avg_hold = float(np.mean([t.hold_days for t in trades])) if trades else 0.0
-    best_trade_pct = max((t.pnl_pct for t in trades), default=0.0)
-    worst_trade_pct = min((t.pnl_pct for t in trades), default=0.0)
-
-    # --- Streaks ---
-    max_win_streak, max_loss_streak = _calculate_streaks(trades)
-
-    # --- Exposure ---
-    if equity_curve:
-        invested_days = sum(1 for e in equity_curve if e["positions_count"] > 0)
-        exposure_pct = (invested_days / len(equity_curve)) * 100
-        avg_positions = float(np.mean([e["positions_count"] for e in equity_curve]))
-    else:
-        exposure_pct = 0.0
-        avg_positions = 0.0
-
-    # --- Close reasons ---
-    stop_loss_count = sum(1 for t in trades if t.close_reason == "stop_loss")
-    take_profit_count = sum(1 for t in trades if t.close_reason == "take_profit")
-    signal_exit_count = sum(1 for t in trades if t.close_reason == "signal_exit")
-    slope_exit_count = sum(1 for t in trades if t.close_reason == "slope_exit")
-    adverse_slope_exit_count = sum(1 for t in trades if t.close_reason == "adverse_slope_exit")
-    nb_exit_count = sum(1 for t in trades if t.close_reason == "nb_exit")
-    vwap_exit_count = sum(1 for t in trades if t.close_reason == "vwap_exit")
-    eod_close_count = sum(1 for t in trades if t.close_reason == "eod_close")
-    end_of_backtest_count = sum(1 for t in trades if t.close_reason == "end_of_backtest")
-    kill_switch_exit_count = sum(1 for t in trades if t.close_reason == "kill_switch")
-
-    # --- Go/No-Go check ---
-    go_nogo = _check_go_nogo(
-        sharpe=sharpe_ratio,
-        max_dd=abs(max_dd_pct),
-        win_rate=win_rate_pct,
-        profit_factor=profit_factor,
-        total_trades=total_trades,
-    )
-
-    metrics = PerformanceMetrics(
-        total_return_pct=round(total_return_pct, 2),
-        cagr_pct=round(cagr_pct, 2),
-        annualized_volatility_pct=round(annualized_vol, 2),
-        sharpe_ratio=round(sharpe_ratio, 3),
-        sortino_ratio=round(sortino_ratio, 3),
-        max_drawdown_pct=round(max_dd_pct, 2),
-        max_drawdown_duration_days=max_dd_duration,
-        avg_drawdown_pct=round(avg_dd_pct, 2),
-        total_trades=total_trades,
-        winning_trades=winning_trades,
-        losing_trades=losing_trades,
-        win_rate_pct=round(win_rate_pct, 1),
-        profit_factor=round(profit_factor, 2) if profit_factor != float("inf") else 999.99,
-        avg_win_pct=round(avg_win_pct, 2),
-        avg_loss_pct=round(avg_loss_pct, 2),
-        avg_hold_days=round(avg_hold, 1),
-        best_trade_pct=round(best_trade_pct, 2),
-        worst_trade_pct=round(worst_trade_pct, 2),
-        max_win_streak=max_win_streak,
-        max_loss_streak=max_loss_streak,
-        exposure_pct=round(exposure_pct, 1),
-        avg_positions=round(avg_positions, 1),
-        final_equity=round(final_equity, 2),
-        total_pnl=round(total_pnl, 2),
-        stop_loss_count=stop_loss_count,
-        take_profit_count=take_profit_count,
-        signal_exit_count=signal_exit_count,
-        slope_exit_count=slope_exit_count,
-        adverse_slope_exit_count=adverse_slope_exit_count,
-        nb_exit_count=nb_exit_count,
-        vwap_exit_count=vwap_exit_count,
-        eod_close_count=eod_close_count,
-        end_of_backtest_count=end_of_backtest_count,
-        kill_switch_exit_count=kill_switch_exit_count,
-        go_nogo=go_nogo,
-    )
+    acc = MetricsAccumulator(result.config.initial_capital, timeframe)
+    for trade in result.trades:
+        acc.add_trade(trade)
+    for point in result.equity_curve:
+        acc.add_equity(point)
+    for ret in result.daily_returns:
+        acc.add_return(ret)
+    metrics = acc.snapshot()
 
     logger.info(
         "metrics_calculated",
@@ -294,35 +383,12 @@ def calculate_metrics(result) -> PerformanceMetrics:
         profit_factor=metrics.profit_factor,
         trades=metrics.total_trades,
         timeframe=timeframe,
-        go=go_nogo["pass"],
+        go=metrics.go_nogo["pass"],
     )
 
     return metrics
 
 
-def _calculate_streaks(trades: list) -> tuple[int, int]:
-    """Calculate max consecutive win/loss streaks."""
-    if not trades:
-        return 0, 0
-
-    max_win = 0
-    max_loss = 0
-    current_win = 0
-    current_loss = 0
-
-    for t in trades:
-        if t.pnl > 0:
-            current_win += 1
-            current_loss = 0
-            max_win = max(max_win, current_win)
-        else:
-            current_loss += 1
-            current_win = 0
-            max_loss = max(max_loss, current_loss)
-
-    return max_win, max_loss
-
-
 def _check_go_nogo(
     sharpe: float,
     max_dd: float,
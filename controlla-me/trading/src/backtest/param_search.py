@@ -0,0 +1,453 @@
+"""
+Parameter Search — adaptive (TPE) search over BacktestConfig parameters.
+
+Instead of the full itertools.product of a grid, a Tree-structured Parzen
+Estimator proposes each batch of configurations from the trials seen so far:
+the best ``gamma`` fraction of trials and the rest each get a per-parameter
+kernel density, and candidates with the highest good/bad density ratio are
+evaluated next. Batches run on the grid search worker pool (shared-memory
+data, result cache, pruning), and every finished trial is stored in the local
+SQLite DB (search_studies / search_trials), so re-running the same study name
+resumes where it stopped.
+
+Usage:
+    python -m src.backtest search --start 2023-01-01 --end 2024-12-31 --trials 60 --workers 4
+    python -m src.backtest search --start 2023-01-01 --end 2024-12-31 --space cycle4 --study c4-tpe
+"""
+
+from __future__ import annotations
+
+import csv
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import structlog
+
+from ..utils.db_local import DEFAULT_DB_PATH, LocalDB
+from .data_loader import DataLoader
+from .grid_search import (
+    DEFAULT_OUTPUT_DIR,
+    RESULT_COLUMNS,
+    _evaluate_all,
+    _init_worker,
+    _result_summary,
+)
+from .pruning import PruneRule
+from .result_cache import data_fingerprint
+from .shared_data import SharedFrames
+
+logger = structlog.get_logger()
+
+
+# ---------------------------------------------------------------------------
+# Search space
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Dimension:
+    """
+    One searchable parameter.
+
+    Numeric: ``low``..``high`` (inclusive), snapped to multiples of ``step``
+    from ``low`` when given. Categorical: ``choices``.
+    """
+
+    name: str
+    low: float | None = None
+    high: float | None = None
+    step: float | None = None
+    choices: tuple | None = None
+
+    @property
+    def categorical(self) -> bool:
+        return self.choices is not None
+
+    def to_unit(self, value: float) -> float:
+        return 0.0 if self.high == self.low else (value - self.low) / (self.high - self.low)
+
+    def from_unit(self, u: float) -> float:
+        value = self.low + min(max(u, 0.0), 1.0) * (self.high - self.low)
+        if self.step:
+            value = self.low + round((value - self.low) / self.step) * self.step
+            value = min(max(value, self.low), self.high)
+            if float(self.step).is_integer() and float(self.low).is_integer():
+                return int(round(value))
+            return round(value, 6)
+        return value
+
+
+# Exit / trailing / portfolio parameters of the 1Day trend-following strategy
+# (the keys grid_search._build_config understands)
+DEFAULT_SPACE = [
+    Dimension("stop_loss_atr", 1.0, 3.0, 0.25),
+    Dimension("take_profit_atr", 2.0, 8.0, 0.5),
+    Dimension("trailing_breakeven_atr", 0.5, 2.0, 0.25),
+    Dimension("trailing_trail_threshold_atr", 1.5, 4.0, 0.25),
+    Dimension("trailing_trail_distance_atr", 1.0, 2.5, 0.25),
+    Dimension("signal_exit_enabled", choices=(False, True)),
+    Dimension("trend_filter", choices=(True, False)),
+    Dimension("max_positions", choices=(5, 10)),
+]
+
+
+def space_from_grid(grid: dict[str, list]) -> list[Dimension]:
+    """
+    Search space spanning a grid preset.
+
+    Numeric lists become ranges [min, max] stepped by the smallest gap between
+    grid values (so the grid points stay reachable, plus everything between);
+    booleans/strings and single values become categorical.
+    """
+    space = []
+    for name, values in grid.items():
+        unique = sorted(set(values), key=str)
+        numeric = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in unique)
+        if numeric and len(unique) > 1:
+            unique = sorted(unique)
+            step = min(b - a for a, b in zip(unique, unique[1:]))
+            if all(isinstance(v, int) for v in unique):
+                step = max(1, int(step))
+            space.append(Dimension(name, unique[0], unique[-1], step))
+        else:
+            space.append(Dimension(name, choices=tuple(values)))
+    return space
+
+
+def _params_key(params: dict) -> tuple:
+    return tuple(sorted((k, repr(v)) for k, v in params.items()))
+
+
+# ---------------------------------------------------------------------------
+# TPE sampler (pure NumPy)
+# ---------------------------------------------------------------------------
+
+class TPESampler:
+    """
+    Tree-structured Parzen Estimator over independent dimensions (maximizes).
+
+    The first ``n_startup`` proposals are uniform random. After that, trials
+    are split into the top ``gamma`` fraction ("good") and the rest; each
+    numeric dimension gets a truncated Gaussian mixture on [0, 1] (one kernel
+    per observation plus a uniform prior), each categorical one smoothed
+    frequencies. ``n_candidates`` draws from the good densities are scored by
+    log l(x) - log g(x) and the best unseen one is proposed.
+    """
+
+    def __init__(
+        self,
+        space: list[Dimension],
+        n_startup: int = 10,
+        gamma: float = 0.25,
+        n_candidates: int = 32,
+        seed: int | None = None,
+    ) -> None:
+        self.space = space
+        self.n_startup = n_startup
+        self.gamma = gamma
+        self.n_candidates = n_candidates
+        self.rng = np.random.default_rng(seed)
+
+    def propose(self, trials: list[tuple[dict, float]], pending: list[dict] | None = None) -> dict:
+        """
+        Next parameter set given (params, value) observations.
+
+        ``pending`` holds proposals of the current batch not yet evaluated;
+        they count as seen (no duplicates) and as "bad" observations, which
+        spreads a batch out instead of proposing the same point repeatedly.
+        """
+        pending = pending or []
+        names = [d.name for d in self.space]
+        trials = [(p, v) for p, v in trials if all(n in p for n in names)]
+        seen = {_params_key(p) for p, _ in trials} | {_params_key(p) for p in pending}
+
+        if len(trials) < self.n_startup:
+            return self._unseen(self._random, seen)
+
+        ordered = sorted(trials, key=lambda t: t[1], reverse=True)
+        n_good = max(1, int(math.ceil(self.gamma * len(ordered))))
+        good = [p for p, _ in ordered[:n_good]]
+        bad = [p for p, _ in ordered[n_good:]] + pending
+
+        best, best_score = None, -np.inf
+        for _ in range(self.n_candidates):
+            params = {d.name: self._sample(d, [p[d.name] for p in good]) for d in self.space}
+            if _params_key(params) in seen:
+                continue
+            score = sum(
+                self._log_density(d, params[d.name], [p[d.name] for p in good])
+                - self._log_density(d, params[d.name], [p[d.name] for p in bad])
+                for d in self.space
+            )
+            if score > best_score:
+                best, best_score = params, score
+        if best is not None:
+            return best
+        return self._unseen(self._random, seen)
+
+    # ------------------------------------------------------------------
+
+    def _unseen(self, draw, seen: set, attempts: int = 100) -> dict:
+        params = draw()
+        for _ in range(attempts):
+            if _params_key(params) not in seen:
+                break
+            params = draw()
+        return params
+
+    def _random(self) -> dict:
+        params = {}
+        for d in self.space:
+            if d.categorical:
+                params[d.name] = d.choices[self.rng.integers(len(d.choices))]
+            else:
+                params[d.name] = d.from_unit(float(self.rng.random()))
+        return params
+
+    @staticmethod
+    def _bandwidths(points: np.ndarray) -> np.ndarray:
+        """
+        Per-kernel width on the unit interval: the larger gap to a neighbouring
+        observation (or bound), at least 1/(n+1) — wide while data is sparse,
+        narrowing as observations accumulate.
+        """
+        order = np.argsort(points)
+        edges = np.concatenate([[0.0], points[order], [1.0]])
+        gaps = np.maximum(edges[1:-1] - edges[:-2], edges[2:] - edges[1:-1])
+        sigma = np.empty_like(points)
+        sigma[order] = gaps
+        return np.clip(sigma, 1.0 / min(100, len(points) + 1), 1.0)
+
+    def _sample(self, d: Dimension, observed: list) -> Any:
+        if d.categorical:
+            return d.choices[self.rng.choice(len(d.choices), p=self._cat_probs(d, observed))]
+        points = np.array([d.to_unit(v) for v in observed])
+        # Mixture component: one kernel per observation or the uniform prior
+        k = self.rng.integers(len(points) + 1)
+        if k == len(points):
+            return d.from_unit(float(self.rng.random()))
+        return d.from_unit(float(self.rng.normal(points[k], self._bandwidths(points)[k])))
+
+    def _log_density(self, d: Dimension, value: Any, observed: list) -> float:
+        if d.categorical:
+            return float(np.log(self._cat_probs(d, observed)[d.choices.index(value)]))
+        if not observed:
+            return 0.0
+        points = np.array([d.to_unit(v) for v in observed])
+        bw = self._bandwidths(points)
+        x = d.to_unit(value)
+        kernels = np.exp(-0.5 * ((x - points) / bw) ** 2) / (bw * math.sqrt(2 * math.pi))
+        # Uniform prior has density 1 on [0, 1]
+        return float(np.log((kernels.sum() + 1.0) / (len(points) + 1)))
+
+    @staticmethod
+    def _cat_probs(d: Dimension, observed: list) -> np.ndarray:
+        counts = np.array([sum(1 for v in observed if v == c) for c in d.choices], dtype=float)
+        probs = counts + 1.0
+        return probs / probs.sum()
+
+
+# ---------------------------------------------------------------------------
+# Persistent study
+# ---------------------------------------------------------------------------
+
+class SearchStudy:
+    """Trials of one named search, persisted in the local DB."""
+
+    def __init__(self, name: str, space: list[Dimension], settings: dict, db: LocalDB) -> None:
+        self.name = name
+        self._db = db
+        self.study_id = db.get_or_create_search_study(
+            name, {"dimensions": [asdict(d) for d in space]}, settings
+        )
+        self.trials = db.get_search_trials(self.study_id)
+
+    def observations(self, objective: str) -> list[tuple[dict, float]]:
+        """(params, value) for the sampler; pruned/failed trials rank last."""
+        floor = min((t["value"] for t in self.trials if t["status"] == "complete"), default=0.0)
+        out = []
+        for t in self.trials:
+            if t["status"] == "complete":
+                out.append((t["params"], t["value"]))
+            else:
+                out.append((t["params"], floor - 1.0))
+        return out
+
+    def record(self, params: dict, row: dict | None, objective: str, error: str | None = None) -> None:
+        if row is None:
+            status, value, metrics = "failed", None, {"error": error}
+        else:
+            status = "pruned" if row.get("pruned") else "complete"
+            value = float(row[objective])
+            metrics = {k: row[k] for k in RESULT_COLUMNS if k in row}
+        self._db.insert_search_trial(self.study_id, params, status, value, metrics)
+        self.trials.append({"params": params, "status": status, "value": value, "metrics": metrics})
+
+    def best(self) -> dict | None:
+        complete = [t for t in self.trials if t["status"] == "complete"]
+        return max(complete, key=lambda t: t["value"]) if complete else None
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def run_param_search(
+    symbols: list[str],
+    start: date,
+    end: date,
+    initial_capital: float = 100_000.0,
+    timeframe: str = "1Day",
+    space: list[Dimension] | None = None,
+    n_trials: int = 50,
+    batch_size: int = 4,
+    workers: int = 1,
+    study_name: str | None = None,
+    objective: str = "sharpe_ratio",
+    n_startup: int = 10,
+    seed: int | None = None,
+    engine: str = "bar",
+    use_cache: bool = True,
+    prune: PruneRule | None = None,
+    output_dir: Path | None = None,
+    db_path: Path | str = DEFAULT_DB_PATH,
+) -> Path:
+    """
+    Run (or resume) a TPE search until the study holds ``n_trials`` trials.
+
+    Args:
+        symbols: List of ticker symbols.
+        start: Start date.
+        end: End date.
+        initial_capital: Initial portfolio capital.
+        timeframe: Bar timeframe.
+        space: Dimensions to search (default: DEFAULT_SPACE).
+        n_trials: Total trials in the study, including ones from earlier runs.
+        batch_size: Proposals evaluated concurrently per round.
+        workers: Worker processes (shared-memory data, as in grid search).
+        study_name: Trials are stored and resumed under this name.
+        objective: RESULT_COLUMNS metric to maximize.
+        n_startup: Random trials before the TPE model takes over.
+        seed: RNG seed for reproducible proposals.
+        engine: BacktestConfig.engine.
+        use_cache: Reuse cached results of identical (config, data) pairs.
+        prune: Optional early-stopping rule for each trial.
+        output_dir: Where search_results.csv is written.
+        db_path: SQLite DB holding the studies.
+
+    Returns:
+        Path to output directory with results.
+    """
+    space = space or DEFAULT_SPACE
+    if objective not in RESULT_COLUMNS:
+        raise ValueError(f"unknown objective {objective!r}")
+    study_name = study_name or f"search_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    batch_size = max(1, batch_size)
+    workers = max(1, min(workers, batch_size))
+
+    settings = {
+        "start": start,
+        "end": end,
+        "initial_capital": initial_capital,
+        "timeframe": timeframe,
+        "engine": engine,
+        "fingerprint": None,
+        "window": None,
+        "prune": prune,
+    }
+    study = SearchStudy(
+        study_name,
+        space,
+        {k: settings[k] for k in ("start", "end", "initial_capital", "timeframe")}
+        | {"symbols": sorted(symbols), "objective": objective},
+        LocalDB(db_path),
+    )
+    sampler = TPESampler(space, n_startup=n_startup, seed=seed)
+
+    print(f"\n{'='*70}")
+    print(f"  PARAMETER SEARCH [TPE] -- {start} -> {end} | study '{study_name}'")
+    print(f"  Capital: ${initial_capital:,.0f} | Symbols: {len(symbols)} | Objective: {objective}")
+    print(f"  Parameters: {', '.join(d.name for d in space)}")
+    print(f"  Trials: {n_trials} (resuming with {len(study.trials)}) | Batch: {batch_size} | Workers: {workers}")
+    print(f"{'='*70}\n")
+
+    if output_dir is None:
+        output_dir = DEFAULT_OUTPUT_DIR / study_name
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    remaining = n_trials - len(study.trials)
+    if remaining > 0:
+        logger.info("loading_data_for_search", symbols=len(symbols), timeframe=timeframe)
+        data = DataLoader().load(symbols, start, end, timeframe=timeframe)
+        if not data:
+            print("Error: No data loaded. Check API keys and date range.")
+            return Path(".")
+        settings["fingerprint"] = data_fingerprint(data) if use_cache else None
+
+        start_time = time.time()
+        with ExitStack() as stack:
+            pool = None
+            if workers > 1:
+                shared = stack.enter_context(SharedFrames.publish(data))
+                pool = stack.enter_context(ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(shared.handle,),
+                ))
+
+            while remaining > 0:
+                observations = study.observations(objective)
+                batch: list[dict] = []
+                for _ in range(min(batch_size, remaining)):
+                    batch.append(sampler.propose(observations, pending=batch))
+
+                outcomes: dict[int, tuple[dict | None, str | None]] = {}
+
+                def _collect(idx: int, row: dict | None, error: str | None, params: dict) -> None:
+                    outcomes[idx] = (row, error)
+                    print(f"ERROR: {error}" if row is None else _result_summary(row))
+
+                _evaluate_all(list(enumerate(batch)), settings, data, pool, _collect, workers)
+                # Record in proposal order so trial numbers do not depend on worker timing
+                for idx, params in enumerate(batch):
+                    row, error = outcomes.get(idx, (None, "no result"))
+                    study.record(params, row, objective, error)
+                remaining -= len(batch)
+
+                best = study.best()
+                logger.info(
+                    "search_batch_done",
+                    trials=len(study.trials),
+                    best=best["value"] if best else None,
+                    elapsed_s=round(time.time() - start_time),
+                )
+
+    # Results CSV: every trial, best first
+    keys = [d.name for d in space]
+    rows = [
+        {**t["params"], "trial": n, "status": t["status"], **t["metrics"]}
+        for n, t in enumerate(study.trials)
+        if t["status"] != "failed"
+    ]
+    rows.sort(key=lambda r: (r["status"] == "complete", r.get(objective, -999)), reverse=True)
+    csv_path = output_dir / "search_results.csv"
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=[*keys, "trial", "status", *RESULT_COLUMNS], extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+    best = study.best()
+    print(f"\n{'='*70}")
+    print(f"  SEARCH COMPLETE — {len(study.trials)} trials in study '{study_name}'")
+    if best is not None:
+        print(f"  Best {objective}: {best['value']:+.3f}")
+        print(f"  Params: {best['params']}")
+    print(f"  Results saved: {csv_path}")
+    print(f"{'='*70}\n")
+    return output_dir
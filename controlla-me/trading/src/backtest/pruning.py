@@ -0,0 +1,83 @@
+"""
+Pruning — stop hopeless backtests before they reach the end of the period.
+
+BacktestEngine.run(prune=...) evaluates a predicate on the live metrics
+(MetricsAccumulator snapshot) every ``prune_every`` bars. When it returns a
+truthy value the run stops: open positions are closed at that bar, the result
+is flagged ``pruned`` and the predicate's return value (a reason string for
+PruneRule) is recorded as ``pruned_reason``.
+
+Successive halving (see grid_search.run_grid_search) runs every combination on
+a short leading window, keeps the best fraction, and re-runs the survivors on
+progressively longer windows until the full period.
+
+Usage:
+    rule = PruneRule(max_drawdown_pct=15.0, min_trades=1, idle_fraction=0.25)
+    result = BacktestEngine(config).run(data, prune=rule)
+    if result.pruned:
+        print(result.pruned_reason)
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from .metrics import PerformanceMetrics
+
+# (live metrics, fraction of simulated bars done) -> falsy to continue,
+# truthy (ideally a short reason) to abort
+PruneCheck = Callable[[PerformanceMetrics, float], object]
+
+# Go/no-go drawdown limit (metrics._check_go_nogo: max drawdown < 15%)
+GO_NOGO_MAX_DRAWDOWN_PCT = 15.0
+
+
+@dataclass(frozen=True)
+class PruneRule:
+    """
+    Default pruning predicate.
+
+    Aborts once the drawdown is past the go/no-go limit (it can only get
+    worse, so the run can never pass), or when fewer than ``min_trades``
+    trades closed after ``idle_fraction`` of the period.
+    """
+
+    max_drawdown_pct: float = GO_NOGO_MAX_DRAWDOWN_PCT
+    min_trades: int = 1
+    idle_fraction: float = 0.25
+
+    def __call__(self, metrics: PerformanceMetrics, progress: float) -> str | None:
+        if abs(metrics.max_drawdown_pct) >= self.max_drawdown_pct:
+            return f"max_drawdown {metrics.max_drawdown_pct:.1f}%"
+        if progress >= self.idle_fraction and metrics.total_trades < self.min_trades:
+            return f"{metrics.total_trades} trades after {progress:.0%} of bars"
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Successive halving
+# ---------------------------------------------------------------------------
+
+def halving_windows(start: date, end: date, rungs: int, eta: float) -> list[date]:
+    """
+    End dates of the successive-halving rungs over [start, end].
+
+    Rung r (0-based) covers the first ``eta ** (r - rungs + 1)`` of the period,
+    so the last rung is the full period: rungs=3, eta=3 → 1/9, 1/3, 1.
+    """
+    if rungs < 1:
+        raise ValueError(f"rungs must be >= 1, got {rungs}")
+    if eta <= 1:
+        raise ValueError(f"eta must be > 1, got {eta}")
+    span = (end - start).days
+    ends = [start + timedelta(days=max(1, round(span * eta ** (r - rungs + 1)))) for r in range(rungs - 1)]
+    return [*ends, end]
+
+
+def promote(rows: list[tuple[int, dict]], keep: int, key: str = "sharpe_ratio") -> list[int]:
+    """Indices of the ``keep`` best rows by ``key`` (pruned rows rank last, ties by index)."""
+    ranked = sorted(rows, key=lambda item: (bool(item[1].get("pruned")), -item[1].get(key, -999), item[0]))
+    return [idx for idx, _ in ranked[: max(1, keep)]]
+
@@ -130,6 +130,8 @@ def _write_json_report(result, metrics, output_dir: Path) -> None:
             "orders_filled": result.orders_filled,
             "kill_switch_triggered": result.kill_switch_triggered,
             "kill_switch_date": result.kill_switch_date,
+            "pruned": result.pruned,
+            "pruned_reason": result.pruned_reason,
         },
         "go_nogo": metrics.go_nogo,
     }
@@ -322,6 +324,10 @@ def _print_summary(result, metrics) -> None:
         print(f"  ⚠️  KILL SWITCH triggered on {result.kill_switch_date}")
         print()
 
+    if result.pruned:
+        print(f"  ✂️  PRUNED early: {result.pruned_reason}")
+        print()
+
     print("  GO / NO-GO CHECK")
     print("  " + "-" * 40)
     for name, check in go["checks"].items():
@@ -356,6 +362,10 @@ def _persist_to_sqlite(result, metrics) -> None:
             "take_profit_atr": getattr(result.config, "take_profit_atr", 6.0),
             "signal_threshold": getattr(result.config, "signal_threshold", 0.3),
             "trend_filter": getattr(result.config, "trend_filter", True),
+            # Indexed as generated columns in backtest_runs (db_local migration 2)
+            "slope_threshold_pct": getattr(result.config, "slope_threshold_pct", None),
+            "slope_volume_multiplier": getattr(result.config, "slope_volume_multiplier", None),
+            "nb_band_mult": getattr(result.config, "nb_band_mult", None),
         }
 
         # Build metrics dict
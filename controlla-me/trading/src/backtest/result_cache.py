@@ -0,0 +1,202 @@
+"""
+Result Cache — memoize backtests by config + input-data fingerprint.
+
+Grid searches, auto-optimizer cycles and A/B scripts keep re-running the same
+(config, symbols, date range) combinations. The cache key is a hash of the
+BacktestConfig dump plus a fingerprint of the exact bars fed to the engine, so
+a hit is guaranteed to reproduce the same BacktestResult. Entries live in the
+local SQLite DB (backtest_cache table) and are evicted least-recently-used
+once the count or byte budget is exceeded.
+
+Usage:
+    cache = ResultCache()
+    result, metrics = run_backtest(config, data, cache=cache)   # engine only on a miss
+    result, metrics = run_backtest(config, data)                # --no-cache
+    outcomes = run_backtests(configs, data, cache=cache)         # exit variants share entries
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import pickle
+import zlib
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import structlog
+
+from ..utils.db_local import DEFAULT_DB_PATH, LocalDB
+from .engine import EXIT_PARAMS, BacktestConfig, BacktestEngine, BacktestResult, run_exit_variants
+from .metrics import PerformanceMetrics, calculate_metrics
+from .pruning import PruneCheck
+
+logger = structlog.get_logger()
+
+# Bump when engine/metrics changes alter results for an unchanged config
+CACHE_VERSION = 2
+
+DEFAULT_MAX_ENTRIES = 5_000
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Config fields that do not affect the result
+_KEY_EXCLUDE = {"engine"}
+
+
+def data_fingerprint(
+    data: dict[str, pd.DataFrame],
+    daily_data: dict[str, pd.DataFrame] | None = None,
+) -> str:
+    """Content hash of the input bars (symbols, timestamps, columns, values)."""
+    h = hashlib.sha256()
+    for prefix, frames in (("primary", data), ("daily", daily_data or {})):
+        for symbol in sorted(frames):
+            df = frames[symbol]
+            h.update(f"{prefix}:{symbol}:{len(df)}:{','.join(map(str, df.columns))}".encode())
+            h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def cache_key(config: BacktestConfig, fingerprint: str, window: tuple[date, date] | None = None) -> str:
+    """Key for a (config, data[, simulated window]) tuple."""
+    dump = config.model_dump(mode="json", exclude=_KEY_EXCLUDE)
+    payload = {"v": CACHE_VERSION, "config": dump, "data": fingerprint}
+    if window is not None:
+        payload["window"] = [str(window[0]), str(window[1])]
+    blob = json.dumps(payload, sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class ResultCache:
+    """Size-bounded LRU store of (BacktestResult, PerformanceMetrics).
+
+    Cache failures are logged and treated as misses — they never fail a run.
+    """
+
+    def __init__(
+        self,
+        db_path: Path | str = DEFAULT_DB_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self._db = LocalDB(db_path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def get(self, key: str) -> tuple[BacktestResult, PerformanceMetrics] | None:
+        try:
+            payload = self._db.get_cached_result(key)
+            if payload is None:
+                return None
+            return pickle.loads(zlib.decompress(payload))
+        except Exception as e:
+            logger.warning("result_cache_read_failed", key=key[:12], error=str(e))
+            return None
+
+    def put(self, key: str, config: BacktestConfig, result: BacktestResult, metrics: PerformanceMetrics) -> None:
+        try:
+            payload = zlib.compress(pickle.dumps((result, metrics), protocol=pickle.HIGHEST_PROTOCOL))
+            self._db.put_cached_result(key, config.model_dump(mode="json"), payload)
+            self._db.evict_cached_results(self.max_entries, self.max_bytes)
+        except Exception as e:
+            logger.warning("result_cache_write_failed", key=key[:12], error=str(e))
+
+    def clear(self) -> int:
+        return self._db.clear_cached_results()
+
+
+def run_backtest(
+    config: BacktestConfig,
+    data: dict[str, pd.DataFrame],
+    daily_data: dict[str, pd.DataFrame] | None = None,
+    cache: ResultCache | None = None,
+    fingerprint: str | None = None,
+    window: tuple[date, date] | None = None,
+    prune: PruneCheck | None = None,
+) -> tuple[BacktestResult, PerformanceMetrics]:
+    """
+    Run a backtest, short-circuiting the engine when the cache has the result.
+
+    Args:
+        config: Backtest configuration.
+        data: Primary bars passed to BacktestEngine.run().
+        daily_data: Secondary daily bars (mean_reversion_v3).
+        cache: ResultCache, or None to always run the engine.
+        fingerprint: Precomputed data_fingerprint(data, daily_data) — pass it
+            when running many configs over the same data.
+        window: Optional (first_day, last_day) simulated by the engine.
+        prune: Optional early-stopping predicate (see pruning.py). Pruned
+            results are returned but never stored; a cached full result is
+            returned as is.
+
+    Returns:
+        (BacktestResult, PerformanceMetrics)
+    """
+    if cache is None:
+        result = BacktestEngine(config).run(data, daily_data=daily_data, window=window, prune=prune)
+        return result, calculate_metrics(result)
+
+    if fingerprint is None:
+        fingerprint = data_fingerprint(data, daily_data)
+    key = cache_key(config, fingerprint, window)
+
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info("result_cache_hit", key=key[:12], strategy=config.strategy)
+        return cached
+
+    result = BacktestEngine(config).run(data, daily_data=daily_data, window=window, prune=prune)
+    metrics = calculate_metrics(result)
+    if not result.pruned:
+        cache.put(key, config, result, metrics)
+    return result, metrics
+
+
+def run_backtests(
+    configs: list[BacktestConfig],
+    data: dict[str, pd.DataFrame],
+    daily_data: dict[str, pd.DataFrame] | None = None,
+    cache: ResultCache | None = None,
+    fingerprint: str | None = None,
+    window: tuple[date, date] | None = None,
+    prune: PruneCheck | None = None,
+) -> list[tuple[BacktestResult, PerformanceMetrics]]:
+    """
+    run_backtest for configs that differ only in exit parameters (EXIT_PARAMS).
+
+    Cache hits are returned as is; the misses run as one engine.run_exit_variants
+    batch, so their entry signals are computed once.
+
+    Raises:
+        ValueError: if two configs differ outside EXIT_PARAMS.
+    """
+    if not configs:
+        return []
+    entry_fields = configs[0].model_dump(exclude=EXIT_PARAMS | _KEY_EXCLUDE)
+    for config in configs[1:]:
+        if config.model_dump(exclude=EXIT_PARAMS | _KEY_EXCLUDE) != entry_fields:
+            raise ValueError("run_backtests: configs differ outside exit parameters")
+
+    outcomes: list[tuple[BacktestResult, PerformanceMetrics] | None] = [None] * len(configs)
+    keys: list[str | None] = [None] * len(configs)
+    if cache is not None:
+        if fingerprint is None:
+            fingerprint = data_fingerprint(data, daily_data)
+        for i, config in enumerate(configs):
+            keys[i] = cache_key(config, fingerprint, window)
+            outcomes[i] = cache.get(keys[i])
+            if outcomes[i] is not None:
+                logger.info("result_cache_hit", key=keys[i][:12], strategy=config.strategy)
+
+    missing = [i for i, outcome in enumerate(outcomes) if outcome is None]
+    if missing:
+        base = configs[missing[0]]
+        variants = [{name: getattr(configs[i], name) for name in EXIT_PARAMS} for i in missing]
+        results = run_exit_variants(base, variants, data, daily_data=daily_data, window=window, prune=prune)
+        for i, result in zip(missing, results):
+            metrics = calculate_metrics(result)
+            if cache is not None and not result.pruned:
+                cache.put(keys[i], configs[i], result, metrics)
+            outcomes[i] = (result, metrics)
+    return outcomes
@@ -0,0 +1,150 @@
+"""
+Shared Data — publish loaded OHLCV frames once for a pool of worker processes.
+
+The parent copies every frame into a single ``multiprocessing.shared_memory``
+block and hands workers a small picklable ``SharedFramesHandle``. Workers
+rebuild read-only, zero-copy DataFrames over that block, so a grid search with
+N workers pays for the market data once instead of pickling the whole
+``dict[symbol, DataFrame]`` into every task.
+
+Usage:
+    with SharedFrames.publish(data) as shared:
+        pool = ProcessPoolExecutor(initializer=init, initargs=(shared.handle,))
+        ...
+
+    # in the worker
+    shm, data = attach(handle)   # keep ``shm`` alive while ``data`` is in use
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+_ALIGN = 8
+
+
+@dataclass(frozen=True)
+class _ColumnSpec:
+    name: str
+    dtype: str
+    offset: int
+
+
+@dataclass(frozen=True)
+class _FrameSpec:
+    symbol: str
+    rows: int
+    index_name: str | None
+    index_unit: str
+    index_tz: str | None
+    index_offset: int
+    columns: tuple[_ColumnSpec, ...]
+
+
+@dataclass(frozen=True)
+class SharedFramesHandle:
+    """Picklable description of a published block (name + frame layout)."""
+
+    name: str
+    size: int
+    frames: tuple[_FrameSpec, ...] = field(default_factory=tuple)
+
+
+def _aligned(nbytes: int) -> int:
+    return (nbytes + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _layout(data: dict[str, pd.DataFrame]) -> tuple[tuple[_FrameSpec, ...], int]:
+    """Assign byte offsets to every index/column array of every frame."""
+    specs: list[_FrameSpec] = []
+    offset = 0
+    for symbol, df in data.items():
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise TypeError(f"{symbol}: shared frames need a DatetimeIndex, got {type(df.index).__name__}")
+        rows = len(df)
+        index_offset = offset
+        offset += _aligned(rows * 8)
+        columns: list[_ColumnSpec] = []
+        for col in df.columns:
+            dtype = np.dtype(df[col].dtype)
+            if dtype.kind not in "biuf":
+                raise TypeError(f"{symbol}.{col}: only numeric columns can be shared, got {dtype}")
+            columns.append(_ColumnSpec(name=str(col), dtype=dtype.str, offset=offset))
+            offset += _aligned(rows * dtype.itemsize)
+        specs.append(
+            _FrameSpec(
+                symbol=symbol,
+                rows=rows,
+                index_name=df.index.name,
+                index_unit=df.index.unit,
+                index_tz=str(df.index.tz) if df.index.tz is not None else None,
+                index_offset=index_offset,
+                columns=tuple(columns),
+            )
+        )
+    return tuple(specs), offset
+
+
+def _view(buf: memoryview, dtype: str, offset: int, rows: int) -> np.ndarray:
+    return np.ndarray((rows,), dtype=np.dtype(dtype), buffer=buf, offset=offset)
+
+
+class SharedFrames:
+    """Owner of a published block — closes and unlinks it on ``close()``."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, handle: SharedFramesHandle) -> None:
+        self._shm = shm
+        self.handle = handle
+
+    @classmethod
+    def publish(cls, data: dict[str, pd.DataFrame]) -> SharedFrames:
+        """Copy ``data`` into a fresh shared-memory block."""
+        frames, size = _layout(data)
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            for spec in frames:
+                df = data[spec.symbol]
+                _view(shm.buf, "<i8", spec.index_offset, spec.rows)[:] = df.index.asi8
+                for col in spec.columns:
+                    _view(shm.buf, col.dtype, col.offset, spec.rows)[:] = df[col.name].to_numpy()
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        return cls(shm, SharedFramesHandle(name=shm.name, size=size, frames=frames))
+
+    def close(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> SharedFrames:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def attach(handle: SharedFramesHandle) -> tuple[shared_memory.SharedMemory, dict[str, pd.DataFrame]]:
+    """
+    Rebuild the published frames as read-only views over the shared block.
+
+    The returned SharedMemory must outlive the frames — drop both together.
+    """
+    shm = shared_memory.SharedMemory(name=handle.name)
+    data: dict[str, pd.DataFrame] = {}
+    for spec in handle.frames:
+        stamps = _view(shm.buf, "<i8", spec.index_offset, spec.rows).view(f"M8[{spec.index_unit}]")
+        index = pd.DatetimeIndex(stamps, name=spec.index_name)
+        if spec.index_tz is not None:
+            index = index.tz_localize("UTC").tz_convert(spec.index_tz)
+        columns = {}
+        for col in spec.columns:
+            arr = _view(shm.buf, col.dtype, col.offset, spec.rows)
+            arr.flags.writeable = False
+            columns[col.name] = arr
+        data[spec.symbol] = pd.DataFrame(columns, index=index, copy=False)
+    return shm, data
@@ -0,0 +1,819 @@
+"""
+Vectorized backtest — array fast path for 5-min slope_volume / noise_boundary.
+
+BacktestEngine.run() walks the timeline bar by bar and re-evaluates every exit
+and entry rule through Python objects. For the intraday strategies all rules
+depend only on per-bar series, so this module:
+
+  1. builds entry / exit arrays for the whole run up front — slope_volume
+     entries via the vectorized slope_volume_candidates() prefilter (the exact
+     evaluate_slope_volume_signal() runs only on candidate bars), slope exits
+     from rolling OLS windows, noise_boundary entries / exits straight from
+     precompute_noise_boundaries();
+  2. runs the position state machine (fills, trailing stops, exits, kill
+     switch, sizing, equity) in one tight loop over those arrays — compiled
+     with Numba when it is installed, plain Python otherwise;
+  3. writes trades, equity curve and counters back into the engine, so
+     BacktestEngine._build_result() returns the same BacktestResult as the
+     bar loop (see the parity tests in tests/unit/test_backtest_engine.py).
+
+Selected with ``BacktestConfig(engine="vectorized")``. Configs outside the
+supported subset run on the bar loop instead (see unsupported_reason()).
+
+Usage:
+    config = BacktestConfig(..., timeframe="5Min", strategy="slope_volume", engine="vectorized")
+    result = BacktestEngine(config).run(data)
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+import structlog
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .bar_store import align_rows
+from .engine import CloseReason, OpenPosition
+
+if TYPE_CHECKING:
+    from .engine import BacktestConfig, BacktestEngine
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+    _jit = njit(cache=True)
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def _jit(func):
+        return func
+
+
+logger = structlog.get_logger()
+
+# Integer codes used inside the kernel
+_BUY, _SELL, _SHORT, _COVER = 0, 1, 2, 3
+REASONS = (
+    CloseReason.SIGNAL_EXIT,  # 0 — default for queued exit orders
+    CloseReason.STOP_LOSS,
+    CloseReason.TAKE_PROFIT,
+    CloseReason.SLOPE_EXIT,
+    CloseReason.ADVERSE_SLOPE_EXIT,
+    CloseReason.NB_EXIT,
+    CloseReason.VWAP_EXIT,
+    CloseReason.EOD_CLOSE,
+    CloseReason.KILL_SWITCH,
+    CloseReason.END_OF_BACKTEST,
+)
+(_R_SIGNAL, _R_STOP, _R_TP, _R_SLOPE, _R_ADVERSE, _R_NB, _R_VWAP, _R_EOD, _R_KILL, _R_END) = range(
+    len(REASONS)
+)
+
+
+def unsupported_reason(config: BacktestConfig) -> str | None:
+    """Why ``config`` cannot use the vectorized path, or None if it can."""
+    from .indicators import signal_mode
+
+    if config.timeframe != "5Min":
+        return "timeframe must be 5Min"
+    if signal_mode(config) not in ("slope_volume", "noise_boundary"):
+        return "strategy must be slope_volume or noise_boundary"
+    if config.signal_exit_enabled:
+        return "signal_exit_enabled is not supported"
+    if config.strategy == "noise_boundary" and config.nb_vix_filter:
+        return "nb_vix_filter is not supported"
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Signal arrays (per symbol, then aligned to the run timeline)
+# ---------------------------------------------------------------------------
+
+def slope_exit_codes(close: np.ndarray, lookback: int, threshold: float) -> tuple[np.ndarray, np.ndarray]:
+    """Slope-exit reason code per bar for long and short positions (0 = hold).
+
+    Same OLS math as BacktestEngine._check_slope_exits on ``close[:i + 1]``:
+    the current window ends at bar i, the previous one ``lookback`` bars earlier,
+    both normalized by the current close.
+    """
+    n = len(close)
+    long_codes = np.zeros(n, dtype=np.int64)
+    short_codes = np.zeros(n, dtype=np.int64)
+    if lookback < 2 or n < lookback * 2:
+        return long_codes, short_codes
+
+    x = np.arange(lookback, dtype=float)
+    x_dev = x - x.mean()
+    denom = float(np.sum(x_dev ** 2))
+
+    windows = sliding_window_view(close, lookback)  # window k ends at bar k + lookback - 1
+    y_means = windows.mean(axis=1)
+    slopes_raw = np.sum((windows - y_means[:, np.newaxis]) * x_dev, axis=1) / denom
+
+    end = np.arange(lookback * 2 - 1, n)  # bars with both windows available
+    price = close[end]
+    curr = slopes_raw[end - lookback + 1]
+    prev = slopes_raw[end - 2 * lookback + 1]
+    valid = price > 0
+    safe_price = np.where(valid, price, 1.0)
+    slope_pct = (curr / safe_price) * 100
+    slope_prev_pct = (prev / safe_price) * 100
+
+    down = valid & (slope_pct < -threshold)
+    up = valid & (slope_pct > threshold)
+    long_codes[end] = np.where(down, np.where(slope_prev_pct > 0, _R_SLOPE, _R_ADVERSE), 0)
+    short_codes[end] = np.where(up, np.where(slope_prev_pct < 0, _R_SLOPE, _R_ADVERSE), 0)
+    return long_codes, short_codes
+
+
+def _to_timeline(values: np.ndarray, prefix: np.ndarray, fill=0) -> np.ndarray:
+    """Per-symbol series read at the last bar <= each timeline bar."""
+    out = np.full(len(prefix), fill, dtype=values.dtype)
+    has = prefix > 0
+    out[has] = values[prefix[has] - 1]
+    return out
+
+
+class _Arrays:
+    """Symbol × bar inputs for the kernel."""
+
+    def __init__(self, n_symbols: int, n_bars: int) -> None:
+        shape = (n_symbols, n_bars)
+        self.avail = np.zeros(shape, dtype=np.int64)
+        self.entry_dir = np.zeros(shape, dtype=np.int64)
+        self.entry_price = np.zeros(shape)
+        self.entry_sl = np.zeros(shape)
+        self.entry_tp = np.zeros(shape)
+        self.entry_score = np.zeros(shape)
+        self.entry_conf = np.zeros(shape)
+        self.exit_long = np.zeros(shape, dtype=np.int64)
+        self.exit_short = np.zeros(shape, dtype=np.int64)
+        self.nb_close = np.full(shape, np.nan)
+        self.nb_vwap = np.full(shape, np.nan)
+        self.nb_ub = np.full(shape, np.nan)
+        self.nb_lb = np.full(shape, np.nan)
+        self.nb_rv = np.full(shape, np.nan)
+        self.nb_checkpoint = np.zeros(shape, dtype=np.bool_)
+        self.nb_signal = np.zeros(shape, dtype=np.int64)
+
+
+def _slope_arrays(
+    engine: BacktestEngine, arrays: _Arrays, row: int, symbol: str, slope_exits: bool
+) -> None:
+    indicators = engine._indicators
+    prefix = arrays.avail[row]
+    cfg = engine.config
+
+    candidates = indicators.entry_candidates(symbol)
+    if candidates is not None and candidates.any():
+        n = len(candidates)
+        own_dir = np.zeros(n, dtype=np.int64)
+        own = np.zeros((5, n))
+        for i in np.flatnonzero(candidates):
+            signal = indicators.signal_at(symbol, int(i))
+            if signal is None:
+                continue
+            own_dir[i] = 1 if signal["action"] == "BUY" else -1
+            own[:, i] = (
+                signal["entry_price"],
+                signal["stop_loss"],
+                signal["take_profit"],
+                signal["score"],
+                signal["confidence"],
+            )
+        arrays.entry_dir[row] = _to_timeline(own_dir, prefix)
+        for target, values in zip(
+            (arrays.entry_price, arrays.entry_sl, arrays.entry_tp, arrays.entry_score, arrays.entry_conf),
+            own,
+        ):
+            target[row] = _to_timeline(values, prefix)
+
+    if slope_exits:
+        long_codes, short_codes = slope_exit_codes(
+            indicators.close(symbol), cfg.slope_exit_lookback_bars, cfg.slope_exit_threshold_pct
+        )
+        # _check_slope_exits needs 2 × lookback bars of history
+        ready = prefix >= cfg.slope_exit_lookback_bars * 2
+        arrays.exit_long[row] = np.where(ready, _to_timeline(long_codes, prefix), 0)
+        arrays.exit_short[row] = np.where(ready, _to_timeline(short_codes, prefix), 0)
+
+
+def _noise_boundary_arrays(
+    engine: BacktestEngine, arrays: _Arrays, row: int, symbol: str, stamps: pd.Index
+) -> None:
+    nb_df = engine._nb_data.get(symbol)
+    if nb_df is None or len(nb_df) == 0:
+        return
+    if not nb_df.index.is_monotonic_increasing:
+        nb_df = nb_df.sort_index(kind="stable")
+    hit, src = align_rows(nb_df.index, stamps)
+
+    def column(name: str) -> np.ndarray:
+        return nb_df[name].to_numpy()[src]
+
+    close = column("close").astype(float)
+    atr = column("atr").astype(float)
+    checkpoint = column("is_checkpoint").astype(bool)
+    signal = column("nb_signal").astype(np.int64)
+
+    arrays.nb_close[row, hit] = close
+    arrays.nb_vwap[row, hit] = column("vwap").astype(float)
+    arrays.nb_ub[row, hit] = column("UB").astype(float)
+    arrays.nb_lb[row, hit] = column("LB").astype(float)
+    arrays.nb_rv[row, hit] = column("realized_vol").astype(float)
+    arrays.nb_checkpoint[row, hit] = checkpoint
+    arrays.nb_signal[row, hit] = signal
+
+    # Entries: checkpoint with a directional signal and a usable ATR
+    with np.errstate(invalid="ignore"):
+        entry = checkpoint & (signal != 0) & (atr > 0)
+    safety_sl = engine.config.nb_safety_sl_atr
+    bars = np.flatnonzero(hit)
+    for k in np.flatnonzero(entry):
+        b = bars[k]
+        price, atr_val, direction = float(close[k]), float(atr[k]), int(signal[k])
+        sl = price - direction * safety_sl * atr_val
+        tp = price + direction * 100 * atr_val  # effectively no TP
+        arrays.entry_dir[row, b] = direction
+        arrays.entry_price[row, b] = price
+        arrays.entry_sl[row, b] = round(sl, 4)
+        arrays.entry_tp[row, b] = round(tp, 4)
+        arrays.entry_score[row, b] = 0.7
+        arrays.entry_conf[row, b] = 0.7
+
+
+# ---------------------------------------------------------------------------
+# State machine kernel
+# ---------------------------------------------------------------------------
+
+@_jit
+def _equity(b, cash, order, n_open, present, close, p_dir, p_shares, p_cost):
+    """(equity, positions_value) — same summation order as _calculate_equity."""
+    positions_value = 0.0
+    for k in range(n_open):
+        s = order[k]
+        if present[s, b]:
+            positions_value += p_dir[s] * p_shares[s] * close[s, b]
+        else:
+            positions_value += p_dir[s] * p_cost[s]
+    return cash + positions_value, positions_value
+
+
+@_jit
+def _remove(order, n_open, s):
+    """Drop ``s`` from the insertion-ordered open list; returns the new length."""
+    k = 0
+    while order[k] != s:
+        k += 1
+    for j in range(k, n_open - 1):
+        order[j] = order[j + 1]
+    return n_open - 1
+
+
+@_jit
+def _close_all(
+    b, reason, cash, order, n_open, trades, present, close,
+    p_open, p_dir, p_shares, p_entry, p_entry_bar, p_sl, p_tp, p_score, p_conf,
+):
+    """Close every open position at the bar close (entry price if absent), no commission."""
+    for k in range(n_open):
+        s = order[k]
+        exit_price = close[s, b] if present[s, b] else p_entry[s]
+        if p_dir[s] == 1:
+            cash += p_shares[s] * exit_price
+        else:
+            cash -= p_shares[s] * exit_price
+        trades.append((
+            s, p_dir[s], p_entry_bar[s], b, p_shares[s], reason,
+            p_entry[s], exit_price, p_sl[s], p_tp[s], p_score[s], p_conf[s],
+        ))
+        p_open[s] = False
+    return cash
+
+
+@_jit
+def _simulate(
+    present, open_, high, low, close, avail,
+    entry_dir, entry_price, entry_sl, entry_tp, entry_score, entry_conf,
+    exit_long, exit_short,
+    nb_close, nb_vwap, nb_ub, nb_lb, nb_rv, nb_checkpoint, nb_signal,
+    entry_window, exit_window, eod_bar, spy_block,
+    is_nb, slope_exits, nb_vwap_trailing, nb_vwap_exit, nb_vol_sizing,
+    initial_capital, slippage_rate, commission, max_positions, max_position_pct, max_loss_pct,
+    daily_limit_pct, weekly_limit_pct, sl_atr, tp_atr,
+    breakeven_atr, lock_atr, lock_cushion_atr, trail_threshold_atr, trail_distance_atr,
+    tight_threshold_atr, tight_distance_atr,
+    nb_min_hold, nb_vol_target_pct, nb_vol_max_leverage,
+    warmup, min_bars, cooldown_bars, week_bars,
+):
+    n_symbols, n_bars = close.shape
+
+    # Open positions: per-symbol slots + insertion order (dict order in the bar loop)
+    p_open = np.zeros(n_symbols, dtype=np.bool_)
+    p_dir = np.zeros(n_symbols, dtype=np.int64)
+    p_shares = np.zeros(n_symbols, dtype=np.int64)
+    p_entry_bar = np.zeros(n_symbols, dtype=np.int64)
+    p_entry = np.zeros(n_symbols)
+    p_cost = np.zeros(n_symbols)
+    p_sl = np.zeros(n_symbols)
+    p_tp = np.zeros(n_symbols)
+    p_atr = np.zeros(n_symbols)
+    p_high = np.zeros(n_symbols)
+    p_low = np.zeros(n_symbols)
+    p_score = np.zeros(n_symbols)
+    p_conf = np.zeros(n_symbols)
+    order = np.zeros(n_symbols, dtype=np.int64)
+    n_open = 0
+
+    # Pending orders (filled at the next bar's open)
+    cap = 4 * n_symbols + 1
+    o_sym = np.zeros(cap, dtype=np.int64)
+    o_act = np.zeros(cap, dtype=np.int64)
+    o_shares = np.zeros(cap, dtype=np.int64)
+    o_reason = np.zeros(cap, dtype=np.int64)
+    o_sl = np.zeros(cap)
+    o_tp = np.zeros(cap)
+    o_score = np.zeros(cap)
+    o_conf = np.zeros(cap)
+    n_pending = 0
+
+    to_close = np.zeros(n_symbols, dtype=np.int64)
+    close_price = np.zeros(n_symbols)
+    close_reason = np.zeros(n_symbols, dtype=np.int64)
+
+    equity_out = np.zeros(n_bars)
+    cash_out = np.zeros(n_bars)
+    positions_out = np.zeros(n_bars)
+    count_out = np.zeros(n_bars, dtype=np.int64)
+    returns_out = np.zeros(n_bars)
+    has_return = np.zeros(n_bars, dtype=np.bool_)
+
+    trades = [(0, 0, 0, 0, 0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)]
+    trades.pop()
+
+    cash = initial_capital
+    prev_equity = initial_capital
+    week_start_equity = initial_capital
+    cooldown_until = 0
+    kill_count = 0
+    kill_bar = -1
+    signals = 0
+    filled = 0
+
+    for b in range(n_bars):
+        # --- Step 1: fill pending orders at this bar's open ---
+        n_orders = n_pending
+        n_pending = 0
+        for k in range(n_orders):
+            s = o_sym[k]
+            if not present[s, b]:
+                continue
+            open_price = open_[s, b]
+            slippage = open_price * slippage_rate
+            act = o_act[k]
+            if act == _BUY:
+                fill = open_price + slippage
+            else:
+                fill = open_price - slippage
+
+            if act == _BUY or act == _SHORT:
+                shares = o_shares[k]
+                if act == _BUY:
+                    cost = shares * fill + (shares * commission)
+                    if cost > cash:
+                        shares = int(cash / (fill + commission))
+                        if shares <= 0:
+                            continue
+                        cost = shares * fill + (shares * commission)
+                if p_open[s]:
+                    continue
+                atr = 0.0
+                if (sl_atr + tp_atr) > 0:
+                    if act == _BUY:
+                        atr = (o_tp[k] - o_sl[k]) / (sl_atr + tp_atr)
+                    else:
+                        atr = (o_sl[k] - o_tp[k]) / (sl_atr + tp_atr)
+                sl_dist = sl_atr * atr
+                if 0.02 > sl_dist:
+                    sl_dist = 0.02
+                if act == _BUY:
+                    cash -= cost
+                    p_dir[s] = 1
+                    p_sl[s] = fill - sl_dist
+                    p_tp[s] = fill + (tp_atr * atr)
+                else:
+                    cash += shares * fill - (shares * commission)
+                    p_dir[s] = -1
+                    p_sl[s] = fill + sl_dist
+                    p_tp[s] = fill - (tp_atr * atr)
+                p_open[s] = True
+                p_shares[s] = shares
+                p_entry[s] = fill
+                p_cost[s] = shares * fill
+                p_atr[s] = atr
+                p_high[s] = fill
+                p_low[s] = fill
+                p_entry_bar[s] = b
+                p_score[s] = o_score[k]
+                p_conf[s] = o_conf[k]
+                order[n_open] = s
+                n_open += 1
+                filled += 1
+            else:
+                if not p_open[s]:
+                    continue
+                if act == _COVER and p_dir[s] != -1:
+                    continue
+                shares = p_shares[s]
+                if act == _SELL:
+                    cash += shares * fill - (shares * commission)
+                else:
+                    cash -= shares * fill + (shares * commission)
+                trades.append((
+                    s, p_dir[s], p_entry_bar[s], b, shares, o_reason[k],
+                    p_entry[s], fill, p_sl[s], p_tp[s], p_score[s], p_conf[s],
+                ))
+                p_open[s] = False
+                n_open = _remove(order, n_open, s)
+                filled += 1
+
+        # --- Step 2: stop-loss / take-profit with 4-tier trailing stop ---
+        n_close = 0
+        for k in range(n_open):
+            s = order[k]
+            if not present[s, b]:
+                continue
+            bar_high, bar_low, bar_close = high[s, b], low[s, b], close[s, b]
+            atr = p_atr[s]
+            entry = p_entry[s]
+            stop = p_sl[s]
+            if p_dir[s] == 1:
+                if bar_close > p_high[s]:
+                    p_high[s] = bar_close
+                if atr > 0:
+                    peak = p_high[s]
+                    profit = peak - entry
+                    if profit > breakeven_atr * atr and entry > stop:
+                        stop = entry
+                    if profit > lock_atr * atr:
+                        level = entry + (atr * lock_cushion_atr)
+                        if level > stop:
+                            stop = level
+                    if profit > trail_threshold_atr * atr:
+                        level = peak - (atr * trail_distance_atr)
+                        if level > stop:
+                            stop = level
+                    if profit > tight_threshold_atr * atr:
+                        level = peak - (atr * tight_distance_atr)
+                        if level > stop:
+                            stop = level
+                    p_sl[s] = stop
+                if bar_low <= stop:
+                    to_close[n_close], close_price[n_close], close_reason[n_close] = s, stop, _R_STOP
+                    n_close += 1
+                elif bar_high >= p_tp[s]:
+                    to_close[n_close], close_price[n_close], close_reason[n_close] = s, p_tp[s], _R_TP
+                    n_close += 1
+            else:
+                if bar_close < p_low[s]:
+                    p_low[s] = bar_close
+                if atr > 0:
+                    trough = p_low[s]
+                    profit = entry - trough
+                    if profit > breakeven_atr * atr and entry < stop:
+                        stop = entry
+                    if profit > lock_atr * atr:
+                        level = entry - (atr * lock_cushion_atr)
+                        if level < stop:
+                            stop = level
+                    if profit > trail_threshold_atr * atr:
+                        level = trough + (atr * trail_distance_atr)
+                        if level < stop:
+                            stop = level
+                    if profit > tight_threshold_atr * atr:
+                        level = trough + (atr * tight_distance_atr)
+                        if level < stop:
+                            stop = level
+                    p_sl[s] = stop
+                if bar_high >= stop:
+                    to_close[n_close], close_price[n_close], close_reason[n_close] = s, stop, _R_STOP
+                    n_close += 1
+                elif bar_low <= p_tp[s]:
+                    to_close[n_close], close_price[n_close], close_reason[n_close] = s, p_tp[s], _R_TP
+                    n_close += 1
+
+        for k in range(n_close):
+            s = to_close[k]
+            exit_price = close_price[k]
+            fee = p_shares[s] * commission
+            if p_dir[s] == 1:
+                cash += p_shares[s] * exit_price - fee
+            else:
+                cash -= p_shares[s] * exit_price + fee
+            trades.append((
+                s, p_dir[s], p_entry_bar[s], b, p_shares[s], close_reason[k],
+                p_entry[s], exit_price, p_sl[s], p_tp[s], p_score[s], p_conf[s],
+            ))
+            p_open[s] = False
+            n_open = _remove(order, n_open, s)
+
+        # --- Step 2.2: slope exits (queued for next bar) ---
+        if slope_exits:
+            for k in range(n_open):
+                s = order[k]
+                code = exit_long[s, b] if p_dir[s] == 1 else exit_short[s, b]
+                if code != 0:
+                    o_sym[n_pending] = s
+                    o_act[n_pending] = _SELL if p_dir[s] == 1 else _COVER
+                    o_shares[n_pending] = p_shares[s]
+                    o_reason[n_pending] = code
+                    o_sl[n_pending] = 0.0
+                    o_tp[n_pending] = 0.0
+                    o_score[n_pending] = 0.0
+                    o_conf[n_pending] = 0.0
+                    n_pending += 1
+
+        if is_nb:
+            # --- Step 2.5: hard EOD close ---
+            if n_open > 0 and eod_bar[b]:
+                cash = _close_all(
+                    b, _R_EOD, cash, order, n_open, trades, present, close,
+                    p_open, p_dir, p_shares, p_entry, p_entry_bar, p_sl, p_tp, p_score, p_conf,
+                )
+                n_open = 0
+
+            # --- Step 2.6: NB exits (signal change / VWAP trailing stop) ---
+            if n_open > 0 and exit_window[b]:
+                for k in range(n_open):
+                    s = order[k]
+                    if nb_min_hold > 0 and b - p_entry_bar[s] < nb_min_hold:
+                        continue
+                    if not present[s, b]:
+                        continue
+                    reason = -1
+                    if nb_vwap_trailing:
+                        c, vwap = nb_close[s, b], nb_vwap[s, b]
+                        if c <= 0 or vwap <= 0:
+                            continue
+                        if p_dir[s] == 1:
+                            stop = vwap
+                            if nb_ub[s, b] > 0 and nb_ub[s, b] > vwap:
+                                stop = nb_ub[s, b]
+                            if c < stop:
+                                reason = _R_VWAP
+                        else:
+                            stop = vwap
+                            if nb_lb[s, b] > 0 and nb_lb[s, b] < vwap:
+                                stop = nb_lb[s, b]
+                            if c > stop:
+                                reason = _R_VWAP
+                    else:
+                        if not nb_checkpoint[s, b]:
+                            continue
+                        if p_dir[s] != nb_signal[s, b]:
+                            reason = _R_NB
+                    if reason >= 0:
+                        o_sym[n_pending] = s
+                        o_act[n_pending] = _SELL if p_dir[s] == 1 else _COVER
+                        o_shares[n_pending] = p_shares[s]
+                        o_reason[n_pending] = reason
+                        o_sl[n_pending] = 0.0
+                        o_tp[n_pending] = 0.0
+                        o_score[n_pending] = 0.0
+                        o_conf[n_pending] = 0.0
+                        n_pending += 1
+
+            # --- Step 2.7: VWAP profit-taking exit ---
+            if n_open > 0 and nb_vwap_exit:
+                for k in range(n_open):
+                    s = order[k]
+                    if not present[s, b]:
+                        continue
+                    c, vwap = nb_close[s, b], nb_vwap[s, b]
+                    if vwap <= 0 or c <= 0:
+                        continue
+                    if p_dir[s] == 1:
+                        hit = c > p_entry[s] and c < vwap
+                    else:
+                        hit = c < p_entry[s] and c > vwap
+                    if hit:
+                        o_sym[n_pending] = s
+                        o_act[n_pending] = _SELL if p_dir[s] == 1 else _COVER
+                        o_shares[n_pending] = p_shares[s]
+                        o_reason[n_pending] = _R_VWAP
+                        o_sl[n_pending] = 0.0
+                        o_tp[n_pending] = 0.0
+                        o_score[n_pending] = 0.0
+                        o_conf[n_pending] = 0.0
+                        n_pending += 1
+
+        # --- Step 3: kill switch (daily / weekly loss limits) ---
+        equity, _ = _equity(b, cash, order, n_open, present, close, p_dir, p_shares, p_cost)
+        if b >= cooldown_until:
+            kill = False
+            if prev_equity > 0 and ((equity - prev_equity) / prev_equity) * 100 <= daily_limit_pct:
+                kill = True
+            elif week_start_equity > 0:
+                if ((equity - week_start_equity) / week_start_equity) * 100 <= weekly_limit_pct:
+                    kill = True
+            if kill:
+                kill_bar = b
+                cash = _close_all(
+                    b, _R_KILL, cash, order, n_open, trades, present, close,
+                    p_open, p_dir, p_shares, p_entry, p_entry_bar, p_sl, p_tp, p_score, p_conf,
+                )
+                n_open = 0
+                cooldown_until = b + cooldown_bars
+                kill_count += 1
+
+        # --- Step 4: entries (after warmup, outside cooldown) ---
+        if b >= warmup and b >= cooldown_until and n_open < max_positions and not spy_block[b]:
+            for s in range(n_symbols):
+                if p_open[s]:
+                    continue
+                if n_open + n_pending >= max_positions:
+                    break
+                if avail[s, b] < min_bars:
+                    continue
+                if is_nb and not entry_window[b]:
+                    continue
+                direction = entry_dir[s, b]
+                if direction == 0:
+                    continue
+                signals += 1
+
+                price = entry_price[s, b]
+                equity, _ = _equity(b, cash, order, n_open, present, close, p_dir, p_shares, p_cost)
+                max_position_value = equity * (max_position_pct / 100)
+                if is_nb:
+                    rv = nb_rv[s, b]
+                    if nb_vol_sizing and present[s, b] and not np.isnan(rv) and rv > 0.01:
+                        leverage = (nb_vol_target_pct / 100.0) / rv
+                        if nb_vol_max_leverage < leverage:
+                            leverage = nb_vol_max_leverage
+                        shares = int(equity * leverage / price)
+                    else:
+                        shares = int(max_position_value / price)
+                else:
+                    risk_per_share = abs(price - entry_sl[s, b])
+                    if risk_per_share <= 0:
+                        continue
+                    shares = int(equity * (max_loss_pct / 100) / risk_per_share)
+                    max_by_value = int(max_position_value / price)
+                    if max_by_value < shares:
+                        shares = max_by_value
+                max_by_cash = int(cash / price)
+                if max_by_cash < shares:
+                    shares = max_by_cash
+                if shares <= 0:
+                    continue
+
+                o_sym[n_pending] = s
+                o_act[n_pending] = _BUY if direction == 1 else _SHORT
+                o_shares[n_pending] = shares
+                o_reason[n_pending] = _R_SIGNAL
+                o_sl[n_pending] = entry_sl[s, b]
+                o_tp[n_pending] = entry_tp[s, b]
+                o_score[n_pending] = entry_score[s, b]
+                o_conf[n_pending] = entry_conf[s, b]
+                n_pending += 1
+
+        # --- Step 5: equity, bar return, weekly reset ---
+        equity, positions_value = _equity(b, cash, order, n_open, present, close, p_dir, p_shares, p_cost)
+        equity_out[b] = equity
+        cash_out[b] = cash
+        positions_out[b] = positions_value
+        count_out[b] = n_open
+        if prev_equity > 0:
+            returns_out[b] = (equity - prev_equity) / prev_equity
+            has_return[b] = True
+        prev_equity = equity
+        if (b + 1) % week_bars == 0:
+            week_start_equity = equity
+
+    if n_open > 0 and n_bars > 0:
+        cash = _close_all(
+            n_bars - 1, _R_END, cash, order, n_open, trades, present, close,
+            p_open, p_dir, p_shares, p_entry, p_entry_bar, p_sl, p_tp, p_score, p_conf,
+        )
+
+    return (
+        trades, equity_out, cash_out, positions_out, count_out, returns_out, has_return,
+        cash, signals, filled, kill_count, kill_bar,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def run_vectorized(engine: BacktestEngine, data: dict[str, pd.DataFrame], dates: list, warmup: int) -> None:
+    """Simulate ``dates`` on arrays and store the outcome in ``engine``.
+
+    Expects BacktestEngine.run() to have prepared ``engine._indicators``,
+    ``engine._bars`` and (noise_boundary) ``engine._nb_data``.
+    """
+    cfg = engine.config
+    bars = engine._bars
+    is_nb = cfg.strategy == "noise_boundary"
+    slope_exits = not is_nb and cfg.slope_exit_enabled
+    n_symbols, n_bars = bars.present.shape
+
+    stamps = pd.Index(dates)
+    arrays = _Arrays(n_symbols, n_bars)
+    for row, symbol in enumerate(bars.symbols):
+        arrays.avail[row] = engine._indicators.prefix_lengths(symbol)
+        if is_nb:
+            _noise_boundary_arrays(engine, arrays, row, symbol, stamps)
+        else:
+            _slope_arrays(engine, arrays, row, symbol, slope_exits)
+
+    hours = pd.DatetimeIndex(dates)
+    if hours.tz is not None:
+        hours = hours.tz_convert("UTC")
+    hour = np.asarray(hours.hour)
+    entry_window = (hour >= 14) & (hour < cfg.nb_last_entry_utc)
+    exit_window = (hour >= 14) & (hour < 20)
+    eod_bar = hour >= 20
+
+    spy_block = None
+    if cfg.trend_filter and not is_nb and "SPY" in data:
+        spy_block = engine._indicators.spy_below_sma_mask()
+    if spy_block is None:
+        spy_block = np.zeros(n_bars, dtype=bool)
+
+    (
+        trades, equity, cash, positions_value, positions_count, returns, has_return,
+        final_cash, signals, filled, kill_count, kill_bar,
+    ) = _simulate(
+        bars.present, bars.open, bars.high, bars.low, bars.close, arrays.avail,
+        arrays.entry_dir, arrays.entry_price, arrays.entry_sl, arrays.entry_tp,
+        arrays.entry_score, arrays.entry_conf,
+        arrays.exit_long, arrays.exit_short,
+        arrays.nb_close, arrays.nb_vwap, arrays.nb_ub, arrays.nb_lb, arrays.nb_rv,
+        arrays.nb_checkpoint, arrays.nb_signal,
+        entry_window, exit_window, eod_bar, spy_block,
+        is_nb, slope_exits, cfg.nb_vwap_trailing, cfg.nb_vwap_exit, cfg.nb_vol_sizing,
+        float(cfg.initial_capital), cfg.slippage_bps / 10_000, float(cfg.commission_per_share),
+        cfg.max_positions, float(cfg.max_position_pct), float(cfg.max_loss_per_trade_pct),
+        float(cfg.daily_loss_limit_pct), float(cfg.weekly_loss_limit_pct),
+        float(cfg.stop_loss_atr), float(cfg.take_profit_atr),
+        float(cfg.trailing_breakeven_atr), float(cfg.trailing_lock_atr),
+        float(cfg.trailing_lock_cushion_atr), float(cfg.trailing_trail_threshold_atr),
+        float(cfg.trailing_trail_distance_atr), float(cfg.trailing_tight_threshold_atr),
+        float(cfg.trailing_tight_distance_atr),
+        cfg.nb_min_hold_bars, float(cfg.nb_vol_target_pct), float(cfg.nb_vol_max_leverage),
+        warmup, engine._periods["min_bars"], engine._cooldown_bars, engine._week_bars,
+    )
+
+    # --- Trades (same rounding / hold-day logic as the bar loop) ---
+    for s, direction, entry_bar, exit_bar, shares, reason, entry, exit_price, sl, tp, score, conf in trades:
+        pos = OpenPosition(
+            symbol=bars.symbols[s],
+            shares=int(shares),
+            entry_price=float(entry),
+            entry_date=engine._format_date(dates[entry_bar]),
+            stop_loss=float(sl),
+            take_profit=float(tp),
+            signal_score=float(score),
+            signal_confidence=float(conf),
+            direction=int(direction),
+        )
+        engine._record_trade(pos, float(exit_price), engine._format_date(dates[exit_bar]), REASONS[reason])
+
+    # --- Equity curve (every bar on 5Min) ---
+    day_codes, day_stamps = pd.factorize(pd.DatetimeIndex(dates).normalize())
+    day_labels = [engine._extract_day(ts) for ts in day_stamps]
+    peak: float | None = None
+    for b in range(n_bars):
+        value = float(equity[b])
+        rounded = round(value, 2)
+        bar_peak = value if peak is None or value > peak else peak
+        drawdown_pct = ((value - bar_peak) / bar_peak) * 100 if bar_peak > 0 else 0.0
+        point = {
+            "date": day_labels[day_codes[b]],
+            "equity": rounded,
+            "cash": round(float(cash[b]), 2),
+            "positions_value": round(float(positions_value[b]), 2),
+            "drawdown_pct": round(drawdown_pct, 2),
+            "positions_count": int(positions_count[b]),
+        }
+        engine._equity_curve.append(point)
+        engine._metrics.add_equity(point)
+        if peak is None or rounded > peak:
+            peak = rounded
+
+    for r in returns[has_return]:
+        engine._daily_returns.append(float(r))
+        engine._metrics.add_return(float(r))
+    engine._cash = float(final_cash)
+    engine._signals_generated = int(signals)
+    engine._orders_filled = int(filled)
+    engine._kill_switch_count = int(kill_count)
+    if kill_count:
+        engine._kill_switch_date = engine._format_date(dates[kill_bar])
+
+    logger.info("vectorized_run", bars=n_bars, symbols=n_symbols, numba=NUMBA_AVAILABLE)
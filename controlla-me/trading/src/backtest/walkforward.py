@@ -0,0 +1,375 @@
+"""
+Walk-Forward — rolling train/test parameter optimization.
+
+The date range is cut into windows: a train span followed by a test span,
+shifted by ``step_months`` each time. For every window the parameter grid is
+searched on the train span, the best combination (by ``objective``) is applied
+to the test span, and the out-of-sample runs are chained — each test window
+starts from the equity the previous one ended with — into a single
+BacktestResult.
+
+Data is loaded once for the whole range. Every run simulates only its own
+window on top of the full history (BacktestEngine.run(window=...)), so
+indicators are warmed up by the bars that precede the window, and indicator
+series are computed once per parameter set and reused across windows through a
+PrecomputeCache. With workers > 1 the train searches of all windows share one
+process pool over shared-memory frames (see shared_data.py).
+
+Usage:
+    python -m src.backtest walkforward --start 2023-01-01 --end 2025-12-31
+    python -m src.backtest walkforward --start 2023-01-01 --end 2025-12-31 \\
+        --train-months 12 --test-months 3 --grid-preset cycle4b --workers 8
+"""
+
+from __future__ import annotations
+
+import csv
+import itertools
+import math
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+import structlog
+
+from .engine import BacktestConfig, BacktestEngine, BacktestResult
+from .indicators import PrecomputeCache
+from .metrics import PerformanceMetrics, calculate_metrics
+from .shared_data import SharedFrames, SharedFramesHandle, attach
+
+logger = structlog.get_logger()
+
+OBJECTIVES = ("sharpe_ratio", "sortino_ratio", "total_return_pct", "cagr_pct", "profit_factor")
+
+
+# ---------------------------------------------------------------------------
+# Windows
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class WalkForwardWindow:
+    """One train span and the test span that follows it (inclusive dates)."""
+
+    index: int
+    train_start: date
+    train_end: date
+    test_start: date
+    test_end: date
+
+
+@dataclass
+class WindowOutcome:
+    """Winner of a window's train search and its out-of-sample performance."""
+
+    window: WalkForwardWindow
+    params: dict
+    train_score: float
+    train_trades: int
+    test_metrics: PerformanceMetrics
+
+
+@dataclass
+class WalkForwardResult:
+    """Per-window outcomes plus the stitched out-of-sample backtest."""
+
+    windows: list[WindowOutcome]
+    result: BacktestResult
+    metrics: PerformanceMetrics
+
+
+def _add_months(d: date, months: int) -> date:
+    return (pd.Timestamp(d) + pd.DateOffset(months=months)).date()
+
+
+def build_windows(
+    start: date,
+    end: date,
+    train_months: int,
+    test_months: int,
+    step_months: int | None = None,
+) -> list[WalkForwardWindow]:
+    """
+    Rolling windows over [start, end]; the last test span is cut at ``end``.
+
+    ``step_months`` defaults to ``test_months`` so test spans tile the
+    out-of-sample period without gaps or overlap. A smaller step is rejected:
+    overlapping test spans would count the same bars twice once stitched.
+    """
+    if train_months <= 0 or test_months <= 0:
+        raise ValueError("train_months and test_months must be positive")
+    step = step_months or test_months
+    if step < test_months:
+        raise ValueError(
+            f"step_months ({step}) must be >= test_months ({test_months}) — test spans would overlap"
+        )
+
+    windows: list[WalkForwardWindow] = []
+    cursor = start
+    while True:
+        test_start = _add_months(cursor, train_months)
+        if test_start > end:
+            break
+        windows.append(
+            WalkForwardWindow(
+                index=len(windows) + 1,
+                train_start=cursor,
+                train_end=test_start - timedelta(days=1),
+                test_start=test_start,
+                test_end=min(_add_months(test_start, test_months) - timedelta(days=1), end),
+            )
+        )
+        cursor = _add_months(cursor, step)
+    return windows
+
+
+def param_combinations(grid: dict[str, list]) -> list[dict]:
+    """Every combination of a parameter grid, in itertools.product order."""
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*grid.values())]
+
+
+# ---------------------------------------------------------------------------
+# Single runs
+# ---------------------------------------------------------------------------
+
+def _window_config(config: BacktestConfig, params: dict, start: date, end: date, **update) -> BacktestConfig:
+    return config.model_copy(update={**params, "start": start, "end": end, "train_test_split": None, **update})
+
+
+def _score(metrics: PerformanceMetrics, objective: str, min_trades: int) -> float:
+    if metrics.total_trades < min_trades:
+        return -math.inf
+    value = float(getattr(metrics, objective))
+    return value if math.isfinite(value) else -math.inf
+
+
+def _train(
+    config: BacktestConfig,
+    params: dict,
+    window: WalkForwardWindow,
+    data: dict[str, pd.DataFrame],
+    daily_data: dict[str, pd.DataFrame] | None,
+    cache: PrecomputeCache,
+    objective: str,
+    min_trades: int,
+) -> tuple[float, int]:
+    """(objective score, trades) of one combination on one train span."""
+    run_config = _window_config(config, params, window.train_start, window.train_end)
+    result = BacktestEngine(run_config, precomputed=cache).run(
+        data, daily_data, window=(window.train_start, window.train_end)
+    )
+    metrics = calculate_metrics(result)
+    return _score(metrics, objective, min_trades), metrics.total_trades
+
+
+# ---------------------------------------------------------------------------
+# Worker process state (ProcessPoolExecutor initializer)
+# ---------------------------------------------------------------------------
+
+_worker_shm: list = []
+_worker_data: dict = {}
+_worker_daily: dict | None = None
+_worker_cache = PrecomputeCache()
+
+
+def _init_worker(handle: SharedFramesHandle, daily_handle: SharedFramesHandle | None) -> None:
+    """Attach once per worker; the PrecomputeCache then lives as long as the worker."""
+    global _worker_data, _worker_daily
+    shm, _worker_data = attach(handle)
+    _worker_shm.append(shm)
+    if daily_handle is not None:
+        shm, _worker_daily = attach(daily_handle)
+        _worker_shm.append(shm)
+
+
+def _train_task(
+    w: int, c: int, config: BacktestConfig, params: dict, window: WalkForwardWindow,
+    objective: str, min_trades: int,
+) -> tuple[int, int, float, int, str | None]:
+    """Pool task: (window idx, combination idx, score, trades, error)."""
+    try:
+        score, trades = _train(
+            config, params, window, _worker_data, _worker_daily, _worker_cache, objective, min_trades
+        )
+        return w, c, score, trades, None
+    except Exception as e:
+        return w, c, -math.inf, 0, str(e)
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def run_walkforward(
+    config: BacktestConfig,
+    data: dict[str, pd.DataFrame],
+    windows: list[WalkForwardWindow],
+    param_grid: dict[str, list],
+    daily_data: dict[str, pd.DataFrame] | None = None,
+    objective: str = "sharpe_ratio",
+    min_trades: int = 1,
+    workers: int = 1,
+) -> WalkForwardResult:
+    """
+    Optimize on every train span, trade the winner on the following test span.
+
+    Args:
+        config: Base configuration — grid params are applied on top of it.
+        data: Primary bars covering every window (loaded once by the caller).
+        windows: From build_windows().
+        param_grid: {BacktestConfig field: [values]}.
+        daily_data: Daily bars for mean_reversion_v3.
+        objective: PerformanceMetrics field maximized on the train span.
+        min_trades: Train runs with fewer trades never win.
+        workers: Processes for the train searches (1 = in-process).
+
+    Returns:
+        WalkForwardResult with the stitched out-of-sample BacktestResult.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {OBJECTIVES}, got {objective!r}")
+    if not windows:
+        raise ValueError("no walk-forward windows — the date range is shorter than the train span")
+    for prev, cur in zip(windows, windows[1:]):
+        if cur.test_start <= prev.test_end:
+            raise ValueError(f"test spans of windows {prev.index} and {cur.index} overlap")
+
+    combos = param_combinations(param_grid)
+    total = len(windows) * len(combos)
+    # scores[w][c] = (score, trades)
+    scores: list[list[tuple[float, int]]] = [[(-math.inf, 0)] * len(combos) for _ in windows]
+    cache = PrecomputeCache()
+
+    logger.info(
+        "walkforward_train_start",
+        windows=len(windows),
+        combinations=len(combos),
+        runs=total,
+        workers=workers,
+        objective=objective,
+    )
+
+    if workers <= 1:
+        for w, window in enumerate(windows):
+            for c, params in enumerate(combos):
+                try:
+                    scores[w][c] = _train(config, params, window, data, daily_data, cache, objective, min_trades)
+                except Exception as e:
+                    logger.error("walkforward_run_error", window=window.index, params=params, error=str(e))
+    else:
+        daily_shared = SharedFrames.publish(daily_data) if daily_data else None
+        try:
+            with SharedFrames.publish(data) as shared, ProcessPoolExecutor(
+                max_workers=min(workers, total),
+                initializer=_init_worker,
+                initargs=(shared.handle, daily_shared.handle if daily_shared else None),
+            ) as pool:
+                futures = [
+                    pool.submit(_train_task, w, c, config, params, window, objective, min_trades)
+                    for w, window in enumerate(windows)
+                    for c, params in enumerate(combos)
+                ]
+                for future in as_completed(futures):
+                    w, c, score, trades, error = future.result()
+                    if error is not None:
+                        logger.error("walkforward_run_error", window=windows[w].index, params=combos[c], error=error)
+                    scores[w][c] = (score, trades)
+        finally:
+            if daily_shared is not None:
+                daily_shared.close()
+
+    # Out-of-sample: sequential, each window starts from the previous final equity
+    outcomes: list[WindowOutcome] = []
+    test_results: list[BacktestResult] = []
+    capital = config.initial_capital
+    for w, window in enumerate(windows):
+        # Best score wins; the earlier combination breaks ties
+        best = max(range(len(combos)), key=lambda c: (scores[w][c][0], -c))
+        params = combos[best]
+        run_config = _window_config(
+            config, params, window.test_start, window.test_end, initial_capital=capital
+        )
+        result = BacktestEngine(run_config, precomputed=cache).run(
+            data, daily_data, window=(window.test_start, window.test_end)
+        )
+        metrics = calculate_metrics(result)
+        if result.equity_curve:
+            capital = result.equity_curve[-1]["equity"]
+        test_results.append(result)
+        outcomes.append(WindowOutcome(window, params, scores[w][best][0], scores[w][best][1], metrics))
+        logger.info(
+            "walkforward_window",
+            window=window.index,
+            test=f"{window.test_start}..{window.test_end}",
+            params=params,
+            train_score=round(scores[w][best][0], 3),
+            test_return_pct=round(metrics.total_return_pct, 2),
+        )
+
+    stitched = stitch_results(
+        config.model_copy(update={"start": windows[0].test_start, "end": windows[-1].test_end,
+                                  "train_test_split": None}),
+        test_results,
+    )
+    return WalkForwardResult(outcomes, stitched, calculate_metrics(stitched))
+
+
+def stitch_results(config: BacktestConfig, results: list[BacktestResult]) -> BacktestResult:
+    """
+    Chain consecutive out-of-sample results into one BacktestResult.
+
+    Runs must be in date order, each started with the previous run's final
+    equity. Drawdowns are recomputed against the peak of the whole chain.
+    """
+    equity_curve: list[dict] = []
+    peak = config.initial_capital
+    for result in results:
+        for point in result.equity_curve:
+            peak = max(peak, point["equity"])
+            drawdown = ((point["equity"] - peak) / peak) * 100 if peak > 0 else 0.0
+            equity_curve.append({**point, "drawdown_pct": round(drawdown, 2)})
+
+    kill_dates = [r.kill_switch_date for r in results if r.kill_switch_date]
+    return BacktestResult(
+        config=config,
+        trades=[t for r in results for t in r.trades],
+        equity_curve=equity_curve,
+        daily_returns=[x for r in results for x in r.daily_returns],
+        total_bars=sum(r.total_bars for r in results),
+        signals_generated=sum(r.signals_generated for r in results),
+        orders_filled=sum(r.orders_filled for r in results),
+        kill_switch_triggered=any(r.kill_switch_triggered for r in results),
+        kill_switch_date=kill_dates[0] if kill_dates else None,
+    )
+
+
+def write_windows_csv(outcomes: list[WindowOutcome], path: Path) -> None:
+    """One row per window: spans, chosen params, train score, test metrics."""
+    param_keys = list(dict.fromkeys(k for o in outcomes for k in o.params))
+    fieldnames = [
+        "window", "train_start", "train_end", "test_start", "test_end",
+        *param_keys, "train_score", "train_trades",
+        "test_return_pct", "test_sharpe", "test_max_drawdown_pct", "test_trades", "test_final_equity",
+    ]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for o in outcomes:
+            w, m = o.window, o.test_metrics
+            writer.writerow({
+                "window": w.index,
+                "train_start": w.train_start,
+                "train_end": w.train_end,
+                "test_start": w.test_start,
+                "test_end": w.test_end,
+                **o.params,
+                "train_score": round(o.train_score, 4) if math.isfinite(o.train_score) else "",
+                "train_trades": o.train_trades,
+                "test_return_pct": m.total_return_pct,
+                "test_sharpe": m.sharpe_ratio,
+                "test_max_drawdown_pct": m.max_drawdown_pct,
+                "test_trades": m.total_trades,
+                "test_final_equity": m.final_equity,
+            })
@@ -147,6 +147,7 @@ class RiskSettings(BaseSettings):
     max_correlation: float = Field(default=0.7, description="Max correlation between positions")
     max_directional_exposure_pct: float = Field(default=60.0, description="Max portfolio % exposed in one direction (long or short) — prevents directional overconcentration")
     kelly_fraction: float = Field(default=0.5, description="Half-Kelly for position sizing")
+    max_concurrent_orders: int = Field(default=4, description="Approved orders the Executor submits in parallel (same-symbol orders stay sequential)")
 
     # Short selling — enabled for bidirectional slope strategy (paper account supports shorts natively)
     allow_short_selling: bool = Field(default=True, description="Enable SHORT/COVER signals — bidirectional momentum strategy")
@@ -162,6 +163,7 @@ class RiskSettings(BaseSettings):
     trailing_trail_distance_atr: float = Field(default=2.0, description="Trail distance in ATR (grid-optimal)")
     trailing_tight_threshold_atr: float = Field(default=4.0, description="Tight trail after this ATR profit")
     trailing_tight_distance_atr: float = Field(default=1.0, description="Tight trail distance in ATR")
+    trailing_replace_workers: int = Field(default=8, description="Concurrent stop-order replacements per trailing-stop cycle")
 
     model_config = {"env_prefix": "TRADING_RISK_", "extra": "ignore"}
 
@@ -275,6 +277,10 @@ class SlopeVolumeSettings(BaseSettings):
     market_close_utc: str = Field(default="21:00", description="Market close UTC — NYSE regular hours: 16:00 ET = 21:00 UTC (EST). Update to 13:30/20:00 when EDT (summer) is active.")
     max_trades_per_day: int = Field(default=3, description="Max trades per day (kill switch protection)")
     min_bars: int = Field(default=60, description="Min bars needed before generating signals (60 × 1min = 60min = 1h history, was 150min at 5Min)")
+    bar_cache_bars: int = Field(default=512, description="Ring-buffer depth per symbol/timeframe of the scheduler's in-memory bar cache (must cover the bars one cycle needs).")
+    analysis_workers: int = Field(default=8, description="Threads for the per-symbol slope analysis + news checks in each intraday cycle. 1 = sequential.")
+    stream_enabled: bool = Field(default=False, description="Scheduler: generate equity slope signals from the Tiingo IEX tick stream on bar close (pipeline.run_slope_stream) instead of the per-minute REST poll. The per-minute job keeps retries, crypto and trailing stops.")
+    stream_batch_sec: float = Field(default=0.5, description="Signals closing within this many seconds of the first one (same bar boundary) go through Risk Manager + Executor together.")
     inverse_etf_symbols: list[str] = Field(
         default=["SH", "PSQ", "DOG", "SPXS", "SQQQ"],
         description=(
@@ -334,6 +340,12 @@ class SupabaseSettings(BaseSettings):
     url: str = Field(..., alias="NEXT_PUBLIC_SUPABASE_URL")
     service_role_key: str = Field(..., alias="SUPABASE_SERVICE_ROLE_KEY")
 
+    # Write-behind queue for hot-path writes (scheduler process only)
+    write_behind_enabled: bool = Field(default=True, alias="TRADING_DB_WRITE_BEHIND", description="Queue hot-path Supabase writes on a background thread")
+    write_behind_max_pending: int = Field(default=10_000, alias="TRADING_DB_WRITE_MAX_PENDING", description="Queued writes held in memory before spilling to SQLite")
+    write_behind_batch_size: int = Field(default=100, alias="TRADING_DB_WRITE_BATCH_SIZE", description="Max writes applied per background flush")
+    write_behind_retry_sec: float = Field(default=30.0, alias="TRADING_DB_WRITE_RETRY_SEC", description="Seconds between replays of SQLite-spilled writes")
+
     model_config = {"env_prefix": "", "extra": "ignore"}
 
 
@@ -22,6 +22,7 @@ from alpaca.trading.requests import (
     StopLossRequest,
     TakeProfitRequest,
 )
+from alpaca.trading.stream import TradingStream
 from datetime import datetime, timedelta
 import time
 from typing import Literal
@@ -257,6 +258,18 @@ class AlpacaClient:
         orders = self._trading.get_orders(request)
         return [self._order_to_dict(o) for o in orders]
 
+    def get_order(self, order_id: str) -> dict:
+        """Get a single order by id."""
+        return self._order_to_dict(self._trading.get_order_by_id(order_id))
+
+    def trade_update_stream(self) -> TradingStream:
+        """New trading websocket client (trade_updates) for this account."""
+        return TradingStream(
+            api_key=self._api_key,
+            secret_key=self._secret_key,
+            paper=self._is_paper,
+        )
+
     def replace_order_stop_price(self, order_id: str, new_stop_price: float) -> dict:
         """Replace a stop order with a new stop price (for trailing stops).
 
@@ -392,6 +405,30 @@ class AlpacaClient:
             open/high/low/close/volume, sorted ascending. Empty DataFrame
             on error or no data.
         """
+        return self.get_latest_bars_multi([symbol], timeframe=timeframe, n_bars=n_bars).get(
+            symbol, pd.DataFrame()
+        )
+
+    def get_latest_bars_multi(
+        self,
+        symbols: list[str],
+        timeframe: str = "5Min",
+        n_bars: int = 60,
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Get the most recent N bars for many symbols in a single request.
+
+        Same window and frame layout as get_latest_bars(), but one
+        StockBarsRequest covers the whole watchlist, so the intraday cycle
+        costs one round trip (plus pagination) instead of one per symbol.
+
+        Returns:
+            dict symbol -> DataFrame (see get_latest_bars). Symbols without
+            data are omitted; an API error returns an empty dict.
+        """
+        if not symbols:
+            return {}
+
         if timeframe.endswith("Min") or timeframe.endswith("min"):
             minutes = int(timeframe.replace("Min", "").replace("min", ""))
             tf = TimeFrame(minutes, TimeFrameUnit.Minute)
@@ -402,47 +439,46 @@ class AlpacaClient:
 
         # Calculate lookback window: n_bars × bar_duration + buffer for
         # weekends / market holidays (factor 2.5 is conservative).
-        minutes_per_bar = (
-            int(timeframe.replace("Min", "").replace("min", ""))
-            if ("Min" in timeframe or "min" in timeframe)
-            else 60
-        )
+        if "Min" in timeframe or "min" in timeframe:
+            minutes_per_bar = int(timeframe.replace("Min", "").replace("min", ""))
+        elif timeframe == "1Hour":
+            minutes_per_bar = 60
+        else:
+            minutes_per_bar = 1440
         buffer_factor = 2.5
         lookback_minutes = int(n_bars * minutes_per_bar * buffer_factor)
         start = datetime.utcnow() - timedelta(minutes=lookback_minutes)
 
         try:
             request = StockBarsRequest(
-                symbol_or_symbols=symbol,
+                symbol_or_symbols=list(symbols),
                 timeframe=tf,
                 start=start,
             )
             bars = self._data.get_stock_bars(request)
-            if symbol not in bars.data:
-                return pd.DataFrame()
+        except Exception as e:
+            logger.warning("alpaca_get_latest_bars_error", symbols=len(symbols), error=str(e))
+            return {}
 
-            data = []
-            for bar in bars.data[symbol]:
-                data.append({
+        result: dict[str, pd.DataFrame] = {}
+        for symbol in symbols:
+            data = [
+                {
                     "timestamp": bar.timestamp,
                     "open": float(bar.open),
                     "high": float(bar.high),
                     "low": float(bar.low),
                     "close": float(bar.close),
                     "volume": float(bar.volume),
-                })
-
+                }
+                for bar in bars.data.get(symbol, [])
+            ]
             if not data:
-                return pd.DataFrame()
-
+                continue
             df = pd.DataFrame(data)
             df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
-            df = df.set_index("timestamp").sort_index()
-            return df.tail(n_bars)
-
-        except Exception as e:
-            logger.warning("alpaca_get_latest_bars_error", symbol=symbol, error=str(e))
-            return pd.DataFrame()
+            result[symbol] = df.set_index("timestamp").sort_index().tail(n_bars)
+        return result
 
     # ─── Private ───────────────────────────────────────────────
 
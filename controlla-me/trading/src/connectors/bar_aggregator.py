@@ -0,0 +1,208 @@
+"""
+Streaming bar aggregator — turns TiingoWebSocketClient ticks into OHLCV bars.
+
+Live slope signals used to poll REST bars once a minute, so a bar that closed
+at hh:mm:00 was only analysed when the next scheduler tick fetched it.
+BarAggregator consumes the websocket stream directly: every tick updates the
+forming bar of its symbol (open/high/low/close, volume, VWAP) and a bar is
+closed as soon as the stream moves past its period — by a tick on any symbol,
+so quiet symbols close on time too. Closed bars go into a per-symbol rolling
+BarRing, and ``on_bar_close(symbol, bars)`` is called with the latest closed
+bars, ready for analyze_slope_volume.
+
+Bars are aligned to the timeframe like REST bars (5Min → hh:00, hh:05, ...)
+and labelled by their start. Minutes without trades produce no bar,
+same as the Tiingo IEX REST endpoint. Ticks older than the forming bar (late
+prints after the bar closed) are dropped.
+
+Usage:
+    async def on_bar_close(symbol: str, bars: pd.DataFrame) -> None:
+        print(symbol, bars.iloc[-1].to_dict())
+
+    agg = BarAggregator("1Min", on_bar_close=on_bar_close)
+    agg.seed(client_rest.get_latest_bars_multi(symbols, "1Min", 120))  # optional warm-up
+    await TiingoWebSocketClient(mode="iex", symbols=symbols).stream(callback=agg.on_tick)
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import structlog
+
+from .bar_cache import BarRing, timeframe_minutes
+
+logger = structlog.get_logger()
+
+BAR_COLUMNS = ("open", "high", "low", "close", "volume", "vwap")
+
+# (symbol, closed bars oldest-first) → None or awaitable
+BarCloseCallback = Callable[[str, pd.DataFrame], None | Awaitable[None]]
+
+# Tick field names: IEX first, crypto second.
+_SIZE_FIELDS = ("lastSaleSize", "lastSize")
+_TIME_FIELDS = ("lastSaleTimestamp", "timestamp")
+
+
+@dataclass
+class LiveBar:
+    """The forming bar of one symbol."""
+
+    start: pd.Timestamp
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float = 0.0
+    notional: float = 0.0  # Σ price × size, for VWAP
+
+    def add(self, price: float, size: float) -> None:
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+        self.close = price
+        self.volume += size
+        self.notional += price * size
+
+    @property
+    def vwap(self) -> float:
+        return self.notional / self.volume if self.volume > 0 else self.close
+
+    def row(self) -> list[float]:
+        return [self.open, self.high, self.low, self.close, self.volume, self.vwap]
+
+
+def _tick_size(data: dict) -> float:
+    for field in _SIZE_FIELDS:
+        value = data.get(field)
+        if value is not None:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return 0.0
+    return 0.0
+
+
+def _tick_time(data: dict) -> pd.Timestamp:
+    for field in _TIME_FIELDS:
+        value = data.get(field)
+        if value:
+            try:
+                ts = pd.Timestamp(value)
+            except (TypeError, ValueError):
+                break
+            return ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+    return pd.Timestamp.now(tz="UTC")
+
+
+class BarAggregator:
+    """
+    Tick → OHLCV/VWAP bar aggregator for one timeframe.
+
+    ``on_tick`` matches TiingoWebSocketClient's TickCallback and can be passed
+    to ``stream(callback=...)`` directly.
+    """
+
+    def __init__(
+        self,
+        timeframe: str = "1Min",
+        on_bar_close: BarCloseCallback | None = None,
+        history: int = 512,
+        emit_bars: int = 120,
+    ) -> None:
+        """
+        Args:
+            timeframe:    Bar size ("1Min", "5Min", ...).
+            on_bar_close: Called with (symbol, last ``emit_bars`` closed bars)
+                          whenever a bar of that symbol closes.
+            history:      Closed bars kept per symbol (ring capacity).
+            emit_bars:    Bars handed to on_bar_close.
+        """
+        self.timeframe = timeframe
+        self._period = pd.Timedelta(minutes=timeframe_minutes(timeframe))
+        self._on_bar_close = on_bar_close
+        self._history = history
+        self._emit_bars = emit_bars
+        self._forming: dict[str, LiveBar] = {}
+        self._closed: dict[str, BarRing] = {}
+        self.late_ticks = 0
+
+    # ─── Closed bars ───────────────────────────────────────────
+
+    def _ring(self, symbol: str) -> BarRing:
+        ring = self._closed.get(symbol)
+        if ring is None:
+            ring = self._closed[symbol] = BarRing(self._history, columns=BAR_COLUMNS)
+        return ring
+
+    def seed(self, bars: dict[str, pd.DataFrame]) -> None:
+        """
+        Pre-load closed bars (e.g. from REST) so signals do not wait for
+        ``min_bars`` of live history. Frames without a vwap column use close.
+        """
+        for symbol, df in bars.items():
+            if df.empty:
+                continue
+            if "vwap" not in df.columns:
+                df = df.assign(vwap=df["close"])
+            self._ring(symbol).append_frame(df)
+
+    def bars(self, symbol: str, n_bars: int | None = None) -> pd.DataFrame:
+        """Latest closed bars of ``symbol`` (empty frame when none)."""
+        ring = self._closed.get(symbol)
+        if ring is None:
+            return pd.DataFrame(columns=list(BAR_COLUMNS))
+        return ring.frame(n_bars or ring.capacity)
+
+    def forming(self, symbol: str) -> LiveBar | None:
+        return self._forming.get(symbol)
+
+    # ─── Ticks ─────────────────────────────────────────────────
+
+    async def on_tick(self, symbol: str, price: float, data: dict) -> None:
+        """Fold one tick into its symbol's forming bar, closing bars that ended."""
+        ts = _tick_time(data)
+        await self.close_due(ts)
+
+        start = ts.floor(self._period)
+        bar = self._forming.get(symbol)
+        if bar is None:
+            last = self._ring(symbol).last_ts
+            if last is not None and start.value <= last:
+                self.late_ticks += 1
+                return
+            bar = self._forming[symbol] = LiveBar(start, price, price, price, price)
+        elif start < bar.start:
+            self.late_ticks += 1
+            return
+        bar.add(price, _tick_size(data))
+
+    async def close_due(self, now: pd.Timestamp) -> None:
+        """Close every forming bar whose period ended at or before ``now``."""
+        due = [s for s, bar in self._forming.items() if bar.start + self._period <= now]
+        for symbol in due:
+            await self._close(symbol)
+
+    async def flush(self) -> None:
+        """Close all forming bars (end of stream)."""
+        for symbol in list(self._forming):
+            await self._close(symbol)
+
+    async def _close(self, symbol: str) -> None:
+        bar = self._forming.pop(symbol)
+        ring = self._ring(symbol)
+        ring.append(
+            pd.DatetimeIndex([bar.start]).as_unit("ns").asi8,
+            np.array(bar.row(), dtype=np.float64).reshape(-1, 1),
+        )
+        if self._on_bar_close is None:
+            return
+        try:
+            result = self._on_bar_close(symbol, ring.frame(self._emit_bars))
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as exc:
+            logger.warning("bar_close_callback_error", symbol=symbol, error=str(exc))
@@ -0,0 +1,276 @@
+"""
+Rolling bar cache — in-memory ring buffers for the intraday pipeline.
+
+The scheduler runs the intraday pipeline every minute, and each run used to
+re-download the last ~60 bars per symbol although only one new bar had closed.
+BarCache keeps the recent bars of every (provider, symbol, timeframe) in
+fixed-size NumPy ring buffers for the lifetime of the scheduler process:
+
+  - first request for a symbol → seed with a full fetch of ``n_bars``
+  - later requests             → fetch only the bars since the last cached
+                                 timestamp (+ overlap) and append them
+  - gap detected               → fall back to a full refetch
+
+A gap is any incremental fetch whose oldest bar is newer than the last cached
+bar (the overlap is missing, so bars in between may be lost) — e.g. after the
+overnight close or a network outage. The last cached bar is overwritten by the
+fresh copy of the same timestamp, so a bar that was still forming is corrected.
+
+The cache is owned by the scheduler: ``install_bar_cache()`` is called once at
+startup and agents pick it up through ``get_bar_cache()``. One-shot CLI runs
+have no cache installed and fetch directly, exactly as before.
+
+Usage:
+    cache = install_bar_cache(BarCache(capacity=512))
+    bars = cache.get_latest_bars_multi(client, ["SPY", "QQQ"], "1Min", n_bars=64)
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+import numpy as np
+import pandas as pd
+import structlog
+
+logger = structlog.get_logger()
+
+_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Bars re-fetched before the last cached timestamp on every incremental call.
+# One would do (the last bar itself); two tolerates a missing bar on the
+# provider side (IEX skips minutes without trades).
+_OVERLAP_BARS = 2
+
+
+class LatestBarsSource(Protocol):
+    """Market-data client interface used by the cache (AlpacaClient, TiingoClient)."""
+
+    def get_latest_bars_multi(
+        self, symbols: list[str], timeframe: str = ..., n_bars: int = ...
+    ) -> dict[str, pd.DataFrame]: ...
+
+
+def timeframe_minutes(timeframe: str) -> int:
+    """Bar length in minutes for "1Min"/"5min"/"1Hour"/"1Day" style strings."""
+    tf = timeframe.lower()
+    if tf.endswith("min"):
+        return int(tf[:-3] or 1)
+    if tf.endswith("hour"):
+        return 60 * int(tf[:-4] or 1)
+    if tf.endswith("day"):
+        return 1440 * int(tf[:-3] or 1)
+    raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+
+# ---------------------------------------------------------------------------
+# Ring buffer
+# ---------------------------------------------------------------------------
+
+class BarRing:
+    """
+    Fixed-capacity bar ring buffer for one symbol/timeframe (OHLCV columns
+    by default).
+
+    Timestamps are stored as int64 UTC nanoseconds, prices and volume as
+    float64. ``_end`` counts every bar ever written, so slot ``i % capacity``
+    holds bar ``i`` and the newest ``count`` bars are always contiguous mod
+    capacity.
+    """
+
+    def __init__(self, capacity: int, columns: tuple[str, ...] = _COLUMNS) -> None:
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1, got {capacity}")
+        self.capacity = capacity
+        self.columns = columns
+        self._ts = np.zeros(capacity, dtype=np.int64)
+        self._values = np.zeros((len(columns), capacity), dtype=np.float64)
+        self._end = 0
+        # Depth of the seeding fetch. Providers may return fewer bars than
+        # asked (IEX gaps), so this, not count, decides when to reseed.
+        self.seeded_bars = 0
+
+    @property
+    def count(self) -> int:
+        return min(self._end, self.capacity)
+
+    @property
+    def last_ts(self) -> int | None:
+        return int(self._ts[(self._end - 1) % self.capacity]) if self._end else None
+
+    def append(self, ts: np.ndarray, values: np.ndarray) -> int:
+        """
+        Append bars newer than the last one; a bar at the last timestamp
+        replaces it in place. Returns the number of new bars written.
+
+        Args:
+            ts:     int64 ns timestamps, ascending.
+            values: float64 array of shape (len(columns), len(ts)).
+        """
+        last = self.last_ts
+        if last is not None:
+            same = ts == last
+            if same.any():
+                self._values[:, (self._end - 1) % self.capacity] = values[:, np.flatnonzero(same)[-1]]
+            keep = ts > last
+            ts, values = ts[keep], values[:, keep]
+        n = len(ts)
+        if n > self.capacity:
+            ts, values = ts[-self.capacity:], values[:, -self.capacity:]
+            self._end += n - self.capacity
+            n = self.capacity
+        slots = (self._end + np.arange(n)) % self.capacity
+        self._ts[slots] = ts
+        self._values[:, slots] = values
+        self._end += n
+        return n
+
+    def append_frame(self, df: pd.DataFrame) -> int:
+        """append() for a DatetimeIndex-ed frame holding this ring's columns."""
+        return self.append(*_frame_arrays(df, self.columns))
+
+    def frame(self, n_bars: int) -> pd.DataFrame:
+        """Newest ``n_bars`` bars as a UTC-indexed frame (oldest first)."""
+        n = min(n_bars, self.count)
+        slots = (self._end - n + np.arange(n)) % self.capacity
+        index = pd.DatetimeIndex(pd.to_datetime(self._ts[slots], utc=True), name="timestamp")
+        return pd.DataFrame(
+            {col: self._values[i, slots] for i, col in enumerate(self.columns)},
+            index=index,
+        )
+
+
+def _frame_arrays(df: pd.DataFrame, columns: tuple[str, ...] = _COLUMNS) -> tuple[np.ndarray, np.ndarray]:
+    idx = pd.DatetimeIndex(df.index)
+    idx = (idx.tz_localize("UTC") if idx.tz is None else idx.tz_convert("UTC")).as_unit("ns")
+    order = np.argsort(idx.asi8, kind="stable")
+    values = np.vstack([df[col].to_numpy(dtype=np.float64) for col in columns])
+    return idx.asi8[order], values[:, order]
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+@dataclass
+class BarCacheStats:
+    seeds: int = 0
+    increments: int = 0
+    gaps: int = 0
+    bars_fetched: int = 0
+
+
+class BarCache:
+    """
+    Process-wide rolling bar cache keyed by (provider, symbol, timeframe).
+
+    The provider is part of the key because the clients are not
+    interchangeable (Alpaca free tier is 15 min delayed, Tiingo IEX is not).
+    """
+
+    def __init__(self, capacity: int = 512, clock: Any = None) -> None:
+        self.capacity = capacity
+        self._clock = clock or (lambda: pd.Timestamp.now(tz="UTC"))
+        self._rings: dict[tuple[str, str, str], BarRing] = {}
+        self._lock = threading.Lock()
+        self.stats = BarCacheStats()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rings.clear()
+
+    def get_latest_bars_multi(
+        self,
+        client: LatestBarsSource,
+        symbols: list[str],
+        timeframe: str,
+        n_bars: int,
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Latest ``n_bars`` bars per symbol, fetching only what the cache lacks.
+
+        Same contract as the clients' get_latest_bars_multi: symbols without
+        data in this cycle are omitted (a failed refresh never serves stale
+        bars).
+        """
+        n_bars = min(n_bars, self.capacity)
+        provider = type(client).__name__
+        bar_ns = timeframe_minutes(timeframe) * 60 * 1_000_000_000
+        now_ns = self._clock().value
+
+        with self._lock:
+            seed: list[str] = []
+            increments: dict[int, list[str]] = {}
+            for symbol in symbols:
+                ring = self._rings.get((provider, symbol, timeframe))
+                if ring is None or ring.seeded_bars < n_bars:
+                    seed.append(symbol)
+                    continue
+                missing = max(0, math.ceil((now_ns - ring.last_ts) / bar_ns))
+                k = missing + _OVERLAP_BARS
+                if k >= n_bars:
+                    seed.append(symbol)
+                else:
+                    increments.setdefault(k, []).append(symbol)
+
+            # Group incremental symbols by window size so each provider call
+            # stays a single batched request.
+            fresh: dict[str, pd.DataFrame] = {}
+            for k, group in increments.items():
+                fetched = client.get_latest_bars_multi(group, timeframe=timeframe, n_bars=k)
+                self.stats.increments += 1
+                for symbol in group:
+                    df = fetched.get(symbol)
+                    if df is None or df.empty:
+                        continue
+                    ring = self._rings[(provider, symbol, timeframe)]
+                    ts, values = _frame_arrays(df)
+                    if ts[0] > ring.last_ts:
+                        # Overlap missing → bars between may be lost.
+                        self.stats.gaps += 1
+                        logger.info("bar_cache_gap", symbol=symbol, timeframe=timeframe)
+                        seed.append(symbol)
+                        continue
+                    self.stats.bars_fetched += len(ts)
+                    ring.append(ts, values)
+                    fresh[symbol] = ring.frame(n_bars)
+
+            if seed:
+                fetched = client.get_latest_bars_multi(seed, timeframe=timeframe, n_bars=n_bars)
+                self.stats.seeds += 1
+                for symbol in seed:
+                    df = fetched.get(symbol)
+                    if df is None or df.empty:
+                        self._rings.pop((provider, symbol, timeframe), None)
+                        continue
+                    ring = BarRing(self.capacity)
+                    ring.seeded_bars = n_bars
+                    ts, values = _frame_arrays(df)
+                    self.stats.bars_fetched += len(ts)
+                    ring.append(ts, values)
+                    self._rings[(provider, symbol, timeframe)] = ring
+                    fresh[symbol] = ring.frame(n_bars)
+
+        return {symbol: fresh[symbol] for symbol in symbols if symbol in fresh}
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance (owned by the scheduler)
+# ---------------------------------------------------------------------------
+
+_bar_cache: BarCache | None = None
+
+
+def install_bar_cache(cache: BarCache | None) -> BarCache | None:
+    """Install (or, with None, remove) the process-wide bar cache."""
+    global _bar_cache
+    _bar_cache = cache
+    return cache
+
+
+def get_bar_cache() -> BarCache | None:
+    """The process-wide bar cache, or None when the process did not install one."""
+    return _bar_cache
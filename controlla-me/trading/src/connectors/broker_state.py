@@ -0,0 +1,102 @@
+"""
+Cycle-scoped broker state — one account/positions read per pipeline cycle.
+
+Every pipeline phase used to ask Alpaca for the same account and positions
+(RiskManager, the slope signal scan, trailing stops, the daily report, stop
+checks), so one intraday cycle made several identical round-trips and each
+phase could see a slightly different portfolio. BrokerState fetches each
+piece lazily on first use and serves the cached copy afterwards, so every
+phase of a cycle works from the same view.
+
+Anything that changes the account — an order fill, a closed position, the
+kill switch — calls ``invalidate()`` and the next reader fetches fresh
+state. Portfolio snapshots are DB history (not touched by fills) and stay
+cached for the whole cycle.
+
+Agents take an optional ``broker``; without one they build a private
+BrokerState per call, which behaves exactly like reading Alpaca directly.
+
+Usage:
+    broker = BrokerState(AlpacaClient(account_type="slope"), TradingDB())
+    signals = signal_gen.run_slope_volume(broker=broker)
+    risk = await risk_mgr.run(signals=signals, broker=broker)
+    await executor.run(decisions=approved, broker=broker)   # invalidates on fills
+    await monitor.run(mode="trailing_stops", broker=broker)
+    logger.info("broker_state_stats", **broker.stats)
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+class BrokerState:
+    """Lazily fetched, cycle-scoped account / positions / snapshots."""
+
+    def __init__(self, alpaca: Any, db: Any | None = None) -> None:
+        """
+        Args:
+            alpaca: AlpacaClient (anything with get_account / get_positions).
+            db:     TradingDB for portfolio snapshots (optional).
+        """
+        self._alpaca = alpaca
+        self._db = db
+        # run_slope_volume runs in a worker thread: guard the lazy fetches.
+        self._lock = threading.Lock()
+        self._account: dict | None = None
+        self._positions: list[dict] | None = None
+        self._snapshots: list[dict] | None = None
+        self._snapshot_days = 0
+        self.stats = {"account_fetches": 0, "positions_fetches": 0, "snapshot_fetches": 0, "invalidations": 0}
+
+    # ─── Reads ─────────────────────────────────────────────────
+
+    def account(self) -> dict:
+        """Account info (cash, portfolio_value, buying_power, equity, ...)."""
+        with self._lock:
+            if self._account is None:
+                self._account = self._alpaca.get_account()
+                self.stats["account_fetches"] += 1
+            return dict(self._account)
+
+    def positions(self) -> list[dict]:
+        """Open positions (shallow copies — callers may mutate them)."""
+        with self._lock:
+            if self._positions is None:
+                self._positions = self._alpaca.get_positions()
+                self.stats["positions_fetches"] += 1
+            return [dict(p) for p in self._positions]
+
+    def position_map(self) -> dict[str, dict]:
+        """Open positions keyed by symbol."""
+        return {p["symbol"]: p for p in self.positions()}
+
+    def snapshots(self, days: int = 30) -> list[dict]:
+        """
+        Latest ``days`` portfolio snapshots, newest first.
+
+        One query serves every reader of the cycle: a longer request than the
+        cached one refetches, a shorter one is sliced from the cache.
+        """
+        if self._db is None:
+            raise RuntimeError("BrokerState has no TradingDB for snapshots")
+        with self._lock:
+            if self._snapshots is None or days > self._snapshot_days:
+                self._snapshots = self._db.get_snapshots(days=days)
+                self._snapshot_days = days
+                self.stats["snapshot_fetches"] += 1
+            return self._snapshots[:days]
+
+    # ─── Invalidation ──────────────────────────────────────────
+
+    def invalidate(self) -> None:
+        """Drop account and positions (after a fill or a close)."""
+        with self._lock:
+            self._account = None
+            self._positions = None
+            self.stats["invalidations"] += 1
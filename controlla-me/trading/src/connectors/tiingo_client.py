@@ -18,7 +18,9 @@ IEX:  https://api.tiingo.com/documentation/iex
 from __future__ import annotations
 
 import math
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any
 
@@ -96,6 +98,9 @@ class TiingoClient:
         rph = max(settings.tiingo.requests_per_hour, 1)
         self._request_interval: float = 3600.0 / rph
         self._last_request_time: float = 0.0
+        # Guards _last_request_time: concurrent callers (get_latest_bars_multi)
+        # each reserve the next free slot, then wait for it outside the lock.
+        self._rate_lock = threading.Lock()
 
     # ─── Internal: rate-limited request helper ────────────────────────────────
 
@@ -125,12 +130,13 @@ class TiingoClient:
 
         for attempt in range(_MAX_RETRIES_429 + 1):
             # Enforce inter-request interval (rate limiting)
-            elapsed = time.monotonic() - self._last_request_time
-            wait = self._request_interval - elapsed
-            if wait > 0:
-                time.sleep(wait)
+            with self._rate_lock:
+                now = time.monotonic()
+                slot = max(now, self._last_request_time + self._request_interval)
+                self._last_request_time = slot
+            if slot > now:
+                time.sleep(slot - now)
 
-            self._last_request_time = time.monotonic()
             resp = self._session.get(url, params=params, timeout=timeout)
 
             if resp.status_code != 429:
@@ -248,6 +254,41 @@ class TiingoClient:
 
         return df.tail(n_bars)
 
+    def get_latest_bars_multi(
+        self,
+        symbols: list[str],
+        timeframe: str = "5Min",
+        n_bars: int = 30,
+        max_workers: int = 8,
+    ) -> dict[str, pd.DataFrame]:
+        """Fetch recent intraday bars for many symbols concurrently.
+
+        The IEX price-series endpoint takes one ticker per request, so the
+        symbols are fetched on a small thread pool: requests still respect
+        the requests_per_hour spacing in ``_get``, but their network latency
+        overlaps instead of adding up.
+
+        Returns:
+            dict symbol -> DataFrame (see get_latest_bars). Symbols without
+            data, or whose request failed, are omitted.
+        """
+        import structlog
+
+        log = structlog.get_logger()
+
+        def fetch(symbol: str) -> pd.DataFrame:
+            try:
+                return self.get_latest_bars(symbol, timeframe=timeframe, n_bars=n_bars)
+            except Exception as e:
+                log.warning("tiingo_get_latest_bars_error", symbol=symbol, error=str(e))
+                return pd.DataFrame()
+
+        if not symbols:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as pool:
+            frames = list(pool.map(fetch, symbols))
+        return {symbol: df for symbol, df in zip(symbols, frames) if not df.empty}
+
     def get_latest_quote(self, symbols: list[str]) -> dict[str, dict]:
         """Fetch the latest IEX real-time quote for each symbol.
 
@@ -41,6 +41,10 @@ Usage:
     client = TiingoWebSocketClient(mode="iex", symbols=["SPY", "QQQ"])
     await client.stream(callback=on_tick)
 
+    # Option 2b: aggregate ticks into 1Min/5Min bars (see bar_aggregator.py)
+    agg = BarAggregator("1Min", on_bar_close=on_bar_close)
+    await client.stream(callback=agg.on_tick)
+
     # Option 3: Run in background thread alongside synchronous scheduler
     import threading
     def run_ws():
@@ -100,6 +104,7 @@ class TiingoWebSocketClient:
         mode: str = "iex",
         symbols: list[str] | None = None,
         api_key: str | None = None,
+        url: str | None = None,
     ) -> None:
         """
         Args:
@@ -108,13 +113,15 @@ class TiingoWebSocketClient:
                      IEX:    ["SPY", "QQQ", "SH", "PSQ"]
                      Crypto: ["btcusd", "ethusd"]
             api_key: Tiingo API key. Falls back to TIINGO_API_KEY env var.
+            url:     Override the endpoint (e.g. a local server replaying
+                     recorded ticks). Defaults to the Tiingo URL for ``mode``.
         """
         if mode not in ("iex", "crypto"):
             raise ValueError(f"Invalid mode {mode!r}. Must be 'iex' or 'crypto'.")
 
         self.mode = mode
         self.symbols: list[str] = symbols or []
-        self._ws_url = _WS_IEX if mode == "iex" else _WS_CRYPTO
+        self._ws_url = url or (_WS_IEX if mode == "iex" else _WS_CRYPTO)
 
         # Resolve API key
         if api_key:
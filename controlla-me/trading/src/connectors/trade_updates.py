@@ -0,0 +1,175 @@
+"""
+Trade-update stream — event-driven order fill tracking.
+
+Executor used to poll ``get_orders(status="all")`` every 2 s and scan the
+whole list for one order id, once per order. FillTracker instead listens to
+Alpaca's trading websocket (trade_updates) and resolves one future per order
+on its terminal event (fill, cancel, expire, reject), so any number of
+orders submitted in a cycle wait on the same connection in parallel.
+
+Events can be missed (stream still connecting when a market order fills,
+reconnects, no stream at all), so a waiter that has heard nothing for
+``poll_interval`` seconds fetches its single order by id as a fallback.
+
+The stream is anything with Alpaca TradingStream's surface:
+``subscribe_trade_updates(async handler)``, ``async _run_forever()`` and
+``async stop_ws()``. Tests pass a local stub.
+
+Usage:
+    tracker = FillTracker(alpaca.get_order, stream=alpaca.trade_update_stream())
+    await tracker.start()
+    try:
+        info = await tracker.wait_for_fill(order_id, timeout=60)
+    finally:
+        await tracker.stop()
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+import structlog
+
+from .alpaca_client import AlpacaClient
+
+logger = structlog.get_logger()
+
+# Alpaca spells it "canceled"; "cancelled" kept for older records/stubs.
+TERMINAL_STATUSES = frozenset({"filled", "canceled", "cancelled", "expired", "rejected"})
+
+
+def _fill_info(order: Any) -> dict:
+    """Order (alpaca-py model or order dict) → the fill fields Executor records."""
+    if not isinstance(order, dict):
+        order = AlpacaClient._order_to_dict(order)
+    return {
+        "order_id": order.get("order_id"),
+        "status": order.get("status", ""),
+        "filled_avg_price": order.get("filled_avg_price"),
+        "filled_qty": order.get("filled_qty"),
+        "filled_at": order.get("filled_at"),
+    }
+
+
+class FillTracker:
+    """Resolves per-order futures from trade-update events, with REST fallback."""
+
+    def __init__(
+        self,
+        fetch_order: Callable[[str], Any],
+        stream: Any | None = None,
+        poll_interval: float = 5.0,
+    ) -> None:
+        """
+        Args:
+            fetch_order:   Single-order lookup by id (AlpacaClient.get_order).
+            stream:        Trade-update stream; None → fallback polling only.
+            poll_interval: Seconds of silence before a waiter fetches its order.
+        """
+        self._fetch_order = fetch_order
+        self._stream = stream
+        self.poll_interval = poll_interval
+        self._latest: dict[str, dict] = {}
+        self._futures: dict[str, asyncio.Future] = {}
+        self._task: asyncio.Task | None = None
+        self.events = 0
+        self.fallback_fetches = 0
+
+    # ─── Stream lifecycle ──────────────────────────────────────
+
+    async def start(self) -> None:
+        """Subscribe to trade updates and run the stream in the background."""
+        if self._stream is None or self._task is not None:
+            return
+        self._stream.subscribe_trade_updates(self.on_trade_update)
+        self._task = asyncio.create_task(self._stream._run_forever())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        try:
+            await self._stream.stop_ws()
+        except Exception as exc:
+            logger.debug("trade_stream_stop_error", error=str(exc))
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    # ─── Events ────────────────────────────────────────────────
+
+    async def on_trade_update(self, update: Any) -> None:
+        """trade_updates handler: record the order state, resolve on terminal events."""
+        order = update.get("order") if isinstance(update, dict) else getattr(update, "order", None)
+        if order is None:
+            return
+        self.events += 1
+        self._record(_fill_info(order))
+
+    def _record(self, info: dict) -> None:
+        order_id = info.get("order_id")
+        if not order_id:
+            return
+        self._latest[order_id] = info
+        if info["status"] in TERMINAL_STATUSES:
+            fut = self._futures.get(order_id)
+            if fut is not None and not fut.done():
+                fut.set_result(info)
+
+    def _future(self, order_id: str) -> asyncio.Future:
+        fut = self._futures.get(order_id)
+        if fut is None:
+            fut = self._futures[order_id] = asyncio.get_running_loop().create_future()
+            info = self._latest.get(order_id)
+            if info is not None and info["status"] in TERMINAL_STATUSES:
+                fut.set_result(info)  # event arrived before anyone waited
+        return fut
+
+    # ─── Waiting ───────────────────────────────────────────────
+
+    async def wait_for_fill(
+        self,
+        order_id: str,
+        timeout: float,
+        allow_partial: bool = False,
+    ) -> dict | None:
+        """
+        Wait for ``order_id`` to reach a terminal status.
+
+        Returns the terminal fill info, or on timeout the last known state
+        (e.g. partially_filled) or None when nothing was ever seen.
+        With ``allow_partial`` a partial fill also counts as terminal.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        fut = self._future(order_id)
+        try:
+            while True:
+                info = self._latest.get(order_id)
+                if info is not None and (
+                    info["status"] in TERMINAL_STATUSES
+                    or (allow_partial and info["status"] == "partially_filled")
+                ):
+                    return info
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return info
+                try:
+                    return await asyncio.wait_for(asyncio.shield(fut), min(self.poll_interval, remaining))
+                except asyncio.TimeoutError:
+                    await self._fetch(order_id)
+        finally:
+            self._futures.pop(order_id, None)
+
+    async def _fetch(self, order_id: str) -> None:
+        self.fallback_fetches += 1
+        try:
+            order = await asyncio.to_thread(self._fetch_order, order_id)
+        except Exception as exc:
+            logger.debug("fill_fetch_error", order_id=order_id, error=str(exc))
+            return
+        if order:
+            info = _fill_info(order)
+            info["order_id"] = info["order_id"] or order_id
+            self._record(info)
@@ -17,6 +17,13 @@ Intraday pipeline (slope-only — phases 2.5+3+4+4.5):
   re-read 1H bars every 5 min (92% redundant) with 0 signals.
   Intraday = slope+volume strategy only: faster, lower API calls, no redundancy.
 
+Streaming slope (run_slope_stream, slope_volume.stream_enabled):
+  equity signals come from the Tiingo tick stream on bar close and go straight
+  to phases 3+4; the per-minute intraday pipeline then only polls crypto.
+
+Each cycle shares one BrokerState (account, positions, snapshots fetched once,
+re-read after fills) across its phases.
+
 Can be run as a full pipeline or agent-by-agent.
 """
 
@@ -24,6 +31,7 @@ from __future__ import annotations
 
 import asyncio
 from datetime import datetime
+from typing import Any
 
 import structlog
 
@@ -33,6 +41,9 @@ from .agents.risk_manager import RiskManager
 from .agents.executor import Executor
 from .agents.portfolio_monitor import PortfolioMonitor
 from .config import get_settings
+from .connectors.alpaca_client import AlpacaClient
+from .connectors.broker_state import BrokerState
+from .connectors.tiingo_websocket import TiingoWebSocketClient
 from .utils.db import TradingDB
 from .utils.logging import setup_logging
 from .utils import telegram as tg
@@ -58,6 +69,8 @@ async def run_daily_pipeline() -> dict:
     results: dict = {"started_at": start.isoformat(), "mode": settings.mode}
 
     try:
+        broker = BrokerState(AlpacaClient(account_type="conventional"), TradingDB())
+
         # Phase 1: Market Scanner
         scanner = MarketScanner(account_type="conventional")
         scan_result = await scanner.run()
@@ -83,7 +96,7 @@ async def run_daily_pipeline() -> dict:
             if signals:
                 # Phase 3: Risk Manager
                 risk_mgr = RiskManager(account_type="conventional")
-                risk_result = await risk_mgr.run(signals=signals)
+                risk_result = await risk_mgr.run(signals=signals, broker=broker)
 
                 if risk_result.get("kill_switch"):
                     results["risk"] = {"status": "kill_switch", "message": risk_result["message"]}
@@ -101,7 +114,7 @@ async def run_daily_pipeline() -> dict:
                 # Phase 4: Executor
                 if approved:
                     executor = Executor(account_type="conventional")
-                    exec_result = await executor.run(decisions=approved)
+                    exec_result = await executor.run(decisions=approved, broker=broker)
                     results["execution"] = {
                         "executed": exec_result.get("total_executed", 0),
                         "status": "ok",
@@ -115,7 +128,7 @@ async def run_daily_pipeline() -> dict:
 
         # Phase 4.5: Update Trailing Stops (ALWAYS runs — existing positions need management)
         monitor = PortfolioMonitor(account_type="conventional")
-        trail_result = await monitor.run(mode="trailing_stops")
+        trail_result = await monitor.run(mode="trailing_stops", broker=broker)
         results["trailing_stops"] = {
             "stops_raised": trail_result.get("stops_raised", 0),
             "states_cleaned": trail_result.get("states_cleaned", 0),
@@ -123,7 +136,7 @@ async def run_daily_pipeline() -> dict:
         }
 
         # Phase 5: Portfolio Monitor (daily report)
-        report = await monitor.run(mode="daily_report")
+        report = await monitor.run(mode="daily_report", broker=broker)
         results["report"] = {
             "portfolio_value": report.get("portfolio_value"),
             "daily_pnl_pct": report.get("daily_pnl_pct"),
@@ -135,6 +148,7 @@ async def run_daily_pipeline() -> dict:
         results["status"] = "ok"
         duration_ms = int((datetime.utcnow() - start).total_seconds() * 1000)
         logger.info("pipeline_complete", duration_ms=duration_ms, **results.get("report", {}))
+        logger.info("broker_state_stats", cycle="daily", **broker.stats)
 
     except Exception as e:
         results["status"] = "error"
@@ -144,13 +158,16 @@ async def run_daily_pipeline() -> dict:
     return results
 
 
-async def run_intraday_pipeline() -> dict:
+async def run_intraday_pipeline(stream_equities: bool = False) -> dict:
     """
     Intraday signal refresh — slope+volume only, every 5 min, 24/7.
 
     Only slope+volume signals (Phase 2.5) — the conventional Signal Generator
     (RSI/MACD/BB on daily bars) runs exclusively in the daily pipeline at 09:00 ET.
     No daily report — that runs post-market at 16:30 ET.
+
+    With ``stream_equities`` the equity watchlist is left to run_slope_stream
+    (signals on bar close); this cycle only polls the crypto pairs.
     """
     settings = get_settings()
     start = datetime.utcnow()
@@ -168,11 +185,12 @@ async def run_intraday_pipeline() -> dict:
 
     try:
         signals: list[dict] = []
+        db = TradingDB()
+        broker = BrokerState(AlpacaClient(account_type="slope"), db)
 
         # Phase 2.0: Retry failed executions from previous cycles (pending intent)
         # Decisions here are already risk-approved — skip signal gen and risk manager.
         # TTL: 10 minutes. After that, signal generator will re-detect independently.
-        db = TradingDB()
         pending = db.get_pending_retries(max_age_minutes=10)
         if pending:
             pending_decisions = [r["data"]["decision"] for r in pending]
@@ -193,7 +211,7 @@ async def run_intraday_pipeline() -> dict:
             logger.info("pending_retries_found", count=len(pending), symbols=[d.get("symbol") for d in valid_decisions])
             if valid_decisions:
                 executor = Executor(account_type="slope")
-                retry_result = await executor.run(decisions=valid_decisions)
+                retry_result = await executor.run(decisions=valid_decisions, broker=broker)
             else:
                 retry_result = {"total_executed": 0}
             # Delete consumed retries regardless of outcome.
@@ -210,7 +228,9 @@ async def run_intraday_pipeline() -> dict:
         # Conventional Signal Generator (RSI/MACD/BB) runs only in daily pipeline (daily bars).
         if get_settings().slope_volume.enabled:
             signal_gen = SignalGenerator(account_type="slope")
-            slope_result = await asyncio.to_thread(signal_gen.run_slope_volume)
+            slope_result = await asyncio.to_thread(
+                signal_gen.run_slope_volume, broker, include_equities=not stream_equities
+            )
             slope_signals = slope_result.get("signals", [])
             results["slope_volume"] = {
                 "generated": slope_result.get("signals_generated", 0),
@@ -228,47 +248,15 @@ async def run_intraday_pipeline() -> dict:
 
         # Phases 3-4: Risk Manager + Executor
         if signals:
-            # Phase 3: Risk Manager
-            risk_mgr = RiskManager(account_type="slope")
-            risk_result = await risk_mgr.run(signals=signals)
-
-            if risk_result.get("kill_switch"):
-                ks_msg = risk_result.get("message", "Limite P&L raggiunto")
-                tg.notify_kill_switch(ks_msg, mode=settings.mode)
-                results["risk"] = {
-                    "status": "kill_switch",
-                    "message": ks_msg,
-                }
-                results["status"] = "kill_switch"
+            results.update(await _risk_and_execute(signals, broker, settings))
+            if results.get("status") == "kill_switch":
                 return results
-
-            decisions = risk_result.get("decisions", [])
-            approved = [d for d in decisions if d.get("status") == "APPROVED"]
-            results["risk"] = {
-                "total": len(decisions),
-                "approved": len(approved),
-                "status": "ok",
-            }
-
-            # Phase 4: Executor
-            if approved:
-                executor = Executor(account_type="slope")
-                exec_result = await executor.run(decisions=approved)
-                executed_orders = exec_result.get("orders", [])
-                if executed_orders and settings.telegram.notify_trades:
-                    tg.notify_trades(executed_orders, mode=settings.mode)
-                results["execution"] = {
-                    "executed": exec_result.get("total_executed", 0),
-                    "status": "ok",
-                }
-            else:
-                results["execution"] = {"executed": 0, "status": "no_approved_orders"}
         else:
             results.setdefault("slope_volume", {})["status"] = "no_signals"
 
         # Phase 4.5: Update Trailing Stops (ALWAYS runs — existing positions need management)
         monitor = PortfolioMonitor(account_type="slope")
-        trail_result = await monitor.run(mode="trailing_stops")
+        trail_result = await monitor.run(mode="trailing_stops", broker=broker)
         results["trailing_stops"] = {
             "stops_raised": trail_result.get("stops_raised", 0),
             "status": "ok",
@@ -282,6 +270,7 @@ async def run_intraday_pipeline() -> dict:
             slope_signals=results.get("slope_volume", {}).get("generated", 0),
             trailing_stops=results["trailing_stops"]["stops_raised"],
         )
+        logger.info("broker_state_stats", cycle="intraday", **broker.stats)
 
     except Exception as e:
         results["status"] = "error"
@@ -291,6 +280,137 @@ async def run_intraday_pipeline() -> dict:
     return results
 
 
+async def _risk_and_execute(signals: list[dict], broker: BrokerState, settings) -> dict:
+    """
+    Phases 3-4 on one batch of slope signals: Risk Manager, then Executor.
+
+    Returns the "risk" / "execution" result entries, plus status="kill_switch"
+    when the kill switch fired (nothing is executed then).
+    """
+    results: dict = {}
+
+    # Phase 3: Risk Manager
+    risk_mgr = RiskManager(account_type="slope")
+    risk_result = await risk_mgr.run(signals=signals, broker=broker)
+
+    if risk_result.get("kill_switch"):
+        ks_msg = risk_result.get("message", "Limite P&L raggiunto")
+        tg.notify_kill_switch(ks_msg, mode=settings.mode)
+        results["risk"] = {
+            "status": "kill_switch",
+            "message": ks_msg,
+        }
+        results["status"] = "kill_switch"
+        return results
+
+    decisions = risk_result.get("decisions", [])
+    approved = [d for d in decisions if d.get("status") == "APPROVED"]
+    results["risk"] = {
+        "total": len(decisions),
+        "approved": len(approved),
+        "status": "ok",
+    }
+
+    # Phase 4: Executor
+    if approved:
+        executor = Executor(account_type="slope")
+        exec_result = await executor.run(decisions=approved, broker=broker)
+        executed_orders = exec_result.get("orders", [])
+        if executed_orders and settings.telegram.notify_trades:
+            tg.notify_trades(executed_orders, mode=settings.mode)
+        results["execution"] = {
+            "executed": exec_result.get("total_executed", 0),
+            "status": "ok",
+        }
+    else:
+        results["execution"] = {"executed": 0, "status": "no_approved_orders"}
+    return results
+
+
+async def run_slope_stream(client: Any | None = None) -> dict:
+    """
+    Streaming slope+volume — equity signals on bar close, no REST bar polling.
+
+    SignalGenerator.stream_slope_volume aggregates Tiingo IEX ticks into
+    slope_volume.timeframe bars and emits a signal the moment a symbol's bar
+    closes. Signals closing within slope_volume.stream_batch_sec of each other
+    (one bar boundary) go through the Risk Manager and Executor together, on a
+    fresh BrokerState per batch.
+
+    Subscribes to the slope watchlist plus the equities held at start. The
+    per-minute intraday pipeline keeps pending retries, crypto pairs and
+    trailing stops (``run_intraday_pipeline(stream_equities=True)``).
+
+    Runs until the stream ends (``client.stop()``); returns batch counters.
+    """
+    settings = get_settings()
+    slope_cfg = settings.slope_volume
+    stats = {"batches": 0, "signals": 0, "approved": 0, "executed": 0, "errors": 0}
+
+    if not settings.enabled or not slope_cfg.enabled:
+        logger.warning("slope_stream_disabled")
+        return {"status": "disabled", **stats}
+
+    db = TradingDB()
+    if client is None:
+        crypto = {c.upper() for c in slope_cfg.crypto_symbols}
+        held = BrokerState(AlpacaClient(account_type="slope")).position_map()
+        symbols = [s for s in dict.fromkeys([*slope_cfg.symbols, *held]) if s.upper() not in crypto]
+        client = TiingoWebSocketClient(mode="iex", symbols=[s.lower() for s in symbols])
+
+    queue: asyncio.Queue[dict] = asyncio.Queue()
+    signal_gen = SignalGenerator(account_type="slope")
+    stream = asyncio.create_task(signal_gen.stream_slope_volume(client, queue.put_nowait))
+    logger.info("slope_stream_start", mode=settings.mode, symbols=client.symbols)
+
+    try:
+        while True:
+            next_signal = asyncio.create_task(queue.get())
+            await asyncio.wait({next_signal, stream}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_signal.done():
+                next_signal.cancel()
+                break
+            # Every symbol's bar closes on the same boundary: gather the burst.
+            await asyncio.sleep(slope_cfg.stream_batch_sec)
+            signals = [next_signal.result()]
+            while not queue.empty():
+                signals.append(queue.get_nowait())
+
+            stats["batches"] += 1
+            stats["signals"] += len(signals)
+            try:
+                db.insert_signal("trade", {
+                    "strategy": "slope_volume_stream",
+                    "timeframe": slope_cfg.timeframe,
+                    "signals": signals,
+                    "signals_generated": len(signals),
+                })
+                broker = BrokerState(AlpacaClient(account_type="slope"), db)
+                batch = await _risk_and_execute(signals, broker, settings)
+            except Exception as e:
+                stats["errors"] += 1
+                logger.error("slope_stream_batch_error", error=str(e))
+                continue
+            stats["approved"] += batch["risk"].get("approved", 0)
+            stats["executed"] += batch.get("execution", {}).get("executed", 0)
+            logger.info(
+                "slope_stream_batch",
+                symbols=[s.get("symbol") for s in signals],
+                risk=batch["risk"].get("status"),
+                approved=batch["risk"].get("approved", 0),
+                executed=batch.get("execution", {}).get("executed", 0),
+            )
+    finally:
+        client.stop()
+        stream_errors = await asyncio.gather(stream, return_exceptions=True)
+
+    status = "error" if isinstance(stream_errors[0], Exception) else "ok"
+    if status == "error":
+        logger.error("slope_stream_error", error=str(stream_errors[0]))
+    logger.info("slope_stream_stopped", status=status, **stats)
+    return {"status": status, **stats}
+
+
 async def run_crypto_pipeline() -> dict:
     """
     Crypto slope pipeline — BTC/ETH, 24/7 including weekends.
@@ -328,6 +448,8 @@ async def run_crypto_pipeline() -> dict:
     }
 
     try:
+        broker = BrokerState(AlpacaClient(account_type="crypto"), TradingDB())
+
         # Phase 2.5: Slope+Volume on crypto symbols only (no market hours check)
         signal_gen = SignalGenerator(account_type="crypto")
         slope_result = await asyncio.to_thread(signal_gen.run_slope_volume, crypto_only=True)
@@ -341,7 +463,7 @@ async def run_crypto_pipeline() -> dict:
         if slope_signals:
             # Phase 3: Risk Manager (crypto account)
             risk_mgr = RiskManager(account_type="crypto")
-            risk_result = await risk_mgr.run(signals=slope_signals)
+            risk_result = await risk_mgr.run(signals=slope_signals, broker=broker)
 
             if risk_result.get("kill_switch"):
                 ks_msg = risk_result.get("message", "Crypto kill switch triggered")
@@ -357,7 +479,7 @@ async def run_crypto_pipeline() -> dict:
             # Phase 4: Executor (crypto account)
             if approved:
                 executor = Executor(account_type="crypto")
-                exec_result = await executor.run(decisions=approved)
+                exec_result = await executor.run(decisions=approved, broker=broker)
                 executed_orders = exec_result.get("orders", [])
                 if executed_orders and settings.telegram.notify_trades:
                     tg.notify_trades(executed_orders, mode=settings.mode)
@@ -370,7 +492,7 @@ async def run_crypto_pipeline() -> dict:
 
         # Phase 4.5: Trailing stops on crypto positions
         monitor = PortfolioMonitor(account_type="crypto")
-        trail_result = await monitor.run(mode="trailing_stops")
+        trail_result = await monitor.run(mode="trailing_stops", broker=broker)
         results["trailing_stops"] = {
             "stops_raised": trail_result.get("stops_raised", 0),
             "status": "ok",
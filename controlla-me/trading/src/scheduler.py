@@ -6,6 +6,10 @@ Schedule:
   - 09:00 ET on weekdays              → daily pipeline (scan + signal + risk + execute + trailing)
   - 16:30 ET on weekdays              → daily report snapshot
 
+With TRADING_SLOPE_STREAM_ENABLED=true, equity slope signals come from the
+Tiingo tick stream on bar close (background thread, pipeline.run_slope_stream)
+and the per-minute job skips its equity REST poll while the stream is alive.
+
 The intraday pipeline runs 24/7 to support multi-market operation (crypto,
 futures, extended hours). The daily pipeline still anchors to US market open
 for full scan + execution. Weekend intraday runs keep signals fresh for
@@ -25,6 +29,7 @@ from __future__ import annotations
 import asyncio
 import json
 import os
+import threading
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from zoneinfo import ZoneInfo
@@ -33,9 +38,13 @@ import schedule
 import time
 import structlog
 
-from .pipeline import run_daily_pipeline, run_intraday_pipeline
+from .connectors.bar_cache import BarCache, get_bar_cache, install_bar_cache
+from .pipeline import run_daily_pipeline, run_intraday_pipeline, run_slope_stream
+from .utils.db import get_supabase
+from .utils.db_local import LocalDB
 from .utils.logging import setup_logging
 from .utils import telegram as tg
+from .utils.write_behind import WriteBehindQueue, get_write_behind, install_write_behind
 
 logger = structlog.get_logger()
 
@@ -43,6 +52,7 @@ _HEARTBEAT_FILE = Path(__file__).resolve().parent.parent / ".scheduler-heartbeat
 _start_time: datetime | None = None
 _last_pipeline_run: str | None = None
 _last_pipeline_status: str | None = None
+_slope_stream_thread: threading.Thread | None = None
 
 _EASTERN = ZoneInfo("America/New_York")
 
@@ -128,7 +138,7 @@ def _run_intraday() -> None:
     global _last_pipeline_run, _last_pipeline_status
     logger.info("scheduler_trigger", job="intraday_pipeline")
     _write_heartbeat("intraday_pipeline")
-    result = asyncio.run(run_intraday_pipeline())
+    result = asyncio.run(run_intraday_pipeline(stream_equities=_slope_stream_alive()))
     status = result.get("status", "unknown")
     _last_pipeline_run = datetime.now(timezone.utc).isoformat()
     _last_pipeline_status = "ok" if status == "success" else "error"
@@ -140,6 +150,39 @@ def _run_intraday() -> None:
         approved=result.get("risk", {}).get("approved", 0),
         executed=result.get("execution", {}).get("executed", 0),
     )
+    bar_cache = get_bar_cache()
+    if bar_cache is not None:
+        stats = bar_cache.stats
+        logger.info(
+            "bar_cache_stats",
+            seeds=stats.seeds,
+            increments=stats.increments,
+            gaps=stats.gaps,
+            bars_fetched=stats.bars_fetched,
+        )
+    write_queue = get_write_behind()
+    if write_queue is not None:
+        logger.info("write_behind_stats", pending=write_queue.pending, **vars(write_queue.stats))
+
+
+def _start_slope_stream() -> None:
+    """Run pipeline.run_slope_stream in a daemon thread (own event loop)."""
+    global _slope_stream_thread
+
+    def run() -> None:
+        try:
+            result = asyncio.run(run_slope_stream())
+            logger.warning("slope_stream_ended", **result)
+        except Exception as e:
+            logger.error("slope_stream_crashed", error=str(e))
+
+    _slope_stream_thread = threading.Thread(target=run, name="slope-stream", daemon=True)
+    _slope_stream_thread.start()
+
+
+def _slope_stream_alive() -> bool:
+    """True while the tick stream covers the equity watchlist (else the minute job polls it)."""
+    return _slope_stream_thread is not None and _slope_stream_thread.is_alive()
 
 
 def _run_daily_report() -> None:
@@ -228,6 +271,24 @@ def main() -> None:
     global _start_time
     setup_logging()
     _start_time = datetime.now(timezone.utc)
+    # The intraday pipeline runs every minute in this process: keep recent bars
+    # in memory so each run only fetches the bars closed since the last one.
+    from .config import get_settings
+    install_bar_cache(BarCache(capacity=get_settings().slope_volume.bar_cache_bars))
+    # Supabase writes (signals, orders, snapshots, risk events) go through a
+    # background queue so a slow Supabase never delays order submission;
+    # writes are spilled to the local SQLite DB while Supabase is down.
+    supabase_cfg = get_settings().supabase
+    if supabase_cfg.write_behind_enabled:
+        install_write_behind(WriteBehindQueue(
+            get_supabase(),
+            spill=LocalDB(),
+            max_pending=supabase_cfg.write_behind_max_pending,
+            batch_size=supabase_cfg.write_behind_batch_size,
+            retry_interval=supabase_cfg.write_behind_retry_sec,
+        )).start()
+    if get_settings().slope_volume.stream_enabled:
+        _start_slope_stream()
     _setup_schedule()
     logger.info("scheduler_start", jobs=len(schedule.jobs))
     _write_heartbeat("starting")
@@ -240,6 +301,10 @@ def main() -> None:
     except KeyboardInterrupt:
         logger.info("scheduler_stop", reason="KeyboardInterrupt")
     finally:
+        write_queue = get_write_behind()
+        if write_queue is not None:
+            write_queue.close(timeout=10)
+            install_write_behind(None)
         _remove_heartbeat()
 
 
@@ -14,6 +14,7 @@ import structlog
 from supabase import Client, create_client
 
 from ..config import get_settings
+from .write_behind import get_write_behind
 
 logger = structlog.get_logger()
 
@@ -26,11 +27,27 @@ def get_supabase() -> Client:
 
 
 class TradingDB:
-    """CRUD operations for trading tables."""
+    """
+    CRUD operations for trading tables.
+
+    Hot-path writes (insert_signal, insert_order, update_order,
+    insert_snapshot, insert_risk_event) go through the process-wide
+    write-behind queue when one is installed and return the queued record
+    right away; otherwise they are written synchronously.
+    """
 
     def __init__(self) -> None:
         self._client = get_supabase()
 
+    def _insert(self, table: str, record: dict[str, Any]) -> dict:
+        """Insert one row — queued when write-behind is installed (returns the record)."""
+        queue = get_write_behind()
+        if queue is not None:
+            queue.insert(table, record)
+            return record
+        result = self._client.table(table).insert(record).execute()
+        return result.data[0] if result.data else {}
+
     # ─── Signals ───────────────────────────────────────────────
 
     def insert_signal(self, signal_type: str, data: dict[str, Any]) -> dict:
@@ -40,12 +57,11 @@ class TradingDB:
             "data": data,
             "created_at": datetime.utcnow().isoformat(),
         }
-        result = self._client.table("trading_signals").insert(record).execute()
         # data["symbol"] exists only for single-symbol records (e.g. scan rows).
         # For trade/risk_check batches the symbols live inside data["signals"] as a list.
         symbol_log = data.get("symbol") or [s.get("symbol") for s in data.get("signals", [])]
         logger.info("signal_inserted", signal_type=signal_type, symbol=symbol_log)
-        return result.data[0] if result.data else {}
+        return self._insert("trading_signals", record)
 
     def get_latest_signals(self, signal_type: str, limit: int = 50) -> list[dict]:
         """Get latest signals by type."""
@@ -67,12 +83,15 @@ class TradingDB:
             **order_data,
             "created_at": datetime.utcnow().isoformat(),
         }
-        result = self._client.table("trading_orders").insert(record).execute()
         logger.info("order_inserted", symbol=order_data.get("symbol"), side=order_data.get("side"))
-        return result.data[0] if result.data else {}
+        return self._insert("trading_orders", record)
 
     def update_order(self, order_id: str, updates: dict[str, Any]) -> dict:
         """Update order status/fill info."""
+        queue = get_write_behind()
+        if queue is not None:
+            queue.update("trading_orders", updates, "alpaca_order_id", order_id)
+            return updates
         result = (
             self._client.table("trading_orders")
             .update(updates)
@@ -85,9 +104,8 @@ class TradingDB:
 
     def insert_snapshot(self, snapshot: dict[str, Any]) -> dict:
         """Insert daily portfolio snapshot."""
-        result = self._client.table("portfolio_snapshots").insert(snapshot).execute()
         logger.info("snapshot_inserted", date=snapshot.get("date"), value=snapshot.get("portfolio_value"))
-        return result.data[0] if result.data else {}
+        return self._insert("portfolio_snapshots", snapshot)
 
     def get_snapshots(self, days: int = 30) -> list[dict]:
         """Get recent portfolio snapshots."""
@@ -124,9 +142,8 @@ class TradingDB:
             **event,
             "created_at": datetime.utcnow().isoformat(),
         }
-        result = self._client.table("risk_events").insert(record).execute()
         logger.warning("risk_event", event_type=event.get("event_type"), severity=event.get("severity"))
-        return result.data[0] if result.data else {}
+        return self._insert("risk_events", record)
 
     def get_risk_events(self, days: int = 7) -> list[dict]:
         """Get recent risk events."""
@@ -172,6 +189,21 @@ class TradingDB:
         )
         return result.data[0] if result.data else {}
 
+    def upsert_trailing_stop_states(self, states: list[dict[str, Any]]) -> list[dict]:
+        """Upsert the trailing stop states of many symbols in one request."""
+        if not states:
+            return []
+        now = datetime.utcnow().isoformat()
+        for state in states:
+            state["updated_at"] = now
+        result = (
+            self._client.table("trailing_stop_state")
+            .upsert(states, on_conflict="symbol")
+            .execute()
+        )
+        logger.info("trailing_stops_upserted", count=len(states))
+        return result.data or []
+
     def delete_trailing_stop_state(self, symbol: str) -> None:
         """Delete trailing stop state when position is closed."""
         self._client.table("trailing_stop_state").delete().eq("symbol", symbol).execute()
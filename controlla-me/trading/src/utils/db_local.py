@@ -6,6 +6,9 @@ Replaces Supabase for all backtest-related storage:
 - Backtest trades (per-trade records linked to runs)
 - Historical trading signals (migrated from Supabase)
 - Historical trading orders (migrated from Supabase)
+- Backtest result cache (memoized BacktestResult + metrics, LRU-evicted)
+- Parameter search studies and trials (resumable TPE searches)
+- Write-behind spill of live Supabase writes while Supabase is unreachable
 
 This reduces Supabase egress bandwidth by keeping backtest and
 historical analysis data fully local.
@@ -17,25 +20,58 @@ Usage:
     run_id = db.insert_backtest_run(config_dict, metrics_dict, go_nogo_dict)
     db.insert_backtest_trades(run_id, trades_list)
 
+    # Analytical history: frames filtered on indexed parameter columns
+    runs = db.query_backtest_runs({"strategy": "slope_volume", "stop_loss_atr": (1.0, 2.0)})
+    trades = db.query_backtest_trades(run_ids=runs["id"].tolist(), as_arrow=True)
+
 The live pipeline (pipeline.py, scheduler.py) continues to use
-Supabase via db.py — this module is backtest-only.
+Supabase via db.py — this module only holds its write-behind spill.
+
+Connections are long-lived: each thread keeps one connection per database
+file (re-opened after a fork), so pragmas are applied once per connection
+and sqlite3's per-connection statement cache reuses prepared statements
+across calls. The schema is versioned with ``PRAGMA user_version``: opening
+a connection applies only the migrations the file has not seen yet, so
+constructing LocalDB() is cheap.
 """
 
 from __future__ import annotations
 
 import json
+import os
 import sqlite3
+import threading
 from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Generator
+from typing import Any, Generator, Iterator
 
+import pandas as pd
+import pyarrow as pa
 import structlog
 
 logger = structlog.get_logger()
 
 DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "backtest.db"
 
+# Per-connection tuning: WAL + synchronous=NORMAL is durable across crashes of
+# this process (only an OS crash can lose the last commits), the page cache and
+# memory map keep hot tables (backtest_cache, trading_orders) off the syscall path.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",      # KiB → 64 MiB page cache
+    "PRAGMA mmap_size=268435456",    # 256 MiB
+)
+_STATEMENT_CACHE = 256  # prepared statements kept per connection
+# Grid-search workers open the same file at once: wait for a writer (e.g. a
+# migration in another process) instead of failing with "database is locked".
+_BUSY_TIMEOUT_SEC = 30.0
+
+_local = threading.local()
+
 
 class LocalDB:
     """SQLite adapter for backtest results and historical trading data."""
@@ -43,30 +79,49 @@ class LocalDB:
     def __init__(self, db_path: Path | str = DEFAULT_DB_PATH) -> None:
         self._db_path = Path(db_path)
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._key = str(self._db_path.resolve())
         self._init_schema()
 
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's pooled connection to the database (opened on first use)."""
+        pool: dict[str, sqlite3.Connection] | None = getattr(_local, "pool", None)
+        if pool is None or getattr(_local, "pid", None) != os.getpid():
+            # First use in this thread, or a forked child: never share the parent's handles.
+            pool = _local.pool = {}
+            _local.pid = os.getpid()
+        conn = pool.get(self._key)
+        if conn is None:
+            conn = sqlite3.connect(self._key, timeout=_BUSY_TIMEOUT_SEC, cached_statements=_STATEMENT_CACHE)
+            conn.row_factory = sqlite3.Row
+            for pragma in _PRAGMAS:
+                conn.execute(pragma)
+            _migrate(conn)
+            pool[self._key] = conn
+        return conn
+
     @contextmanager
     def _connect(self) -> Generator[sqlite3.Connection, None, None]:
-        """Context manager for SQLite connections with WAL mode."""
-        conn = sqlite3.connect(str(self._db_path))
-        conn.execute("PRAGMA journal_mode=WAL")
-        conn.execute("PRAGMA foreign_keys=ON")
-        conn.row_factory = sqlite3.Row
+        """One transaction on the pooled connection: commit on success, roll back on error."""
+        conn = self._connection()
         try:
             yield conn
             conn.commit()
         except Exception:
             conn.rollback()
             raise
-        finally:
-            conn.close()
 
     def _init_schema(self) -> None:
-        """Create tables if they don't exist."""
-        with self._connect() as conn:
-            conn.executescript(_SCHEMA_SQL)
+        """Open the pooled connection, migrating the schema if the file is behind."""
+        self._connection()
         logger.debug("local_db_initialized", path=str(self._db_path))
 
+    def close(self) -> None:
+        """Close this thread's pooled connection (reopened on next use)."""
+        pool = getattr(_local, "pool", None)
+        conn = pool.pop(self._key, None) if pool is not None else None
+        if conn is not None:
+            conn.close()
+
     # ─── Backtest Runs ────────────────────────────────────────────
 
     def insert_backtest_run(
@@ -111,41 +166,11 @@ class LocalDB:
             return run_id
 
     def insert_backtest_trades(self, run_id: int, trades: list[dict[str, Any]]) -> int:
-        """Insert trades for a backtest run. Returns count inserted."""
+        """Insert trades for a backtest run (one executemany). Returns count inserted."""
         if not trades:
             return 0
         with self._connect() as conn:
-            conn.executemany(
-                """
-                INSERT INTO backtest_trades (
-                    run_id, symbol, action, entry_date, entry_price,
-                    exit_date, exit_price, shares, pnl, pnl_pct,
-                    hold_days, close_reason, stop_loss, take_profit,
-                    signal_score, signal_confidence
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                [
-                    (
-                        run_id,
-                        t.get("symbol", ""),
-                        t.get("action", ""),
-                        t.get("entry_date", ""),
-                        t.get("entry_price", 0.0),
-                        t.get("exit_date", ""),
-                        t.get("exit_price", 0.0),
-                        t.get("shares", 0),
-                        t.get("pnl", 0.0),
-                        t.get("pnl_pct", 0.0),
-                        t.get("hold_days", 0),
-                        t.get("close_reason", ""),
-                        t.get("stop_loss", 0.0),
-                        t.get("take_profit", 0.0),
-                        t.get("signal_score", 0.0),
-                        t.get("signal_confidence", 0.0),
-                    )
-                    for t in trades
-                ],
-            )
+            conn.executemany(_INSERT_TRADE_SQL, (_trade_row(run_id, t) for t in trades))
         logger.info("backtest_trades_inserted", run_id=run_id, count=len(trades))
         return len(trades)
 
@@ -184,6 +209,247 @@ class LocalDB:
             ).fetchall()
             return [dict(r) for r in rows]
 
+    # ─── Backtest History (analytical queries) ────────────────────
+
+    def query_backtest_runs(
+        self,
+        where: dict[str, Any] | None = None,
+        columns: list[str] | None = None,
+        order_by: str = "sharpe_ratio",
+        descending: bool = True,
+        limit: int | None = None,
+        as_arrow: bool = False,
+    ) -> pd.DataFrame | pa.Table:
+        """
+        Backtest runs as a frame, filtered on indexed columns.
+
+        ``where`` maps a run column to a value (``=``), a list (``IN``) or a
+        ``(low, high)`` tuple (inclusive range, either end may be None), e.g.
+        ``{"strategy": "slope_volume", "timeframe": ["5Min", "15Min"],
+        "stop_loss_atr": (1.0, 2.0), "sharpe_ratio": (1.0, None)}``.
+        Parameters live in generated columns, so no row's JSON is parsed.
+        """
+        names = _run_columns(columns or list(_RUN_FRAME_COLUMNS))
+        clause, params = _where_sql(where, prefix="")
+        sql = f"SELECT {', '.join(names)} FROM backtest_runs{clause}"  # noqa: S608 — names whitelisted
+        sql += f" ORDER BY {_run_columns([order_by])[0]} {'DESC' if descending else 'ASC'}, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._frame(sql, params, as_arrow)
+
+    def query_backtest_trades(
+        self,
+        run_ids: list[int] | None = None,
+        where: dict[str, Any] | None = None,
+        symbol: str | None = None,
+        as_arrow: bool = False,
+    ) -> pd.DataFrame | pa.Table:
+        """
+        Trades of the selected runs as one frame, each row tagged with its
+        run's strategy, timeframe and SL/TP parameters.
+
+        ``where`` filters runs exactly as in ``query_backtest_runs``.
+        """
+        clause, params = _where_sql(where, prefix="r.")
+        conditions = [clause.removeprefix(" WHERE ")] if clause else []
+        if run_ids is not None:
+            conditions.append(f"t.run_id IN ({', '.join('?' * len(run_ids))})")
+            params.extend(run_ids)
+        if symbol:
+            conditions.append("t.symbol = ?")
+            params.append(symbol)
+        sql = (
+            "SELECT t.*, " + ", ".join(f"r.{c}" for c in _TRADE_RUN_COLUMNS)
+            + " FROM backtest_trades t JOIN backtest_runs r ON r.id = t.run_id"
+        )
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY t.run_id, t.entry_date, t.id"
+        return self._frame(sql, params, as_arrow)
+
+    def iter_backtest_summary(self, chunk_size: int = 500) -> Iterator[dict[str, Any]]:
+        """Stream one flat summary row per run (export_backtest_summary.py), oldest first."""
+        yield from self._stream(_SUMMARY_EXPORT_SQL, chunk_size)
+
+    def iter_backtest_trades(self, chunk_size: int = 500) -> Iterator[dict[str, Any]]:
+        """Stream every backtest trade with its run's strategy/timeframe, by run."""
+        yield from self._stream(_TRADES_EXPORT_SQL, chunk_size)
+
+    def _frame(self, sql: str, params: list[Any], as_arrow: bool) -> pd.DataFrame | pa.Table:
+        cursor = self._connection().execute(sql, params)
+        names = [d[0] for d in cursor.description]
+        df = pd.DataFrame.from_records(cursor.fetchall(), columns=names)
+        return pa.Table.from_pandas(df, preserve_index=False) if as_arrow else df
+
+    def _stream(self, sql: str, chunk_size: int) -> Iterator[dict[str, Any]]:
+        # A plain read on the pooled connection: rows are fetched chunk by
+        # chunk, so an export never holds the whole history in memory.
+        cursor = self._connection().execute(sql)
+        try:
+            while rows := cursor.fetchmany(chunk_size):
+                yield from (dict(r) for r in rows)
+        finally:
+            cursor.close()
+
+    # ─── Backtest Result Cache ────────────────────────────────────
+
+    def get_cached_result(self, cache_key: str) -> bytes | None:
+        """Return the cached payload for a key (and mark it recently used)."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM backtest_cache WHERE cache_key = ?",
+                (cache_key,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE backtest_cache SET last_used_at = ?, hits = hits + 1 WHERE cache_key = ?",
+                (datetime.utcnow().isoformat(), cache_key),
+            )
+            return bytes(row["payload"])
+
+    def put_cached_result(self, cache_key: str, config: dict[str, Any], payload: bytes) -> None:
+        """Insert or replace a cached result payload."""
+        now = datetime.utcnow().isoformat()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO backtest_cache (
+                    cache_key, created_at, last_used_at, hits, size_bytes, config_json, payload
+                ) VALUES (?, ?, ?, 0, ?, ?, ?)
+                """,
+                (cache_key, now, now, len(payload), json.dumps(config), payload),
+            )
+
+    def evict_cached_results(self, max_entries: int, max_bytes: int) -> int:
+        """Drop least-recently-used entries beyond the count/size budget. Returns count removed."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                DELETE FROM backtest_cache WHERE cache_key IN (
+                    SELECT cache_key FROM (
+                        SELECT
+                            cache_key,
+                            ROW_NUMBER() OVER w AS rank,
+                            SUM(size_bytes) OVER w AS running_bytes
+                        FROM backtest_cache
+                        WINDOW w AS (ORDER BY last_used_at DESC, cache_key)
+                    )
+                    WHERE rank > ? OR running_bytes > ?
+                )
+                """,
+                (max_entries, max_bytes),
+            )
+            removed = cursor.rowcount
+        if removed:
+            logger.info("backtest_cache_evicted", count=removed)
+        return removed
+
+    def clear_cached_results(self) -> int:
+        """Delete every cached result. Returns count removed."""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM backtest_cache").rowcount
+
+    # ─── Parameter Search (studies + trials) ──────────────────────
+
+    def get_or_create_search_study(self, name: str, space: dict[str, Any], settings: dict[str, Any]) -> int:
+        """
+        Return the id of study `name`, creating it on first use.
+
+        Resuming a study requires the same space and settings it was created
+        with — trials scored under different ones are not comparable — so a
+        mismatch raises ValueError instead of mixing them.
+        """
+        space_json, settings_json = json.dumps(space), json.dumps(settings, default=str)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, space_json, settings_json FROM search_studies WHERE name = ?", (name,)
+            ).fetchone()
+            if row is not None:
+                changed = [
+                    f"{label}: stored {stored} != current {current}"
+                    for label, stored, current in (
+                        ("space", json.loads(row["space_json"]), json.loads(space_json)),
+                        ("settings", json.loads(row["settings_json"]), json.loads(settings_json)),
+                    )
+                    if stored != current
+                ]
+                if changed:
+                    raise ValueError(
+                        f"search study {name!r} was created with a different "
+                        + "; ".join(changed)
+                        + " — use a new study name"
+                    )
+                return int(row["id"])
+            cursor = conn.execute(
+                """
+                INSERT INTO search_studies (name, created_at, space_json, settings_json)
+                VALUES (?, ?, ?, ?)
+                """,
+                (name, datetime.utcnow().isoformat(), space_json, settings_json),
+            )
+            study_id = cursor.lastrowid
+            assert study_id is not None
+            logger.info("search_study_created", study_id=study_id, name=name)
+            return study_id
+
+    def get_search_study(self, name: str) -> dict[str, Any] | None:
+        """Study row (space/settings decoded), or None."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM search_studies WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return None
+            d = dict(row)
+            d["space"] = json.loads(d.pop("space_json", "{}"))
+            d["settings"] = json.loads(d.pop("settings_json", "{}"))
+            return d
+
+    def insert_search_trial(
+        self,
+        study_id: int,
+        params: dict[str, Any],
+        status: str,
+        value: float | None,
+        metrics: dict[str, Any] | None = None,
+    ) -> int:
+        """Record a finished trial (status: complete | pruned | failed)."""
+        with self._connect() as conn:
+            number = conn.execute(
+                "SELECT COUNT(*) AS cnt FROM search_trials WHERE study_id = ?", (study_id,)
+            ).fetchone()["cnt"]
+            cursor = conn.execute(
+                """
+                INSERT INTO search_trials (study_id, number, created_at, status, value, params_json, metrics_json)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    study_id,
+                    number,
+                    datetime.utcnow().isoformat(),
+                    status,
+                    value,
+                    json.dumps(params),
+                    json.dumps(metrics or {}, default=str),
+                ),
+            )
+            return cursor.lastrowid or 0
+
+    def get_search_trials(self, study_id: int) -> list[dict[str, Any]]:
+        """All trials of a study in evaluation order (params/metrics decoded)."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM search_trials WHERE study_id = ? ORDER BY number",
+                (study_id,),
+            ).fetchall()
+            result = []
+            for r in rows:
+                d = dict(r)
+                d["params"] = json.loads(d.pop("params_json", "{}"))
+                d["metrics"] = json.loads(d.pop("metrics_json", "{}"))
+                result.append(d)
+            return result
+
     # ─── Historical Trading Signals (migrated from Supabase) ─────
 
     def insert_signal(self, signal_type: str, data: dict[str, Any], created_at: str | None = None) -> int:
@@ -203,24 +469,25 @@ class LocalDB:
             return cursor.lastrowid or 0
 
     def insert_signals_batch(self, signals: list[dict[str, Any]]) -> int:
-        """Bulk insert signals (for migration). Returns count inserted."""
+        """Bulk insert signals (one executemany; duplicates by supabase id skipped). Returns count given."""
         if not signals:
             return 0
+        now = datetime.utcnow().isoformat()
         with self._connect() as conn:
             conn.executemany(
                 """
                 INSERT OR IGNORE INTO trading_signals (supabase_id, signal_type, data_json, created_at)
                 VALUES (?, ?, ?, ?)
                 """,
-                [
+                (
                     (
                         s.get("id", ""),
                         s.get("signal_type", ""),
                         json.dumps(s.get("data", {})),
-                        s.get("created_at", datetime.utcnow().isoformat()),
+                        s.get("created_at", now),
                     )
                     for s in signals
-                ],
+                ),
             )
         logger.info("signals_batch_inserted", count=len(signals))
         return len(signals)
@@ -254,73 +521,18 @@ class LocalDB:
     def insert_order(self, order_data: dict[str, Any]) -> int:
         """Insert a historical trading order."""
         with self._connect() as conn:
-            cursor = conn.execute(
-                """
-                INSERT INTO trading_orders (
-                    supabase_id, alpaca_order_id, symbol, side, qty,
-                    order_type, status, limit_price, stop_price,
-                    filled_avg_price, filled_qty, filled_at,
-                    stop_loss, take_profit, commission, error_message, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    order_data.get("id", ""),
-                    order_data.get("alpaca_order_id", ""),
-                    order_data.get("symbol", ""),
-                    order_data.get("side", ""),
-                    order_data.get("qty", 0),
-                    order_data.get("order_type", "market"),
-                    order_data.get("status", "pending"),
-                    order_data.get("limit_price"),
-                    order_data.get("stop_price"),
-                    order_data.get("filled_avg_price"),
-                    order_data.get("filled_qty"),
-                    order_data.get("filled_at"),
-                    order_data.get("stop_loss"),
-                    order_data.get("take_profit"),
-                    order_data.get("commission", 0),
-                    order_data.get("error_message"),
-                    order_data.get("created_at", datetime.utcnow().isoformat()),
-                ),
-            )
+            cursor = conn.execute(_INSERT_ORDER_SQL, _order_row(order_data))
             return cursor.lastrowid or 0
 
     def insert_orders_batch(self, orders: list[dict[str, Any]]) -> int:
-        """Bulk insert orders (for migration). Returns count inserted."""
+        """Bulk insert orders (one executemany; duplicates by supabase id skipped). Returns count given."""
         if not orders:
             return 0
+        now = datetime.utcnow().isoformat()
         with self._connect() as conn:
             conn.executemany(
-                """
-                INSERT OR IGNORE INTO trading_orders (
-                    supabase_id, alpaca_order_id, symbol, side, qty,
-                    order_type, status, limit_price, stop_price,
-                    filled_avg_price, filled_qty, filled_at,
-                    stop_loss, take_profit, commission, error_message, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                [
-                    (
-                        o.get("id", ""),
-                        o.get("alpaca_order_id", ""),
-                        o.get("symbol", ""),
-                        o.get("side", ""),
-                        o.get("qty", 0),
-                        o.get("order_type", "market"),
-                        o.get("status", "pending"),
-                        o.get("limit_price"),
-                        o.get("stop_price"),
-                        o.get("filled_avg_price"),
-                        o.get("filled_qty"),
-                        o.get("filled_at"),
-                        o.get("stop_loss"),
-                        o.get("take_profit"),
-                        o.get("commission", 0),
-                        o.get("error_message"),
-                        o.get("created_at", datetime.utcnow().isoformat()),
-                    )
-                    for o in orders
-                ],
+                _INSERT_ORDER_IGNORE_SQL,
+                (_order_row(o, now) for o in orders),
             )
         logger.info("orders_batch_inserted", count=len(orders))
         return len(orders)
@@ -344,18 +556,179 @@ class LocalDB:
                 ).fetchall()
             return [dict(r) for r in rows]
 
+    # ─── Write-behind Spill (Supabase unreachable) ────────────────
+
+    def spill_writes(self, rows: list[tuple[int, str, str, str, str]]) -> int:
+        """Add (seq, op, table_name, payload_json, match_json) rows to the spill."""
+        if not rows:
+            return 0
+        now = datetime.utcnow().isoformat()
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO write_spill (created_at, seq, op, table_name, payload_json, match_json)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [(now, *row) for row in rows],
+            )
+        return len(rows)
+
+    def get_spilled_writes(self, limit: int = 100, before_seq: int | None = None) -> list[dict[str, Any]]:
+        """Spilled writes in submission (seq) order, optionally only those with seq < before_seq."""
+        with self._connect() as conn:
+            if before_seq is None:
+                rows = conn.execute(
+                    "SELECT * FROM write_spill ORDER BY seq, id LIMIT ?", (limit,)
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT * FROM write_spill WHERE seq < ? ORDER BY seq, id LIMIT ?", (before_seq, limit)
+                ).fetchall()
+            return [dict(r) for r in rows]
+
+    def max_spilled_seq(self) -> int:
+        """Highest seq in the spill (0 when empty)."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(MAX(seq), 0) AS seq FROM write_spill").fetchone()["seq"]
+
+    def delete_spilled_writes(self, ids: list[int]) -> None:
+        """Remove replayed writes from the spill."""
+        if not ids:
+            return
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM write_spill WHERE id = ?", [(i,) for i in ids])
+
+    def count_spilled_writes(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) AS cnt FROM write_spill").fetchone()["cnt"]
+
     # ─── Stats ────────────────────────────────────────────────────
 
     def stats(self) -> dict[str, int]:
         """Return row counts for all tables."""
         with self._connect() as conn:
             counts = {}
-            for table in ("backtest_runs", "backtest_trades", "trading_signals", "trading_orders"):
+            for table in (
+                "backtest_runs",
+                "backtest_trades",
+                "trading_signals",
+                "trading_orders",
+                "backtest_cache",
+                "search_studies",
+                "search_trials",
+                "write_spill",
+            ):
                 row = conn.execute(f"SELECT COUNT(*) as cnt FROM {table}").fetchone()  # noqa: S608
                 counts[table] = row["cnt"] if row else 0
             return counts
 
 
+# ─── Row builders (shared by single-row and executemany paths) ───
+
+_INSERT_TRADE_SQL = """
+    INSERT INTO backtest_trades (
+        run_id, symbol, action, entry_date, entry_price,
+        exit_date, exit_price, shares, pnl, pnl_pct,
+        hold_days, close_reason, stop_loss, take_profit,
+        signal_score, signal_confidence
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _trade_row(run_id: int, t: dict[str, Any]) -> tuple:
+    return (
+        run_id,
+        t.get("symbol", ""),
+        t.get("action", ""),
+        t.get("entry_date", ""),
+        t.get("entry_price", 0.0),
+        t.get("exit_date", ""),
+        t.get("exit_price", 0.0),
+        t.get("shares", 0),
+        t.get("pnl", 0.0),
+        t.get("pnl_pct", 0.0),
+        t.get("hold_days", 0),
+        t.get("close_reason", ""),
+        t.get("stop_loss", 0.0),
+        t.get("take_profit", 0.0),
+        t.get("signal_score", 0.0),
+        t.get("signal_confidence", 0.0),
+    )
+
+
+_ORDER_COLUMNS_SQL = """ INTO trading_orders (
+        supabase_id, alpaca_order_id, symbol, side, qty,
+        order_type, status, limit_price, stop_price,
+        filled_avg_price, filled_qty, filled_at,
+        stop_loss, take_profit, commission, error_message, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_INSERT_ORDER_SQL = "INSERT" + _ORDER_COLUMNS_SQL
+_INSERT_ORDER_IGNORE_SQL = "INSERT OR IGNORE" + _ORDER_COLUMNS_SQL
+
+
+def _order_row(o: dict[str, Any], now: str | None = None) -> tuple:
+    return (
+        o.get("id", ""),
+        o.get("alpaca_order_id", ""),
+        o.get("symbol", ""),
+        o.get("side", ""),
+        o.get("qty", 0),
+        o.get("order_type", "market"),
+        o.get("status", "pending"),
+        o.get("limit_price"),
+        o.get("stop_price"),
+        o.get("filled_avg_price"),
+        o.get("filled_qty"),
+        o.get("filled_at"),
+        o.get("stop_loss"),
+        o.get("take_profit"),
+        o.get("commission", 0),
+        o.get("error_message"),
+        o.get("created_at", now or datetime.utcnow().isoformat()),
+    )
+
+
+# ─── Schema migrations ───────────────────────────────────────────
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """
+    Apply the migrations newer than the file's ``user_version`` in one transaction.
+
+    Several processes may open a behind-schema file at once (grid-search
+    workers): BEGIN IMMEDIATE takes the write lock before ``user_version`` is
+    re-read, so exactly one process migrates and the others, once the busy
+    timeout lets them in, find nothing left to do.
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= len(_MIGRATIONS):
+        return  # up to date: no write lock needed
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target, script in enumerate(_MIGRATIONS[version:], start=version + 1):
+            # Statement by statement: executescript() would commit the transaction.
+            for statement in _statements(script):
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {target}")
+            logger.info("local_db_migrated", version=target)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _statements(script: str) -> Generator[str, None, None]:
+    """Split a SQL script into complete statements (``;`` inside literals/triggers kept)."""
+    buf = ""
+    for piece in script.split(";"):
+        buf += piece + ";"
+        if sqlite3.complete_statement(buf):
+            if buf.strip(" \n;"):
+                yield buf
+            buf = ""
+
+
 # ─── Schema ──────────────────────────────────────────────────────
 
 _SCHEMA_SQL = """
@@ -445,4 +818,193 @@ CREATE TABLE IF NOT EXISTS trading_orders (
 CREATE INDEX IF NOT EXISTS idx_orders_symbol ON trading_orders (symbol, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_orders_status ON trading_orders (status);
 CREATE INDEX IF NOT EXISTS idx_orders_alpaca ON trading_orders (alpaca_order_id);
+
+-- Backtest result cache: pickled (BacktestResult, PerformanceMetrics) keyed by
+-- hash(config + input-data fingerprint), evicted least-recently-used first
+CREATE TABLE IF NOT EXISTS backtest_cache (
+    cache_key TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    last_used_at TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    size_bytes INTEGER NOT NULL,
+    config_json TEXT NOT NULL DEFAULT '{}',
+    payload BLOB NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_bt_cache_used ON backtest_cache (last_used_at DESC);
+
+-- Parameter search: one study per named search, one row per evaluated trial
+CREATE TABLE IF NOT EXISTS search_studies (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL,
+    space_json TEXT NOT NULL DEFAULT '{}',
+    settings_json TEXT NOT NULL DEFAULT '{}'
+);
+
+CREATE TABLE IF NOT EXISTS search_trials (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    study_id INTEGER NOT NULL REFERENCES search_studies(id) ON DELETE CASCADE,
+    number INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    value REAL,
+    params_json TEXT NOT NULL DEFAULT '{}',
+    metrics_json TEXT NOT NULL DEFAULT '{}'
+);
+
+CREATE INDEX IF NOT EXISTS idx_search_trials_study ON search_trials (study_id, number);
+
+-- Write-behind spill: live TradingDB writes parked while Supabase is unreachable,
+-- replayed in id order on recovery (src/utils/write_behind.py)
+CREATE TABLE IF NOT EXISTS write_spill (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    op TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    payload_json TEXT NOT NULL,
+    match_json TEXT
+);
+"""
+
+# ─── Backtest history: generated parameter columns ───────────────
+
+# Run parameters / metrics that only live in config_json / metrics_json,
+# exposed as VIRTUAL generated columns (computed on read, no rewrite of
+# existing rows) so they can be indexed and filtered without parsing JSON.
+# ALTER TABLE ADD COLUMN has no IF NOT EXISTS: this migration must run
+# exactly once, which _migrate guarantees (BEGIN IMMEDIATE + version re-read).
+_GENERATED_RUN_COLUMNS: tuple[tuple[str, str, str], ...] = (
+    # (column, type, source JSON column)
+    ("stop_loss_atr", "REAL", "config_json"),
+    ("take_profit_atr", "REAL", "config_json"),
+    ("signal_threshold", "REAL", "config_json"),
+    ("trend_filter", "INTEGER", "config_json"),
+    ("slope_threshold_pct", "REAL", "config_json"),
+    ("slope_volume_multiplier", "REAL", "config_json"),
+    ("nb_band_mult", "REAL", "config_json"),
+    ("max_positions", "INTEGER", "config_json"),
+    ("max_position_pct", "REAL", "config_json"),
+    ("cagr_pct", "REAL", "metrics_json"),
+    ("sortino_ratio", "REAL", "metrics_json"),
+    ("avg_win_pct", "REAL", "metrics_json"),
+    ("avg_loss_pct", "REAL", "metrics_json"),
+    ("avg_hold_days", "REAL", "metrics_json"),
+)
+
+_BACKTEST_PARAMS_SQL = "\n".join(
+    f"ALTER TABLE backtest_runs ADD COLUMN {name} {sql_type} "
+    f"GENERATED ALWAYS AS (json_extract({source}, '$.{name}')) VIRTUAL;"
+    for name, sql_type, source in _GENERATED_RUN_COLUMNS
+) + """
+CREATE INDEX IF NOT EXISTS idx_bt_runs_params
+    ON backtest_runs (strategy, timeframe, stop_loss_atr, take_profit_atr);
+CREATE INDEX IF NOT EXISTS idx_bt_runs_signal_threshold ON backtest_runs (signal_threshold);
+CREATE INDEX IF NOT EXISTS idx_bt_runs_slope_params
+    ON backtest_runs (slope_threshold_pct, slope_volume_multiplier);
+CREATE INDEX IF NOT EXISTS idx_bt_runs_nb_band ON backtest_runs (nb_band_mult);
 """
+
+# Every scalar run column a query may select, filter or sort on (the JSON
+# blobs are left out of frames on purpose).
+_RUN_FRAME_COLUMNS: tuple[str, ...] = (
+    "id", "created_at", "strategy", "timeframe", "start_date", "end_date", "initial_capital",
+    *(name for name, _, _ in _GENERATED_RUN_COLUMNS),
+    "sharpe_ratio", "total_return_pct", "max_drawdown_pct", "win_rate_pct",
+    "profit_factor", "total_trades", "verdict",
+)
+
+# Run columns attached to every row of query_backtest_trades.
+_TRADE_RUN_COLUMNS = ("strategy", "timeframe", "stop_loss_atr", "take_profit_atr", "signal_threshold")
+
+
+def _run_columns(names: list[str]) -> list[str]:
+    """Validate column names against the whitelist (they are spliced into SQL)."""
+    unknown = [n for n in names if n not in _RUN_FRAME_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown backtest_runs column(s): {', '.join(unknown)}")
+    return names
+
+
+def _where_sql(where: dict[str, Any] | None, prefix: str) -> tuple[str, list[Any]]:
+    """``where`` mapping → (" WHERE ..." clause, params); see query_backtest_runs."""
+    if not where:
+        return "", []
+    conditions: list[str] = []
+    params: list[Any] = []
+    for name, value in where.items():
+        column = prefix + _run_columns([name])[0]
+        if isinstance(value, tuple):
+            low, high = value
+            if low is not None:
+                conditions.append(f"{column} >= ?")
+                params.append(low)
+            if high is not None:
+                conditions.append(f"{column} <= ?")
+                params.append(high)
+        elif isinstance(value, (list, set, frozenset)):
+            values = list(value)
+            conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        elif value is None:
+            conditions.append(f"{column} IS NULL")
+        else:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+
+# Flat per-run export row (the columns of exports/backtest_summary.csv).
+_SUMMARY_EXPORT_SQL = """
+SELECT
+    id AS run_id, created_at AS generated_at, strategy, timeframe,
+    start_date AS start, end_date AS "end", initial_capital,
+    json_extract(config_json, '$.slippage_bps') AS slippage_bps,
+    max_positions, max_position_pct,
+    stop_loss_atr, take_profit_atr, signal_threshold, trend_filter,
+    slope_threshold_pct, slope_volume_multiplier, nb_band_mult,
+    total_return_pct, cagr_pct,
+    json_extract(metrics_json, '$.annualized_volatility_pct') AS annualized_volatility_pct,
+    sharpe_ratio, sortino_ratio, max_drawdown_pct,
+    total_trades, win_rate_pct, profit_factor, avg_win_pct, avg_loss_pct, avg_hold_days,
+    CASE WHEN json_extract(go_nogo_json, '$.pass') THEN 'PASS' ELSE 'NO-GO' END AS go_nogo,
+    json_extract(go_nogo_json, '$.checks.sharpe.pass') AS sharpe_pass,
+    json_extract(go_nogo_json, '$.checks.max_drawdown.pass') AS drawdown_pass,
+    json_extract(go_nogo_json, '$.checks.win_rate.pass') AS win_rate_pass,
+    json_extract(go_nogo_json, '$.checks.profit_factor.pass') AS profit_factor_pass,
+    json_extract(go_nogo_json, '$.checks.total_trades.pass') AS total_trades_pass
+FROM backtest_runs
+ORDER BY id
+"""
+
+_TRADES_EXPORT_SQL = """
+SELECT t.run_id, r.strategy, r.timeframe,
+       t.symbol, t.action, t.entry_date, t.entry_price, t.exit_date, t.exit_price,
+       t.shares, t.pnl, t.pnl_pct, t.hold_days, t.close_reason,
+       t.stop_loss, t.take_profit, t.signal_score, t.signal_confidence
+FROM backtest_trades t JOIN backtest_runs r ON r.id = t.run_id
+ORDER BY t.run_id, t.id
+"""
+
+# ─── Write-behind spill: submission order ────────────────────────
+
+# Writes are spilled both by the write-behind worker and by submit() when the
+# in-memory queue is full, so insertion (id) order is no longer submission
+# order. Each row carries the queue's submission sequence instead; rows
+# spilled before this column existed keep their id order.
+_SPILL_SEQ_SQL = """
+ALTER TABLE write_spill ADD COLUMN seq INTEGER NOT NULL DEFAULT 0;
+UPDATE write_spill SET seq = id;
+CREATE INDEX IF NOT EXISTS idx_write_spill_seq ON write_spill (seq);
+"""
+
+# Append-only: entry N upgrades a database from user_version N to N + 1.
+# Version 1 is the original schema (IF NOT EXISTS, so pre-versioning files
+# that already have these tables upgrade cleanly). Version 2 adds the
+# generated parameter columns and their indexes, version 3 the spill's
+# submission sequence.
+_MIGRATIONS: list[str] = [
+    _SCHEMA_SQL,
+    _BACKTEST_PARAMS_SQL,
+    _SPILL_SEQ_SQL,
+]
@@ -0,0 +1,363 @@
+"""
+Write-behind queue for TradingDB writes on the trading hot path.
+
+insert_signal / insert_order / update_order / insert_snapshot /
+insert_risk_event used to be synchronous Supabase HTTP calls made inline by
+the agents, so a slow Supabase response delayed the next order. With a
+WriteBehindQueue installed, TradingDB only enqueues those writes; a
+background thread applies them in order, batching consecutive inserts into
+the same table into one request.
+
+When Supabase is unreachable (transport errors, 5xx), writes are spilled to
+the local SQLite database (LocalDB ``write_spill`` table) instead of being
+lost, and new writes keep going to the spill until it has been replayed —
+every ``retry_interval`` seconds — so Supabase sees writes in submission
+order (an order's insert always lands before its update). Writes Supabase
+rejects (4xx: bad column, constraint violation) are logged and dropped;
+retrying them would block everything behind them.
+
+At most ``max_pending`` writes are held in memory. A write submitted while
+the queue is full is spilled by the caller instead, ahead of older writes
+still queued; every write carries its submission number (``seq``), the spill
+replays in that order, and only writes older than everything still queued
+are replayed, so an overflow never reorders writes either.
+
+The scheduler installs one queue per process (``install_write_behind``);
+one-shot CLI runs have none and TradingDB writes synchronously, as before.
+
+Usage:
+    queue = install_write_behind(WriteBehindQueue(get_supabase(), spill=LocalDB()))
+    queue.start()
+    TradingDB().insert_order(order)     # returns immediately
+    queue.close(timeout=10)             # flush on shutdown
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+import structlog
+from postgrest.exceptions import APIError
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class PendingWrite:
+    """One queued write: insert ``payload`` into ``table``, or update rows matching ``match``."""
+
+    op: str  # "insert" | "update"
+    table: str
+    payload: dict[str, Any]
+    match: tuple[str, Any] | None = None  # (column, value) for updates
+    seq: int = 0  # submission order, assigned by WriteBehindQueue.submit
+
+
+@dataclass
+class WriteBehindStats:
+    enqueued: int = 0
+    written: int = 0
+    requests: int = 0
+    spilled: int = 0
+    replayed: int = 0
+    overflow: int = 0
+    failures: int = 0
+    rejected: int = 0
+
+
+class WriteBehindQueue:
+    """Background writer for Supabase inserts/updates with SQLite spill."""
+
+    def __init__(
+        self,
+        client: Any,
+        spill: Any | None = None,
+        max_pending: int = 10_000,
+        batch_size: int = 100,
+        flush_interval: float = 0.2,
+        retry_interval: float = 30.0,
+    ) -> None:
+        """
+        Args:
+            client:         Supabase client (``table(...).insert/update...execute()``).
+            spill:          LocalDB for durable spill; None → failed writes are dropped.
+            max_pending:    Writes held in memory; further writes are spilled.
+            batch_size:     Max writes applied per worker iteration.
+            flush_interval: Seconds the worker waits for more writes before applying.
+            retry_interval: Seconds between replay attempts while spilled writes exist.
+        """
+        self._client = client
+        self._spill = spill
+        self._queue: queue.Queue[PendingWrite] = queue.Queue(maxsize=max_pending)
+        # Numbering, queueing and submit-side spilling happen under one lock,
+        # so seq order is queue order and a spilled write is in SQLite before
+        # any newer write can be queued.
+        self._submit_lock = threading.Lock()
+        self._next_seq = (spill.max_spilled_seq() if spill is not None else 0) + 1
+        self._taken_seq = 0  # seq of the last write the worker took from the queue
+        self._overflowing = False
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._spilled = spill is not None and spill.count_spilled_writes() > 0
+        self._next_replay = 0.0
+        self.stats = WriteBehindStats()
+
+    # ─── Lifecycle ─────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every queued write was applied or spilled. False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        """Flush, then stop the worker thread."""
+        self.flush(timeout)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        logger.info("write_behind_closed", pending=self.pending, **vars(self.stats))
+
+    # ─── Submission (hot path) ─────────────────────────────────
+
+    def submit(self, write: PendingWrite) -> None:
+        """Queue a write; never blocks on the network. With the queue full the write is spilled."""
+        self.stats.enqueued += 1
+        with self._submit_lock:
+            write.seq = self._next_seq
+            self._next_seq += 1
+            try:
+                self._queue.put_nowait(write)
+                self._overflowing = False
+                return
+            except queue.Full:
+                self.stats.overflow += 1
+                if not self._overflowing:
+                    self._overflowing = True
+                    logger.warning("write_behind_overflow", table=write.table, pending=self._queue.qsize())
+                self._spill_writes([write])
+
+    def insert(self, table: str, record: dict[str, Any]) -> None:
+        self.submit(PendingWrite("insert", table, record))
+
+    def update(self, table: str, updates: dict[str, Any], column: str, value: Any) -> None:
+        self.submit(PendingWrite("update", table, updates, (column, value)))
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    # ─── Worker ────────────────────────────────────────────────
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            try:
+                if self._spilled:
+                    self._spill_writes(batch)  # seq keeps it in submission order within the spill
+                    self._replay()
+                elif batch:
+                    self._apply(batch)
+            except Exception as exc:  # never let the writer thread die
+                logger.error("write_behind_error", error=str(exc))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _next_batch(self) -> list[PendingWrite]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self._taken_seq = batch[-1].seq
+        return batch
+
+    def _apply(self, batch: list[PendingWrite]) -> None:
+        """Write ``batch`` in order; when Supabase is unreachable spill the remainder."""
+        for start, end in _groups(batch):
+            done = start + self._write(batch[start:end])
+            if done < end:
+                logger.warning("write_behind_spilling", spilled=len(batch) - done)
+                self._next_replay = time.monotonic() + self.retry_interval
+                self._spill_writes(batch[done:])
+                return
+
+    def _write(self, group: list[PendingWrite]) -> int:
+        """
+        Apply one request's worth of writes. Returns how many leading writes
+        were handled (written or rejected) before Supabase proved unreachable.
+
+        A rejected multi-row insert is retried row by row, so only the rows
+        Supabase refuses are dropped.
+        """
+        try:
+            self._execute(group)
+        except Exception as exc:
+            if _retryable(exc):
+                self.stats.failures += 1
+                logger.warning("write_behind_supabase_unreachable", table=group[0].table, error=str(exc))
+                return 0
+            if len(group) == 1:
+                self.stats.rejected += 1
+                logger.error(
+                    "write_behind_rejected",
+                    op=group[0].op,
+                    table=group[0].table,
+                    payload=group[0].payload,
+                    error=str(exc),
+                )
+                return 1
+            for i, write in enumerate(group):
+                if not self._write([write]):
+                    return i
+            return len(group)
+        self.stats.requests += 1
+        self.stats.written += len(group)
+        return len(group)
+
+    def _execute(self, group: list[PendingWrite]) -> None:
+        first = group[0]
+        table = self._client.table(first.table)
+        if first.op == "insert":
+            if len(group) == 1:
+                table.insert(first.payload).execute()
+            else:
+                # Rows may carry different keys: missing columns take their
+                # table defaults, exactly as in single-row inserts.
+                table.insert([w.payload for w in group], default_to_null=False).execute()
+        else:
+            column, value = first.match  # type: ignore[misc]
+            table.update(first.payload).eq(column, value).execute()
+
+    # ─── Spill / replay ────────────────────────────────────────
+
+    def _spill_writes(self, writes: list[PendingWrite]) -> None:
+        if not writes:
+            return
+        if self._spill is None:
+            self.stats.failures += len(writes)
+            logger.error("write_behind_dropped", count=len(writes), reason="no spill store")
+            return
+        self._spill.spill_writes([
+            (w.seq, w.op, w.table, json.dumps(w.payload, default=str), json.dumps(w.match, default=str))
+            for w in writes
+        ])
+        self.stats.spilled += len(writes)
+        self._spilled = True
+
+    def _replay(self) -> None:
+        """Re-apply spilled writes in submission order; back to direct writes once drained."""
+        if time.monotonic() < self._next_replay:
+            return
+        while True:
+            with self._submit_lock:
+                # Writes still queued are older than anything submit() spilled
+                # after them: replay only what precedes the oldest of them.
+                before = self._next_seq if self._queue.empty() else self._taken_seq + 1
+            rows = self._spill.get_spilled_writes(limit=self.batch_size, before_seq=before)
+            if not rows:
+                with self._submit_lock:
+                    if self._spill.count_spilled_writes() == 0:
+                        self._spilled = False
+                        logger.info("write_behind_recovered", replayed=self.stats.replayed)
+                return
+            writes = [_from_spill_row(r) for r in rows]
+            for start, end in _groups(writes):
+                done = start + self._write(writes[start:end])
+                if done < end:
+                    logger.info("write_behind_replay_deferred", remaining=len(rows) - done)
+                    self._spill.delete_spilled_writes([r["id"] for r in rows[:done]])
+                    self.stats.replayed += done
+                    self._next_replay = time.monotonic() + self.retry_interval
+                    return
+            self._spill.delete_spilled_writes([r["id"] for r in rows])
+            self.stats.replayed += len(rows)
+
+
+# SQLSTATE classes / PostgREST codes of transient server-side failures:
+# connection, transaction rollback (deadlock), resources, operator
+# intervention, system error, PostgREST can't reach the database.
+_RETRYABLE_CODES = ("08", "40", "53", "57", "58", "PGRST0")
+
+
+def _retryable(exc: Exception) -> bool:
+    """Transport errors and 5xx are worth retrying; anything Supabase rejects (4xx) is not."""
+    if isinstance(exc, (OSError, httpx.TransportError)):  # ConnectionError, timeouts
+        return True
+    if isinstance(exc, APIError):
+        code = str(exc.code or "")
+        if len(code) == 3 and code.isdigit():  # no JSON body: the HTTP status (e.g. a 502 from the gateway)
+            return int(code) >= 500 or int(code) in (408, 429)
+        return code.startswith(_RETRYABLE_CODES)
+    return False
+
+
+def _groups(writes: list[PendingWrite]) -> list[tuple[int, int]]:
+    """[start, end) runs of consecutive inserts into one table; each update is its own run."""
+    groups: list[tuple[int, int]] = []
+    start = 0
+    for i in range(1, len(writes) + 1):
+        if (
+            i == len(writes)
+            or writes[i].op != "insert"
+            or writes[start].op != "insert"
+            or writes[i].table != writes[start].table
+        ):
+            groups.append((start, i))
+            start = i
+    return groups
+
+
+def _from_spill_row(row: dict[str, Any]) -> PendingWrite:
+    match = json.loads(row["match_json"]) if row.get("match_json") else None
+    return PendingWrite(
+        op=row["op"],
+        table=row["table_name"],
+        payload=json.loads(row["payload_json"]),
+        match=tuple(match) if match else None,
+        seq=row["seq"],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Process-wide queue
+# ---------------------------------------------------------------------------
+
+_write_behind: WriteBehindQueue | None = None
+
+
+def install_write_behind(q: WriteBehindQueue | None) -> WriteBehindQueue | None:
+    """Install (or, with None, remove) the process-wide write-behind queue."""
+    global _write_behind
+    _write_behind = q
+    return q
+
+
+def get_write_behind() -> WriteBehindQueue | None:
+    """The process-wide write-behind queue, or None when writes are synchronous."""
+    return _write_behind
@@ -0,0 +1,26 @@
+"""
+Shared helpers for the unit tests.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def daily_bars(n_days: int, seed: int, start: str = "2023-01-02", tz: str | None = "UTC") -> pd.DataFrame:
+    """Seeded random-walk daily OHLCV bars starting at `start` (business days)."""
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range(start, periods=n_days, tz=tz, name="timestamp")
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0005, 0.015, n_days)))
+    spread = np.abs(rng.normal(0, 0.01, n_days)) * close
+    return pd.DataFrame(
+        {
+            "open": np.concatenate([[close[0]], close[:-1]]),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.integers(500_000, 2_000_000, n_days).astype(float),
+        },
+        index=idx,
+    )
@@ -0,0 +1,110 @@
+"""
+Tests for the auto-optimizer's in-process experiment runner.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import date
+
+import pytest
+
+from src.backtest import auto_optimize, report
+from src.backtest.__main__ import build_config, build_parser, resolve_strategy
+from src.backtest.auto_optimize import AutoOptimizer, ExperimentRunner, experiment_argv
+from src.backtest.result_cache import ResultCache
+from tests.unit.conftest import daily_bars
+
+
+@pytest.fixture
+def offline(monkeypatch, tmp_path):
+    """Synthetic bars instead of downloads, no task board / shared SQLite side effects."""
+    loads: list[tuple] = []
+
+    def fake_load(self, symbols, start, end, timeframe="1Day"):
+        loads.append((tuple(symbols), timeframe))
+        return {sym: daily_bars(260, seed=i) for i, sym in enumerate(symbols)}
+
+    monkeypatch.setattr(auto_optimize.DataLoader, "__init__", lambda self, *a, **k: None)
+    monkeypatch.setattr(auto_optimize.DataLoader, "load", fake_load)
+    monkeypatch.setattr(auto_optimize, "_loader", None)
+    monkeypatch.setattr(auto_optimize, "_data_cache", {})
+    monkeypatch.setattr(auto_optimize, "_result_cache", ResultCache(tmp_path / "cache.db"))
+    monkeypatch.setattr(auto_optimize, "_run_task_cli", lambda *a: None)
+    monkeypatch.setattr(report, "_persist_to_sqlite", lambda result, metrics: None)
+    return loads
+
+
+EXPERIMENT = {
+    "name": "daily_test",
+    "strategy": "trend_following",
+    "timeframe": "1Day",
+    "universe": "SPY,AAPL",
+    "params": {"sl_atr": 1.5, "tp_atr": 5.0, "no_trend_filter": True, "trail_lock": 1.2, "bogus": 1},
+}
+
+
+def test_experiment_argv_matches_cli_semantics(tmp_path):
+    argv = experiment_argv(EXPERIMENT, "2023-01-02", "2023-12-29", 50_000, tmp_path)
+    args = build_parser().parse_args(argv)
+    config = build_config(args, date(2023, 1, 2), date(2023, 12, 29), resolve_strategy(args))
+
+    assert args.universe == "SPY,AAPL"
+    assert config.initial_capital == 50_000
+    assert config.stop_loss_atr == 1.5
+    assert config.take_profit_atr == 5.0
+    assert config.trend_filter is False
+    assert config.trailing_lock_atr == 1.2
+    assert "bogus" not in " ".join(argv)
+
+
+def test_runner_writes_report_and_reuses_loaded_data(tmp_path, offline):
+    runner = ExperimentRunner("2023-01-02", "2023-12-29", 100_000)
+    first = runner.run(EXPERIMENT, tmp_path / "a")
+    second = runner.run({**EXPERIMENT, "params": {"sl_atr": 2.5}}, tmp_path / "b")
+
+    assert offline == [(("SPY", "AAPL"), "1Day")]
+    with open(tmp_path / "a" / "report.json") as f:
+        assert json.load(f) == first
+    assert (tmp_path / "a" / "trades.csv").exists()
+    assert first["trades"]["total"] > 0
+    assert first["performance"] != second["performance"]
+
+
+def test_runner_reports_failures_as_none(tmp_path, offline):
+    runner = ExperimentRunner("2023-01-02", "2023-12-29", 100_000)
+    assert runner.run({**EXPERIMENT, "timeframe": "2Min"}, tmp_path / "bad") is None
+
+
+def test_parallel_batch_matches_serial(tmp_path, offline):
+    jobs = [({**EXPERIMENT, "params": {"sl_atr": sl}}, tmp_path / f"p{sl}") for sl in (1.0, 2.0, 3.0)]
+    serial = ExperimentRunner("2023-01-02", "2023-12-29", 100_000, use_cache=False).run_batch(jobs)
+
+    runner = ExperimentRunner("2023-01-02", "2023-12-29", 100_000, workers=3, use_cache=False)
+    try:
+        parallel = runner.run_batch(jobs)
+    finally:
+        runner.close()
+
+    strip = lambda r: {k: v for k, v in r.items() if k != "generated_at"}  # noqa: E731
+    assert [strip(r) for r in parallel] == [strip(r) for r in serial]
+
+
+def test_rules_only_batches_presets_then_adaptive_variants(tmp_path, offline, monkeypatch):
+    monkeypatch.setattr(auto_optimize, "STRATEGY_PRESETS", [
+        {**EXPERIMENT, "name": "preset_a"},
+        {**EXPERIMENT, "name": "preset_b", "params": {"sl_atr": 2.5, "max_positions": 6}},
+    ])
+    optimizer = AutoOptimizer(
+        start="2023-01-02", end="2023-12-29", max_iterations=5,
+        output_dir=tmp_path, rules_only=True, workers=3,
+    )
+    optimizer.run()
+
+    names = [h["config_used"]["name"] for h in optimizer.history]
+    assert names[:2] == ["preset_a", "preset_b"]
+    assert len(names) == 5
+    assert all(name.startswith("adaptive_") and name.endswith(f"_{i}") for i, name in enumerate(names[2:], 3))
+    assert len(set(names)) == 5
+    for i in range(1, 6):
+        assert (optimizer.session_dir / f"iteration_{i:02d}" / "report.json").exists()
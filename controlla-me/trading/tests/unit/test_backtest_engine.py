@@ -0,0 +1,284 @@
+"""
+Tests for the backtest engine internals (bar store, run-level behaviour).
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest.bar_store import BarStore
+
+
+def _bars(index: list[str], base: float = 100.0) -> pd.DataFrame:
+    idx = pd.DatetimeIndex(index, tz="UTC")
+    close = base + np.arange(len(idx), dtype=float)
+    return pd.DataFrame(
+        {"open": close - 0.5, "high": close + 1, "low": close - 1, "close": close, "volume": 1000.0},
+        index=idx,
+    )
+
+
+# ---------------------------------------------------------------------------
+# BarStore — OHLCV arrays aligned to the union timeline
+# ---------------------------------------------------------------------------
+
+class TestBarStore:
+    def test_alignment_and_presence_mask(self):
+        spy = _bars(["2024-01-02 14:30", "2024-01-02 14:35", "2024-01-02 14:40"])
+        qqq = _bars(["2024-01-02 14:35"], base=400.0)
+        dates = sorted(set(spy.index) | set(qqq.index))
+
+        store = BarStore({"SPY": spy, "QQQ": qqq}, dates)
+
+        assert store.present.tolist() == [[True, True, True], [False, True, False]]
+        assert store.bar("SPY", 2) == (101.5, 103.0, 101.0, 102.0)
+        assert store.price("QQQ", 1) == 400.0
+        assert store.price("QQQ", 0) is None
+        assert store.bar("QQQ", 2) is None
+        assert store.price("IWM", 0) is None
+
+    def test_matches_df_loc_for_every_bar(self):
+        spy = _bars([f"2024-01-02 {h}:{m:02d}" for h in (15, 16) for m in range(0, 60, 5)])
+        gappy = spy.iloc[::2]
+        dates = list(spy.index)
+
+        store = BarStore({"SPY": spy, "GAP": gappy}, dates)
+
+        for bar_idx, ts in enumerate(dates):
+            for symbol, df in (("SPY", spy), ("GAP", gappy)):
+                if ts in df.index:
+                    row = df.loc[ts]
+                    assert store.bar(symbol, bar_idx) == (row["open"], row["high"], row["low"], row["close"])
+                else:
+                    assert not store.has_bar(symbol, bar_idx)
+
+    def test_unsorted_input_and_empty_timeline(self):
+        spy = _bars(["2024-01-02 14:30", "2024-01-02 14:35"])
+        store = BarStore({"SPY": spy.iloc[::-1]}, list(spy.index))
+        assert store.price("SPY", 0) == 100.0
+
+        empty = BarStore({"SPY": spy}, [])
+        assert empty.present.shape == (1, 0)
+
+
+# ---------------------------------------------------------------------------
+# Vectorized engine — same BacktestResult as the bar loop
+# ---------------------------------------------------------------------------
+
+def _session_bars(n_bars: int, seed: int, drop_every: int = 0) -> pd.DataFrame:
+    """Random-walk 5-min bars on the 14:30–20:55 UTC session grid."""
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range("2024-01-02", periods=n_bars // 78 + 2, tz="UTC")
+    idx = pd.DatetimeIndex(
+        [d + pd.Timedelta(hours=14, minutes=30 + 5 * k) for d in days for k in range(78)]
+    )[:n_bars]
+    close = 470.0 * np.exp(np.cumsum(rng.normal(0, 0.0012, n_bars)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.0006, n_bars)) * close
+    df = pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.minimum(open_, close) - spread,
+            "close": close,
+            "volume": rng.integers(200_000, 2_000_000, n_bars).astype(float),
+        },
+        index=idx,
+    )
+    if drop_every:
+        df = df.drop(df.index[200::drop_every])
+    return df
+
+
+def _run_both(data: dict[str, pd.DataFrame], **overrides):
+    from src.backtest.engine import BacktestConfig, BacktestEngine
+
+    first = next(iter(data.values())).index
+    params = {"start": first[0].date(), "end": first[-1].date(), "timeframe": "5Min", **overrides}
+    bar = BacktestEngine(BacktestConfig(**params)).run(data)
+    vectorized = BacktestEngine(BacktestConfig(**params, engine="vectorized")).run(data)
+    return bar, vectorized
+
+
+class TestVectorizedEngine:
+    DATA = {
+        "SPY": _session_bars(2400, seed=1),
+        "QQQ": _session_bars(2400, seed=2, drop_every=9),
+    }
+
+    def _assert_same(self, bar, vectorized):
+        assert vectorized.model_dump(exclude={"config"}) == bar.model_dump(exclude={"config"})
+
+    def test_slope_volume_parity(self):
+        bar, vectorized = _run_both(self.DATA, strategy="slope_volume", slope_volume_multiplier=1.0)
+        assert len(bar.trades) > 10
+        self._assert_same(bar, vectorized)
+
+    def test_slope_volume_contrarian_with_kill_switch(self):
+        bar, vectorized = _run_both(
+            self.DATA,
+            strategy="slope_volume",
+            slope_volume_multiplier=1.0,
+            slope_contrarian=True,
+            trend_filter=False,
+            commission_per_share=0.01,
+            daily_loss_limit_pct=-0.05,
+            weekly_loss_limit_pct=-0.2,
+        )
+        assert bar.kill_switch_triggered
+        self._assert_same(bar, vectorized)
+
+    def test_noise_boundary_parity(self):
+        bar, vectorized = _run_both(self.DATA, strategy="noise_boundary", nb_band_mult=0.5, nb_vwap_exit=True)
+        assert any(t.close_reason == "nb_exit" for t in bar.trades)
+        self._assert_same(bar, vectorized)
+
+    def test_noise_boundary_vwap_trailing_vol_sizing(self):
+        bar, vectorized = _run_both(
+            self.DATA,
+            strategy="noise_boundary",
+            nb_band_mult=0.5,
+            nb_vwap_trailing=True,
+            nb_vol_sizing=True,
+            nb_min_hold_bars=6,
+        )
+        assert any(t.close_reason == "vwap_exit" for t in bar.trades)
+        self._assert_same(bar, vectorized)
+
+    def test_unsupported_config_falls_back_to_bar_loop(self):
+        from src.backtest.engine import BacktestConfig
+        from src.backtest.vectorized import unsupported_reason
+
+        data = {"SPY": self.DATA["SPY"].iloc[:600]}
+        bar, vectorized = _run_both(data, strategy="slope_volume", signal_exit_enabled=True)
+        self._assert_same(bar, vectorized)
+        assert unsupported_reason(
+            BacktestConfig(start="2024-01-02", end="2024-02-01", timeframe="15Min", strategy="mean_reversion")
+        ) == "timeframe must be 5Min"
+
+    def test_slope_exit_codes_match_engine_math(self):
+        from src.backtest.vectorized import REASONS, slope_exit_codes
+
+        close = self.DATA["SPY"]["close"].to_numpy()[:400]
+        lookback, threshold = 5, 0.01
+        long_codes, short_codes = slope_exit_codes(close, lookback, threshold)
+
+        def slope(y, price):
+            x = np.arange(len(y), dtype=float)
+            raw = float(np.sum((x - x.mean()) * (y - y.mean())) / float(np.sum((x - x.mean()) ** 2)))
+            return (raw / price) * 100
+
+        for n in range(lookback * 2, len(close) + 1):
+            price = float(close[n - 1])
+            curr = slope(close[n - lookback:n], price)
+            prev = slope(close[n - 2 * lookback:n - lookback], price)
+            expected_long = ("slope_exit" if prev > 0 else "adverse_slope_exit") if curr < -threshold else None
+            expected_short = ("slope_exit" if prev < 0 else "adverse_slope_exit") if curr > threshold else None
+            got_long = REASONS[long_codes[n - 1]] if long_codes[n - 1] else None
+            got_short = REASONS[short_codes[n - 1]] if short_codes[n - 1] else None
+            assert (got_long, got_short) == (expected_long, expected_short)
+
+
+# ---------------------------------------------------------------------------
+# VIX regime filter — cached daily series, as-of joined onto the timeline
+# ---------------------------------------------------------------------------
+
+def test_vix_asof_join_matches_per_bar_lookup(monkeypatch):
+    from src.backtest import engine as engine_mod
+    from src.backtest.engine import BacktestConfig, BacktestEngine
+
+    data = {"SPY": _session_bars(78 * 25, seed=3)}
+    days = pd.bdate_range("2023-12-28", "2024-02-09", tz="America/New_York", name="timestamp")
+    days = days.delete(3)  # a missing VIX day falls back to the previous close
+    vix = pd.DataFrame({"close": 20.0 + 3.0 * np.sin(np.arange(len(days)))}, index=days)
+    requests = []
+    monkeypatch.setattr(
+        engine_mod.DataLoader, "load_regime", lambda self, symbol, start, end: requests.append(symbol) or vix
+    )
+    monkeypatch.setattr(engine_mod.DataLoader, "__init__", lambda self, *a, **k: None)
+
+    dates = data["SPY"].index
+    config = BacktestConfig(
+        start=dates[0].date(), end=dates[-1].date(), timeframe="5Min",
+        strategy="noise_boundary", nb_band_mult=0.5, nb_vix_filter=True, nb_vix_threshold=20.0,
+    )
+    engine = BacktestEngine(config)
+    result = engine.run(data)
+    assert requests == ["^VIX"]
+
+    for bar_idx, ts in enumerate(dates):
+        ts_day = pd.Timestamp(ts.date()).tz_localize(vix.index.tz)
+        mask = vix.index.normalize() <= ts_day
+        assert engine._vix_at(bar_idx) == float(vix.loc[mask, "close"].iloc[-1])
+
+    # Entries only on days whose VIX close is at or above the threshold
+    unfiltered = BacktestEngine(config.model_copy(update={"nb_vix_filter": False})).run(data)
+    signal_days = {t.entry_date[:10] for t in unfiltered.trades}
+    entry_days = {t.entry_date[:10] for t in result.trades}
+    assert entry_days and entry_days < signal_days
+    for day in entry_days:
+        day_vix = vix.loc[vix.index.normalize() <= pd.Timestamp(day).tz_localize(vix.index.tz), "close"]
+        assert day_vix.iloc[-1] >= 20.0
+
+
+# ---------------------------------------------------------------------------
+# Exit variants — shared entry signals, same result as standalone runs
+# ---------------------------------------------------------------------------
+
+class TestExitVariants:
+    DATA = TestVectorizedEngine.DATA
+    VARIANTS = [
+        {"stop_loss_atr": 1.0, "take_profit_atr": 2.0},
+        {"stop_loss_atr": 2.0, "take_profit_atr": 4.0, "trailing_breakeven_atr": 0.5},
+        {"stop_loss_atr": 1.5, "take_profit_atr": 3.0, "signal_exit_enabled": True},
+        {"stop_loss_atr": 1.5, "take_profit_atr": 3.0, "slope_exit_enabled": False},
+    ]
+
+    def _config(self, **overrides):
+        from src.backtest.engine import BacktestConfig
+
+        first = self.DATA["SPY"].index
+        return BacktestConfig(start=first[0].date(), end=first[-1].date(), timeframe="5Min", **overrides)
+
+    @pytest.mark.parametrize("engine", ["bar", "vectorized"])
+    def test_each_variant_matches_standalone_run(self, engine):
+        from src.backtest.engine import BacktestEngine, run_exit_variants
+
+        base = self._config(strategy="slope_volume", slope_volume_multiplier=1.0, engine=engine)
+        results = run_exit_variants(base, self.VARIANTS, self.DATA)
+
+        assert len(results) == len(self.VARIANTS)
+        assert len({len(r.trades) for r in results}) > 1
+        for params, result in zip(self.VARIANTS, results):
+            alone = BacktestEngine(base.model_copy(update=params)).run(self.DATA)
+            assert result.model_dump() == alone.model_dump()
+
+    def test_later_variants_skip_known_empty_entries(self, monkeypatch):
+        from src.backtest.engine import run_exit_variants
+        from src.backtest.indicators import IndicatorEngine
+
+        calls: list[int] = []
+        original = IndicatorEngine._evaluate
+
+        def counting(self, *args):
+            calls[-1] += 1
+            return original(self, *args)
+
+        monkeypatch.setattr(IndicatorEngine, "_evaluate", counting)
+        monkeypatch.setattr(
+            IndicatorEngine, "shared_view",
+            lambda self, config, _view=IndicatorEngine.shared_view: calls.append(0) or _view(self, config),
+        )
+        base = self._config(strategy="slope_volume", slope_volume_multiplier=1.0)
+        run_exit_variants(base, self.VARIANTS[:2], {"SPY": self.DATA["SPY"].iloc[:1200]})
+
+        assert calls[0] > 0
+        assert calls[1] < calls[0] / 5
+
+    def test_rejects_entry_parameters(self):
+        from src.backtest.engine import run_exit_variants
+
+        with pytest.raises(ValueError, match="max_positions"):
+            run_exit_variants(self._config(), [{"max_positions": 3}], self.DATA)
@@ -0,0 +1,139 @@
+"""
+Tests for the indexed backtest-history queries in LocalDB: generated
+parameter columns (migration 2), frame/Arrow results and streaming export.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import sqlite3
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.utils import db_local
+from src.utils.db_local import LocalDB
+
+_GO = {"pass": False, "checks": {"sharpe": {"pass": True}}, "verdict": "NO-GO"}
+
+
+def _config(strategy: str, timeframe: str, sl: float, tp: float, **extra) -> dict:
+    return {"start": "2024-01-01", "end": "2024-06-30", "strategy": strategy, "timeframe": timeframe,
+            "stop_loss_atr": sl, "take_profit_atr": tp, "signal_threshold": 0.3, "trend_filter": True,
+            "slippage_bps": 4.0, **extra}
+
+
+@pytest.fixture()
+def db(tmp_path):
+    db = LocalDB(tmp_path / "bt.db")
+    grid = [("trend_following", "1Day", 2.0, 6.0, 0.8), ("slope_volume", "5Min", 1.0, 3.0, 1.4),
+            ("slope_volume", "5Min", 1.5, 4.0, 1.1), ("slope_volume", "15Min", 2.5, 5.0, 0.4)]
+    for i, (strategy, tf, sl, tp, sharpe) in enumerate(grid):
+        run_id = db.insert_backtest_run(
+            _config(strategy, tf, sl, tp, slope_threshold_pct=0.01 * i),
+            {"sharpe_ratio": sharpe, "cagr_pct": 10.0 + i, "annualized_volatility_pct": 12.0},
+            _GO,
+        )
+        db.insert_backtest_trades(run_id, [{"symbol": s, "entry_price": 1.0, "entry_date": f"2024-01-0{d}"}
+                                           for d, s in enumerate(["SPY", "QQQ"], start=1)])
+    yield db
+    db.close()
+
+
+def test_v1_file_gains_generated_columns(tmp_path):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(db_local._SCHEMA_SQL)
+    conn.execute("PRAGMA user_version = 1")
+    conn.execute(
+        "INSERT INTO backtest_runs (created_at, start_date, end_date, config_json, metrics_json) VALUES (?, ?, ?, ?, ?)",
+        ("2024-01-01", "", "", json.dumps({"stop_loss_atr": 1.5, "trend_filter": False}),
+         json.dumps({"sortino_ratio": 2.1})),
+    )
+    conn.commit()
+    conn.close()
+
+    db = LocalDB(path)
+    assert db._connection().execute("PRAGMA user_version").fetchone()[0] == len(db_local._MIGRATIONS)
+    row = db.query_backtest_runs(columns=["stop_loss_atr", "trend_filter", "sortino_ratio", "take_profit_atr"])
+    assert row.iloc[0].tolist()[:3] == [1.5, 0, 2.1]
+    assert pd.isna(row.iloc[0]["take_profit_atr"])
+    db.close()
+
+
+def _open_and_count(path: str) -> int | str:
+    try:
+        return len(LocalDB(path).query_backtest_runs(where={"stop_loss_atr": 1.5}))
+    except Exception as exc:
+        return repr(exc)
+
+
+def test_generated_columns_migration_survives_concurrent_opens(tmp_path):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(db_local._SCHEMA_SQL)
+    conn.execute("PRAGMA user_version = 1")
+    conn.execute(
+        "INSERT INTO backtest_runs (created_at, start_date, end_date, config_json) VALUES (?, ?, ?, ?)",
+        ("2024-01-01", "", "", json.dumps({"stop_loss_atr": 1.5})),
+    )
+    conn.commit()
+    conn.close()
+
+    with multiprocessing.get_context("fork").Pool(6) as pool:
+        counts = pool.map(_open_and_count, [str(path)] * 6)
+
+    assert counts == [1] * 6  # no "duplicate column name", no "database is locked"
+
+
+def test_query_runs_filters_on_indexed_params(db):
+    df = db.query_backtest_runs(
+        where={"strategy": "slope_volume", "timeframe": ["5Min", "15Min"], "stop_loss_atr": (None, 2.0)},
+    )
+    assert df["sharpe_ratio"].tolist() == [1.4, 1.1]  # sorted by sharpe desc
+    assert {"stop_loss_atr", "take_profit_atr", "cagr_pct"} <= set(df.columns)
+    assert "config_json" not in df.columns
+
+    table = db.query_backtest_runs(where={"sharpe_ratio": (1.0, None)}, columns=["id", "sharpe_ratio"],
+                                   order_by="id", descending=False, as_arrow=True)
+    assert isinstance(table, pa.Table)
+    assert table.column("sharpe_ratio").to_pylist() == [1.4, 1.1]
+
+    plan = " ".join(
+        r[-1] for r in db._connection().execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM backtest_runs "
+            "WHERE strategy = ? AND timeframe = ? AND stop_loss_atr = ? AND take_profit_atr = ?",
+            ("slope_volume", "5Min", 1.0, 3.0),
+        )
+    )
+    assert "idx_bt_runs_params" in plan
+
+
+def test_query_rejects_unknown_columns(db):
+    with pytest.raises(ValueError, match="config_json"):
+        db.query_backtest_runs(where={"config_json": "{}"})
+    with pytest.raises(ValueError, match="sharpe; DROP"):
+        db.query_backtest_runs(order_by="sharpe; DROP")
+
+
+def test_query_trades_tags_run_params(db):
+    df = db.query_backtest_trades(where={"strategy": "slope_volume", "take_profit_atr": 3.0}, symbol="QQQ")
+    assert len(df) == 1
+    assert df.iloc[0][["symbol", "timeframe", "stop_loss_atr"]].tolist() == ["QQQ", "5Min", 1.0]
+
+    assert len(db.query_backtest_trades(run_ids=[1, 2], as_arrow=True)) == 4
+
+
+def test_streaming_export_rows(db):
+    summary = list(db.iter_backtest_summary(chunk_size=3))
+    assert [r["run_id"] for r in summary] == [1, 2, 3, 4]
+    first = summary[0]
+    assert (first["strategy"], first["slippage_bps"], first["annualized_volatility_pct"]) == (
+        "trend_following", 4.0, 12.0)
+    assert (first["go_nogo"], first["sharpe_pass"]) == ("NO-GO", 1)
+
+    trades = list(db.iter_backtest_trades(chunk_size=3))
+    assert len(trades) == 8
+    assert (trades[-1]["run_id"], trades[-1]["timeframe"]) == (4, "15Min")
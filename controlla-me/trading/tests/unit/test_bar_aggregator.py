@@ -0,0 +1,199 @@
+"""
+Tests for the streaming tick → bar aggregator, driven through a local
+websocket stand-in that replays recorded Tiingo IEX ticks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+import websockets
+
+from src.connectors.bar_aggregator import BarAggregator
+from src.connectors.tiingo_websocket import TiingoWebSocketClient
+
+# Recorded IEX ticks: (ticker, lastSalePrice, lastSaleSize, lastSaleTimestamp)
+_TICKS = [
+    ("SPY", 470.00, 100, "2024-01-15T15:00:01.120Z"),
+    ("QQQ", 400.00, 50, "2024-01-15T15:00:02.000Z"),
+    ("SPY", 470.50, 300, "2024-01-15T15:00:20.500Z"),
+    ("SPY", 469.80, 100, "2024-01-15T15:00:59.999Z"),
+    ("SPY", 469.90, 200, "2024-01-15T15:01:00.001Z"),  # closes SPY and QQQ 15:00
+    ("SPY", 470.10, 100, "2024-01-15T15:00:58.000Z"),  # late print → dropped
+    ("QQQ", 401.00, 10, "2024-01-15T15:02:30.000Z"),   # closes SPY 15:01
+]
+
+
+def _message(ticker: str, price: float, size: int, ts: str) -> str:
+    data = {"ticker": ticker.lower(), "lastSalePrice": price, "lastSaleSize": size, "lastSaleTimestamp": ts}
+    return json.dumps({"messageType": "A", "data": data})
+
+
+async def _replay(ticks, client: TiingoWebSocketClient, run) -> None:
+    """Serve ``ticks`` from a local websocket server while ``run()`` streams them through ``client``."""
+
+    connections = 0
+
+    async def handler(ws):
+        nonlocal connections
+        connections += 1
+        await ws.recv()  # subscribe message
+        if connections > 1:
+            # The client drained the replay and reconnected: end the stream.
+            client.stop()
+            return
+        await ws.send(json.dumps({"messageType": "I", "data": {"subscriptionId": 1}}))
+        await ws.send(json.dumps({"messageType": "H"}))
+        for tick in ticks:
+            await ws.send(_message(*tick))
+
+    async with websockets.serve(handler, "127.0.0.1", 0) as server:
+        client._ws_url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        await asyncio.wait_for(run(), timeout=10)
+
+
+def _client(symbols: list[str]) -> TiingoWebSocketClient:
+    return TiingoWebSocketClient(mode="iex", symbols=symbols, api_key="test")
+
+
+# ---------------------------------------------------------------------------
+# BarAggregator over a replayed stream
+# ---------------------------------------------------------------------------
+
+def test_replayed_ticks_build_ohlcv_vwap_bars():
+    closed: list[tuple[str, pd.Timestamp]] = []
+    agg = BarAggregator("1Min", on_bar_close=lambda sym, bars: closed.append((sym, bars.index[-1])))
+
+    client = _client(["SPY", "QQQ"])
+    asyncio.run(_replay(_TICKS, client, lambda: client.stream(callback=agg.on_tick)))
+
+    t0 = pd.Timestamp("2024-01-15 15:00", tz="UTC")
+    assert closed == [("SPY", t0), ("QQQ", t0), ("SPY", t0 + pd.Timedelta(minutes=1))]
+    assert agg.late_ticks == 1
+
+    spy = agg.bars("SPY")
+    first = spy.iloc[0]
+    assert (first["open"], first["high"], first["low"], first["close"]) == (470.00, 470.50, 469.80, 469.80)
+    assert first["volume"] == 500
+    assert first["vwap"] == pytest.approx((470.00 * 100 + 470.50 * 300 + 469.80 * 100) / 500)
+    assert spy.iloc[1]["close"] == 469.90
+    assert agg.forming("QQQ").close == 401.00
+
+
+def test_five_minute_bars_and_seeded_history():
+    agg = BarAggregator("5Min")
+    seed_idx = pd.date_range("2024-01-15 14:50", periods=2, freq="5min", tz="UTC")
+    agg.seed({"SPY": pd.DataFrame(
+        {"open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 10.0}, index=seed_idx
+    )})
+
+    async def feed():
+        for ticker, price, size, ts in _TICKS:
+            await agg.on_tick(ticker, price, {"lastSaleSize": size, "lastSaleTimestamp": ts})
+        await agg.flush()
+
+    asyncio.run(feed())
+    spy = agg.bars("SPY")
+    assert list(spy.index) == [*seed_idx, pd.Timestamp("2024-01-15 15:00", tz="UTC")]
+    assert spy["vwap"].iloc[0] == 1.5  # seeded bars without vwap use close
+    assert spy["volume"].iloc[-1] == 800  # the 15:00:58 print still belongs to the open 5Min bar
+
+
+# ---------------------------------------------------------------------------
+# SignalGenerator.stream_slope_volume — evaluation on bar close
+# ---------------------------------------------------------------------------
+
+def test_stream_evaluates_slope_on_bar_close():
+    from src.agents.signal_generator import SignalGenerator
+    from src.config.settings import SlopeVolumeSettings
+
+    n = 80
+    idx = pd.date_range("2024-01-15 13:40", periods=n, freq="1min", tz="UTC")
+    close = 100.0 - 0.2 * np.arange(n)
+    history = pd.DataFrame(
+        {"open": close + 0.1, "high": close + 0.3, "low": close - 0.3, "close": close, "volume": 1000.0},
+        index=idx,
+    )
+    market = MagicMock()
+    market.get_latest_bars_multi.return_value = {"XLK": history}
+
+    with patch.object(SignalGenerator, "__init__", lambda self: None):
+        gen = SignalGenerator.__new__(SignalGenerator)
+    gen.name = "signal_generator"
+    gen.logger = MagicMock()
+    gen._alpaca = MagicMock()
+    gen._alpaca.get_positions.return_value = [{"symbol": "XLK", "qty": 5}]
+    gen._market_data = market
+    gen._news_client = None
+    cfg = MagicMock()
+    cfg.slope_volume = SlopeVolumeSettings.model_construct(symbols=["XLK"])
+
+    ticks = [
+        ("XLK", 83.9, 100, "2024-01-15T15:00:05Z"),
+        ("XLK", 83.7, 100, "2024-01-15T15:00:40Z"),
+        ("XLK", 83.6, 100, "2024-01-15T15:01:02Z"),  # closes 15:00
+    ]
+    signals: list[dict] = []
+    client = _client(["xlk"])
+    with patch("src.agents.signal_generator.get_settings", return_value=cfg):
+        asyncio.run(_replay(ticks, client, lambda: gen.stream_slope_volume(client, signals.append)))
+
+    market.get_latest_bars_multi.assert_called_once()
+    assert [(s["symbol"], s["action"]) for s in signals] == [("XLK", "SELL")]
+    gen._alpaca.get_positions.assert_called_once()
+
+
+
+# ---------------------------------------------------------------------------
+# pipeline.run_slope_stream — stream signals feed Risk Manager + Executor
+# ---------------------------------------------------------------------------
+
+def test_slope_stream_feeds_risk_and_executor_per_bar_close():
+    from src import pipeline
+
+    class _Gen:
+        def __init__(self, account_type: str) -> None:
+            pass
+
+        async def stream_slope_volume(self, client, on_signal) -> None:
+            on_signal({"symbol": "XLK", "action": "SELL"})  # bar close 1: a burst of two
+            on_signal({"symbol": "XLE", "action": "BUY"})
+            await asyncio.sleep(0.1)
+            on_signal({"symbol": "SPY", "action": "BUY"})  # bar close 2
+            await asyncio.sleep(0.1)
+
+    risk_calls: list[list[str]] = []
+
+    async def risk_run(signals, broker):
+        risk_calls.append([s["symbol"] for s in signals])
+        return {"decisions": [{**s, "status": "APPROVED"} for s in signals]}
+
+    async def exec_run(decisions, broker):
+        return {"orders": decisions, "total_executed": len(decisions)}
+
+    cfg = MagicMock()
+    cfg.enabled = True
+    cfg.slope_volume.enabled = True
+    cfg.slope_volume.stream_batch_sec = 0.02
+    cfg.telegram.notify_trades = False
+    client = MagicMock(symbols=["xlk", "xle", "spy"])
+    with (
+        patch.object(pipeline, "get_settings", return_value=cfg),
+        patch.object(pipeline, "SignalGenerator", _Gen),
+        patch.object(pipeline, "TradingDB"),
+        patch.object(pipeline, "AlpacaClient"),
+        patch.object(pipeline, "RiskManager") as risk_cls,
+        patch.object(pipeline, "Executor") as exec_cls,
+    ):
+        risk_cls.return_value.run = risk_run
+        exec_cls.return_value.run = exec_run
+        result = asyncio.run(pipeline.run_slope_stream(client))
+
+    assert risk_calls == [["XLK", "XLE"], ["SPY"]]
+    assert (result["status"], result["batches"], result["signals"], result["executed"]) == ("ok", 2, 3, 3)
+    client.stop.assert_called_once()
@@ -0,0 +1,132 @@
+"""
+Tests for the rolling bar cache (ring buffers + incremental refresh).
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.connectors.bar_cache import BarCache, BarRing, timeframe_minutes
+
+
+def _bars(start: str, n: int, first_close: float = 100.0) -> pd.DataFrame:
+    idx = pd.date_range(start, periods=n, freq="1min", tz="UTC", name="timestamp").as_unit("ns")
+    close = first_close + np.arange(n, dtype=float)
+    return pd.DataFrame(
+        {"open": close, "high": close + 0.5, "low": close - 0.5, "close": close, "volume": 1000.0},
+        index=idx,
+    )
+
+
+class _FakeFeed:
+    """Serves the tail of a fixed tape as of ``now`` and records each request."""
+
+    def __init__(self, tape: dict[str, pd.DataFrame]) -> None:
+        self.tape = tape
+        self.now = pd.Timestamp("2024-01-15 15:00", tz="UTC")
+        self.calls: list[tuple[list[str], int]] = []
+
+    def get_latest_bars_multi(self, symbols, timeframe="1Min", n_bars=60):
+        self.calls.append((list(symbols), n_bars))
+        out = {}
+        for s in symbols:
+            df = self.tape[s]
+            df = df[df.index <= self.now].tail(n_bars)
+            if not df.empty:
+                out[s] = df
+        return out
+
+
+# ---------------------------------------------------------------------------
+# BarRing
+# ---------------------------------------------------------------------------
+
+def test_ring_wraps_and_keeps_newest_bars_in_order():
+    ring = BarRing(capacity=8)
+    df = _bars("2024-01-15 14:30", 13)
+    ts = df.index.asi8
+    values = df[["open", "high", "low", "close", "volume"]].to_numpy().T
+
+    assert ring.append(ts[:5], values[:, :5]) == 5
+    assert ring.append(ts[3:], values[:, 3:]) == 8  # overlap 3..4 is skipped
+    out = ring.frame(8)
+    pd.testing.assert_frame_equal(out, df.tail(8), check_freq=False)
+    assert ring.frame(100).shape == (8, 5)
+
+
+def test_ring_replaces_last_bar_with_fresh_copy():
+    ring = BarRing(capacity=4)
+    df = _bars("2024-01-15 14:30", 3)
+    values = df[["open", "high", "low", "close", "volume"]].to_numpy().T
+    ring.append(df.index.asi8, values)
+
+    revised = values[:, -1:].copy()
+    revised[3] = 999.0
+    assert ring.append(df.index.asi8[-1:], revised) == 0
+    assert ring.frame(3)["close"].tolist() == [100.0, 101.0, 999.0]
+
+
+def test_timeframe_minutes():
+    assert timeframe_minutes("1Min") == 1
+    assert timeframe_minutes("5min") == 5
+    assert timeframe_minutes("1Hour") == 60
+    assert timeframe_minutes("1Day") == 1440
+    with pytest.raises(ValueError):
+        timeframe_minutes("1Week")
+
+
+# ---------------------------------------------------------------------------
+# BarCache
+# ---------------------------------------------------------------------------
+
+def test_cache_seeds_once_then_fetches_only_new_bars():
+    tape = {"SPY": _bars("2024-01-15 13:00", 300), "QQQ": _bars("2024-01-15 13:00", 300, 400.0)}
+    feed = _FakeFeed(tape)
+    cache = BarCache(capacity=128, clock=lambda: feed.now)
+
+    first = cache.get_latest_bars_multi(feed, ["SPY", "QQQ"], "1Min", n_bars=60)
+    assert feed.calls == [(["SPY", "QQQ"], 60)]
+    assert len(first["SPY"]) == 60
+
+    for _ in range(3):
+        feed.now += pd.Timedelta(minutes=1)
+        out = cache.get_latest_bars_multi(feed, ["SPY", "QQQ"], "1Min", n_bars=60)
+
+    # One batched request per cycle, each only a few bars deep.
+    assert [n for _, n in feed.calls[1:]] == [3, 3, 3]
+    for symbol in ("SPY", "QQQ"):
+        expected = tape[symbol][tape[symbol].index <= feed.now].tail(60)
+        pd.testing.assert_frame_equal(out[symbol], expected, check_freq=False)
+    assert cache.stats.seeds == 1
+    assert cache.stats.gaps == 0
+
+
+def test_cache_refetches_everything_after_a_gap():
+    tape = {"SPY": _bars("2024-01-15 13:00", 300)}
+    feed = _FakeFeed(tape)
+    clock = [feed.now]
+    cache = BarCache(capacity=128, clock=lambda: clock[0])
+    cache.get_latest_bars_multi(feed, ["SPY"], "1Min", n_bars=60)
+
+    # The feed moved on by more bars than the cache expects (e.g. the
+    # scheduler stalled): the short incremental window no longer overlaps.
+    feed.now += pd.Timedelta(minutes=10)
+    clock[0] += pd.Timedelta(minutes=1)
+    out = cache.get_latest_bars_multi(feed, ["SPY"], "1Min", n_bars=60)
+
+    assert cache.stats.gaps == 1
+    assert feed.calls[-1] == (["SPY"], 60)
+    expected = tape["SPY"][tape["SPY"].index <= feed.now].tail(60)
+    pd.testing.assert_frame_equal(out["SPY"], expected, check_freq=False)
+
+
+def test_cache_never_serves_stale_bars():
+    feed = _FakeFeed({"SPY": _bars("2024-01-15 13:00", 300)})
+    cache = BarCache(capacity=128, clock=lambda: feed.now)
+    cache.get_latest_bars_multi(feed, ["SPY"], "1Min", n_bars=60)
+
+    feed.get_latest_bars_multi = lambda symbols, timeframe="1Min", n_bars=60: {}
+    feed.now += pd.Timedelta(minutes=1)
+    assert cache.get_latest_bars_multi(feed, ["SPY"], "1Min", n_bars=60) == {}
@@ -0,0 +1,103 @@
+"""
+Tests for the cycle-scoped broker state shared across pipeline phases.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+from src.connectors.broker_state import BrokerState
+
+
+def _alpaca(positions: list[dict]) -> MagicMock:
+    alpaca = MagicMock()
+    alpaca.get_account.return_value = {
+        "cash": 1000.0, "portfolio_value": 5000.0, "buying_power": 2000.0, "equity": 5000.0,
+    }
+    alpaca.get_positions.return_value = positions
+    return alpaca
+
+
+def _position(symbol: str) -> dict:
+    return {
+        "symbol": symbol, "qty": 10, "avg_entry_price": 100.0, "current_price": 101.0,
+        "market_value": 1010.0, "unrealized_pl": 10.0, "unrealized_plpc": 0.01, "side": "long",
+    }
+
+
+def test_state_is_fetched_once_until_invalidated():
+    alpaca = _alpaca([_position("SPY")])
+    db = MagicMock()
+    db.get_snapshots.return_value = [{"portfolio_value": 5000.0 - i} for i in range(30)]
+    broker = BrokerState(alpaca, db)
+
+    assert broker.account()["cash"] == 1000.0
+    broker.positions()[0]["qty"] = 0  # callers get copies
+    assert broker.position_map()["SPY"]["qty"] == 10
+    assert len(broker.snapshots(days=30)) == 30
+    assert len(broker.snapshots(days=7)) == 7  # sliced from the cached query
+    assert (alpaca.get_account.call_count, alpaca.get_positions.call_count) == (1, 1)
+    db.get_snapshots.assert_called_once_with(days=30)
+
+    broker.invalidate()
+    broker.account()
+    broker.positions()
+    assert (alpaca.get_account.call_count, alpaca.get_positions.call_count) == (2, 2)
+    assert broker.stats == {
+        "account_fetches": 2, "positions_fetches": 2, "snapshot_fetches": 1, "invalidations": 1,
+    }
+
+
+def test_monitor_phases_share_one_positions_read():
+    from src.agents.portfolio_monitor import PortfolioMonitor
+
+    alpaca = _alpaca([_position("SPY"), _position("XLK")])
+    alpaca.get_orders.return_value = []
+    with patch.object(PortfolioMonitor, "__init__", lambda self: None):
+        monitor = PortfolioMonitor.__new__(PortfolioMonitor)
+    monitor.name = "portfolio_monitor"
+    monitor.logger = MagicMock()
+    monitor._alpaca = alpaca
+    monitor._db = MagicMock()
+    monitor._db.get_all_trailing_stop_states.return_value = []
+    monitor._risk = MagicMock(trailing_enabled=True)
+    monitor._bootstrap_trailing_stop = lambda pos: None
+
+    broker = BrokerState(alpaca, monitor._db)
+    asyncio.run(monitor.run(mode="trailing_stops", broker=broker))
+    asyncio.run(monitor.run(mode="status", broker=broker))
+
+    # Position sync, trailing update, cleanup and status: one Alpaca read.
+    assert alpaca.get_positions.call_count == 1
+    assert alpaca.get_account.call_count == 1
+
+
+def test_executor_fill_invalidates_broker_state():
+    from src.agents.executor import Executor
+
+    with patch.object(Executor, "__init__", lambda self: None):
+        ex = Executor.__new__(Executor)
+    ex.name = "executor"
+    ex.logger = MagicMock()
+    ex._fills = None
+
+    async def execute(decision):
+        return {"symbol": decision["symbol"], "status": decision["fill"]}
+
+    async def no_tracker():
+        return None
+
+    ex._execute_order = execute
+    ex._start_fill_tracker = no_tracker
+    broker = BrokerState(_alpaca([]))
+    decisions = [
+        {"symbol": "SPY", "status": "APPROVED", "fill": "filled"},
+        {"symbol": "XLK", "status": "APPROVED", "fill": "submitted"},
+    ]
+    cfg = MagicMock()
+    cfg.risk.max_concurrent_orders = 4
+    with patch("src.agents.executor.get_settings", return_value=cfg):
+        asyncio.run(ex.run(decisions, broker=broker))
+
+    assert broker.stats["invalidations"] == 1
@@ -0,0 +1,219 @@
+"""
+Tests for the concurrent Alpaca bar downloader, against a local fake HTTP server.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from src.backtest.data_loader import DataLoader
+from src.backtest.downloader import AlpacaBarDownloader, Chunk, TokenBucket, plan_chunks
+
+
+# ---------------------------------------------------------------------------
+# Fake Alpaca data API
+# ---------------------------------------------------------------------------
+
+class FakeAlpaca:
+    """Serves /v2/stocks/bars: one bar per symbol per weekday, PAGE_SIZE bars per page."""
+
+    PAGE_SIZE = 4
+
+    def __init__(self) -> None:
+        self.requests: list[dict] = []
+        self.throttle_first = 0          # answer the first N requests with 429
+        self.reject_starts: set[str] = set()   # chunk start dates answered with 400
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.url = ""
+
+    @staticmethod
+    def bars(symbols: list[str], start: date, end: date) -> list[tuple[str, dict]]:
+        rows = []
+        for symbol in symbols:
+            for i, day in enumerate(pd.bdate_range(start, end - timedelta(days=1))):
+                price = 100.0 + day.dayofyear + len(symbol)
+                rows.append((symbol, {
+                    "t": f"{day.date()}T14:30:00Z", "o": price, "h": price + 1,
+                    "l": price - 1, "c": price + 0.5, "v": 1000 + i, "n": 10, "vw": price,
+                }))
+        return rows
+
+    def handle(self, handler: BaseHTTPRequestHandler) -> tuple[int, dict, dict]:
+        query = {k: v[0] for k, v in parse_qs(urlparse(handler.path).query).items()}
+        with self._lock:
+            self.requests.append({"query": query, "key": handler.headers.get("APCA-API-KEY-ID")})
+            n = len(self.requests)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if n <= self.throttle_first:
+                return 429, {"Retry-After": "0"}, {"message": "too many requests"}
+            start = date.fromisoformat(query["start"][:10])
+            if str(start) in self.reject_starts:
+                return 400, {}, {"message": "bad request"}
+
+            rows = self.bars(query["symbols"].split(","), start, date.fromisoformat(query["end"][:10]))
+            offset = int(query.get("page_token", 0))
+            page = rows[offset : offset + self.PAGE_SIZE]
+            body: dict = {"bars": {}, "next_page_token": None}
+            for symbol, bar in page:
+                body["bars"].setdefault(symbol, []).append(bar)
+            if offset + self.PAGE_SIZE < len(rows):
+                body["next_page_token"] = str(offset + self.PAGE_SIZE)
+            return 200, {}, body
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def fake_alpaca():
+    api = FakeAlpaca()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802
+            status, headers, body = api.handle(self)
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    api.url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield api
+    server.shutdown()
+    server.server_close()
+
+
+def _expected(symbol: str, start: date, end: date) -> pd.Series:
+    rows = FakeAlpaca.bars([symbol], start, end + timedelta(days=1))
+    return pd.Series(
+        [bar["c"] for _, bar in rows],
+        index=pd.DatetimeIndex(pd.to_datetime([bar["t"] for _, bar in rows], utc=True), name="timestamp"),
+        name="close",
+    )
+
+
+# ---------------------------------------------------------------------------
+# TokenBucket / plan_chunks
+# ---------------------------------------------------------------------------
+
+def test_token_bucket_waits_once_burst_is_spent():
+    now = [0.0]
+    waits: list[float] = []
+
+    def sleep(seconds: float) -> None:
+        waits.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(5):
+        bucket.acquire()
+    assert waits == [0.5, 0.5, 0.5]
+
+    now[0] += 10  # idle time refills at most to capacity
+    bucket.acquire()
+    bucket.acquire()
+    assert len(waits) == 3
+
+
+def test_plan_chunks_covers_range_without_overlap():
+    chunks = plan_chunks(["A", "B", "C"], date(2024, 1, 1), date(2024, 3, 5), batch_size=2, chunk_days=30)
+    assert {c.symbols for c in chunks} == {("A", "B"), ("C",)}
+    spans = [(c.start, c.end) for c in chunks if c.symbols == ("C",)]
+    assert spans == [
+        (date(2024, 1, 1), date(2024, 1, 30)),
+        (date(2024, 1, 31), date(2024, 2, 29)),
+        (date(2024, 3, 1), date(2024, 3, 5)),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# AlpacaBarDownloader
+# ---------------------------------------------------------------------------
+
+def test_downloader_pages_retries_and_runs_concurrently(fake_alpaca):
+    fake_alpaca.throttle_first = 2
+    fake_alpaca.delay = 0.05
+    downloader = AlpacaBarDownloader(
+        "key", "secret", base_url=fake_alpaca.url, workers=4,
+        rate_per_minute=60_000, backoff_base=0.001,
+    )
+    chunks = plan_chunks(["SPY", "QQQ", "IWM"], date(2024, 1, 1), date(2024, 2, 15), batch_size=2, chunk_days=15)
+
+    stored: dict[str, list[pd.DataFrame]] = {}
+    checkpoint_threads: set[int] = set()
+
+    def on_chunk(chunk: Chunk, frames: dict[str, pd.DataFrame]) -> None:
+        checkpoint_threads.add(threading.get_ident())
+        for symbol, df in frames.items():
+            stored.setdefault(symbol, []).append(df)
+
+    failed = downloader.download(chunks, "5Min", on_chunk=on_chunk)
+
+    assert failed == []
+    assert checkpoint_threads == {threading.get_ident()}
+    assert fake_alpaca.max_in_flight > 1
+    assert all(r["key"] == "key" for r in fake_alpaca.requests)
+    assert any("page_token" in r["query"] for r in fake_alpaca.requests)
+    for symbol in ("SPY", "QQQ", "IWM"):
+        close = pd.concat(stored[symbol]).sort_index()["close"]
+        pd.testing.assert_series_equal(close, _expected(symbol, date(2024, 1, 1), date(2024, 2, 15)),
+                                       check_index_type=False)
+        assert close.index.is_unique
+
+
+def test_downloader_gives_up_after_max_retries(fake_alpaca):
+    fake_alpaca.throttle_first = 100
+    downloader = AlpacaBarDownloader(
+        "key", "secret", base_url=fake_alpaca.url, workers=2,
+        rate_per_minute=60_000, max_retries=2, backoff_base=0.001,
+    )
+    chunk = Chunk(("SPY",), date(2024, 1, 1), date(2024, 1, 5))
+    assert downloader.download([chunk], "5Min", on_chunk=lambda *a: None) == [chunk]
+    assert len(fake_alpaca.requests) == 3
+
+
+# ---------------------------------------------------------------------------
+# DataLoader — checkpointed chunks make downloads resumable
+# ---------------------------------------------------------------------------
+
+def test_loader_resumes_only_failed_chunks(fake_alpaca, tmp_path):
+    loader = DataLoader(
+        api_key="key", secret_key="secret", cache_dir=tmp_path,
+        workers=3, rate_per_minute=60_000, alpaca_data_url=fake_alpaca.url,
+    )
+    start, end = date(2024, 1, 1), date(2024, 3, 31)
+    fake_alpaca.reject_starts = {"2024-01-31"}  # second 30-day chunk fails
+
+    partial = loader.load(["SPY", "QQQ"], start, end, timeframe="5Min")
+    assert not (partial["SPY"].index.month == 2).any()
+
+    fake_alpaca.requests.clear()
+    fake_alpaca.reject_starts = set()
+    full = loader.load(["SPY", "QQQ"], start, end, timeframe="5Min")
+
+    assert {r["query"]["start"][:10] for r in fake_alpaca.requests} == {"2024-01-31"}
+    for symbol in ("SPY", "QQQ"):
+        pd.testing.assert_series_equal(full[symbol]["close"], _expected(symbol, start, end), check_index_type=False)
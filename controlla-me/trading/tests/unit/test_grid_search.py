@@ -0,0 +1,95 @@
+"""
+Tests for the grid search runner (shared-memory data, parallel workers).
+"""
+
+from __future__ import annotations
+
+import csv
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from src.backtest import grid_search
+from src.backtest.shared_data import SharedFrames, attach
+from tests.unit.conftest import daily_bars
+
+
+# ---------------------------------------------------------------------------
+# SharedFrames — publish once, attach zero-copy
+# ---------------------------------------------------------------------------
+
+class TestSharedFrames:
+    def test_round_trip_preserves_values_dtypes_and_index(self):
+        data = {
+            "SPY": daily_bars(50, seed=1),
+            "QQQ": daily_bars(7, seed=2, tz="America/New_York"),
+            "NAIVE": daily_bars(3, seed=3, tz=None),
+        }
+        with SharedFrames.publish(data) as shared:
+            shm, attached = attach(shared.handle)
+            try:
+                assert list(attached) == list(data)
+                for symbol, df in data.items():
+                    pd.testing.assert_frame_equal(attached[symbol], df, check_freq=False)
+                with pytest.raises(ValueError):
+                    attached["SPY"]["close"].to_numpy()[0] = 0.0
+            finally:
+                del attached
+                shm.close()
+
+    def test_rejects_non_numeric_columns(self):
+        df = daily_bars(3, seed=1).assign(note="x")
+        with pytest.raises(TypeError):
+            SharedFrames.publish({"SPY": df})
+
+
+# ---------------------------------------------------------------------------
+# run_grid_search — workers > 1 gives the same CSV as the serial loop
+# ---------------------------------------------------------------------------
+
+def _read_csv(path) -> list[dict]:
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_parallel_grid_matches_serial(tmp_path, monkeypatch):
+    data = {sym: daily_bars(260, seed=i) for i, sym in enumerate(["SPY", "AAPL", "MSFT"])}
+    monkeypatch.setattr(grid_search.DataLoader, "__init__", lambda self, *a, **k: None)
+    monkeypatch.setattr(grid_search.DataLoader, "load", lambda self, *a, **k: data)
+    grid = {"stop_loss_atr": [1.5, 2.5], "take_profit_atr": [3.0, 5.0], "max_positions": [5]}
+
+    kwargs = dict(
+        symbols=list(data), start=date(2023, 1, 2), end=date(2023, 12, 29), param_grid=grid, use_cache=False
+    )
+    serial = grid_search.run_grid_search(output_dir=tmp_path / "serial", workers=1, **kwargs)
+    parallel = grid_search.run_grid_search(output_dir=tmp_path / "parallel", workers=3, **kwargs)
+
+    serial_rows = _read_csv(serial / "grid_results.csv")
+    assert len(serial_rows) == 4
+    assert list(serial_rows[0])[:4] == ["stop_loss_atr", "take_profit_atr", "max_positions", "timeframe"]
+    assert _read_csv(parallel / "grid_results.csv") == serial_rows
+
+
+# ---------------------------------------------------------------------------
+# Pruning + successive halving
+# ---------------------------------------------------------------------------
+
+def test_successive_halving_promotes_best_fraction(tmp_path, monkeypatch):
+    data = {sym: daily_bars(260, seed=i) for i, sym in enumerate(["SPY", "AAPL", "MSFT"])}
+    monkeypatch.setattr(grid_search.DataLoader, "__init__", lambda self, *a, **k: None)
+    monkeypatch.setattr(grid_search.DataLoader, "load", lambda self, *a, **k: data)
+    grid = {"stop_loss_atr": [1.0, 1.5, 2.0, 2.5], "take_profit_atr": [3.0, 5.0], "max_positions": [5]}
+
+    out = grid_search.run_grid_search(
+        symbols=list(data), start=date(2023, 1, 2), end=date(2023, 12, 29), param_grid=grid,
+        output_dir=tmp_path, use_cache=False, halving_rungs=2, halving_eta=2.0,
+        prune=grid_search.PruneRule(),
+    )
+
+    first = _read_csv(out / "halving_rung1.csv")
+    final = _read_csv(out / "grid_results.csv")
+    assert len(first) == 8
+    assert len(final) == 4
+    promoted = {(r["stop_loss_atr"], r["take_profit_atr"]) for r in first[:4]}
+    assert {(r["stop_loss_atr"], r["take_profit_atr"]) for r in final} == promoted
@@ -0,0 +1,123 @@
+"""
+Tests for LocalDB's pooled connections, pragmas, schema versioning and bulk inserts.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import sqlite3
+import threading
+
+from src.utils import db_local
+from src.utils.db_local import LocalDB
+
+
+def test_connection_is_reused_per_thread_and_tuned(tmp_path):
+    path = tmp_path / "bt.db"
+    a, b = LocalDB(path), LocalDB(path)
+    conn = a._connection()
+    assert b._connection() is conn
+
+    other: list[sqlite3.Connection] = []
+    t = threading.Thread(target=lambda: other.append(LocalDB(path)._connection()))
+    t.start()
+    t.join()
+    assert other[0] is not conn
+
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    a.close()
+
+
+def test_schema_migrations_run_once(tmp_path, monkeypatch):
+    path = tmp_path / "bt.db"
+    db = LocalDB(path)
+    version = len(db_local._MIGRATIONS)
+    assert db._connection().execute("PRAGMA user_version").fetchone()[0] == version
+    db.close()
+
+    # A new connection on an up-to-date file applies nothing.
+    monkeypatch.setattr(db_local, "_MIGRATIONS", [*db_local._MIGRATIONS, "CREATE TABLE probe (x INTEGER);"])
+    db = LocalDB(path)
+    db.close()
+    db = LocalDB(path)
+    conn = db._connection()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == version + 1
+    assert conn.execute("SELECT COUNT(*) FROM probe").fetchone()[0] == 0
+    db.close()
+
+
+_barrier = None
+
+
+def _init_worker(barrier) -> None:
+    global _barrier
+    _barrier = barrier
+
+
+def _open_and_report_version(path: str) -> int | str:
+    _barrier.wait()  # every process opens the file at the same moment
+    try:
+        return LocalDB(path)._connection().execute("PRAGMA user_version").fetchone()[0]
+    except Exception as exc:
+        return repr(exc)
+
+
+def test_concurrent_processes_migrate_once(tmp_path):
+    path = tmp_path / "bt.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(db_local._MIGRATIONS[0])
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    ctx = multiprocessing.get_context("fork")
+    with ctx.Pool(8, initializer=_init_worker, initargs=(ctx.Barrier(8),)) as pool:
+        versions = pool.map(_open_and_report_version, [str(path)] * 8)
+
+    assert versions == [len(db_local._MIGRATIONS)] * 8
+
+
+def test_spill_rows_from_before_seq_keep_their_order(tmp_path):
+    path = tmp_path / "bt.db"
+    conn = sqlite3.connect(path)
+    for script in db_local._MIGRATIONS[:2]:
+        conn.executescript(script)
+    conn.executemany(
+        "INSERT INTO write_spill (created_at, op, table_name, payload_json) VALUES ('', 'insert', 't', ?)",
+        [('{"id": 1}',), ('{"id": 2}',)],
+    )
+    conn.execute("PRAGMA user_version = 2")
+    conn.commit()
+    conn.close()
+
+    db = LocalDB(path)
+    assert db.max_spilled_seq() == 2
+    db.spill_writes([(4, "insert", "t", '{"id": 4}', "null"), (3, "insert", "t", '{"id": 3}', "null")])
+    assert [r["payload_json"] for r in db.get_spilled_writes()] == [f'{{"id": {i}}}' for i in (1, 2, 3, 4)]
+    assert [r["seq"] for r in db.get_spilled_writes(before_seq=4)] == [1, 2, 3]
+    db.close()
+
+
+def test_bulk_inserts_and_rollback(tmp_path):
+    db = LocalDB(tmp_path / "bt.db")
+    orders = [{"id": f"o{i}", "symbol": "SPY", "side": "buy", "qty": 1} for i in range(50)]
+    assert db.insert_orders_batch(orders) == 50
+    db.insert_orders_batch(orders[:10])  # duplicates by supabase id are skipped
+    db.insert_signals_batch([{"id": f"s{i}", "signal_type": "trade", "data": {"i": i}} for i in range(20)])
+    run_id = db.insert_backtest_run({"start": "2024-01-01", "end": "2024-02-01"}, {}, {})
+    db.insert_backtest_trades(run_id, [{"symbol": "SPY", "entry_price": 1.0}] * 30)
+
+    stats = db.stats()
+    assert (stats["trading_orders"], stats["trading_signals"], stats["backtest_trades"]) == (50, 20, 30)
+
+    # A failing statement rolls back its whole transaction on the pooled connection.
+    try:
+        with db._connect() as conn:
+            conn.execute("DELETE FROM trading_orders")
+            conn.execute("INSERT INTO no_such_table VALUES (1)")
+    except sqlite3.OperationalError:
+        pass
+    assert db.stats()["trading_orders"] == 50
+    db.close()
@@ -0,0 +1,143 @@
+"""
+Tests for the partitioned market data cache and DataLoader gap downloads.
+"""
+
+from __future__ import annotations
+
+import sys
+from datetime import date
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest.data_loader import DataLoader
+from src.backtest.market_cache import MarketDataCache, _subtract_spans
+
+
+def _bars(start: str, end: str, tz: str | None = "UTC") -> pd.DataFrame:
+    idx = pd.bdate_range(start, end, tz=tz, name="timestamp")
+    close = np.linspace(100.0, 110.0, len(idx))
+    return pd.DataFrame(
+        {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1_000.0},
+        index=idx,
+    )
+
+
+@pytest.fixture
+def loader(tmp_path, monkeypatch):
+    """DataLoader whose provider returns synthetic bars and records each request."""
+    calls: list[tuple[tuple[str, ...], date, date]] = []
+
+    def fake_download(self, symbols, start, end, timeframe):
+        calls.append((tuple(symbols), start, end))
+        return {sym: _bars(str(start), str(end)) for sym in symbols}
+
+    monkeypatch.setattr(DataLoader, "_download_batch_yfinance", fake_download)
+    dl = DataLoader(cache_dir=tmp_path, api_key="", secret_key="")
+    dl.calls = calls
+    return dl
+
+
+def test_subtract_spans():
+    covered = [(date(2024, 1, 5), date(2024, 1, 10)), (date(2024, 1, 20), date(2024, 1, 25))]
+    assert _subtract_spans(date(2024, 1, 1), date(2024, 1, 31), covered) == [
+        (date(2024, 1, 1), date(2024, 1, 4)),
+        (date(2024, 1, 11), date(2024, 1, 19)),
+        (date(2024, 1, 26), date(2024, 1, 31)),
+    ]
+    assert _subtract_spans(date(2024, 1, 6), date(2024, 1, 9), covered) == []
+
+
+def test_loader_only_downloads_missing_spans(loader, tmp_path):
+    first = loader.load(["SPY", "QQQ"], date(2024, 1, 1), date(2024, 2, 29))
+    assert loader.calls == [(("SPY", "QQQ"), date(2024, 1, 1), date(2024, 2, 29))]
+    assert len(first["SPY"]) == len(pd.bdate_range("2024-01-01", "2024-02-29"))
+
+    # Range fully covered -> no download, sliced read
+    loader.calls.clear()
+    inner = loader.load(["SPY"], date(2024, 1, 15), date(2024, 1, 19))
+    assert loader.calls == []
+    assert list(inner["SPY"].index.day) == [15, 16, 17, 18, 19]
+
+    # Extending the range fetches only the tail and merges into the store
+    wider = loader.load(["SPY"], date(2024, 1, 1), date(2024, 3, 15))
+    assert loader.calls == [(("SPY",), date(2024, 3, 1), date(2024, 3, 15))]
+    assert wider["SPY"].index.is_monotonic_increasing
+    assert not wider["SPY"].index.has_duplicates
+    assert len(wider["SPY"]) == len(pd.bdate_range("2024-01-01", "2024-03-15"))
+
+    files = sorted(p.name for p in (tmp_path / "store" / "1Day" / "SPY").glob("*.parquet"))
+    assert files == ["2024-01.parquet", "2024-02.parquet", "2024-03.parquet"]
+
+
+def test_regime_series_is_cached_after_first_load(loader, tmp_path):
+    first = loader.load_regime("^VIX", date(2024, 1, 1), date(2024, 1, 31))
+    assert loader.calls == [(("^VIX",), date(2024, 1, 1), date(2024, 1, 31))]
+
+    loader.calls.clear()
+    again = DataLoader(cache_dir=tmp_path).load_regime("^VIX", date(2024, 1, 8), date(2024, 1, 31))
+    assert loader.calls == []
+    pd.testing.assert_frame_equal(again, first.loc["2024-01-08":])
+
+
+def test_single_day_gap_is_downloaded(tmp_path, monkeypatch):
+    requests: list[tuple[str, str]] = []
+
+    class _Ticker:
+        def __init__(self, symbol: str) -> None:
+            pass
+
+        def history(self, start, end, interval, auto_adjust):
+            requests.append((start, end))
+            last = (pd.Timestamp(end) - pd.Timedelta(days=1)).strftime("%Y-%m-%d")  # end is exclusive
+            return _bars(start, last).rename(columns=str.capitalize)
+
+    monkeypatch.setitem(sys.modules, "yfinance", SimpleNamespace(Ticker=_Ticker))
+    dl = DataLoader(cache_dir=tmp_path, api_key="", secret_key="")
+    dl.load(["SPY"], date(2024, 3, 1), date(2024, 3, 6), timeframe="1Hour")
+
+    requests.clear()
+    data = dl.load(["SPY"], date(2024, 3, 1), date(2024, 3, 7), timeframe="1Hour")
+
+    assert requests == [("2024-03-07", "2024-03-08")]
+    assert data["SPY"].index[-1].date() == date(2024, 3, 7)
+    assert dl._store.missing_spans("SPY", "1Hour", date(2024, 3, 1), date(2024, 3, 7)) == []
+
+
+def test_empty_download_is_not_marked_fetched(tmp_path):
+    cache = MarketDataCache(tmp_path)
+    cache.merge("SPY", "1Day", None, date(2024, 1, 2), date(2024, 1, 5))
+    assert cache.missing_spans("SPY", "1Day", date(2024, 1, 2), date(2024, 1, 5)) == [
+        (date(2024, 1, 2), date(2024, 1, 5))
+    ]
+    # A weekend has nothing to fetch
+    cache.merge("SPY", "1Day", None, date(2024, 1, 6), date(2024, 1, 7))
+    assert cache.missing_spans("SPY", "1Day", date(2024, 1, 6), date(2024, 1, 7)) == []
+
+
+def test_merge_keeps_store_timezone_and_overwrites_duplicates(tmp_path):
+    cache = MarketDataCache(tmp_path)
+    cache.merge("SPY", "5Min", _bars("2024-01-02", "2024-01-05", tz="America/New_York"),
+                date(2024, 1, 2), date(2024, 1, 5))
+    update = _bars("2024-01-04", "2024-01-10", tz="America/New_York").tz_convert("UTC")
+    update["close"] = 1.0
+    cache.merge("SPY", "5Min", update, date(2024, 1, 4), date(2024, 1, 10))
+
+    df = cache.read("SPY", "5Min", date(2024, 1, 1), date(2024, 1, 31))
+    assert str(df.index.tz) == "America/New_York"
+    assert len(df) == len(pd.bdate_range("2024-01-02", "2024-01-10"))
+    assert (df.loc["2024-01-04":, "close"] == 1.0).all()
+
+
+def test_legacy_files_are_imported(tmp_path):
+    legacy = _bars("2024-01-02", "2024-02-09")
+    legacy.to_parquet(tmp_path / "SPY_5Min_2024-01-01_2024-02-10.parquet")
+
+    cache = MarketDataCache(tmp_path)
+    assert cache.missing_spans("SPY", "5Min", date(2024, 1, 1), date(2024, 2, 10)) == []
+    df = cache.read("SPY", "5Min", date(2024, 1, 1), date(2024, 2, 10))
+    pd.testing.assert_frame_equal(df, legacy, check_freq=False)
+    # Imported once — a second cache instance does not re-import
+    assert MarketDataCache(tmp_path).missing_spans("SPY", "5Min", date(2024, 1, 1), date(2024, 2, 10)) == []
@@ -0,0 +1,120 @@
+"""
+Tests for the streaming metrics accumulator and calculate_metrics.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest.engine import BacktestConfig, BacktestEngine, BacktestResult, TradeRecord
+from src.backtest.metrics import MetricsAccumulator, calculate_metrics
+
+
+def _trade(pnl: float, reason: str, hold_days: int = 1) -> TradeRecord:
+    return TradeRecord(
+        symbol="SPY", action="BUY", entry_date="2024-01-02", entry_price=100.0,
+        exit_date="2024-01-03", exit_price=100.0 + pnl, shares=1, pnl=pnl, pnl_pct=pnl,
+        hold_days=hold_days, close_reason=reason, stop_loss=95.0, take_profit=110.0,
+        signal_score=0.5, signal_confidence=0.5,
+    )
+
+
+def _point(day: str, equity: float, drawdown_pct: float = 0.0, positions: int = 0) -> dict:
+    return {
+        "date": day, "equity": equity, "cash": equity, "positions_value": 0.0,
+        "drawdown_pct": drawdown_pct, "positions_count": positions,
+    }
+
+
+def _result(trades: list[TradeRecord], curve: list[dict], returns: list[float]) -> BacktestResult:
+    return BacktestResult(
+        config=BacktestConfig(start="2024-01-02", end="2024-03-01"),
+        trades=trades, equity_curve=curve, daily_returns=returns,
+        total_bars=len(curve), signals_generated=0, orders_filled=0,
+    )
+
+
+# ---------------------------------------------------------------------------
+# MetricsAccumulator
+# ---------------------------------------------------------------------------
+
+def test_trade_statistics_streaks_and_close_reasons():
+    pnls = [5.0, 3.0, -2.0, -1.0, -4.0, 6.0, 0.0]
+    reasons = ["take_profit", "take_profit", "stop_loss", "stop_loss", "signal_exit", "eod_close", "kill_switch"]
+    trades = [_trade(p, r, hold_days=i) for i, (p, r) in enumerate(zip(pnls, reasons))]
+    m = calculate_metrics(_result(trades, [], []))
+
+    assert (m.total_trades, m.winning_trades, m.losing_trades) == (7, 3, 4)
+    assert (m.max_win_streak, m.max_loss_streak) == (2, 3)
+    assert m.profit_factor == round(14.0 / 7.0, 2)
+    assert m.avg_win_pct == round(14.0 / 3, 2)
+    assert m.avg_loss_pct == round(-7.0 / 4, 2)
+    assert m.avg_hold_days == 3.0
+    assert (m.best_trade_pct, m.worst_trade_pct) == (6.0, -4.0)
+    assert (m.take_profit_count, m.stop_loss_count, m.signal_exit_count) == (2, 2, 1)
+    assert (m.eod_close_count, m.kill_switch_exit_count, m.nb_exit_count) == (1, 1, 0)
+
+
+def test_drawdown_duration_and_exposure():
+    curve = [
+        _point("2024-01-02", 100_000),
+        _point("2024-01-03", 95_000, -5.0, positions=1),
+        _point("2024-01-10", 98_000, -2.0, positions=2),
+        _point("2024-01-12", 101_000, positions=1),   # recovered after 9 days
+        _point("2024-01-15", 90_900, -10.0),
+        _point("2024-01-16", 102_000),                # recovered after 1 day
+    ]
+    m = calculate_metrics(_result([], curve, []))
+
+    assert m.max_drawdown_pct == -10.0
+    assert m.max_drawdown_duration_days == 9
+    assert m.avg_drawdown_pct == round((-5.0 - 2.0 - 10.0) / 3, 2)
+    assert m.exposure_pct == 50.0
+    assert m.avg_positions == round(4 / 6, 1)
+    assert m.final_equity == 102_000
+
+
+def test_volatility_matches_numpy_sample_std():
+    rng = np.random.default_rng(7)
+    returns = rng.normal(0.0005, 0.01, 500).tolist()
+    acc = MetricsAccumulator(100_000)
+    for r in returns:
+        acc.add_return(r)
+
+    assert acc._returns.std() == pytest.approx(np.std(returns, ddof=1), rel=1e-12)
+    negative = [r for r in returns if r < 0]
+    assert acc._downside.std() == pytest.approx(np.std(negative, ddof=1), rel=1e-12)
+
+
+def test_degenerate_return_series():
+    acc = MetricsAccumulator(100_000)
+    assert acc.snapshot().annualized_volatility_pct == 0.0
+
+    acc.add_return(0.01)
+    acc.add_return(-0.02)  # a single losing bar: downside deviation undefined
+    m = acc.snapshot()
+    assert m.annualized_volatility_pct > 0
+    assert m.sortino_ratio == 0.0
+
+
+# ---------------------------------------------------------------------------
+# Engine — live metrics while running, identical to the final report
+# ---------------------------------------------------------------------------
+
+def test_live_metrics_match_calculate_metrics():
+    rng = np.random.default_rng(3)
+    idx = pd.bdate_range("2023-01-02", periods=300, tz="UTC")
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.015, len(idx))))
+    bars = pd.DataFrame(
+        {"open": close, "high": close * 1.01, "low": close * 0.99, "close": close, "volume": 1e6},
+        index=idx,
+    )
+    config = BacktestConfig(start=idx[0].date(), end=idx[-1].date(), entry_threshold=0.0)
+    engine = BacktestEngine(config)
+    result = engine.run({"SPY": bars, "QQQ": bars * 1.5})
+
+    assert engine.live_metrics() == calculate_metrics(result)
+    assert engine._metrics.points == len(result.equity_curve)
+    assert engine._metrics.peak == max(p["equity"] for p in result.equity_curve)
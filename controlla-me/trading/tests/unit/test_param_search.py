@@ -0,0 +1,134 @@
+"""
+Tests for the adaptive (TPE) parameter search and its persisted studies.
+"""
+
+from __future__ import annotations
+
+import csv
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.backtest import grid_search, param_search
+from src.backtest.param_search import Dimension, TPESampler, space_from_grid
+from src.utils.db_local import LocalDB
+from tests.unit.conftest import daily_bars
+
+
+# ---------------------------------------------------------------------------
+# Search space
+# ---------------------------------------------------------------------------
+
+def test_space_from_grid_keeps_grid_points_reachable():
+    space = {d.name: d for d in space_from_grid(grid_search.CYCLE4_GRID)}
+
+    sl = space["stop_loss_atr"]
+    assert (sl.low, sl.high, sl.step) == (1.5, 2.5, 0.5)
+    for value in grid_search.CYCLE4_GRID["take_profit_atr"]:
+        d = space["take_profit_atr"]
+        assert d.from_unit(d.to_unit(value)) == value
+    assert space["signal_exit_enabled"].choices == (False, True)
+    assert space["max_positions"].choices == (10,)
+
+
+def test_integer_dimension_stays_integer():
+    d = Dimension("max_positions", 2, 12, 1)
+    values = {d.from_unit(u) for u in np.linspace(0, 1, 50)}
+    assert values == set(range(2, 13))
+
+
+# ---------------------------------------------------------------------------
+# TPESampler
+# ---------------------------------------------------------------------------
+
+def _toy_objective(p: dict) -> float:
+    """Maximum 0.2 at x=0.7, y=-2, z=3, flag=True."""
+    return (
+        -((p["x"] - 0.7) ** 2)
+        - ((p["y"] + 2.0) ** 2) / 4
+        - ((p["z"] - 3) ** 2) / 10
+        + (0.2 if p["flag"] else 0.0)
+    )
+
+
+def _best_after(sampler: TPESampler, n: int) -> float:
+    trials: list[tuple[dict, float]] = []
+    for _ in range(n):
+        params = sampler.propose(trials)
+        trials.append((params, _toy_objective(params)))
+    return max(v for _, v in trials)
+
+
+def test_tpe_beats_random_search_on_same_budget():
+    space = [
+        Dimension("x", -3.0, 3.0, 0.05),
+        Dimension("y", -5.0, 5.0, 0.1),
+        Dimension("z", 0, 10, 1),
+        Dimension("flag", choices=(False, True)),
+    ]
+    tpe = [_best_after(TPESampler(space, n_startup=8, seed=s), 40) for s in range(8)]
+    rand = [_best_after(TPESampler(space, n_startup=10_000, seed=s), 40) for s in range(8)]
+
+    assert np.mean(tpe) > np.mean(rand) + 0.3
+    assert np.median(tpe) > -0.2
+
+
+def test_batch_proposals_are_distinct():
+    space = [Dimension("x", 0.0, 1.0, 0.25), Dimension("flag", choices=(True, False))]
+    sampler = TPESampler(space, n_startup=2, seed=0)
+    trials = [({"x": 0.0, "flag": True}, 1.0), ({"x": 1.0, "flag": False}, 0.0)]
+    batch: list[dict] = []
+    for _ in range(6):
+        batch.append(sampler.propose(trials, pending=batch))
+
+    keys = {tuple(sorted(p.items())) for p in batch} | {tuple(sorted(p.items())) for p, _ in trials}
+    assert len(keys) == 8
+
+
+# ---------------------------------------------------------------------------
+# run_param_search — trials persist and a rerun resumes the study
+# ---------------------------------------------------------------------------
+
+def test_search_resumes_from_db(tmp_path, monkeypatch):
+    data = {sym: daily_bars(260, seed=i) for i, sym in enumerate(["SPY", "AAPL"])}
+    monkeypatch.setattr(param_search.DataLoader, "__init__", lambda self, *a, **k: None)
+    monkeypatch.setattr(param_search.DataLoader, "load", lambda self, *a, **k: data)
+    db_path = tmp_path / "search.db"
+    space = space_from_grid(grid_search.CYCLE4B_GRID)
+    kwargs = dict(
+        symbols=list(data), start=date(2023, 1, 2), end=date(2023, 12, 29), space=space,
+        study_name="resume", batch_size=2, n_startup=3, seed=1, use_cache=False,
+        output_dir=tmp_path / "out", db_path=db_path,
+    )
+
+    param_search.run_param_search(n_trials=4, **kwargs)
+    db = LocalDB(db_path)
+    study_id = db.get_search_study("resume")["id"]
+    first = db.get_search_trials(study_id)
+    assert len(first) == 4
+
+    out = param_search.run_param_search(n_trials=7, workers=2, **kwargs)
+    trials = db.get_search_trials(study_id)
+    assert [t["params"] for t in trials[:4]] == [t["params"] for t in first]
+    assert [t["number"] for t in trials] == list(range(7))
+    assert all(t["status"] == "complete" for t in trials)
+
+    with open(out / "search_results.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 7
+    assert float(rows[0]["sharpe_ratio"]) == max(t["value"] for t in trials)
+
+
+def test_resume_rejects_changed_space_or_settings(tmp_path):
+    db = LocalDB(tmp_path / "search.db")
+    space = space_from_grid(grid_search.CYCLE4B_GRID)
+    settings = {"start": date(2023, 1, 2), "end": date(2023, 12, 29), "timeframe": "1Day", "objective": "sharpe_ratio"}
+    study = param_search.SearchStudy("s", space, settings, db)
+    assert param_search.SearchStudy("s", list(space), dict(settings), db).study_id == study.study_id
+
+    with pytest.raises(ValueError, match="different settings"):
+        param_search.SearchStudy("s", space, settings | {"timeframe": "1Hour"}, db)
+    with pytest.raises(ValueError, match="different space"):
+        param_search.SearchStudy("s", space[:-1], settings, db)
+    assert len(db.get_search_trials(study.study_id)) == 0
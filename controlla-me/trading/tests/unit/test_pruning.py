@@ -0,0 +1,96 @@
+"""
+Tests for early stopping (prune predicates) and successive-halving helpers.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest.engine import BacktestConfig, BacktestEngine
+from src.backtest.metrics import calculate_metrics
+from src.backtest.pruning import PruneRule, halving_windows, promote
+
+
+def _daily_bars(n_days: int, seed: int, drift: float = 0.0005) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2023-01-02", periods=n_days, tz="UTC", name="timestamp")
+    close = 100.0 * np.exp(np.cumsum(rng.normal(drift, 0.015, n_days)))
+    return pd.DataFrame(
+        {"open": close, "high": close * 1.01, "low": close * 0.99, "close": close, "volume": 1e6},
+        index=idx,
+    )
+
+
+def _config(**overrides) -> BacktestConfig:
+    return BacktestConfig(start=date(2023, 1, 2), end=date(2024, 2, 28), **overrides)
+
+
+# ---------------------------------------------------------------------------
+# Engine prune hook
+# ---------------------------------------------------------------------------
+
+def test_predicate_stops_run_at_checkpoint():
+    data = {"SPY": _daily_bars(300, seed=1)}
+    calls: list[float] = []
+
+    def stop_at_half(metrics, progress):
+        calls.append(progress)
+        return "half way" if progress >= 0.5 else None
+
+    result = BacktestEngine(_config()).run(data, prune=stop_at_half, prune_every=10)
+
+    assert result.pruned
+    assert result.pruned_reason == "half way"
+    assert calls == [pytest.approx(10 * k / 300) for k in range(1, 16)]
+    assert len(result.equity_curve) == 150
+    assert all(t.exit_date <= result.equity_curve[-1]["date"] for t in result.trades)
+
+
+def test_unpruned_run_is_identical_to_plain_run():
+    data = {"SPY": _daily_bars(300, seed=2), "QQQ": _daily_bars(300, seed=3)}
+    plain = BacktestEngine(_config()).run(data)
+    watched = BacktestEngine(_config()).run(data, prune=lambda m, p: False, prune_every=5)
+
+    assert not watched.pruned
+    assert watched.model_dump() == plain.model_dump()
+
+
+def test_prune_rule_drawdown_and_idle():
+    rule = PruneRule(max_drawdown_pct=15.0, min_trades=1, idle_fraction=0.25)
+    data = {"SPY": _daily_bars(300, seed=4)}
+    metrics = calculate_metrics(BacktestEngine(_config()).run(data))
+
+    assert rule(metrics, 0.1) is None or abs(metrics.max_drawdown_pct) >= 15.0
+    metrics.max_drawdown_pct = -16.0
+    assert rule(metrics, 0.1).startswith("max_drawdown")
+    metrics.max_drawdown_pct = -1.0
+    metrics.total_trades = 0
+    assert rule(metrics, 0.2) is None
+    assert "0 trades" in rule(metrics, 0.3)
+
+
+# ---------------------------------------------------------------------------
+# Successive halving helpers
+# ---------------------------------------------------------------------------
+
+def test_halving_windows():
+    start, end = date(2023, 1, 1), date(2023, 12, 27)  # 360 days
+    assert halving_windows(start, end, 1, 3) == [end]
+    assert halving_windows(start, end, 3, 3) == [date(2023, 2, 10), date(2023, 5, 1), end]
+    with pytest.raises(ValueError):
+        halving_windows(start, end, 2, 1.0)
+
+
+def test_promote_ranks_pruned_last():
+    rows = [
+        (1, {"sharpe_ratio": 0.5, "pruned": ""}),
+        (2, {"sharpe_ratio": 2.0, "pruned": "max_drawdown -20.0%"}),
+        (3, {"sharpe_ratio": 0.5, "pruned": ""}),
+        (4, {"sharpe_ratio": 1.0, "pruned": ""}),
+    ]
+    assert promote(rows, 2) == [4, 1]
+    assert promote(rows, 4) == [4, 1, 3, 2]
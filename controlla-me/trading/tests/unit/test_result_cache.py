@@ -0,0 +1,70 @@
+"""
+Tests for the backtest result cache (config + data fingerprint memoization).
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+from src.backtest import result_cache
+from src.backtest.engine import BacktestConfig
+from src.backtest.result_cache import ResultCache, cache_key, data_fingerprint, run_backtest
+from src.utils.db_local import LocalDB
+from tests.unit.conftest import daily_bars
+
+
+def _config(**overrides) -> BacktestConfig:
+    return BacktestConfig(start=date(2023, 1, 2), end=date(2023, 12, 29), **overrides)
+
+
+class TestKeys:
+    def test_fingerprint_tracks_values_index_and_symbols(self):
+        spy = daily_bars(50, seed=1)
+        base = data_fingerprint({"SPY": spy})
+
+        assert data_fingerprint({"SPY": spy.copy()}) == base
+        assert data_fingerprint({"QQQ": spy}) != base
+        assert data_fingerprint({"SPY": spy.iloc[:-1]}) != base
+        bumped = spy.copy()
+        bumped.iloc[10, 3] += 0.01
+        assert data_fingerprint({"SPY": bumped}) != base
+        assert data_fingerprint({"SPY": spy}, daily_data={"SPY": spy}) != base
+
+    def test_key_ignores_engine_choice_only(self):
+        fp = "x"
+        assert cache_key(_config(), fp) == cache_key(_config(engine="vectorized"), fp)
+        assert cache_key(_config(), fp) != cache_key(_config(stop_loss_atr=2.7), fp)
+        assert cache_key(_config(), fp) != cache_key(_config(), "y")
+
+
+class TestResultCache:
+    def test_hit_skips_engine_and_returns_same_result(self, tmp_path, monkeypatch):
+        data = {"SPY": daily_bars(260, seed=1), "AAPL": daily_bars(260, seed=2)}
+        cache = ResultCache(tmp_path / "bt.db")
+        result, metrics = run_backtest(_config(), data, cache=cache)
+
+        def boom(*args, **kwargs):
+            raise AssertionError("engine should not run on a cache hit")
+
+        monkeypatch.setattr(result_cache.BacktestEngine, "run", boom)
+        cached_result, cached_metrics = run_backtest(_config(), data, cache=cache)
+
+        assert cached_result.model_dump() == result.model_dump()
+        assert cached_metrics == metrics
+        assert len(result.trades) > 0
+
+    def test_lru_eviction_by_count_and_size(self, tmp_path):
+        db = LocalDB(tmp_path / "bt.db")
+        for key in ("a", "b", "c"):
+            db.put_cached_result(key, {}, b"x" * 100)
+        assert db.get_cached_result("a") is not None  # a is now most recently used
+
+        assert db.evict_cached_results(max_entries=2, max_bytes=10_000) == 1
+        assert db.get_cached_result("b") is None
+        assert db.evict_cached_results(max_entries=10, max_bytes=150) == 1
+        assert db.stats()["backtest_cache"] == 1
+
+    def test_corrupt_payload_is_a_miss(self, tmp_path):
+        cache = ResultCache(tmp_path / "bt.db")
+        LocalDB(tmp_path / "bt.db").put_cached_result("k", {}, b"not zlib")
+        assert cache.get("k") is None
@@ -210,6 +210,191 @@ class TestAnalyzeSlopeVolume:
         assert result is None
 
 
+# ---------------------------------------------------------------------------
+# IndicatorEngine — precomputed series must match the per-bar slicing path
+# ---------------------------------------------------------------------------
+
+class TestIndicatorEngineParity:
+    """The backtest reads precomputed indicators at bar i; the legacy path
+    re-analyzes df.iloc[:i + 1]. Signals must be identical on every bar."""
+
+    def _frame(self, **kwargs) -> pd.DataFrame:
+        wave = TestAnalyzeSlopeVolume()._wave_closes(60)
+        return _make_ohlcv(wave + wave[::-1] + wave, **kwargs)
+
+    def _config(self, **kwargs):
+        from src.backtest.engine import BacktestConfig
+
+        return BacktestConfig(start="2024-01-15", end="2024-01-16", **kwargs)
+
+    def _assert_parity(self, config, df: pd.DataFrame, legacy, df_daily=None) -> int:
+        """Compare every bar; return how many bars produced a signal."""
+        from src.backtest.engine import _signal_from_dict, get_indicator_periods
+        from src.backtest.indicators import IndicatorEngine
+
+        engine = IndicatorEngine(config, get_indicator_periods(config.timeframe))
+        engine.prepare({"SPY": df}, list(df.index))
+
+        hits = 0
+        for i in range(len(df)):
+            expected = legacy(df.iloc[: i + 1])
+            signal = _signal_from_dict(engine.entry_signal("SPY", i, df_daily))
+            assert signal == expected, f"bar {i}"
+            hits += expected is not None
+        return hits
+
+    def test_slope_volume_parity(self):
+        from src.backtest.engine import analyze_stock_slope_volume
+
+        config = self._config(
+            timeframe="5Min",
+            strategy="slope_volume",
+            slope_lookback_bars=5,
+            slope_threshold_pct=0.01,
+            slope_acceleration_bars=3,
+            slope_min_acceleration_pct=0.001,
+            slope_persistence_bars=3,
+            slope_volume_multiplier=1.0,
+        )
+        df = self._frame(volume_multiplier=3.0, growing_volume=True)
+
+        def legacy(df_slice):
+            return analyze_stock_slope_volume(
+                "SPY",
+                df_slice,
+                lookback_bars=config.slope_lookback_bars,
+                slope_threshold_pct=config.slope_threshold_pct,
+                volume_multiplier=config.slope_volume_multiplier,
+                volume_ma_period=config.slope_volume_ma_period,
+                stop_loss_atr=config.stop_loss_atr,
+                take_profit_atr=config.take_profit_atr,
+                acceleration_bars=config.slope_acceleration_bars,
+                min_acceleration_pct=config.slope_min_acceleration_pct,
+                volume_trend_bars=config.slope_volume_trend_bars,
+                persistence_bars=config.slope_persistence_bars,
+            )
+
+        assert self._assert_parity(config, df, legacy) > 0
+
+    @pytest.mark.parametrize("anticipatory", [False, True])
+    def test_slope_volume_candidates_cover_every_signal(self, anticipatory):
+        from src.backtest.engine import get_indicator_periods
+        from src.backtest.indicators import IndicatorEngine
+
+        config = self._config(
+            timeframe="5Min",
+            strategy="slope_volume",
+            slope_lookback_bars=5,
+            slope_threshold_pct=0.01,
+            slope_acceleration_bars=3,
+            slope_min_acceleration_pct=0.001,
+            slope_persistence_bars=3,
+            slope_volume_multiplier=1.0,
+            slope_anticipatory=anticipatory,
+        )
+        df = self._frame(volume_multiplier=3.0, growing_volume=True)
+        engine = IndicatorEngine(config, get_indicator_periods("5Min"))
+        engine.prepare({"SPY": df}, list(df.index))
+
+        candidates = engine.entry_candidates("SPY")
+        signals = [engine.signal_at("SPY", i) is not None for i in range(len(df))]
+        assert any(signals)
+        assert not any(hit and not candidates[i] for i, hit in enumerate(signals))
+        assert candidates.sum() < len(df)
+
+    def test_composite_parity(self):
+        from src.backtest.engine import analyze_stock
+
+        config = self._config(timeframe="1Hour", strategy="trend_following")
+        df = self._frame(freq="1h", growing_volume=True)
+
+        def legacy(df_slice):
+            return analyze_stock(
+                "SPY",
+                df_slice,
+                config.signal,
+                threshold=config.signal_threshold,
+                stop_loss_atr=config.stop_loss_atr,
+                take_profit_atr=config.take_profit_atr,
+                trend_filter=config.trend_filter,
+                timeframe=config.timeframe,
+            )
+
+        assert self._assert_parity(config, df, legacy) > 0
+
+    def _mean_reversion_frame(self) -> pd.DataFrame:
+        # Second descent (bars ~141-151) lands in the 14-20 UTC window; every
+        # third bar carries a volume spike so the volume gate can pass.
+        df = self._frame(volume_multiplier=3.0, start="2024-01-15 03:00")
+        df.loc[df.index[::3], "volume"] *= 3
+        return df
+
+    def test_mean_reversion_parity(self):
+        from src.backtest.engine import analyze_stock_mean_reversion
+
+        config = self._config(timeframe="15Min", strategy="mean_reversion")
+
+        def legacy(df_slice):
+            return analyze_stock_mean_reversion(
+                "SPY",
+                df_slice,
+                config.signal,
+                threshold=config.signal_threshold,
+                stop_loss_atr=config.stop_loss_atr,
+                take_profit_atr=config.take_profit_atr,
+                timeframe=config.timeframe,
+            )
+
+        assert self._assert_parity(config, self._mean_reversion_frame(), legacy) > 0
+
+    @pytest.mark.parametrize("daily_trend", [None, 1.0, -1.0])
+    def test_mean_reversion_v3_parity(self, daily_trend):
+        from src.backtest.engine import analyze_stock_mean_reversion_v3
+
+        config = self._config(timeframe="15Min", strategy="mean_reversion_v3")
+        daily = None
+        if daily_trend is not None:
+            daily = _make_ohlcv([100.0 + daily_trend * i for i in range(25)], freq="1D", start="2023-12-20")
+
+        def legacy(df_slice):
+            return analyze_stock_mean_reversion_v3("SPY", df_slice, daily, config.signal, config)
+
+        hits = self._assert_parity(config, self._mean_reversion_frame(), legacy, df_daily=daily)
+        assert (hits == 0) == (daily_trend == -1.0)  # daily downtrend blocks every entry
+
+    @pytest.mark.parametrize("daily_tz", ["UTC", "America/New_York", None])
+    def test_mean_reversion_v3_daily_index_matches_slicing(self, daily_tz):
+        from src.backtest.engine import get_indicator_periods
+        from src.backtest.indicators import IndicatorEngine
+
+        config = self._config(timeframe="15Min", strategy="mean_reversion_v3", daily_sma_period=5)
+        df = self._mean_reversion_frame()
+        df.index = pd.date_range("2024-01-15 03:00", periods=len(df), freq="15min", tz="UTC")  # 3 days
+        # Daily closes zig-zag around their SMA so the filter flips between days
+        closes = [100.0 + (3.0 if (i + 1) % 4 < 2 else -3.0) + 0.1 * i for i in range(40)]
+        daily = _make_ohlcv(closes, freq="1D", start="2023-12-20")
+        daily.index = daily.index.tz_localize(None)
+        if daily_tz is not None:
+            daily.index = daily.index.tz_localize(daily_tz)
+
+        engine = IndicatorEngine(config, get_indicator_periods("15Min"))
+        engine.prepare({"SPY": df}, list(df.index), {"SPY": daily})
+
+        refs, hits = set(), 0
+        for i, ts in enumerate(df.index):
+            # Legacy per-bar slice: daily rows dated up to the bar's calendar day
+            ts_day = pd.Timestamp(ts.date())
+            if daily.index.tz is not None:
+                ts_day = ts_day.tz_localize(daily.index.tz)
+            daily_slice = daily[daily.index.normalize() <= ts_day]
+            expected = engine.entry_signal("SPY", i, daily_slice if len(daily_slice) else None)
+            assert engine.entry_signal("SPY", i) == expected, f"bar {i}"
+            refs.add(engine.daily_reference("SPY", i))
+            hits += expected is not None
+        assert len(refs) > 1
+        assert hits > 0
+
+
 # ---------------------------------------------------------------------------
 # Trailing stop state machine logic
 # ---------------------------------------------------------------------------
@@ -356,6 +541,107 @@ class TestTrailingStopLogic:
             previous_stop = new_stop
 
 
+    def test_vectorized_levels_match_scalar_ladder(self):
+        """trailing_stop_levels == the per-position ladder for every position."""
+        from src.agents.portfolio_monitor import trailing_stop_levels
+        from src.config.settings import RiskSettings
+
+        risk = RiskSettings.model_construct(
+            trailing_breakeven_atr=1.5,
+            trailing_lock_atr=1.5,
+            trailing_lock_cushion_atr=0.5,
+            trailing_trail_threshold_atr=3.5,
+            trailing_trail_distance_atr=2.0,
+            trailing_tight_threshold_atr=4.0,
+            trailing_tight_distance_atr=1.0,
+        )
+        rng = np.random.default_rng(7)
+        n = 200
+        entry = rng.uniform(20, 500, n)
+        atr = entry * rng.uniform(0.005, 0.05, n)
+        highest = entry + atr * rng.uniform(-1, 6, n)
+        stop = entry - atr * 2.5
+
+        _, new_stop, tier = trailing_stop_levels(
+            entry, atr, highest, highest, np.zeros(n, dtype=int), stop, risk
+        )
+        for i in range(n):
+            expected_stop, expected_tier = self._compute_new_stop(entry[i], highest[i], atr[i], stop[i])
+            assert round(new_stop[i], 4) == expected_stop
+            assert tier[i] == expected_tier
+
+
+class TestTrailingStopBatch:
+    """_update_trailing_stops: one bulk upsert, concurrent stop replacements."""
+
+    @staticmethod
+    def _monitor(n_positions: int):
+        import threading
+        import time
+
+        from src.agents.portfolio_monitor import PortfolioMonitor
+        from src.config.settings import RiskSettings
+
+        with patch.object(PortfolioMonitor, "__init__", lambda self: None):
+            monitor = PortfolioMonitor.__new__(PortfolioMonitor)
+        monitor.logger = MagicMock()
+        monitor._risk = RiskSettings.model_construct(trailing_replace_workers=8)
+
+        symbols = [f"S{i:02d}" for i in range(n_positions)]
+        monitor._alpaca = MagicMock()
+        monitor._alpaca.get_positions.return_value = [
+            {"symbol": s, "current_price": 110.0} for s in symbols
+        ]
+        monitor._db = MagicMock()
+        monitor._db.get_all_trailing_stop_states.return_value = [
+            {
+                "symbol": s, "entry_price": 100.0, "atr_at_entry": 2.0, "highest_close": 104.0,
+                "current_stop_price": 95.0, "original_stop_price": 95.0,
+                "stop_order_id": f"old-{s}", "take_profit_price": None, "tier_reached": 1,
+            }
+            for s in symbols
+        ]
+
+        in_flight = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def replace(order_id, stop_price):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            time.sleep(0.02)
+            with lock:
+                in_flight["now"] -= 1
+            if order_id == "old-S00":
+                raise RuntimeError("order not found")
+            return {"order_id": order_id.replace("old", "new")}
+
+        monitor._alpaca.replace_order_stop_price.side_effect = replace
+        monitor._alpaca.get_orders.return_value = [{"symbol": "S00", "type": "stop", "order_id": "relinked"}]
+        return monitor, in_flight
+
+    def test_batch_update_for_many_positions(self):
+        monitor, in_flight = self._monitor(32)
+        updates = monitor._update_trailing_stops()
+
+        # profit 10 = 5 ATR → tight trail: 110 - 1 ATR = 108
+        assert len(updates) == 31
+        assert {u["new_stop"] for u in updates} == {108.0}
+        assert in_flight["peak"] > 1
+
+        monitor._db.upsert_trailing_stop_state.assert_not_called()
+        monitor._db.upsert_trailing_stop_states.assert_called_once()
+        (saved,), _ = monitor._db.upsert_trailing_stop_states.call_args
+        by_symbol = {s["symbol"]: s for s in saved}
+        assert len(saved) == 32
+        assert by_symbol["S05"]["stop_order_id"] == "new-S05"
+        assert by_symbol["S00"]["stop_order_id"] == "relinked"
+        assert by_symbol["S00"]["current_stop_price"] == 108.0
+        assert by_symbol["S05"]["tier_reached"] == 4
+        assert by_symbol["S05"]["highest_close"] == 110.0
+        monitor._alpaca.get_orders.assert_called_once()
+
+
 # ---------------------------------------------------------------------------
 # SHORT/COVER signal actions
 # ---------------------------------------------------------------------------
@@ -499,3 +785,55 @@ class TestRiskManagerShortRejection:
         decision = mgr._validate_signal(signal, 100_000, 50_000, [])
         assert decision.status == RiskDecisionStatus.REJECTED
         assert "No open position to sell" in decision.reason
+
+
+# ---------------------------------------------------------------------------
+# SignalGenerator.run_slope_volume — one batched fetch, concurrent analysis
+# ---------------------------------------------------------------------------
+
+class TestSlopeVolumeBatchFetch:
+    """run_slope_volume fetches every symbol in one call and keeps watchlist order."""
+
+    class _FakeMarketData:
+        def __init__(self, bars: dict[str, pd.DataFrame]) -> None:
+            self.bars = bars
+            self.calls: list[list[str]] = []
+
+        def get_latest_bars_multi(self, symbols, timeframe="5Min", n_bars=60):
+            self.calls.append(list(symbols))
+            return {s: self.bars[s] for s in symbols if s in self.bars}
+
+    def _make_generator(self, market_data, positions):
+        from src.agents.signal_generator import SignalGenerator
+
+        with patch.object(SignalGenerator, "__init__", lambda self: None):
+            gen = SignalGenerator.__new__(SignalGenerator)
+            gen.name = "signal_generator"
+            gen.logger = MagicMock()
+            gen._alpaca = MagicMock()
+            gen._alpaca.get_positions.return_value = positions
+            gen._market_data = market_data
+            gen._db = MagicMock()
+            gen._news_client = None
+            return gen
+
+    def test_single_fetch_and_ordered_exits(self):
+        from src.config.settings import SlopeVolumeSettings
+
+        falling = _make_ohlcv([100.0 - 0.2 * i for i in range(80)], freq="1min")
+        flat = _make_ohlcv([100.0] * 80, freq="1min")
+        market = self._FakeMarketData({"SPY": flat, "XLK": falling, "AAPL": falling})
+        positions = [{"symbol": "AAPL", "qty": 10}, {"symbol": "XLK", "qty": 5}]
+        gen = self._make_generator(market, positions)
+        cfg = MagicMock()
+        cfg.slope_volume = SlopeVolumeSettings.model_construct(
+            symbols=["SPY", "QQQ", "XLK"], analysis_workers=4
+        )
+
+        with patch("src.agents.signal_generator.get_settings", return_value=cfg):
+            out = gen.run_slope_volume()
+
+        assert market.calls == [["SPY", "QQQ", "XLK", "AAPL"]]
+        assert [(s["symbol"], s["action"]) for s in out["signals"]] == [("XLK", "SELL"), ("AAPL", "SELL")]
+        assert out["symbols_with_signals"] == 2
+        gen._db.insert_signal.assert_called_once()
@@ -0,0 +1,172 @@
+"""
+Tests for event-driven fill tracking (FillTracker + Executor._wait_for_fill)
+against a local trade-update stream stub.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from src.agents import executor as executor_module
+from src.connectors.trade_updates import FillTracker
+
+
+class _StubStream:
+    """Local stand-in for alpaca TradingStream: replays queued trade updates."""
+
+    def __init__(self) -> None:
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.handler = None
+        self.stopped = False
+
+    def subscribe_trade_updates(self, handler) -> None:
+        self.handler = handler
+
+    async def _run_forever(self) -> None:
+        while True:
+            event = await self.queue.get()
+            await self.handler(event)
+
+    async def stop_ws(self) -> None:
+        self.stopped = True
+
+    def push(self, order_id: str, status: str, **fields) -> None:
+        order = {"order_id": order_id, "status": status, **fields}
+        self.queue.put_nowait(SimpleNamespace(event=status, order=order))
+
+
+def _unexpected_fetch(order_id: str) -> dict:
+    raise AssertionError(f"fallback lookup for {order_id} while the stream delivered events")
+
+
+def test_concurrent_orders_resolve_from_stream_events():
+    async def scenario():
+        stream = _StubStream()
+        tracker = FillTracker(_unexpected_fetch, stream=stream, poll_interval=5.0)
+        await tracker.start()
+        waits = [asyncio.create_task(tracker.wait_for_fill(oid, timeout=10)) for oid in ("A", "B")]
+        await asyncio.sleep(0)
+        stream.push("A", "partially_filled", filled_qty=3)
+        stream.push("B", "filled", filled_qty=5, filled_avg_price=10.5)
+        stream.push("A", "filled", filled_qty=10, filled_avg_price=99.0)
+        results = await asyncio.gather(*waits)
+        await tracker.stop()
+        return stream, tracker, results
+
+    start = time.perf_counter()
+    stream, tracker, (a, b) = asyncio.run(scenario())
+
+    assert time.perf_counter() - start < 1.0
+    assert (a["status"], a["filled_qty"], a["filled_avg_price"]) == ("filled", 10, 99.0)
+    assert (b["status"], b["filled_avg_price"]) == ("filled", 10.5)
+    assert tracker.events == 3
+    assert tracker.fallback_fetches == 0
+    assert stream.stopped
+
+
+def test_event_before_wait_and_cancel_resolve_immediately():
+    async def scenario():
+        stream = _StubStream()
+        tracker = FillTracker(_unexpected_fetch, stream=stream)
+        await tracker.start()
+        stream.push("C", "canceled")
+        await asyncio.sleep(0.01)
+        info = await tracker.wait_for_fill("C", timeout=10)
+        await tracker.stop()
+        return info
+
+    assert asyncio.run(scenario())["status"] == "canceled"
+
+
+def test_single_order_lookup_when_no_event_arrives():
+    states = iter(["new", "accepted", "filled"])
+    calls: list[str] = []
+
+    def fetch(order_id: str) -> dict:
+        calls.append(order_id)
+        return {"order_id": order_id, "status": next(states), "filled_qty": 7}
+
+    tracker = FillTracker(fetch, stream=None, poll_interval=0.01)
+    info = asyncio.run(tracker.wait_for_fill("D", timeout=5))
+
+    assert info["status"] == "filled"
+    assert calls == ["D", "D", "D"]
+
+
+# ---------------------------------------------------------------------------
+# Executor._wait_for_fill — timeout semantics unchanged
+# ---------------------------------------------------------------------------
+
+def _executor(get_order):
+    from src.agents.executor import Executor
+
+    with patch.object(Executor, "__init__", lambda self: None):
+        ex = Executor.__new__(Executor)
+    ex.logger = MagicMock()
+    ex._alpaca = MagicMock()
+    ex._alpaca.get_order.side_effect = get_order
+    ex._fills = None
+    return ex
+
+
+def test_wait_for_fill_timeout_returns_partial_or_submitted(monkeypatch):
+    monkeypatch.setattr(executor_module, "FILL_TIMEOUT_SEC", 0.05)
+    monkeypatch.setattr(executor_module, "FILL_POLL_INTERVAL_SEC", 0.01)
+
+    partial = _executor(lambda oid: {"order_id": oid, "status": "partially_filled", "filled_qty": 4})
+    info = asyncio.run(partial._wait_for_fill("E"))
+    assert info == {"status": "partially_filled", "filled_avg_price": None, "filled_qty": 4, "filled_at": None}
+
+    pending = _executor(lambda oid: {"order_id": oid, "status": "accepted"})
+    assert asyncio.run(pending._wait_for_fill("F")) == {"status": "submitted"}
+
+
+# ---------------------------------------------------------------------------
+# Executor.run — concurrent submission, per-symbol ordering
+# ---------------------------------------------------------------------------
+
+def test_run_executes_symbols_concurrently_in_order_per_symbol():
+    ex = _executor(lambda oid: None)
+    ex.name = "executor"
+    active = 0
+    peak = 0
+    log: list[tuple[str, str, str]] = []
+
+    async def execute(decision):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        log.append(("start", decision["symbol"], decision["action"]))
+        await asyncio.sleep(0.05)  # waiting for the fill
+        log.append(("end", decision["symbol"], decision["action"]))
+        active -= 1
+        return {"symbol": decision["symbol"], "side": decision["action"].lower()}
+
+    async def no_tracker():
+        return None
+
+    ex._execute_order = execute
+    ex._start_fill_tracker = no_tracker
+    decisions = [
+        {"symbol": "XLK", "action": "SELL", "status": "APPROVED"},
+        {"symbol": "XLE", "action": "BUY", "status": "APPROVED"},
+        {"symbol": "XLK", "action": "BUY", "status": "APPROVED"},
+        {"symbol": "XLF", "action": "BUY", "status": "APPROVED"},
+        {"symbol": "XLV", "action": "BUY", "status": "REJECTED"},
+    ]
+    cfg = MagicMock()
+    cfg.risk.max_concurrent_orders = 2
+    with patch.object(executor_module, "get_settings", return_value=cfg):
+        result = asyncio.run(ex.run(decisions))
+
+    assert [(o["symbol"], o["side"]) for o in result["orders"]] == [
+        ("XLK", "sell"), ("XLE", "buy"), ("XLK", "buy"), ("XLF", "buy"),
+    ]
+    assert peak == 2
+    xlk = [entry for entry in log if entry[1] == "XLK"]
+    assert xlk == [("start", "XLK", "SELL"), ("end", "XLK", "SELL"), ("start", "XLK", "BUY"), ("end", "XLK", "BUY")]
+    # 4 orders × 50 ms with 2 slots: two rounds, not four.
+    assert result["wall_time_ms"] < 180
@@ -0,0 +1,98 @@
+"""
+Tests for walk-forward optimization (windows, windowed engine runs, stitching).
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest.engine import BacktestConfig, BacktestEngine
+from src.backtest.indicators import PrecomputeCache
+from src.backtest.walkforward import WalkForwardWindow, build_windows, run_walkforward
+from tests.unit.conftest import daily_bars
+
+
+DATA = {sym: daily_bars(520, seed=i, start="2022-01-03") for i, sym in enumerate(["SPY", "AAPL", "MSFT", "XOM"])}
+CONFIG = BacktestConfig(start=date(2022, 1, 3), end=date(2023, 12, 29), trend_filter=False)
+GRID = {"stop_loss_atr": [1.5, 2.5], "take_profit_atr": [3.0, 5.0]}
+
+
+def test_build_windows_tiles_the_test_period():
+    windows = build_windows(date(2022, 1, 1), date(2023, 12, 31), train_months=12, test_months=4)
+    assert [(w.test_start, w.test_end) for w in windows] == [
+        (date(2023, 1, 1), date(2023, 4, 30)),
+        (date(2023, 5, 1), date(2023, 8, 31)),
+        (date(2023, 9, 1), date(2023, 12, 31)),
+    ]
+    assert windows[0].train_start == date(2022, 1, 1) and windows[0].train_end == date(2022, 12, 31)
+    assert windows[1].train_start == date(2022, 5, 1)
+    assert build_windows(date(2022, 1, 1), date(2022, 6, 30), 12, 3) == []
+
+
+def test_overlapping_test_spans_are_rejected():
+    with pytest.raises(ValueError, match="overlap"):
+        build_windows(date(2022, 1, 1), date(2023, 12, 31), train_months=12, test_months=4, step_months=2)
+    # A larger step leaves gaps between test spans but never double-counts
+    windows = build_windows(date(2022, 1, 1), date(2023, 12, 31), train_months=12, test_months=2, step_months=4)
+    assert all(b.test_start > a.test_end for a, b in zip(windows, windows[1:]))
+
+    first = build_windows(date(2022, 1, 3), date(2023, 12, 29), train_months=9, test_months=5)[0]
+    shifted = WalkForwardWindow(2, first.train_start, first.train_end, first.test_end, first.test_end)
+    with pytest.raises(ValueError, match="windows 1 and 2 overlap"):
+        run_walkforward(CONFIG, DATA, [first, shifted], GRID)
+
+
+def test_window_covering_everything_matches_full_run():
+    full = BacktestEngine(CONFIG).run(DATA)
+    windowed = BacktestEngine(CONFIG).run(DATA, window=(date(2021, 1, 1), date(2024, 1, 1)))
+    assert windowed.model_dump() == full.model_dump()
+
+
+def test_window_uses_prior_history_for_warmup():
+    window = (date(2023, 6, 1), date(2023, 6, 30))
+    result = BacktestEngine(CONFIG).run(DATA, window=window)
+    assert result.total_bars == len(pd.bdate_range("2023-06-01", "2023-06-30"))
+    assert result.equity_curve[0]["date"].startswith("2023-06-01")
+
+
+def test_precompute_cache_is_reused_and_does_not_change_results():
+    cache = PrecomputeCache()
+    window = (date(2023, 1, 1), date(2023, 6, 30))
+    plain = BacktestEngine(CONFIG).run(DATA, window=window)
+    first = BacktestEngine(CONFIG, precomputed=cache).run(DATA, window=window)
+    other = CONFIG.model_copy(update={"stop_loss_atr": 2.5})
+    BacktestEngine(other, precomputed=cache).run(DATA, window=(date(2023, 7, 1), date(2023, 12, 29)))
+
+    assert first.model_dump() == plain.model_dump()
+    assert cache.misses == len(DATA)
+    assert cache.hits == len(DATA)
+
+
+def test_walkforward_stitches_out_of_sample_windows():
+    windows = build_windows(date(2022, 1, 3), date(2023, 12, 29), train_months=9, test_months=5)
+    wf = run_walkforward(CONFIG, DATA, windows, GRID)
+
+    assert len(wf.windows) == len(windows) == 3
+    assert all(o.params in [{"stop_loss_atr": sl, "take_profit_atr": tp}
+                            for sl in (1.5, 2.5) for tp in (3.0, 5.0)] for o in wf.windows)
+    assert wf.result.config.start == windows[0].test_start
+    assert len(wf.result.trades) == sum(o.test_metrics.total_trades for o in wf.windows)
+    assert wf.result.equity_curve[0]["date"] >= str(windows[0].test_start)
+    # Each window starts from the equity the previous one ended with
+    assert wf.metrics.final_equity == wf.windows[-1].test_metrics.final_equity
+    compounded = CONFIG.initial_capital * np.prod([1 + o.test_metrics.total_return_pct / 100 for o in wf.windows])
+    assert compounded == pytest.approx(wf.metrics.final_equity, rel=1e-3)
+
+
+def test_parallel_walkforward_matches_serial():
+    windows = build_windows(date(2022, 1, 3), date(2023, 12, 29), train_months=9, test_months=5)
+    serial = run_walkforward(CONFIG, DATA, windows, GRID)
+    parallel = run_walkforward(CONFIG, DATA, windows, GRID, workers=2)
+
+    assert [o.params for o in parallel.windows] == [o.params for o in serial.windows]
+    assert [o.train_score for o in parallel.windows] == [o.train_score for o in serial.windows]
+    assert parallel.result.model_dump() == serial.result.model_dump()
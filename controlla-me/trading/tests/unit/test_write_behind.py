@@ -0,0 +1,216 @@
+"""
+Tests for the write-behind queue: batching, ordering, spill-to-SQLite while
+Supabase is down and replay on recovery.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from unittest.mock import patch
+
+from postgrest.exceptions import APIError
+
+from src.utils.db_local import LocalDB
+from src.utils.write_behind import WriteBehindQueue, _retryable, install_write_behind
+
+
+class _FakeSupabase:
+    """Records executed requests; ``down`` makes every request fail, rows with "bad" are rejected."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.down = False
+        self.requests: list[tuple] = []
+        self.lock = threading.Lock()
+
+    def table(self, name: str) -> "_FakeRequest":
+        return _FakeRequest(self, name)
+
+
+class _FakeRequest:
+    def __init__(self, db: _FakeSupabase, table: str) -> None:
+        self.db, self.table, self.call = db, table, None
+
+    def insert(self, rows, **kwargs):
+        self.call = ("insert", self.table, rows if isinstance(rows, list) else [rows])
+        return self
+
+    def update(self, updates):
+        self.call = ("update", self.table, updates)
+        return self
+
+    def eq(self, column, value):
+        self.call = (*self.call, (column, value))
+        return self
+
+    def execute(self):
+        time.sleep(self.db.latency)
+        if self.db.down:
+            raise ConnectionError("supabase unreachable")
+        if self.call[0] == "insert" and any("bad" in r for r in self.call[2]):
+            raise APIError({"code": "PGRST204", "message": "Could not find the 'bad' column"})
+        with self.db.lock:
+            self.db.requests.append(self.call)
+
+
+def _rows(db: _FakeSupabase) -> list[tuple[str, str]]:
+    """Flattened (op, id) sequence of everything Supabase received."""
+    out = []
+    for call in db.requests:
+        if call[0] == "insert":
+            out += [("insert", r["id"]) for r in call[2]]
+        else:
+            out.append(("update", call[3][1]))
+    return out
+
+
+def test_inserts_are_batched_per_table_in_order():
+    supa = _FakeSupabase()
+    q = WriteBehindQueue(supa, flush_interval=0.05)
+    for i in range(5):
+        q.insert("trading_signals", {"id": f"s{i}"})
+    q.insert("trading_orders", {"id": "o1"})
+    q.update("trading_orders", {"status": "filled"}, "alpaca_order_id", "o1")
+    q.start()
+    assert q.flush(timeout=5)
+    q.close()
+
+    assert [c[0:2] for c in supa.requests] == [
+        ("insert", "trading_signals"), ("insert", "trading_orders"), ("update", "trading_orders"),
+    ]
+    assert _rows(supa) == [*[("insert", f"s{i}") for i in range(5)], ("insert", "o1"), ("update", "o1")]
+    assert q.stats.requests == 3 and q.stats.written == 7
+
+
+def test_spill_while_down_then_replay_in_order(tmp_path):
+    supa = _FakeSupabase()
+    spill = LocalDB(tmp_path / "spill.db")
+    q = WriteBehindQueue(supa, spill=spill, flush_interval=0.01, retry_interval=0.05)
+    q.start()
+
+    supa.down = True
+    q.insert("trading_orders", {"id": "o1"})
+    assert q.flush(timeout=5)
+    supa.down = False  # recovered — but o1 is still spilled
+    q.update("trading_orders", {"status": "filled"}, "alpaca_order_id", "o1")
+    q.insert("risk_events", {"id": "e1"})
+    assert q.flush(timeout=5)
+    assert spill.count_spilled_writes() >= 1
+
+    deadline = time.monotonic() + 5
+    while spill.count_spilled_writes() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    q.close()
+
+    assert spill.count_spilled_writes() == 0
+    assert _rows(supa) == [("insert", "o1"), ("update", "o1"), ("insert", "e1")]
+    assert q.stats.spilled == 3 and q.stats.replayed == 3
+
+
+def _wait_drained(spill: LocalDB) -> None:
+    deadline = time.monotonic() + 5
+    while spill.count_spilled_writes() and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+
+def test_overflow_keeps_submission_order_through_spill_and_replay(tmp_path):
+    supa = _FakeSupabase()
+    spill = LocalDB(tmp_path / "spill.db")
+    q = WriteBehindQueue(supa, spill=spill, max_pending=2, flush_interval=0.01, retry_interval=0.05)
+    q.insert("trading_orders", {"id": "o1"})
+    q.update("trading_orders", {"status": "filled"}, "alpaca_order_id", "o1")
+    q.insert("trading_orders", {"id": "o2"})  # queue full → spilled ahead of the queued o1 writes
+    q.update("trading_orders", {"status": "filled"}, "alpaca_order_id", "o2")
+
+    assert (q.pending, q.stats.overflow) == (2, 2)
+    assert spill.count_spilled_writes() == 2
+
+    supa.down = True
+    q.start()
+    assert q.flush(timeout=5)
+    assert spill.count_spilled_writes() == 4
+    supa.down = False
+    _wait_drained(spill)
+    q.close()
+
+    assert _rows(supa) == [("insert", "o1"), ("update", "o1"), ("insert", "o2"), ("update", "o2")]
+
+
+def test_pending_stays_bounded_under_sustained_overflow(tmp_path):
+    supa = _FakeSupabase(latency=0.002)
+    spill = LocalDB(tmp_path / "spill.db")
+    q = WriteBehindQueue(supa, spill=spill, max_pending=5, batch_size=3, flush_interval=0.01, retry_interval=0.05)
+    q.start()
+
+    peak = 0
+    for i in range(100):
+        q.insert("trading_orders", {"id": f"o{i}"})
+        q.update("trading_orders", {"status": "filled"}, "alpaca_order_id", f"o{i}")
+        peak = max(peak, q.pending)
+    assert peak <= 5
+    assert q.stats.overflow > 0
+
+    assert q.flush(timeout=10)
+    _wait_drained(spill)
+    q.close()
+
+    assert spill.count_spilled_writes() == 0
+    assert _rows(supa) == [r for i in range(100) for r in (("insert", f"o{i}"), ("update", f"o{i}"))]
+
+
+def test_rejected_rows_are_dropped_not_retried(tmp_path):
+    supa = _FakeSupabase()
+    spill = LocalDB(tmp_path / "spill.db")
+    q = WriteBehindQueue(supa, spill=spill, flush_interval=0.01, retry_interval=0.05)
+    q.start()
+
+    supa.down = True
+    q.insert("trading_orders", {"id": "x", "bad": 1})  # at the head of the spill
+    q.insert("trading_orders", {"id": "o1"})
+    q.update("trading_orders", {"status": "filled"}, "alpaca_order_id", "o1")
+    assert q.flush(timeout=5)
+    supa.down = False
+    _wait_drained(spill)
+
+    q.insert("trading_signals", {"id": "s0"})
+    q.insert("trading_signals", {"id": "y", "bad": 1})
+    q.insert("trading_signals", {"id": "s2"})
+    assert q.flush(timeout=5)
+    q.close()
+
+    assert spill.count_spilled_writes() == 0
+    assert _rows(supa) == [("insert", "o1"), ("update", "o1"), ("insert", "s0"), ("insert", "s2")]
+    assert q.stats.rejected == 2
+
+
+def test_only_transport_errors_and_5xx_are_retryable():
+    assert _retryable(ConnectionError("reset"))
+    assert _retryable(APIError({"code": 502, "message": "JSON could not be generated"}))
+    assert _retryable(APIError({"code": "PGRST001", "message": "database connection error"}))
+    assert not _retryable(APIError({"code": "23505", "message": "duplicate key"}))
+    assert _retryable(APIError({"code": "08006", "message": "connection failure"}))
+    assert not _retryable(APIError({"code": 400, "message": "JSON could not be generated"}))
+    assert not _retryable(ValueError("not serializable"))
+
+
+def test_trading_db_writes_do_not_wait_for_supabase():
+    from src.utils.db import TradingDB
+
+    slow = _FakeSupabase(latency=0.2)
+    q = install_write_behind(WriteBehindQueue(slow, flush_interval=0.01))
+    q.start()
+    try:
+        with patch("src.utils.db.get_supabase", return_value=slow):
+            db = TradingDB()
+        start = time.perf_counter()
+        for i in range(5):
+            db.insert_order({"id": f"o{i}", "symbol": "SPY", "side": "buy"})
+        db.update_order("o0", {"status": "filled"})
+        assert time.perf_counter() - start < 0.1
+        assert q.flush(timeout=5)
+    finally:
+        q.close()
+        install_write_behind(None)
+
+    assert _rows(slow) == [*[("insert", f"o{i}") for i in range(5)], ("update", "o0")]